@@ -0,0 +1,165 @@
+"""
+AnalysisProfile definition. AnalysisProfile collects timings of an analysis run.
+
+Copyright 2025, Gates Foundation. All rights reserved.
+"""
+import csv
+import json
+from collections import defaultdict
+from dataclasses import dataclass, field
+from logging import getLogger
+from typing import Dict, List, Optional, Tuple
+from tabulate import tabulate
+
+logger = getLogger(__name__)
+
+# Stages recorded by the analysis
+FETCH = 'fetch'  # retrieving the files of an item
+PARSE = 'parse'  # parsing (or copying parsed) files for an analyzer
+MAP = 'map'  # analyzer map
+QUEUE = 'queue'  # waiting for a worker
+IPC = 'ipc'  # returning map results from the worker
+REDUCE = 'reduce'  # analyzer reduce, including partial reduces and combines
+STAGES = [FETCH, PARSE, MAP, QUEUE, IPC, REDUCE]
+# Stages counting as work done on an item
+ITEM_STAGES = [FETCH, PARSE, MAP]
+PROFILE_FIELDS = ['item', 'analyzer', 'stage', 'seconds', 'bytes']
+
+
+@dataclass
+class AnalysisProfile:
+    """
+    Timings and bytes transferred by stage, item and analyzer during an analysis.
+    """
+    records: List[Dict] = field(default_factory=list)
+
+    def add(self, stage: str, seconds: float, item: Optional[str] = None, analyzer: Optional[str] = None,
+            nbytes: int = 0) -> None:
+        """
+        Add a record.
+
+        Args:
+            stage: Stage of the analysis
+            seconds: Time spent
+            item: Item id, if the record is about an item
+            analyzer: Analyzer uid, if the record is about an analyzer
+            nbytes: Bytes transferred
+
+        Returns:
+            None
+        """
+        self.records.append(dict(item=item, analyzer=analyzer, stage=stage, seconds=seconds, bytes=nbytes))
+
+    def extend(self, records: List[Dict]) -> None:
+        """
+        Add records collected by a worker.
+
+        Args:
+            records: Records to add
+
+        Returns:
+            None
+        """
+        self.records.extend(records)
+
+    def totals(self, key: Optional[str] = None, stages: Optional[List[str]] = None) -> Dict:
+        """
+        Total seconds and bytes, grouped by stage, item or analyzer.
+
+        Args:
+            key: Group by *item* or *analyzer*. Defaults to stage.
+            stages: Only count these stages. Defaults to all stages.
+
+        Returns:
+            Dict of group and (seconds, bytes)
+        """
+        totals = defaultdict(lambda: [0.0, 0])
+        for record in self.records:
+            if stages is not None and record['stage'] not in stages:
+                continue
+            group = record['stage'] if key is None else record[key]
+            if group is None:
+                continue
+            totals[group][0] += record['seconds']
+            totals[group][1] += record['bytes']
+        return {group: tuple(total) for group, total in totals.items()}
+
+    def slowest(self, key: str, n: int = 5, stages: Optional[List[str]] = None) -> List[Tuple[str, float]]:
+        """
+        Get the slowest items or analyzers.
+
+        Args:
+            key: *item* or *analyzer*
+            n: Number of results
+            stages: Only count these stages. Defaults to fetch, parse and map for items and to all stages for
+                analyzers.
+
+        Returns:
+            List of item ids or analyzer uids with their total seconds, slowest first
+        """
+        if stages is None and key == 'item':
+            stages = ITEM_STAGES
+        totals = self.totals(key, stages)
+        return sorted(((group, total[0]) for group, total in totals.items()), key=lambda x: x[1], reverse=True)[:n]
+
+    def summary(self, n: int = 5) -> str:
+        """
+        Build a summary of the profile.
+
+        Args:
+            n: Number of slowest items and analyzers to list
+
+        Returns:
+            Summary tables
+        """
+        stage_totals = self.totals()
+        rows = [(stage, f"{stage_totals[stage][0]:.3f}", stage_totals[stage][1]) for stage in STAGES if stage in stage_totals]
+        tables = [tabulate(rows, headers=['Stage', 'Seconds', 'Bytes'], tablefmt='psql')]
+
+        analyzer_rows = []
+        analyzer_totals = [self.totals('analyzer', [stage]) for stage in (PARSE, MAP, REDUCE)]
+        for analyzer, seconds in self.slowest('analyzer', n):
+            stage_seconds = [totals.get(analyzer, (0.0, 0))[0] for totals in analyzer_totals]
+            analyzer_rows.append((analyzer, *(f"{s:.3f}" for s in stage_seconds), f"{seconds:.3f}"))
+        if analyzer_rows:
+            tables.append(tabulate(analyzer_rows, headers=['Slowest analyzers', 'Parse', 'Map', 'Reduce', 'Total'],
+                                   tablefmt='psql'))
+
+        item_rows = [(item, f"{seconds:.3f}") for item, seconds in self.slowest('item', n)]
+        if item_rows:
+            tables.append(tabulate(item_rows, headers=['Slowest items', 'Seconds'], tablefmt='psql'))
+        return '\n'.join(tables)
+
+    def to_json(self, path: str) -> None:
+        """
+        Write the records and totals to a JSON file.
+
+        Args:
+            path: File path
+
+        Returns:
+            None
+        """
+        content = dict(
+            totals={stage: dict(seconds=seconds, bytes=nbytes) for stage, (seconds, nbytes) in self.totals().items()},
+            slowest_items=self.slowest('item'),
+            slowest_analyzers=self.slowest('analyzer'),
+            records=self.records
+        )
+        with open(path, 'w') as f:
+            json.dump(content, f, indent=2)
+
+    def to_csv(self, path: str) -> None:
+        """
+        Write the records to a CSV file.
+
+        Args:
+            path: File path
+
+        Returns:
+            None
+        """
+        with open(path, 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=PROFILE_FIELDS)
+            writer.writeheader()
+            writer.writerows(self.records)
@@ -7,12 +7,17 @@ Copyright 2021, Bill & Melinda Gates Foundation. All rights reserved.
 import os
 import sys
 import time
-from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from collections import Counter
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor, as_completed, wait, FIRST_COMPLETED
+from itertools import islice
 from logging import getLogger, DEBUG
-from typing import NoReturn, List, Dict, Tuple, Optional, TYPE_CHECKING
+from queue import SimpleQueue
+from typing import Any, NoReturn, List, Dict, Tuple, Optional, Union, Generator, TYPE_CHECKING
 from tqdm import tqdm
 from idmtools import IdmConfigParser
-from idmtools.analysis.map_worker_entry import map_item
+from idmtools.analysis.analysis_profile import AnalysisProfile, QUEUE, IPC, REDUCE
+from idmtools.analysis.map_result_cache import MapResultCache
+from idmtools.analysis.map_worker_entry import map_item, map_items
 from idmtools.core import NoPlatformException
 from idmtools.core.enums import ItemType
 from idmtools.core.interfaces.ientity import IEntity
@@ -27,7 +32,8 @@ logger = getLogger(__name__)
 user_logger = getLogger('user')
 
 
-def pool_worker_initializer(func, analyzers, platform: 'IPlatform') -> NoReturn:
+def pool_worker_initializer(func, analyzers, platform: 'IPlatform', cache: Optional[MapResultCache] = None,
+                            fingerprints: Optional[Dict[str, str]] = None, profile: bool = False) -> NoReturn:
     """
     Initialize the pool worker, which allows the process pool to associate the analyzers, cache, and path mapping to the function executed to retrieve data.
 
@@ -37,12 +43,34 @@ def pool_worker_initializer(func, analyzers, platform: 'IPlatform') -> NoReturn:
         func: The function that the pool will call.
         analyzers: The list of all analyzers to run.
         platform: The platform to communicate with to retrieve files from.
+        cache: The map result cache. None disables caching.
+        fingerprints: Analyzer fingerprints by analyzer uid, used in map result cache keys.
+        profile: Whether to record timings of the mapping.
 
     Returns:
         None
     """
     func.analyzers = analyzers
     func.platform = platform
+    func.cache = cache
+    func.fingerprints = fingerprints
+    func.profile = profile
+
+
+def timed_call(func, *args) -> Tuple[Any, float]:
+    """
+    Call a function in a worker and measure how long it takes, excluding the time queued for the worker.
+
+    Args:
+        func: The function to call, for example an analyzer reduce.
+        args: Arguments of the function.
+
+    Returns:
+        Result of the function and its duration in seconds
+    """
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
 
 
 class AnalyzeManager:
@@ -52,6 +80,8 @@ class AnalyzeManager:
     ANALYZE_TIMEOUT = 3600 * 8  # Maximum seconds before timing out - set to 8 hours
     WAIT_TIME = 1.15  # How much time to wait between check if the analysis is done
     EXCEPTION_KEY = '__EXCEPTION__'
+    CHUNK_TARGET_TIME = 0.5  # Seconds of work targeted per chunk when chunk_size is 'auto'
+    MAX_CHUNK_SIZE = 256  # Largest chunk of items sent to a worker when chunk_size is 'auto'
 
     class TimeOutException(Exception):
         """
@@ -74,7 +104,10 @@ class AnalyzeManager:
                  partial_analyze_ok: bool = False, max_items: Optional[int] = None, verbose: bool = True,
                  force_manager_working_directory: bool = False,
                  exclude_ids: List[str] = None, analyze_failed_items: bool = False,
-                 max_workers: Optional[int] = None, executor_type: str = 'process'):
+                 max_workers: Optional[int] = None, executor_type: str = 'process',
+                 streaming: bool = False, max_in_flight: Optional[int] = None, chunk_size: Union[int, str] = 1,
+                 map_cache: Union[bool, str, MapResultCache] = False, tree_reduce: bool = False,
+                 reduce_shard_size: Optional[int] = None, profile: Union[bool, str] = False):
         """
         Initialize the AnalyzeManager.
 
@@ -92,6 +125,13 @@ class AnalyzeManager:
             analyze_failed_items (bool, optional): Allows analyzing of failed items. Useful when you are trying to aggregate items that have failed. Defaults to False.
             max_workers (int, optional): Set the max workers. If not provided, falls back to the configuration item *max_threads*. If max_workers is not set in configuration, defaults to CPU count
             executor_type: (str): Whether to use process or thread pooling. Process pooling is more efficient but threading might be required in some environments
+            streaming (bool, optional): Map items with a bounded number of items in flight and reduce results as they arrive for analyzers implementing :meth:`~idmtools.entities.ianalyzer.IAnalyzer.combine`. Peak memory no longer grows with the number of items. Defaults to False.
+            max_in_flight (int, optional): In streaming mode, the maximum number of items submitted to workers at once. It is also the number of items reduced at a time. Defaults to four times the number of workers.
+            chunk_size (int or str, optional): Number of items sent to a worker in one task. Use 'auto' to adapt the chunk size to the measured map time per item. Larger chunks reduce communication overhead when map functions are cheap. Defaults to 1.
+            map_cache (bool, str or MapResultCache, optional): Reuse map results of previous runs for items whose files and analyzer are unchanged. True uses the default cache directory, a string is the cache directory. Defaults to False.
+            tree_reduce (bool, optional): Reduce shards of items in parallel for analyzers implementing :meth:`~idmtools.entities.ianalyzer.IAnalyzer.combine` and combine the partial results in parallel. Defaults to False.
+            reduce_shard_size (int, optional): In tree reduce mode, the number of items reduced together. Defaults to the number of items divided by the number of workers.
+            profile (bool or str, optional): Record fetch, parse, map, IPC and reduce timings and bytes transferred. A summary is logged at the end of the analysis and the profile saved as analysis_profile.json and analysis_profile.csv in the working directory, or in the directory given. Defaults to False.
         """
         super().__init__()
         if working_dir is None:
@@ -121,6 +161,35 @@ class AnalyzeManager:
         if logger.isEnabledFor(DEBUG):
             logger.debug(f'AnalyzeManager set to {self.max_processes}')
 
+        # streaming map/reduce options
+        if max_in_flight is not None and max_in_flight < 1:
+            raise ValueError("max_in_flight must be greater or equal to one")
+        self.streaming = streaming
+        self.max_in_flight = max_in_flight
+
+        # number of items sent to a worker at once
+        if chunk_size != 'auto' and (not isinstance(chunk_size, int) or chunk_size < 1):
+            raise ValueError(f'{chunk_size} is not a valid chunk_size. Choose either "auto" or an integer greater or equal to one')
+        self.chunk_size = chunk_size
+
+        # persistent cache of map results
+        if map_cache is True:
+            map_cache = MapResultCache()
+        elif isinstance(map_cache, (str, os.PathLike)):
+            map_cache = MapResultCache(directory=map_cache)
+        self.map_cache: Optional[MapResultCache] = map_cache or None
+        self.cache_stats = Counter()
+
+        # parallel reduce of combinable analyzers
+        if reduce_shard_size is not None and reduce_shard_size < 1:
+            raise ValueError("reduce_shard_size must be greater or equal to one")
+        self.tree_reduce = tree_reduce
+        self.reduce_shard_size = reduce_shard_size
+
+        # analysis profiling
+        self.profile: Optional[AnalysisProfile] = AnalysisProfile() if profile else None
+        self.profile_dir = profile if isinstance(profile, (str, os.PathLike)) else None
+
         # Should we continue analyzing even when we encounter an error?
         self.continue_on_error = False
 
@@ -302,6 +371,154 @@ class AnalyzeManager:
             if hasattr(analyzer, 'need_dir_map'):
                 user_logger.log(VERBOSE, f' | (Directory map: {on_off(analyzer.need_dir_map)}')
         user_logger.log(VERBOSE, f' | Pool of {n_processes} analyzing {self.executor_type}(es)')
+        user_logger.log(VERBOSE, f' | Chunk size: {self.chunk_size}')
+        if self.map_cache is not None:
+            user_logger.log(VERBOSE, f' | Map result cache: {self.map_cache._cache_directory}')
+        if self.tree_reduce:
+            user_logger.log(VERBOSE, ' | Tree reduce for analyzers implementing combine')
+        if self.streaming:
+            user_logger.log(VERBOSE, f' | Streaming with {self.max_in_flight or max(self.max_processes, 1) * 4} item(s) in flight')
+
+    def evict_map_cache(self, max_size: Optional[int] = None, max_age: Optional[float] = None) -> int:
+        """
+        Evict map results from the map result cache.
+
+        Args:
+            max_size: Evict the least recently stored results until the cache is smaller than max_size bytes.
+            max_age: Evict results stored more than max_age seconds ago.
+
+        Returns:
+            Number of results evicted
+        """
+        if self.map_cache is None:
+            return 0
+        return self.map_cache.evict(max_size=max_size, max_age=max_age)
+
+    def _next_chunk_size(self, time_per_item: Optional[float]) -> int:
+        """
+        Get the number of items to send to a worker in the next chunk.
+
+        Args:
+            time_per_item: Measured average map time per item in seconds. None if not measured yet.
+
+        Returns:
+            Chunk size
+        """
+        if self.chunk_size != 'auto':
+            return self.chunk_size
+        if time_per_item is None:
+            return 1
+        return max(1, min(self.MAX_CHUNK_SIZE, int(self.CHUNK_TARGET_TIME / max(time_per_item, 1e-6))))
+
+    def _iter_map_results(self, executor, progress: tqdm, max_in_flight: Optional[int] = None) -> Generator[Tuple[IEntity, Optional[Dict], Optional[Exception]], None, None]:
+        """
+        Submit the items to the workers in chunks and yield their map results as chunks complete.
+
+        Args:
+            executor: A pool of workers.
+            progress: Progress bar to update.
+            max_in_flight: Maximum number of items submitted and not yet returned. None submits every chunk at once
+                unless chunk size is adaptive.
+
+        Returns:
+            Generator of item, map results of the item and exception raised mapping the item
+        """
+        items = iter(self._items.values())
+        # With adaptive chunks, only a few chunks are queued at a time so later chunks benefit from measurements
+        max_chunks = max(self.max_processes, 1) * 2 if self.chunk_size == 'auto' else None
+        bounded = max_in_flight is not None or max_chunks is not None
+        futures = dict()
+        # completed futures of a bounded window, in order of completion
+        done_queue = SimpleQueue()
+        in_flight = 0
+        time_per_item = None
+
+        def submit_chunk() -> bool:
+            nonlocal in_flight
+            size = self._next_chunk_size(time_per_item)
+            if max_in_flight is not None:
+                size = min(size, max_in_flight - in_flight)
+            chunk = list(islice(items, size))
+            if not chunk:
+                return False
+            future = executor.submit(map_items, chunk)
+            futures[future] = chunk, time.time()
+            in_flight += len(chunk)
+            if bounded:
+                future.add_done_callback(done_queue.put)
+            return True
+
+        def fill_window():
+            while (max_in_flight is None or in_flight < max_in_flight) and \
+                    (max_chunks is None or len(futures) < max_chunks) and submit_chunk():
+                pass
+
+        def chunk_results(future: Future):
+            nonlocal in_flight, time_per_item
+            chunk, submitted = futures.pop(future)
+            in_flight -= len(chunk)
+            progress.update(len(chunk))
+            if future.exception():
+                # the chunk itself failed, for example it could not be sent to the worker
+                for item in chunk:
+                    yield item, None, future.exception()
+                return
+            chunk_result = future.result()
+            self.cache_stats.update(chunk_result['cache_stats'])
+            if self.profile is not None:
+                self._profile_chunk(chunk, chunk_result, submitted)
+            item_time = chunk_result['elapsed'] / len(chunk)
+            time_per_item = item_time if time_per_item is None else 0.7 * time_per_item + 0.3 * item_time
+            for item, (result, ex) in zip(chunk, chunk_result['results']):
+                yield item, result, ex
+
+        fill_window()
+        if not bounded:
+            # every chunk is already submitted
+            for future in as_completed(list(futures.keys())):
+                yield from chunk_results(future)
+            return
+        while futures:
+            yield from chunk_results(done_queue.get())
+            fill_window()
+
+    def _profile_chunk(self, chunk: List[IEntity], chunk_result: Dict[str, Any], submitted: float) -> NoReturn:
+        """
+        Record the profile of a chunk of mapped items.
+
+        Time waiting for a worker and returning results is shared evenly by the items of the chunk.
+
+        Args:
+            chunk: Items of the chunk.
+            chunk_result: Output of :func:`~idmtools.analysis.map_worker_entry.map_items` for the chunk.
+            submitted: Time the chunk was submitted at.
+
+        Returns:
+            None
+        """
+        received = time.time()
+        self.profile.extend(chunk_result.get('profile', []))
+        queue_time = max(chunk_result['started'] - submitted, 0.0) / len(chunk)
+        ipc_time = max(received - chunk_result['finished'], 0.0) / len(chunk)
+        for item, nbytes in zip(chunk, chunk_result.get('result_bytes', [0] * len(chunk))):
+            self.profile.add(QUEUE, queue_time, item=str(item.uid))
+            self.profile.add(IPC, ipc_time, item=str(item.uid), nbytes=nbytes)
+
+    def _report_profile(self) -> NoReturn:
+        """
+        Log the profile summary and save the profile as JSON and CSV.
+
+        Returns:
+            None
+        """
+        profile_dir = self.profile_dir or self.working_dir
+        os.makedirs(profile_dir, exist_ok=True)
+        json_path = os.path.join(profile_dir, 'analysis_profile.json')
+        csv_path = os.path.join(profile_dir, 'analysis_profile.csv')
+        self.profile.to_json(json_path)
+        self.profile.to_csv(csv_path)
+        user_logger.info(f"Analysis profile:\n{self.profile.summary()}")
+        user_logger.info(f"Analysis profile saved to {json_path} and {csv_path}")
 
     def _run_and_wait_for_mapping(self, executor) -> Tuple[Dict, bool]:
         """
@@ -318,26 +535,18 @@ class AnalyzeManager:
         n_items = len(self._items)
         logger.debug(f"Number of items for analysis: {n_items}")
         logger.debug("Mapping the items for analysis")
-        futures = dict()
         results = dict()
         status = True
-        # create status bar and then queue our futures
+        # create status bar and then queue our chunks, catch exceptions, and aggregate results
         with tqdm(total=len(self._items)) as progress:
-            for i in self._items.values():
-                future = executor.submit(map_item, i)
-                future.add_done_callback(lambda p: progress.update())
-                futures[future] = i
-
-            # wait on our futures to complete, catch exceptions, and aggregate results
-            for future in as_completed(futures.keys()):
-                if future.exception():
+            for item, result, ex in self._iter_map_results(executor, progress):
+                if ex is not None:
                     status = False
-                    ex = future.exception()
                     user_logger.error(ex)
                     if not self.continue_on_error:
                         raise ex
                 else:
-                    results[futures[future]] = future.result()
+                    results[item] = result
 
         logger.debug(f"Result fetching status: : {status}")
         return results, status
@@ -348,6 +557,7 @@ class AnalyzeManager:
 
         Args:
             executor: A pool of workers.
+            results: An item keyed dictionary of map results per analyzer.
 
         Returns:
             An analyzer ID keyed dictionary of finalize results.
@@ -356,42 +566,191 @@ class AnalyzeManager:
         # the keys in self.cache from map() calls are expected to be item ids. Each keyed value
         # contains analyzer_id: item_results_for_analyzer entries.
         logger.debug("Running reduce results")
-        futures = {}
+        analyzer_data = {}
+        for analyzer in self.analyzers:
+            logger.debug(f"Gather data for {analyzer.uid}")
+            item_data_for_analyzer = {}
+            for item, data in results.items():
+                if analyzer.uid in data:
+                    item_data_for_analyzer[item] = data[analyzer.uid]
+            analyzer_data[analyzer.uid] = item_data_for_analyzer
+        return self._run_and_wait_for_analyzer_reduces(executor, self.analyzers, analyzer_data)
+
+    def _run_and_wait_for_analyzer_reduces(self, executor, analyzers: List[IAnalyzer], analyzer_data: Dict[str, Dict]) -> dict:
+        """
+        Run and manage the reduce call of each analyzer on its gathered item data.
+
+        In tree reduce mode, analyzers implementing :meth:`~idmtools.entities.ianalyzer.IAnalyzer.combine` reduce
+        shards of their items in parallel. Adjacent partial results are then combined in parallel, as soon as both
+        are ready, until one result is left. Items order is kept so combine only needs to be associative.
+
+        Args:
+            executor: A pool of workers.
+            analyzers: The analyzers to reduce.
+            analyzer_data: An analyzer ID keyed dictionary of item data.
+
+        Returns:
+            An analyzer ID keyed dictionary of finalize results.
+        """
+        # for each analyzer, the ordered futures of its partial results
+        partials: Dict[str, List[Future]] = {}
+        owners: Dict[Future, str] = {}
         finalize_results = {}
         # create a progress bar
-        with tqdm(total=len(self.analyzers), desc="Running Analyzer Reduces") as progress:
+        with tqdm(total=len(analyzers), desc="Running Analyzer Reduces") as progress:
             # for each analyzer, queue our futures
-            for analyzer in self.analyzers:
-                logger.debug(f"Gather data for {analyzer.uid}")
-                item_data_for_analyzer = {}
-                for item, data in results.items():
-                    if analyzer.uid in data:
-                        item_data_for_analyzer[item] = data[analyzer.uid]
+            for analyzer in analyzers:
+                item_data_for_analyzer = analyzer_data.get(analyzer.uid, {})
                 if item_data_for_analyzer.__len__() == 0:
                     user_logger.warning(f"Note: {analyzer.uid} has no simulation data to analyze. Please verify the filter or map function of the analyzer.")
-                future = executor.submit(analyzer.reduce, item_data_for_analyzer)
-                future.add_done_callback(lambda p: progress.update())
+                partials[analyzer.uid] = []
+                for shard in self._reduce_shards(analyzer, item_data_for_analyzer):
+                    future = executor.submit(timed_call, analyzer.reduce, shard)
+                    owners[future] = analyzer.uid
+                    partials[analyzer.uid].append(future)
 
-                logger.debug(f"Queueing {analyzer.uid}")
-                futures[future] = analyzer.uid
+                logger.debug(f"Queueing {analyzer.uid} on {len(partials[analyzer.uid])} shard(s)")
 
             # wait on our futures, catch exceptions, and aggregate results
             logger.debug("Waiting for results")
-            for future in as_completed(futures.keys()):
-                if future.exception():
-                    user_logger.error(f'Reduce for Analyzer {futures[future]} failed')
-                    user_logger.exception(future.exception())
-                    user_logger.error("See log for details")
-                    if not self.continue_on_error:
-                        sys.exit(-1)
-                else:
-                    finalize_results[futures[future]] = future.result()
+            analyzers_by_uid = {analyzer.uid: analyzer for analyzer in analyzers}
+            pending = set(owners.keys())
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    uid = owners.pop(future)
+                    if uid not in partials:
+                        # another partial result of this analyzer already failed
+                        continue
+                    if future.exception():
+                        user_logger.error(f'Reduce for Analyzer {uid} failed')
+                        user_logger.exception(future.exception())
+                        user_logger.error("See log for details")
+                        if not self.continue_on_error:
+                            sys.exit(-1)
+                        for other in partials.pop(uid):
+                            other.cancel()
+                        progress.update()
+                        continue
+                    if self.profile is not None:
+                        self.profile.add(REDUCE, future.result()[1], analyzer=uid)
+                    futures = partials[uid]
+                    if len(futures) == 1:
+                        finalize_results[uid] = future.result()[0]
+                        del partials[uid]
+                        progress.update()
+                        continue
+                    # combine adjacent partial results which are both ready
+                    i = 0
+                    while i < len(futures) - 1:
+                        left, right = futures[i], futures[i + 1]
+                        if left not in owners and right not in owners:
+                            combined = executor.submit(timed_call, analyzers_by_uid[uid].combine, left.result()[0],
+                                                       right.result()[0])
+                            owners[combined] = uid
+                            pending.add(combined)
+                            futures[i:i + 2] = [combined]
+                        i += 1
             if logger.isEnabledFor(DEBUG):
                 logger.debug("Finished reducing results")
-            for future in futures.keys():
-                future.cancel()
         return finalize_results
 
+    def _reduce_shards(self, analyzer: IAnalyzer, item_data: Dict) -> List[Dict]:
+        """
+        Split the item data of an analyzer in the shards reduced in parallel.
+
+        Args:
+            analyzer: Analyzer to reduce.
+            item_data: An item keyed dictionary of the analyzer map results.
+
+        Returns:
+            List of item data shards. A single shard unless tree reduce applies to the analyzer.
+        """
+        if not self.tree_reduce or not analyzer.can_combine:
+            return [item_data]
+        shard_size = self.reduce_shard_size or -(-len(item_data) // max(self.max_processes, 1))
+        if shard_size >= len(item_data):
+            return [item_data]
+        items = iter(item_data.items())
+        return [dict(shard) for shard in iter(lambda: list(islice(items, shard_size)), [])]
+
+    def _run_streaming_map_reduce(self, executor) -> Tuple[Dict, bool]:
+        """
+        Map the items with a bounded window of in-flight items and fold results into each analyzer as they arrive.
+
+        Analyzers implementing :meth:`~idmtools.entities.ianalyzer.IAnalyzer.combine` are reduced every
+        *max_in_flight* items and their partial results combined, so map results are released as soon as they are
+        reduced. Other analyzers keep their item data and are reduced once mapping is done.
+
+        Args:
+            executor: A pool of workers.
+
+        Returns:
+            An analyzer ID keyed dictionary of finalize results and False if an exception occurred processing
+            **.map** on any item; otherwise True (succeeded).
+        """
+        window = self.max_in_flight or max(self.max_processes, 1) * 4
+        logger.debug(f"Streaming map/reduce of {len(self._items)} items with {window} items in flight")
+        combinable = {a.uid for a in self.analyzers if a.can_combine}
+        for analyzer in self.analyzers:
+            if analyzer.uid not in combinable:
+                logger.debug(f"{analyzer.uid} does not implement combine. Its data will be reduced at the end")
+        buffers = {a.uid: {} for a in self.analyzers}
+        accumulated = {}
+        status = True
+
+        with tqdm(total=len(self._items)) as progress:
+            for item, data, ex in self._iter_map_results(executor, progress, max_in_flight=window):
+                if ex is not None:
+                    status = False
+                    user_logger.error(ex)
+                    if not self.continue_on_error:
+                        raise ex
+                    continue
+                for analyzer in self.analyzers:
+                    if analyzer.uid in data:
+                        buffers[analyzer.uid][item] = data[analyzer.uid]
+                    if analyzer.uid in combinable and len(buffers[analyzer.uid]) >= window:
+                        self._fold_partial_reduce(analyzer, buffers, accumulated, self.profile)
+
+        finalize_results = {}
+        remaining = []
+        for analyzer in self.analyzers:
+            if analyzer.uid in combinable and (analyzer.uid in accumulated or buffers[analyzer.uid]):
+                if buffers[analyzer.uid]:
+                    self._fold_partial_reduce(analyzer, buffers, accumulated, self.profile)
+                finalize_results[analyzer.uid] = accumulated[analyzer.uid]
+            else:
+                remaining.append(analyzer)
+        if remaining:
+            finalize_results.update(self._run_and_wait_for_analyzer_reduces(executor, remaining, buffers))
+        return finalize_results, status
+
+    @staticmethod
+    def _fold_partial_reduce(analyzer: IAnalyzer, buffers: Dict[str, Dict], accumulated: Dict[str, Any],
+                             profile: Optional[AnalysisProfile] = None) -> NoReturn:
+        """
+        Reduce the buffered item data of an analyzer and combine it with its previous results.
+
+        Args:
+            analyzer: Analyzer to reduce
+            buffers: An analyzer ID keyed dictionary of item data not reduced yet
+            accumulated: An analyzer ID keyed dictionary of combined results
+            profile: Profile to record the reduce time in
+
+        Returns:
+            None
+        """
+        start = time.perf_counter()
+        partial = analyzer.reduce(buffers[analyzer.uid])
+        buffers[analyzer.uid] = {}
+        if analyzer.uid in accumulated:
+            accumulated[analyzer.uid] = analyzer.combine(accumulated[analyzer.uid], partial)
+        else:
+            accumulated[analyzer.uid] = partial
+        if profile is not None:
+            profile.add(REDUCE, time.perf_counter() - start, analyzer=analyzer.uid)
+
     def analyze(self) -> bool:
         """
         Process the provided items with the provided analyzers. This is the main driver method of :class:`AnalyzeManager`.
@@ -432,6 +791,16 @@ class AnalyzeManager:
         for analyzer in self.analyzers:
             analyzer.per_group(items=self._items)
 
+        fingerprints = None
+        self.cache_stats = Counter()
+        if self.profile is not None:
+            self.profile = AnalysisProfile()
+        if self.map_cache is not None:
+            fingerprints = {analyzer.uid: analyzer.fingerprint() for analyzer in self.analyzers}
+            for uid, fingerprint in fingerprints.items():
+                if fingerprint is None:
+                    logger.debug(f"Map results of {uid} will not be cached")
+
         if self.verbose:
             self._print_configuration(n_items, n_processes)
 
@@ -452,15 +821,18 @@ class AnalyzeManager:
                 os.environ['IDMTOOLS_CONFIG_FILE'] = config_file
 
             # our options for our executor
-            opts = dict(max_workers=n_processes, initializer=pool_worker_initializer, initargs=(map_item, self.analyzers, self.platform))
+            opts = dict(max_workers=n_processes, initializer=pool_worker_initializer, initargs=(map_item, self.analyzers, self.platform, self.map_cache, fingerprints, self.profile is not None))
             # determine type. Most cases we want a process, but sometimes(like in Jupyter notebooks, we want to use threads)
             if self.executor_type == 'process':
                 executor = ProcessPoolExecutor(**opts)
             else:
                 executor = ThreadPoolExecutor(**opts)
 
-            map_results, status = self._run_and_wait_for_mapping(executor)
-            finalize_results = self._run_and_wait_for_reducing(executor, map_results)
+            if self.streaming:
+                finalize_results, status = self._run_streaming_map_reduce(executor)
+            else:
+                map_results, status = self._run_and_wait_for_mapping(executor)
+                finalize_results = self._run_and_wait_for_reducing(executor, map_results)
 
         finally:
             # because of debug mode, we have to leave executor and let python handle the shutdown through del
@@ -482,6 +854,15 @@ class AnalyzeManager:
         if 'IDMTOOLS_CONFIG_FILE' in os.environ:
             del os.environ['IDMTOOLS_CONFIG_FILE']
 
+        if self.map_cache is not None:
+            logger.debug(f"Map result cache hits: {self.cache_stats['hits']}, misses: {self.cache_stats['misses']}")
+            if self.verbose:
+                user_logger.log(VERBOSE, f" | Map result cache: {self.cache_stats['hits']} hit(s), "
+                                         f"{self.cache_stats['misses']} miss(es)")
+
+        if self.profile is not None:
+            self._report_profile()
+
         if self.verbose:
             total_time = time.time() - start_time
             time_str = verbose_timedelta(total_time)
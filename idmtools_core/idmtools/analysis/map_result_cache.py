@@ -0,0 +1,115 @@
+"""
+MapResultCache definition. MapResultCache keeps analyzer map results on disk across analysis runs.
+
+Copyright 2025, Gates Foundation. All rights reserved.
+"""
+import hashlib
+import json
+import os
+import time
+from dataclasses import dataclass
+from logging import getLogger
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+from idmtools.core.cache_enabled import PersistentCacheEnabled
+
+logger = getLogger(__name__)
+
+DEFAULT_MAP_CACHE_DIRECTORY = os.path.join(str(Path.home()), '.idmtools', 'cache', 'analysis')
+_MISSING = object()
+
+
+@dataclass(init=False, repr=False)
+class MapResultCache(PersistentCacheEnabled):
+    """
+    Persistent cache of analyzer map results.
+
+    Entries are keyed on the analyzer fingerprint, the item id and the checksums of the item files read by the
+    analyzer, so an entry is only reused when neither the analyzer nor its inputs changed.
+    """
+    default_cache_directory = DEFAULT_MAP_CACHE_DIRECTORY
+
+    @staticmethod
+    def make_key(analyzer_fingerprint: str, item_id: str, checksums: Dict[str, str]) -> str:
+        """
+        Build the key of a map result.
+
+        Args:
+            analyzer_fingerprint: Fingerprint of the analyzer
+            item_id: Id of the item mapped
+            checksums: Checksum of each file read by the analyzer
+
+        Returns:
+            Key of the map result
+        """
+        content = json.dumps([analyzer_fingerprint, str(item_id), sorted(checksums.items())])
+        return hashlib.md5(content.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        """
+        Get a map result.
+
+        Args:
+            key: Key of the map result
+
+        Returns:
+            True and the map result if the key is in the cache, otherwise False and None
+        """
+        value = self.cache.get(key, default=_MISSING, retry=True)
+        if value is _MISSING:
+            return False, None
+        return True, value
+
+    def set(self, key: str, value: Any) -> bool:
+        """
+        Store a map result. The time it is stored at is kept as tag for eviction by age.
+
+        Args:
+            key: Key of the map result
+            value: Map result
+
+        Returns:
+            True if the result was stored. Results that cannot be pickled are not cached.
+        """
+        try:
+            return self.cache.set(key, value, tag=time.time(), retry=True)
+        except Exception as e:
+            logger.debug(f"Could not cache map result {key}: {e}")
+            return False
+
+    def evict(self, max_size: Optional[int] = None, max_age: Optional[float] = None) -> int:
+        """
+        Evict map results from the cache.
+
+        Args:
+            max_size: Evict the least recently stored results until the cache is smaller than max_size bytes. The
+                limit is kept for future writes.
+            max_age: Evict results stored more than max_age seconds ago.
+
+        Returns:
+            Number of results evicted
+        """
+        count = len(self.cache)
+        if max_age is not None:
+            oldest = time.time() - max_age
+            for key in list(self.cache.iterkeys()):
+                _, stored_at = self.cache.get(key, default=None, tag=True, retry=True)
+                if stored_at is not None and stored_at < oldest:
+                    self.cache.delete(key, retry=True)
+        if max_size is not None:
+            self.size_limit = max_size
+            self.cache.reset('size_limit', max_size)
+            self.cache.cull(retry=True)
+        evicted = count - len(self.cache)
+        logger.debug(f"Evicted {evicted} results from map cache {self._cache_directory}")
+        return evicted
+
+    @property
+    def volume(self) -> int:
+        """
+        Size of the cache on disk.
+
+        Returns:
+            Size in bytes
+        """
+        return self.cache.volume()
@@ -5,27 +5,39 @@ Most of these function are used either to initialize a thread or to handle excep
 
 Copyright 2021, Bill & Melinda Gates Foundation. All rights reserved.
 """
+import copy
+import hashlib
 import itertools
+import mmap
+import pickle
+import time
+from collections import Counter
+from contextlib import suppress
 from logging import getLogger, DEBUG
+from pathlib import Path
+from idmtools.analysis.analysis_profile import AnalysisProfile, FETCH, PARSE, MAP
 from idmtools.core.interfaces.ientity import IEntity
 from idmtools.utils.file_parser import FileParser
-from typing import TYPE_CHECKING, Dict
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple, Union
 from idmtools.core.interfaces.iitem import IItem
-from idmtools.entities.ianalyzer import TAnalyzerList
+from idmtools.entities.ianalyzer import FILE_ACCESS_MODES, IAnalyzer, TAnalyzerList
 from idmtools.utils.general import FilterSafeItem
 
 if TYPE_CHECKING:  # pragma: no cover
     from idmtools.entities.iplatform import IPlatform
+    from idmtools.analysis.map_result_cache import MapResultCache
 
 logger = getLogger(__name__)
 
 
-def map_item(item: IItem) -> Dict[str, Dict]:
+def map_item(item: IItem, stats: Optional[Counter] = None, profile: Optional[AnalysisProfile] = None) -> Dict[str, Dict]:
     """
     Initialize some worker-global values; a worker process entry point for analyzer item-mapping.
 
     Args:
         item: The item (often simulation) to process.
+        stats: Counter of map result cache hits and misses to update.
+        profile: Profile to record timings in. None disables profiling.
 
     Returns:
         Dict[str, Dict]
@@ -36,10 +48,248 @@ def map_item(item: IItem) -> Dict[str, Dict]:
         logger.debug(f"Init item {item.uid} in worker")
     analyzers = map_item.analyzers
     platform = map_item.platform
-    return _get_mapped_data_for_item(item, analyzers, platform)
+    cache = getattr(map_item, 'cache', None)
+    fingerprints = getattr(map_item, 'fingerprints', None)
+    return _get_mapped_data_for_item(item, analyzers, platform, cache, fingerprints, stats, profile)
 
 
-def _get_mapped_data_for_item(item: IEntity, analyzers: TAnalyzerList, platform: 'IPlatform') -> Dict[str, Dict]:
+def map_items(items: List[IItem]) -> Dict[str, Any]:
+    """
+    Worker process entry point for mapping a chunk of items in one call.
+
+    Sending items in chunks reduces the number of messages exchanged with the workers and lets pickle serialize
+    objects shared by the items, like their parent experiment, once per chunk.
+
+    Args:
+        items: The items (often simulations) to process.
+
+    Returns:
+        A dict with:
+
+        - results: for each item, its mapped data and the exception raised while mapping it (or None)
+        - elapsed: the time spent on the chunk in seconds
+        - cache_stats: the map result cache hits and misses
+        - profile: the profile records, when profiling is enabled
+        - result_bytes: the pickled size of each item results, when profiling is enabled
+        - started/finished: the wall clock time the chunk started and finished at
+    """
+    started = time.time()
+    start = time.perf_counter()
+    results = []
+    stats = Counter()
+    profile = AnalysisProfile() if getattr(map_item, 'profile', False) else None
+    for item in items:
+        try:
+            results.append((map_item(item, stats, profile), None))
+        except Exception as e:
+            results.append((None, e))
+    chunk = dict(results=results, elapsed=time.perf_counter() - start, cache_stats=stats, started=started)
+    if profile is not None:
+        chunk['profile'] = profile.records
+        # measure the size of the results sent back to the main process
+        chunk['result_bytes'] = []
+        for result, _ in results:
+            nbytes = 0
+            with suppress(Exception):
+                nbytes = len(pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL))
+            chunk['result_bytes'].append(nbytes)
+    chunk['finished'] = time.time()
+    return chunk
+
+
+class _ParsedFiles:
+    """
+    Per item memoization of parsed files.
+
+    Analyzers with :attr:`~idmtools.entities.ianalyzer.IAnalyzer.share_parsed_data` get the parsed object itself.
+    Other analyzers get a copy, except the last analyzer reading a file that no analyzer shares, which takes the parsed
+    object since nobody else will see it.
+    """
+
+    def __init__(self, analyzers: TAnalyzerList):
+        """
+        Count the readers of each file.
+
+        Args:
+            analyzers: Analyzers that will map the item, in the order they will run.
+        """
+        self._parsed = {}
+        self._remaining = Counter()
+        self._shared = set()
+        for analyzer in analyzers:
+            if analyzer.parse:
+                keys = [self._key(analyzer, filename) for filename in analyzer.filenames]
+                self._remaining.update(keys)
+                if analyzer.share_parsed_data:
+                    self._shared.update(keys)
+
+    @staticmethod
+    def _key(analyzer: IAnalyzer, filename: str) -> Tuple[str, Callable]:
+        """
+        Get the memoization key of a file for an analyzer.
+
+        Args:
+            analyzer: Analyzer reading the file.
+            filename: Name of the file.
+
+        Returns:
+            Filename and parser used by the analyzer
+        """
+        return filename, FileParser.get_parser(filename, analyzer.parsers)
+
+    def get(self, analyzer: IAnalyzer, filename: str, content: bytes) -> Any:
+        """
+        Get parsed content of a file for an analyzer.
+
+        Args:
+            analyzer: Analyzer reading the file.
+            filename: Name of the file.
+            content: Raw content of the file.
+
+        Returns:
+            Parsed content
+        """
+        key = self._key(analyzer, filename)
+        if key not in self._parsed:
+            self._parsed[key] = FileParser.parse(filename, content, parser=key[1])
+        self._remaining[key] -= 1
+        parsed = self._parsed[key]
+        if analyzer.share_parsed_data:
+            return parsed
+        if self._remaining[key] <= 0 and key not in self._shared:
+            # last reader of the file, no need to keep the parsed content around
+            return self._parsed.pop(key)
+        return _copy_parsed(parsed)
+
+
+class _LocalFiles:
+    """
+    Read-only memory maps of local item files, opened on first use and shared by the analyzers of an item.
+
+    Used as a context manager, the memory maps are closed when the item is mapped.
+    """
+
+    def __init__(self, paths: Dict[str, Path]):
+        """
+        Initialize the memory maps.
+
+        Args:
+            paths: Local path of each file by filename.
+        """
+        self._paths = paths
+        self._maps = {}
+
+    def mmap(self, filename: str) -> Union[mmap.mmap, bytes]:
+        """
+        Get the memory map of a file.
+
+        Args:
+            filename: Name of the file.
+
+        Returns:
+            Read-only memory map of the file. Empty files, which cannot be mapped, are returned as empty bytes.
+        """
+        if filename not in self._maps:
+            with open(self._paths[filename], 'rb') as f:
+                try:
+                    self._maps[filename] = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                except ValueError:
+                    self._maps[filename] = b''
+        return self._maps[filename]
+
+    def close(self) -> None:
+        """
+        Close the memory maps.
+
+        Returns:
+            None
+        """
+        for filename, content in self._maps.items():
+            if isinstance(content, mmap.mmap):
+                try:
+                    content.close()
+                except BufferError:
+                    # A view of the map is still referenced, it is closed once the view is released
+                    logger.debug(f"Memory map of {filename} is still in use")
+        self._maps.clear()
+
+    def __enter__(self) -> '_LocalFiles':
+        """
+        Enter the context.
+
+        Returns:
+            The local files
+        """
+        return self
+
+    def __exit__(self, *args) -> None:
+        """
+        Close the memory maps when leaving the context.
+
+        Args:
+            *args: Exception raised in the context, if any
+
+        Returns:
+            None
+        """
+        self.close()
+
+
+def _copy_parsed(parsed: Any) -> Any:
+    """
+    Copy parsed content. A pickle round trip is much faster than deepcopy for large parsed files.
+
+    Args:
+        parsed: Parsed content
+
+    Returns:
+        Copy of the parsed content
+    """
+    try:
+        return pickle.loads(pickle.dumps(parsed, protocol=pickle.HIGHEST_PROTOCOL))
+    except Exception:
+        return copy.deepcopy(parsed)
+
+
+def _get_cached_data(item: IEntity, analyzers: TAnalyzerList, cache: 'MapResultCache', fingerprints: Dict[str, str],
+                     checksums: Dict[str, str], selected_data: Dict[str, Dict], stats: Counter) -> Tuple[TAnalyzerList, Dict[str, str]]:
+    """
+    Fill selected data with cached map results.
+
+    Args:
+        item: The item being mapped.
+        analyzers: Analyzers to look up.
+        cache: Map result cache.
+        fingerprints: Analyzer fingerprint by analyzer uid. Analyzers without fingerprint are never cached.
+        checksums: Checksum of item files by filename.
+        selected_data: Mapped data by analyzer uid, updated with the cached results.
+        stats: Counter of cache hits and misses.
+
+    Returns:
+        The analyzers missing from the cache and their cache keys by analyzer uid
+    """
+    missing = []
+    keys = {}
+    for analyzer in analyzers:
+        fingerprint = fingerprints.get(analyzer.uid)
+        if fingerprint is None:
+            missing.append(analyzer)
+            continue
+        key = cache.make_key(fingerprint, item.id, {f: checksums[f] for f in analyzer.filenames if f in checksums})
+        found, value = cache.get(key)
+        if found:
+            stats['hits'] += 1
+            selected_data[analyzer.uid] = value
+        else:
+            stats['misses'] += 1
+            keys[analyzer.uid] = key
+            missing.append(analyzer)
+    return missing, keys
+
+
+def _get_mapped_data_for_item(item: IEntity, analyzers: TAnalyzerList, platform: 'IPlatform',
+                              cache: Optional['MapResultCache'] = None, fingerprints: Optional[Dict[str, str]] = None,
+                              stats: Optional[Counter] = None, profile: Optional[AnalysisProfile] = None) -> Dict[str, Dict]:
     """
     Get mapped data from an item.
 
@@ -49,11 +299,21 @@ def _get_mapped_data_for_item(item: IEntity, analyzers: TAnalyzerList, platform:
         analyzers: The :class:`~idmtools.analysis.IAnalyzer` items with
             :meth:`~idmtools.analysis.AddAnalyzer.map` methods to call on the provided items.
         platform: A platform object to query for information.
+        cache: Map result cache to reuse results from. None disables caching.
+        fingerprints: Analyzer fingerprint by analyzer uid, used in cache keys.
+        stats: Counter of cache hits and misses to update.
+        profile: Profile to record fetch, parse and map timings in. None disables profiling.
 
     Returns:
         Dict[str, Dict] - Array mapping file data to from str to contents
 
     """
+    if stats is None:
+        stats = Counter()
+    for analyzer in analyzers:
+        if analyzer.file_access not in FILE_ACCESS_MODES:
+            raise ValueError(f"{analyzer.file_access} is not a valid file_access for analyzer {analyzer.uid}. Choose "
+                             f"one of {', '.join(FILE_ACCESS_MODES)}")
     try:
         # determine which analyzers (and by extension, which filenames) are applicable to this item
         # ensure item has a platform
@@ -61,6 +321,19 @@ def _get_mapped_data_for_item(item: IEntity, analyzers: TAnalyzerList, platform:
         analyzers_to_use = [a for a in analyzers if a.filter(FilterSafeItem(item))]
         analyzer_uids = [a.uid for a in analyzers]
 
+        # Selected data will be a dict with analyzer.uid: data  entries
+        selected_data = {}
+        cache_keys = {}
+        use_cache = cache is not None and fingerprints is not None
+        checksums = None
+        if use_cache:
+            # Platforms able to checksum files without reading them let us skip the download of cached items
+            filenames = set(itertools.chain(*(a.filenames for a in analyzers_to_use)))
+            checksums = platform.get_files_checksums(item, [f.replace("\\", '/') for f in filenames])
+            if checksums is not None:
+                analyzers_to_use, cache_keys = _get_cached_data(item, analyzers_to_use, cache, fingerprints, checksums,
+                                                                selected_data, stats)
+
         filenames = set(itertools.chain(*(a.filenames for a in analyzers_to_use)))
         filenames = [f.replace("\\", '/') for f in filenames]
 
@@ -68,26 +341,65 @@ def _get_mapped_data_for_item(item: IEntity, analyzers: TAnalyzerList, platform:
             logger.debug(f"Analyzers to use on item: {str(analyzer_uids)}")
             logger.debug(f"Filenames to analyze: {filenames}")
 
-        # The byte_arrays will associate filename with content
-        if len(filenames) > 0:
-            file_data = platform.get_files(item, filenames)
-        else:
-            file_data = dict()
+        # Analyzers opting out of byte copies get paths or memory maps when the platform has the files locally
+        local_filenames = set(itertools.chain(*(a.filenames for a in analyzers_to_use if a.file_access != 'bytes')))
+        local_paths = (platform.get_local_files(item, sorted(local_filenames)) if local_filenames else None) or {}
+        byte_filenames = set(itertools.chain(*(a.filenames for a in analyzers_to_use if a.file_access == 'bytes')))
+        filenames = [f for f in filenames if f not in local_paths or f in byte_filenames]
 
-        # Selected data will be a dict with analyzer.uid: data  entries
-        selected_data = {}
-        for analyzer in analyzers_to_use:
-            # If the analyzer needs the parsed data, parse
-            if analyzer.parse:
-                logger.debug(f'Parsing content for {analyzer.uid}')
-                data = {filename: FileParser.parse(filename, content) for filename, content in file_data.items() if filename in analyzer.filenames}
+        with _LocalFiles(local_paths) as local_files:
+            # The byte_arrays will associate filename with content
+            start = time.perf_counter()
+            if len(filenames) > 0:
+                file_data = platform.get_files(item, filenames)
             else:
-                # If the analyzer doesnt wish to parse, give the raw data
-                data = {filename: content for filename, content in file_data.items() if filename in analyzer.filenames}
+                file_data = dict()
+            if profile is not None:
+                nbytes = sum(len(content) for content in file_data.values())
+                profile.add(FETCH, time.perf_counter() - start, item=str(item.uid), nbytes=nbytes)
+
+            if use_cache and checksums is None:
+                # Checksum the downloaded content so cached items at least skip parsing and mapping
+                checksums = {filename: hashlib.md5(content).hexdigest() for filename, content in file_data.items()}
+                checksums.update({filename: hashlib.md5(local_files.mmap(filename)).hexdigest() for filename in local_paths
+                                  if filename not in checksums})
+                analyzers_to_use, cache_keys = _get_cached_data(item, analyzers_to_use, cache, fingerprints, checksums,
+                                                                selected_data, stats)
+
+            # Parse each file once per item and hand the result to every analyzer reading it
+            parsed_files = _ParsedFiles(analyzers_to_use)
+            for analyzer in analyzers_to_use:
+                start = time.perf_counter()
+                data = {}
+                for filename in analyzer.filenames:
+                    if analyzer.file_access != 'bytes' and filename in local_paths:
+                        if analyzer.file_access == 'path':
+                            # Analyzers asking for paths read the files themselves
+                            data[filename] = local_paths[filename]
+                            continue
+                        content = local_files.mmap(filename)
+                    elif filename in file_data:
+                        content = file_data[filename]
+                    else:
+                        continue
+                    # If the analyzer needs the parsed data, parse. Otherwise, give the raw data
+                    data[filename] = parsed_files.get(analyzer, filename, content) if analyzer.parse else content
+
+                if profile is not None:
+                    profile.add(PARSE, time.perf_counter() - start, item=str(item.uid), analyzer=analyzer.uid)
 
-            # run the mapping routine for this analyzer and item
-            logger.debug("Running map on selected data")
-            selected_data[analyzer.uid] = analyzer.map(data, item)
+                # run the mapping routine for this analyzer and item
+                logger.debug("Running map on selected data")
+                start = time.perf_counter()
+                result = analyzer.map(data, item)
+                if isinstance(result, mmap.mmap):
+                    # Memory maps are closed with the item and cannot be sent back from a worker process
+                    result = result[:]
+                selected_data[analyzer.uid] = result
+                if profile is not None:
+                    profile.add(MAP, time.perf_counter() - start, item=str(item.uid), analyzer=analyzer.uid)
+                if analyzer.uid in cache_keys:
+                    cache.set(cache_keys[analyzer.uid], selected_data[analyzer.uid])
 
         # Store all analyzer results for this item in the result cache
         if logger.isEnabledFor(DEBUG):
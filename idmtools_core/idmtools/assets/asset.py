@@ -11,13 +11,16 @@ from functools import partial
 from io import BytesIO
 from logging import getLogger, DEBUG
 from pathlib import PurePosixPath
-from typing import TypeVar, Union, List, Callable, Any, Optional, Generator, BinaryIO
+from typing import TypeVar, Union, List, Callable, Any, Optional, Generator, BinaryIO, TYPE_CHECKING
 import backoff
 import requests
 from idmtools import IdmConfigParser
 from idmtools.utils.file import file_content_to_generator, content_generator
 from idmtools.utils.hashing import calculate_md5, calculate_md5_stream
 
+if TYPE_CHECKING:  # pragma: no cover
+    from idmtools.assets.checksum_cache import ChecksumCache
+
 logger = getLogger(__name__)
 
 
@@ -387,16 +390,22 @@ class Asset:
                     logger.debug(f"Download {self.filename} to {path}")
                 self.__write_download_generator_to_stream(out)
 
-    def calculate_checksum(self) -> str:
+    def calculate_checksum(self, cache: 'ChecksumCache' = None, chunk_size: int = 8192) -> str:
         """
         Calculate checksum on asset. If previous checksum was calculated, that value will be returned.
 
+        Args:
+            cache: Persistent checksum cache to look the checksum of a file up in
+            chunk_size: Read buffer size used to hash a file
+
         Returns:
             Checksum string
         """
         if not self._checksum:
-            if self.absolute_path:
-                self._checksum = calculate_md5(self.absolute_path)
+            if self.absolute_path and cache is not None:
+                self._checksum = cache.calculate_md5(self.absolute_path, chunk_size)
+            elif self.absolute_path:
+                self._checksum = calculate_md5(self.absolute_path, chunk_size)
             elif self.content is not None:
                 self._checksum = calculate_md5_stream(io.BytesIO(self.bytes))
         return self._checksum
@@ -5,12 +5,15 @@ Copyright 2021, Bill & Melinda Gates Foundation. All rights reserved.
 """
 import copy
 import os
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
+from itertools import islice
 from logging import getLogger
 from os import PathLike
-from typing import List, NoReturn, TypeVar, Union, Any, Dict, TYPE_CHECKING
+from typing import List, NoReturn, Optional, Tuple, TypeVar, Union, Any, Dict, Iterable, TYPE_CHECKING
 from idmtools.assets import Asset, TAssetList
 from idmtools.assets import TAssetFilterList
+from idmtools.assets.checksum_cache import ChecksumCache, DEFAULT_CHECKSUM_CHUNK_SIZE
 from idmtools.assets.errors import DuplicatedAssetError
 from idmtools.core import FilterMode, ItemType
 from idmtools.core.interfaces.ientity import IEntity
@@ -28,10 +31,347 @@ if TYPE_CHECKING:  # pragma: no cover
 user_logger = getLogger('user')
 
 
+def asset_key(asset: Asset) -> Tuple[str, str]:
+    """
+    Get the key an asset is indexed on in an asset collection.
+
+    Args:
+        asset: Asset
+
+    Returns:
+        Relative path and filename of the asset
+    """
+    return asset.relative_path, asset.filename
+
+
+class IndexedAssets:
+    """
+    Assets of a collection, kept in an insertion-ordered dict keyed on (relative_path, filename).
+
+    Adding, finding, removing and popping an asset by path are O(1). Positional access (``assets[0]``, ``insert``,
+    ``del assets[0]``) is supported for compatibility with lists but walks the assets. A path holds one asset: adding an
+    asset with the path of another replaces it and moves it last.
+
+    Assets are keyed on the path they had when added. A renamed asset is re-keyed when it is found under its old path
+    or when the assets are iterated over; call :meth:`reindex` to re-key the assets right after renaming them.
+    """
+
+    def __init__(self, assets: Iterable[Asset] = ()):
+        """
+        Constructor.
+
+        Args:
+            assets: Initial assets
+        """
+        self._assets = dict()
+        self.extend(assets)
+
+    def __reduce__(self):
+        """
+        Pickle and copy the assets only.
+
+        Returns:
+            Class and arguments to rebuild the assets
+        """
+        return self.__class__, (list(self._assets.values()),)
+
+    def reindex(self) -> None:
+        """
+        Re-key the assets on their current path.
+
+        Returns:
+            None
+        """
+        assets = list(self._assets.values())
+        self._assets = dict()
+        self.extend(assets)
+
+    def get(self, key: Tuple[str, str]) -> Optional[Asset]:
+        """
+        Get the asset with a path.
+
+        Args:
+            key: Relative path and filename
+
+        Returns:
+            Asset with the path or None
+        """
+        asset = self._assets.get(key)
+        if asset is not None and asset_key(asset) != key:
+            # The asset was renamed since it was added
+            self.reindex()
+            asset = self._assets.get(key)
+        return asset
+
+    def index(self, asset: Asset) -> int:
+        """
+        Get the position of the asset with the path of an asset.
+
+        Args:
+            asset: Asset
+
+        Returns:
+            Position of the asset
+
+        Raises:
+            ValueError - If no asset has the path
+        """
+        key = asset_key(asset)
+        if self.get(key) is not None:
+            for position, k in enumerate(self._assets):
+                if k == key:
+                    return position
+        raise ValueError(f"{asset} is not in list")
+
+    def append(self, asset: Asset) -> None:
+        """
+        Add an asset last, replacing the asset with the same path.
+
+        Args:
+            asset: Asset to add
+
+        Returns:
+            None
+        """
+        key = asset_key(asset)
+        self._assets.pop(key, None)
+        self._assets[key] = asset
+
+    def replace(self, asset: Asset) -> None:
+        """
+        Replace the asset with the path of an asset, keeping its position.
+
+        Args:
+            asset: New asset
+
+        Returns:
+            None
+
+        Raises:
+            ValueError - If no asset has the path
+        """
+        key = asset_key(asset)
+        if self.get(key) is None:
+            raise ValueError(f"{asset} is not in list")
+        self._assets[key] = asset
+
+    def extend(self, assets: Iterable[Asset]) -> None:
+        """
+        Add several assets.
+
+        Args:
+            assets: Assets to add
+
+        Returns:
+            None
+        """
+        for asset in assets:
+            self.append(asset)
+
+    def __iadd__(self, assets: Iterable[Asset]) -> 'IndexedAssets':
+        """
+        Add several assets with +=.
+
+        Args:
+            assets: Assets to add
+
+        Returns:
+            The assets
+        """
+        self.extend(assets)
+        return self
+
+    def insert(self, index: int, asset: Asset) -> None:
+        """
+        Insert an asset at a position.
+
+        Args:
+            index: Position to insert at, like list.insert
+            asset: Asset to insert
+
+        Returns:
+            None
+        """
+        assets = [a for a in self._assets.values() if asset_key(a) != asset_key(asset)]
+        assets.insert(index, asset)
+        self._assets = dict()
+        self.extend(assets)
+
+    def remove(self, asset: Asset) -> None:
+        """
+        Remove the asset with the path of an asset.
+
+        Args:
+            asset: Asset to remove
+
+        Returns:
+            None
+
+        Raises:
+            ValueError - If no asset has the path
+        """
+        key = asset_key(asset)
+        if self.get(key) is None:
+            raise ValueError(f"{asset} is not in list")
+        del self._assets[key]
+
+    def pop(self, index: int = -1) -> Asset:
+        """
+        Remove and return an asset.
+
+        Args:
+            index: Position of the asset. Defaults to the last one, which is removed without walking the assets
+
+        Returns:
+            Asset removed
+        """
+        if index == -1:
+            if not self._assets:
+                raise IndexError("pop from empty list")
+            return self._assets.popitem()[1]
+        asset = self[index]
+        del self._assets[self._key_at(index)]
+        return asset
+
+    def clear(self) -> None:
+        """
+        Remove all the assets.
+
+        Returns:
+            None
+        """
+        self._assets.clear()
+
+    def _key_at(self, index: int) -> Tuple[str, str]:
+        """
+        Get the key of the asset at a position.
+
+        Args:
+            index: Position
+
+        Returns:
+            Key of the asset
+        """
+        position = range(len(self._assets))[index]
+        return next(islice(self._assets, position, None))
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[Asset, List[Asset]]:
+        """
+        Get assets by position.
+
+        Args:
+            index: Position or slice
+
+        Returns:
+            Asset or list of assets
+        """
+        if isinstance(index, slice):
+            return list(self._assets.values())[index]
+        return self._assets[self._key_at(index)]
+
+    def __setitem__(self, index: Union[int, slice], value: Union[Asset, Iterable[Asset]]) -> None:
+        """
+        Replace assets by position.
+
+        Args:
+            index: Position or slice
+            value: Asset or assets
+
+        Returns:
+            None
+        """
+        assets = list(self._assets.values())
+        assets[index] = value
+        self._assets = dict()
+        self.extend(assets)
+
+    def __delitem__(self, index: Union[int, slice]) -> None:
+        """
+        Delete assets by position.
+
+        Args:
+            index: Position or slice
+
+        Returns:
+            None
+        """
+        if isinstance(index, slice):
+            keys = list(self._assets)[index]
+        else:
+            keys = [self._key_at(index)]
+        for key in keys:
+            del self._assets[key]
+
+    def __contains__(self, asset: Asset) -> bool:
+        """
+        Whether an asset has the path of the given asset.
+
+        Args:
+            asset: Asset
+
+        Returns:
+            True if an asset has the path
+        """
+        return isinstance(asset, Asset) and self.get(asset_key(asset)) is not None
+
+    def __iter__(self):
+        """
+        Iterate over the assets in order. Assets renamed meanwhile are re-keyed at the end of the iteration.
+
+        Returns:
+            Iterator of assets
+        """
+        stale = False
+        for key, asset in list(self._assets.items()):
+            yield asset
+            stale = stale or asset_key(asset) != key
+        if stale:
+            self.reindex()
+
+    def __len__(self) -> int:
+        """
+        Number of assets.
+
+        Returns:
+            Number of assets
+        """
+        return len(self._assets)
+
+    def __eq__(self, other) -> bool:
+        """
+        Compare the assets, in order, with other assets or a list.
+
+        Args:
+            other: Other assets
+
+        Returns:
+            True if the assets are equal
+        """
+        if isinstance(other, IndexedAssets):
+            other = list(other._assets.values())
+        if not isinstance(other, list):
+            return NotImplemented
+        return list(self._assets.values()) == other
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        """
+        String representation of the assets.
+
+        Returns:
+            List-like representation
+        """
+        return repr(list(self._assets.values()))
+
+
 @dataclass(repr=False)
 class AssetCollection(IEntity):
     """
     A class that represents a collection of assets.
+
+    Assets are kept in :class:`IndexedAssets` so finding an asset by relative path and filename does not scan the
+    collection.
     """
 
     #: Assets for collection
@@ -61,6 +401,31 @@ class AssetCollection(IEntity):
 
         self.tags = self.tags or tags
 
+    @property
+    def assets(self) -> IndexedAssets:  # noqa: F811
+        """
+        Assets of the collection.
+
+        Returns:
+            Assets
+        """
+        return self._assets
+
+    @assets.setter
+    def assets(self, assets: Iterable[Asset]):
+        """
+        Set the assets of the collection.
+
+        Args:
+            assets: Assets
+
+        Returns:
+            None
+        """
+        if isinstance(assets, property) or assets is None:
+            assets = []
+        self._assets = assets if isinstance(assets, IndexedAssets) else IndexedAssets(assets)
+
     @classmethod
     def from_id(cls, item_id: str, platform: 'IPlatform' = None, as_copy: bool = False,  # noqa E821
                 **kwargs) -> 'AssetCollection':
@@ -213,17 +578,26 @@ class AssetCollection(IEntity):
             DuplicatedAssetError - If fail_on_duplicate is true and the asset is already part of the collection
         """
         self.is_editable(True)
+        self._add_asset(asset, fail_on_duplicate, fail_on_deep_comparison, **kwargs)
+
+    def _add_asset(self, asset: Union[Asset, str, PathLike], fail_on_duplicate: bool = True, fail_on_deep_comparison: bool = False, **kwargs):  # noqa: F821
+        """
+        Add an asset to the collection without checking the collection is editable.
+
+        See :meth:`~AssetCollection.add_asset` for arguments.
+        """
         if isinstance(asset, (str, PathLike)):
             asset = Asset(absolute_path=str(asset), **kwargs)
         # do a simple check first
-        if asset in self.assets:
+        existing = self.assets.get(asset_key(asset))
+        if existing is not None:
             if fail_on_duplicate:
-                if not fail_on_deep_comparison or self.find_index_of_asset(asset, deep_compare=True) is None:
+                if not fail_on_deep_comparison or not existing.deep_equals(asset):
                     raise DuplicatedAssetError(("File with same paths but different content provided", asset) if fail_on_deep_comparison else asset)
             else:
                 # The equality not considering the content of the asset, even if it is already present
                 # nothing guarantees that the content is the same. So remove and add the fresh one.
-                self.assets.remove(asset)
+                self.assets.remove(existing)
         self.assets.append(asset)
 
     def __add__(self, other: Union[TAssetList, 'AssetCollection', Asset]) -> 'AssetCollection':
@@ -265,8 +639,12 @@ class AssetCollection(IEntity):
             None
         """
         self.is_editable(True)
+        if not self.assets and isinstance(assets, AssetCollection):
+            # Assets of another collection cannot clash, so take them all at once
+            self.assets.extend(assets.assets)
+            return
         for asset in assets:
-            self.add_asset(asset, fail_on_duplicate, fail_on_deep_comparison)
+            self._add_asset(asset, fail_on_duplicate, fail_on_deep_comparison)
 
     def add_or_replace_asset(self, asset: Union[Asset, str, PathLike], fail_on_deep_comparison: bool = False):
         """
@@ -281,11 +659,11 @@ class AssetCollection(IEntity):
         """
         self.is_editable(True)
         tasset = Asset(asset) if isinstance(asset, (str, PathLike)) else asset
-        index = self.find_index_of_asset(tasset)
-        if index is not None:
-            if fail_on_deep_comparison and not tasset.deep_equals(self.assets[index]):
+        existing = self.assets.get(asset_key(tasset))
+        if existing is not None:
+            if fail_on_deep_comparison and not tasset.deep_equals(existing):
                 raise ValueError(f"Contents of file {asset.short_remote_path()} being replaced differs. To prevent unexpected behaviour, please review script or disable deep checks")
-            self.assets[index] = tasset
+            self.assets.replace(tasset)
         else:
             self.assets.append(tasset)
 
@@ -305,6 +683,10 @@ class AssetCollection(IEntity):
             None or Asset if found.
 
         """
+        if isinstance(kwargs.get('filename'), str) and isinstance(kwargs.get('relative_path'), str):
+            # Both parts of the key are given: only the asset with this key can match
+            asset = self.assets.get((kwargs['relative_path'], kwargs['filename']))
+            return asset if asset is not None and all(getattr(asset, k) == v for k, v in kwargs.items()) else None
         try:
             return next(filter(lambda a: all(getattr(a, k) == kwargs.get(k) for k in kwargs), self.assets))
         except StopIteration:
@@ -356,7 +738,7 @@ class AssetCollection(IEntity):
         """
         self.is_editable(True)
         for asset in assets:
-            self.add_asset(asset, fail_on_duplicate)
+            self._add_asset(asset, fail_on_duplicate)
 
     def clear(self):
         """
@@ -368,6 +750,42 @@ class AssetCollection(IEntity):
         self.is_editable(True)
         self.assets.clear()
 
+    def calculate_checksums(self, max_workers: Optional[int] = None, cache: Union[bool, str, ChecksumCache, None] = None,
+                            chunk_size: int = DEFAULT_CHECKSUM_CHUNK_SIZE) -> List[str]:
+        """
+        Calculate the checksum of every asset missing one, hashing files in parallel.
+
+        Args:
+            max_workers: Number of hashing threads. Defaults to the ThreadPoolExecutor default
+            cache: Persistent cache of file checksums. True uses the default cache directory, a string the cache in
+                that directory. Unchanged files are not hashed again with a cache. Defaults to no cache
+            chunk_size: Read buffer size used to hash files
+
+        Returns:
+            Checksum of each asset, in order
+        """
+        own_cache = cache is True or isinstance(cache, str)
+        if cache is True:
+            cache = ChecksumCache()
+        elif isinstance(cache, str):
+            cache = ChecksumCache(cache)
+        elif not cache:
+            cache = None
+
+        pending = [asset for asset in self.assets if not asset.checksum]
+        try:
+            if max_workers == 1 or len(pending) < 2:
+                for asset in pending:
+                    asset.calculate_checksum(cache, chunk_size)
+            else:
+                # hashlib releases the GIL on large buffers so files are hashed concurrently
+                with ThreadPoolExecutor(max_workers=max_workers) as pool:
+                    list(pool.map(lambda a: a.calculate_checksum(cache, chunk_size), pending))
+        finally:
+            if own_cache:
+                cache.cleanup_cache()
+        return [asset.checksum for asset in self.assets]
+
     def set_all_persisted(self):
         """
         Set all persisted.
@@ -446,7 +864,7 @@ class AssetCollection(IEntity):
         # make a dummy asset
         content = None if absolute_path or checksum else ""
         tmp_asset = Asset(absolute_path=absolute_path, filename=filename, relative_path=relative_path, checksum=checksum, content=content)
-        return self.find_index_of_asset(tmp_asset) is not None
+        return self.assets.get(asset_key(tmp_asset)) is not None
 
     def find_index_of_asset(self, other: 'Asset', deep_compare: bool = False) -> Union[int, None]:
         """
@@ -460,12 +878,11 @@ class AssetCollection(IEntity):
             Index number if found.
             None if not found.
         """
-        for idx, asset in enumerate(self.assets):
-            if deep_compare and asset.deep_equals(other):
-                return idx
-            elif not deep_compare and asset == other:
-                return idx
-        return None
+        # A path holds one asset, so the asset with the path of the other one is the only one that can match
+        asset = self.assets.get(asset_key(other))
+        if asset is None or (deep_compare and not asset.deep_equals(other)):
+            return None
+        return self.assets.index(asset)
 
     def pre_creation(self, platform: 'IPlatform') -> None:
         """
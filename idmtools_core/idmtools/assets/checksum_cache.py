@@ -0,0 +1,96 @@
+"""
+ChecksumCache definition. ChecksumCache keeps file checksums on disk across sessions.
+
+Copyright 2025, Gates Foundation. All rights reserved.
+"""
+import json
+import os
+from dataclasses import dataclass
+from logging import getLogger
+from pathlib import Path
+from typing import Optional
+from idmtools.core.cache_enabled import PersistentCacheEnabled
+from idmtools.utils.hashing import calculate_md5
+
+logger = getLogger(__name__)
+
+DEFAULT_CHECKSUM_CACHE_DIRECTORY = os.path.join(str(Path.home()), '.idmtools', 'cache', 'checksums')
+# Read buffer used to hash files. Large reads keep the hashing threads out of the GIL most of the time.
+DEFAULT_CHECKSUM_CHUNK_SIZE = 2 ** 20
+
+
+@dataclass(init=False, repr=False)
+class ChecksumCache(PersistentCacheEnabled):
+    """
+    Persistent cache of file checksums.
+
+    Entries are keyed on the absolute path, size, modification time and inode of the file, so a checksum is only
+    reused while the file is unchanged.
+    """
+    default_cache_directory = DEFAULT_CHECKSUM_CACHE_DIRECTORY
+
+    @staticmethod
+    def make_key(path: str, stat_result: os.stat_result) -> str:
+        """
+        Build the key of a file checksum.
+
+        Args:
+            path: File path
+            stat_result: Stat of the file
+
+        Returns:
+            Key of the checksum
+        """
+        return json.dumps([os.path.abspath(path), stat_result.st_size, stat_result.st_mtime_ns, stat_result.st_ino])
+
+    def get(self, path: str, stat_result: Optional[os.stat_result] = None) -> Optional[str]:
+        """
+        Get the cached checksum of a file.
+
+        Args:
+            path: File path
+            stat_result: Stat of the file. Defaults to the current stat of the file
+
+        Returns:
+            Checksum or None if the file changed since it was hashed
+        """
+        stat_result = stat_result or os.stat(path)
+        return self.cache.get(self.make_key(path, stat_result), retry=True)
+
+    def set(self, path: str, checksum: str, stat_result: Optional[os.stat_result] = None) -> bool:
+        """
+        Store the checksum of a file.
+
+        Args:
+            path: File path
+            checksum: Checksum of the file
+            stat_result: Stat of the file when it was hashed. Defaults to the current stat of the file
+
+        Returns:
+            True if the checksum was stored
+        """
+        stat_result = stat_result or os.stat(path)
+        return self.cache.set(self.make_key(path, stat_result), checksum, retry=True)
+
+    def calculate_md5(self, path: str, chunk_size: int = DEFAULT_CHECKSUM_CHUNK_SIZE) -> str:
+        """
+        Get the md5 of a file from the cache or calculate and store it.
+
+        Args:
+            path: File path
+            chunk_size: Read buffer size
+
+        Returns:
+            md5 as string
+        """
+        before = os.stat(path)
+        checksum = self.get(path, before)
+        if checksum is None:
+            checksum = calculate_md5(path, chunk_size)
+            after = os.stat(path)
+            # A file written while it was hashed is not cached
+            if self.make_key(path, before) == self.make_key(path, after):
+                self.set(path, checksum, after)
+            else:
+                logger.debug(f"{path} changed while it was hashed")
+        return checksum
@@ -4,7 +4,7 @@ idmtools arm builder definition.
 Copyright 2021, Bill & Melinda Gates Foundation. All rights reserved.
 """
 from idmtools.builders import SweepArm
-from itertools import tee
+from idmtools.builders.sweep_space import SweepSpace, ChainSweepSpace
 
 
 class ArmSimulationBuilder:
@@ -112,27 +112,40 @@ class ArmSimulationBuilder:
         Returns:
             None
         """
-        # create a new arm
+        # create a new arm, so later changes to the arm do not change the builder
         arm_new = SweepArm(type=arm.type)
-        old_sweeps = []
-        new_sweeps = []
-        # make two copies of each sweep
-        for sweep in arm.sweeps:
-            old_sw, new_sw = tee(sweep, 2)
-            old_sweeps.append(old_sw)
-            new_sweeps.append(new_sw)
-
-        # keep original sweeps
-        arm.sweeps = old_sweeps
-        # copy sweeps to new arm
-        arm_new.sweeps = new_sweeps
+        # sweep definitions are read-only, they can be shared
+        arm_new.sweeps = list(arm.sweeps)
         # update count for new arm
         arm_new.count = arm.count
 
         # add new arm to arms
         self.arms.append(arm_new)
-        # update sweep functions for new arm
-        arm_new._update_sweep_functions()
+
+    @property
+    def sweep_space(self) -> SweepSpace:
+        """
+        Sweep points of the builder, the points of each arm one after the other.
+
+        The space supports random access by index, slicing and sharding, see
+        :class:`~idmtools.builders.sweep_space.SweepSpace`.
+
+        Returns:
+            Sweep space
+        """
+        return ChainSweepSpace([arm.sweep_space for arm in self.arms])
+
+    def __getitem__(self, index):
+        """
+        Get a sweep point or a slice of the sweep space.
+
+        Args:
+            index: Index or slice
+
+        Returns:
+            Sweep point or view on the sweep space
+        """
+        return self.sweep_space[index]
 
     def __iter__(self):
         """
@@ -140,8 +153,7 @@ class ArmSimulationBuilder:
         Returns:
             Iterator
         """
-        for arm in self.arms:
-            yield from arm.functions
+        yield from self.sweep_space
 
     def __len__(self):
         """
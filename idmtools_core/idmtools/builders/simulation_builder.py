@@ -8,10 +8,9 @@ import numpy as np
 import pandas as pd
 from functools import partial
 from inspect import signature
-from itertools import product
 from typing import Callable, Any, Iterable, Union, Dict, Sized, NoReturn
+from idmtools.builders.sweep_space import SweepDimension, ProductSweepSpace, SweepSpace
 from idmtools.entities.simulation import Simulation
-from idmtools.utils.collections import duplicate_list_of_generators
 
 TSweepFunction = Union[
     Callable[[Simulation, Any], Dict[str, Any]],
@@ -167,7 +166,7 @@ class SimulationBuilder:
             required_params = self._extract_required_parameters(remaining_parameters)
             if len(required_params) > 0:
                 raise ValueError(f"Missing arguments: {list(required_params)}.")
-            self.sweeps.append((function,))
+            self.sweeps.append(SweepDimension(function))
             self.count = 1
 
     def _extract_remaining_parameters(self, function):
@@ -202,10 +201,7 @@ class SimulationBuilder:
                     f"Currently the callback has {len(required_params)} required parameters and callback has {len(remaining_parameters)} parameters but there were {len(values)} arguments passed.")
             else:
                 # Handle special case
-                generated_values = product(*_values)
-                self.sweeps.append(
-                    partial(function, **self._map_argument_array(list(remaining_parameters), v)) for v in
-                    generated_values)
+                self.sweeps.append(SweepDimension(function, list(remaining_parameters), _values))
                 self.count = np.prod(list(map(len, _values)))
                 return
 
@@ -221,15 +217,10 @@ class SimulationBuilder:
         # 1. len(required_params) > 0 and len(required_params) == len(values)
         # 2. len(required_params) == 0 and len(remaining_parameters) == 1 and len(values) == 1
         # create sweeps using the multi-index
-        generated_values = product(*_values)
         if len(required_params) > 0:
-            self.sweeps.append(
-                partial(function, **self._map_argument_array(list(required_params), v)) for v in
-                generated_values)
+            self.sweeps.append(SweepDimension(function, list(required_params), _values))
         else:
-            self.sweeps.append(
-                partial(function, **self._map_argument_array(list(remaining_parameters), v)) for v in
-                generated_values)
+            self.sweeps.append(SweepDimension(function, list(remaining_parameters), _values))
 
         self.count = np.prod(list(map(len, _values)))
 
@@ -256,9 +247,7 @@ class SimulationBuilder:
 
         # validate each values in a dict
         _values = {key: self._validate_value(vals) for key, vals in values.items()}
-        generated_values = product(*_values.values())
-        self.sweeps.append(
-            partial(function, **self._map_argument_array(_values.keys(), v)) for v in generated_values)
+        self.sweeps.append(SweepDimension(function, list(_values), list(_values.values())))
         self.count = np.prod(list(map(len, _values.values())))
 
     def add_multiple_parameter_sweep_definition(self, function: TSweepFunction, *args, **kwargs):
@@ -302,42 +291,44 @@ class SimulationBuilder:
         else:
             return list(value)
 
-    @staticmethod
-    def _map_argument_array(parameters, value_set, remainder: str = None) -> Dict[str, Iterable]:
+    def _extract_required_parameters(self, remaining_parameters: Dict) -> Dict:
+        required_params = {k: v for k, v in remaining_parameters.items() if
+                           not isinstance(v, pd.DataFrame) and v == inspect.Parameter.empty}
+        return required_params
+
+    @property
+    def sweep_space(self) -> SweepSpace:
         """
-        Map multi-argument calls to parameters in a callback.
-        Args:
-            parameters: Parameters
-            value_set: List of values that should be sent to parameter in calls
-            remainder: Remainder
+        Sweep points of the builder, the cross product of the sweep definitions.
+
+        The space supports random access by index, slicing and sharding, see
+        :class:`~idmtools.builders.sweep_space.SweepSpace`.
+
         Returns:
-            Dictionary to map our call to our callbacks
+            Sweep space
         """
-        call_args = dict()
-        for idx, parameter in enumerate(parameters):
-            call_args[parameter] = value_set[idx]
+        return ProductSweepSpace(self.sweeps)
 
-        if remainder:
-            return {remainder: call_args}
-        else:
-            return call_args
+    def __getitem__(self, index):
+        """
+        Get a sweep point or a slice of the sweep space.
 
-    def _extract_required_parameters(self, remaining_parameters: Dict) -> Dict:
-        required_params = {k: v for k, v in remaining_parameters.items() if
-                           not isinstance(v, pd.DataFrame) and v == inspect.Parameter.empty}
-        return required_params
+        Args:
+            index: Index or slice
+
+        Returns:
+            Sweep point or view on the sweep space
+        """
+        return self.sweep_space[index]
 
     def __iter__(self):
         """
         Iterator of the simulation builder.
-        We duplicate the generators here so that we can loop over multiple times.
+        Sweep points are built from the sweep space, so we can loop over multiple times.
         Returns:
             The iterator
         """
-        old_sw, new_sw = duplicate_list_of_generators(self.sweeps)
-
-        yield from product(*old_sw)
-        self.sweeps = new_sw
+        yield from self.sweep_space
 
     def __len__(self):
         """
@@ -3,11 +3,12 @@ idmtools SimulationBuilder definition.
 
 Copyright 2021, Bill & Melinda Gates Foundation. All rights reserved.
 """
+import warnings
 from enum import Enum
 from functools import partial
-from itertools import product, tee
 from typing import Callable, Any, Iterable, Union, List, Tuple, Dict
 from idmtools.builders import SimulationBuilder
+from idmtools.builders.sweep_space import SweepSpace, SweepDimension, ProductSweepSpace, ZipSweepSpace, ChainSweepSpace
 from idmtools.entities.simulation import Simulation
 
 TSweepFunction = Union[
@@ -15,6 +16,23 @@ TSweepFunction = Union[
 ]
 
 
+def apply_sweep_point(simulation: Simulation, functions: Tuple[TSweepFunction, ...]) -> Dict[str, Any]:
+    """
+    Apply the sweep functions of a sweep point given as a whole, see :attr:`SweepArm.functions`.
+
+    Args:
+        simulation: Simulation
+        functions: Sweep functions of the point
+
+    Returns:
+        Tags returned by the functions
+    """
+    tags = {}
+    for func in functions:
+        tags.update(func(simulation=simulation) or {})
+    return tags
+
+
 class ArmType(Enum):
     """
     ArmTypes.
@@ -34,7 +52,6 @@ class SweepArm(SimulationBuilder):
         """
         self.type = type
         self.__count = 0
-        self.__functions = None
         super().__init__()
 
         if funcs is None:
@@ -66,6 +83,20 @@ class SweepArm(SimulationBuilder):
             else:
                 self.__count = cnt
 
+    @property
+    def sweep_space(self) -> SweepSpace:
+        """
+        Sweep points of the arm, the cross product or the pairs of its sweep definitions.
+
+        Returns:
+            Sweep space
+        """
+        if len(self.sweeps) == 0:
+            return ChainSweepSpace([])
+        elif self.type == ArmType.pair:
+            return ZipSweepSpace(self.sweeps)
+        return ProductSweepSpace(self.sweeps)
+
     @property
     def functions(self):
         """
@@ -73,24 +104,26 @@ class SweepArm(SimulationBuilder):
         Returns:
             functions
         """
-        old_sw, new_sw = tee(self.__functions, 2)
-        self.__functions = new_sw
-        return old_sw
+        return iter(self.sweep_space)
 
     @functions.setter
-    def functions(self, funcs):
-        self.__functions = funcs
+    def functions(self, funcs: Iterable[Tuple[TSweepFunction, ...]]):
+        """
+        Replace the sweep definitions of the arm by a list of sweep points.
 
-    def _update_sweep_functions(self):
-        result = []
-        if len(self.sweeps) == 0:
-            result = []
-        elif self.type == ArmType.cross:
-            result = product(*self.sweeps)
-        elif self.type == ArmType.pair:
-            result = zip(*self.sweeps)
+        Deprecated, use :meth:`add_sweep_definition`. The points are kept in a single sweep dimension.
 
-        self.__functions = result
+        Args:
+            funcs: Sweep functions of each sweep point
+
+        Returns:
+            None
+        """
+        warnings.warn("Setting SweepArm.functions is deprecated, use add_sweep_definition instead", DeprecationWarning,
+                      stacklevel=2)
+        points = [tuple(point) for point in funcs]
+        self.sweeps = [SweepDimension(apply_sweep_point, ['functions'], [points])] if points else []
+        self.__count = len(points)
 
     def _update_count(self, values):
         """
@@ -0,0 +1,393 @@
+"""
+idmtools sweep space definition.
+
+A sweep space is a read-only sequence of the sweep points of a builder. Sweep points are computed from their index on
+demand, so a large sweep can be sliced, sharded across processes or machines, or restarted from any offset without
+walking the points before it.
+
+Copyright 2025, Gates Foundation. All rights reserved.
+"""
+from abc import abstractmethod
+from bisect import bisect_right
+from collections.abc import Sequence
+from functools import partial
+from itertools import accumulate, product
+from typing import Any, Callable, Iterator, List, Sequence as TSequence, Tuple
+import numpy as np
+
+
+def mixed_radix_decode(index: int, sizes: TSequence[int]) -> List[int]:
+    """
+    Decode an index of a cross product into the index of each dimension.
+
+    The last dimension varies the fastest, which matches the order of :func:`itertools.product`.
+
+    Args:
+        index: Index in the cross product
+        sizes: Size of each dimension
+
+    Returns:
+        Index in each dimension
+    """
+    digits = [0] * len(sizes)
+    for position in range(len(sizes) - 1, -1, -1):
+        index, digits[position] = divmod(index, sizes[position])
+    return digits
+
+
+class SweepSpace(Sequence):
+    """
+    Base class of the sweep spaces.
+
+    Supports len(), random access by index, slicing and sharding. Slices are views, nothing is built until a point is
+    accessed.
+
+    Examples:
+        Resume a sweep after the first 1000 points, or build the third of four shards::
+
+            for point in builder.sweep_space[1000:]:
+                ...
+            points = builder.sweep_space.shard(2, 4)
+    """
+
+    @abstractmethod
+    def __len__(self) -> int:
+        """
+        Number of sweep points.
+
+        Returns:
+            Number of sweep points
+        """
+        pass
+
+    @abstractmethod
+    def _get(self, index: int) -> Any:
+        """
+        Build a sweep point.
+
+        Args:
+            index: Index of the point. Always in range(len(self))
+
+        Returns:
+            Sweep point
+        """
+        pass
+
+    def __getitem__(self, index):
+        """
+        Get a sweep point, or a view on a slice of the space.
+
+        Args:
+            index: Index (negative indices are supported) or slice
+
+        Returns:
+            Sweep point or SweepSpaceView
+
+        Raises:
+            IndexError - If the index is out of range
+        """
+        if isinstance(index, slice):
+            return SweepSpaceView(self, range(len(self))[index])
+        length = len(self)
+        index = int(index)
+        if index < 0:
+            index += length
+        if not 0 <= index < length:
+            raise IndexError(f"Sweep point index {index} is out of range for {length} points")
+        return self._get(index)
+
+    def __iter__(self) -> Iterator:
+        """
+        Iterate over the sweep points.
+
+        Returns:
+            Sweep points iterator
+        """
+        for index in range(len(self)):
+            yield self._get(index)
+
+    def shard(self, index: int, count: int) -> 'SweepSpaceView':
+        """
+        Get one of count contiguous shards of the space. Shard sizes differ by one point at most.
+
+        Args:
+            index: Index of the shard, from 0 to count - 1
+            count: Number of shards
+
+        Returns:
+            View on the points of the shard
+
+        Raises:
+            ValueError - If the shard index or count is invalid
+        """
+        if count < 1:
+            raise ValueError(f"The number of shards must be at least 1, got {count}")
+        if not 0 <= index < count:
+            raise ValueError(f"Shard index {index} is out of range for {count} shards")
+        length = len(self)
+        return self[index * length // count:(index + 1) * length // count]
+
+
+class SweepSpaceView(SweepSpace):
+    """
+    View on a slice of a sweep space.
+    """
+
+    def __init__(self, space: SweepSpace, indices: range):
+        """
+        Constructor.
+
+        Args:
+            space: Space viewed
+            indices: Indices of the space in the view
+        """
+        self.space = space
+        self.indices = indices
+
+    def __len__(self) -> int:
+        """
+        Number of sweep points in the view.
+
+        Returns:
+            Number of sweep points
+        """
+        return len(self.indices)
+
+    def _get(self, index: int) -> Any:
+        """
+        Build a sweep point of the view.
+
+        Args:
+            index: Index in the view
+
+        Returns:
+            Sweep point
+        """
+        return self.space._get(self.indices[index])
+
+    def __getitem__(self, index):
+        """
+        Get a sweep point. Slices of a view are views on the same space.
+
+        Args:
+            index: Index or slice
+
+        Returns:
+            Sweep point or SweepSpaceView
+        """
+        if isinstance(index, slice):
+            return SweepSpaceView(self.space, self.indices[index])
+        return super().__getitem__(index)
+
+
+class SweepDimension(SweepSpace):
+    """
+    Sweep points of a single sweep definition: the cross product of the values of the parameters of a function.
+
+    Each point is the function with its parameters bound, or the function itself when it takes no parameter.
+    """
+
+    def __init__(self, function: Callable, parameters: TSequence[str] = (), values: TSequence[TSequence] = ()):
+        """
+        Constructor.
+
+        Args:
+            function: Sweep function
+            parameters: Names of the swept parameters
+            values: Values of each parameter
+        """
+        if len(parameters) != len(values):
+            raise ValueError(f"Got {len(values)} lists of values for {len(parameters)} parameters")
+        self.function = function
+        self.parameters = list(parameters)
+        # Values must support indexing, sized iterables like sets are copied to lists
+        self.values = [v if isinstance(v, (list, tuple, range, np.ndarray)) else list(v) for v in values]
+        self._sizes = [len(v) for v in self.values]
+
+    def __len__(self) -> int:
+        """
+        Number of sweep points.
+
+        Returns:
+            Product of the number of values of each parameter
+        """
+        return int(np.prod(self._sizes, dtype=object)) if self._sizes else 1
+
+    def _bind(self, value_set) -> Callable:
+        """
+        Bind a set of values to the function.
+
+        Args:
+            value_set: One value per parameter
+
+        Returns:
+            Sweep point
+        """
+        if not self.parameters:
+            return self.function
+        return partial(self.function, **dict(zip(self.parameters, value_set)))
+
+    def _get(self, index: int) -> Callable:
+        """
+        Build a sweep point.
+
+        Args:
+            index: Index of the point
+
+        Returns:
+            Sweep function with its parameters bound
+        """
+        digits = mixed_radix_decode(index, self._sizes)
+        return self._bind([values[digit] for values, digit in zip(self.values, digits)])
+
+    def __iter__(self) -> Iterator[Callable]:
+        """
+        Iterate over the sweep points.
+
+        Returns:
+            Sweep points iterator
+        """
+        for value_set in product(*self.values):
+            yield self._bind(value_set)
+
+
+class ProductSweepSpace(SweepSpace):
+    """
+    Cross product of sweep spaces. Each point is a tuple with one point of each space.
+    """
+
+    def __init__(self, spaces: TSequence[SweepSpace]):
+        """
+        Constructor.
+
+        Args:
+            spaces: Spaces to cross
+        """
+        self.spaces = list(spaces)
+        self._sizes = [len(s) for s in self.spaces]
+
+    def __len__(self) -> int:
+        """
+        Number of sweep points.
+
+        Returns:
+            Product of the sizes of the spaces
+        """
+        return int(np.prod(self._sizes, dtype=object)) if self._sizes else 1
+
+    def _get(self, index: int) -> Tuple:
+        """
+        Build a sweep point.
+
+        Args:
+            index: Index of the point
+
+        Returns:
+            Tuple of points
+        """
+        digits = mixed_radix_decode(index, self._sizes)
+        return tuple(space._get(digit) for space, digit in zip(self.spaces, digits))
+
+    def __iter__(self) -> Iterator[Tuple]:
+        """
+        Iterate over the sweep points.
+
+        Returns:
+            Sweep points iterator
+        """
+        return product(*self.spaces)
+
+
+class ZipSweepSpace(SweepSpace):
+    """
+    Sweep spaces paired point by point. Each point is a tuple with the points of the same index in each space.
+    """
+
+    def __init__(self, spaces: TSequence[SweepSpace]):
+        """
+        Constructor.
+
+        Args:
+            spaces: Spaces to pair
+        """
+        self.spaces = list(spaces)
+
+    def __len__(self) -> int:
+        """
+        Number of sweep points.
+
+        Returns:
+            Size of the smallest space
+        """
+        return min(len(s) for s in self.spaces) if self.spaces else 0
+
+    def _get(self, index: int) -> Tuple:
+        """
+        Build a sweep point.
+
+        Args:
+            index: Index of the point
+
+        Returns:
+            Tuple of points
+        """
+        return tuple(space._get(index) for space in self.spaces)
+
+    def __iter__(self) -> Iterator[Tuple]:
+        """
+        Iterate over the sweep points.
+
+        Returns:
+            Sweep points iterator
+        """
+        return zip(*self.spaces)
+
+
+class ChainSweepSpace(SweepSpace):
+    """
+    Sweep spaces one after the other.
+    """
+
+    def __init__(self, spaces: TSequence[SweepSpace]):
+        """
+        Constructor.
+
+        Args:
+            spaces: Spaces to chain
+        """
+        self.spaces = list(spaces)
+        # Index of the first point of each space after the first one
+        self._offsets = list(accumulate(len(s) for s in self.spaces))
+
+    def __len__(self) -> int:
+        """
+        Number of sweep points.
+
+        Returns:
+            Sum of the sizes of the spaces
+        """
+        return self._offsets[-1] if self._offsets else 0
+
+    def _get(self, index: int) -> Any:
+        """
+        Build a sweep point.
+
+        Args:
+            index: Index of the point
+
+        Returns:
+            Point of the space containing the index
+        """
+        position = bisect_right(self._offsets, index)
+        start = self._offsets[position - 1] if position > 0 else 0
+        return self.spaces[position]._get(index - start)
+
+    def __iter__(self) -> Iterator:
+        """
+        Iterate over the sweep points.
+
+        Returns:
+            Sweep points iterator
+        """
+        for space in self.spaces:
+            yield from space
@@ -12,7 +12,7 @@ from dataclasses import dataclass, field
 from multiprocessing import current_process, cpu_count
 from logging import getLogger, DEBUG
 from diskcache import Cache, DEFAULT_SETTINGS, FanoutCache
-from typing import Union, Optional
+from typing import ClassVar, Union, Optional
 
 MAX_CACHE_SIZE = int(2 ** 33)  # 8GB
 DEFAULT_SETTINGS["size_limit"] = MAX_CACHE_SIZE
@@ -112,3 +112,69 @@ class CacheEnabled:
             self.initialize_cache()
 
         return self._cache
+
+
+@dataclass(init=False, repr=False)
+class PersistentCacheEnabled(CacheEnabled):
+    """
+    CacheEnabled item whose cache lives in a fixed directory and is kept on disk when the object is deleted.
+    """
+    #: Directory of the cache when none is given
+    default_cache_directory: ClassVar[Optional[str]] = None
+
+    def __init__(self, directory: Optional[str] = None, size_limit: Optional[int] = None):
+        """
+        Initialize the persistent cache.
+
+        Args:
+            directory: Directory of the cache. Defaults to the default_cache_directory of the class
+            size_limit: Maximum size of the cache in bytes. Least recently stored entries are evicted first.
+                Defaults to the diskcache size limit.
+        """
+        self._cache = None
+        self._cache_directory = str(directory or self.default_cache_directory)
+        self.size_limit = size_limit
+        os.makedirs(self._cache_directory, exist_ok=True)
+
+    def __getstate__(self):
+        """
+        Do not pickle the open cache. Workers reopen it from the directory.
+
+        Returns:
+            State to pickle
+        """
+        state = self.__dict__.copy()
+        state['_cache'] = None
+        return state
+
+    def initialize_cache(self, shards: Optional[int] = None, eviction_policy=None):
+        """
+        Open the cache in its directory.
+
+        Args:
+            shards: Ignored. Entries are written by one worker at a time per key.
+            eviction_policy: Ignored. The least recently stored entries are evicted first.
+        """
+        super().initialize_cache()
+        if self.size_limit is not None and self._cache.size_limit != self.size_limit:
+            self._cache.reset('size_limit', self.size_limit)
+
+    def cleanup_cache(self):
+        """
+        Close the cache but keep its content on disk.
+
+        Returns:
+            None
+        """
+        if self._cache is not None:
+            self._cache.close()
+            self._cache = None
+
+    def clear(self) -> int:
+        """
+        Remove every entry from the cache.
+
+        Returns:
+            Number of entries removed
+        """
+        return self.cache.clear(retry=True)
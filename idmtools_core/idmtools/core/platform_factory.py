@@ -73,6 +73,7 @@ class Platform:
            - batch_size (int, optional): How many simulations per batch. Default is 10, min is 1 and max is 100
            - exclusive (bool, optional): Enable exclusive mode? (one simulation per node on the cluster). Default is False
            - docker_image (str, optional): Docker image to use for the simulation. Default is None
+           - checksum_cache (str, optional): Directory of a persistent cache of the checksums of uploaded files. Default is None (no cache)
 
         SlurmPlatform Keyword Args:
            - nodes (int, optional): How many nodes to be used. Default is None
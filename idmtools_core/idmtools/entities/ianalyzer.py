@@ -3,9 +3,10 @@ Defines our IAnalyzer interface used as base of all other analyzers.
 
 Copyright 2021, Bill & Melinda Gates Foundation. All rights reserved.
 """
+import inspect
 from abc import ABCMeta, abstractmethod
 from logging import getLogger
-from typing import Any, NoReturn, List, TypeVar, Dict, Optional, Union, TYPE_CHECKING
+from typing import Any, Callable, NoReturn, List, TypeVar, Dict, Optional, Union, TYPE_CHECKING
 
 if TYPE_CHECKING:
     from idmtools.core.interfaces.iitem import IItemList
@@ -19,12 +20,31 @@ ANALYZABLE_ITEM = Union['IWorkflowItem', 'Simulation']
 ANALYSIS_ITEM_MAP_DATA_TYPE = Dict[str, Any]
 # The datatype if the reduce input
 ANALYSIS_REDUCE_DATA_TYPE = Dict[ANALYZABLE_ITEM, Any]
+# How analyzers can receive local files, see IAnalyzer.file_access
+FILE_ACCESS_MODES = ('bytes', 'mmap', 'path')
 
 
 class IAnalyzer(metaclass=ABCMeta):
     """
     An abstract base class carrying the lowest level analyzer interfaces called by :class:`~idmtools.managers.experiment_manager.ExperimentManager`.
+
+    Attributes:
+        share_parsed_data: When several analyzers parse the same file of an item, the file is parsed once. Analyzers
+            sharing parsed data receive the same object and must not modify it. Other analyzers receive their own
+            copy. Defaults to False.
+        parsers: Parsers used by this analyzer instead of the ones registered in
+            :class:`~idmtools.utils.file_parser.FileParser`, keyed by file extension or filename pattern.
+            Defaults to None.
+        file_access: How the analyzer receives files that the platform has on a local filesystem. *bytes* gives a
+            copy of the content, *mmap* a read-only memory map and *path* the file path, which is never parsed.
+            Files that are not local are given as bytes. Memory maps are closed once the item is mapped, so
+            :meth:`map` must copy the content it returns (e.g. bytes(content[start:end])). Parsers read memory maps in
+            place through a :class:`~idmtools.utils.file_parser.BufferReader`; only what a parser reads or decodes
+            is copied. Defaults to *bytes*.
     """
+    share_parsed_data: bool = False
+    parsers: Optional[Dict[str, Callable]] = None
+    file_access: str = 'bytes'
 
     @abstractmethod
     def __init__(self, uid=None, working_dir: Optional[str] = None, parse: bool = True, filenames: Optional[List[str]] = None):
@@ -129,6 +149,60 @@ class IAnalyzer(metaclass=ABCMeta):
         """
         pass
 
+    def combine(self, accumulated: Any, partial: Any) -> Any:
+        """
+        Merge two :meth:`reduce` results computed over disjoint sets of items.
+
+        Analyzers implementing this method declare that :meth:`reduce` may be called on subsets of the items and the
+        results merged afterwards. This allows the :class:`~idmtools.analysis.analyze_manager.AnalyzeManager` to
+        reduce while mapping is still in progress, keeping memory bounded.
+
+        Args:
+            accumulated: Result of reducing (and combining) previous items.
+            partial: Result of reducing the next set of items.
+
+        Returns:
+            The combined result.
+        """
+        raise NotImplementedError(f"{self.__class__.__name__} does not implement combine")
+
+    @property
+    def can_combine(self) -> bool:
+        """
+        Returns if the analyzer implements :meth:`combine`.
+
+        Returns:
+            True if combine is overridden
+        """
+        return type(self).combine is not IAnalyzer.combine
+
+    def fingerprint(self) -> Optional[str]:
+        """
+        Identify the analyzer code and configuration.
+
+        The :class:`~idmtools.analysis.analyze_manager.AnalyzeManager` uses the fingerprint to reuse cached
+        :meth:`map` results. The default combines the source of the analyzer classes with the analyzer attributes
+        (except :attr:`results`). Override it to return a version string, or None to never cache the analyzer.
+
+        Returns:
+            Hash of the analyzer or None if the analyzer cannot be fingerprinted
+        """
+        from idmtools.utils.hashing import hash_obj
+        sources = []
+        for cls in type(self).__mro__:
+            if cls in (IAnalyzer, object):
+                break
+            try:
+                sources.append(inspect.getsource(cls))
+            except (OSError, TypeError):
+                sources.append(f"{cls.__module__}.{cls.__qualname__}")
+        state = {k: v for k, v in vars(self).items() if k != 'results'}
+        try:
+            return hash_obj((sources, state))
+        except Exception as e:
+            logger.debug(f"Could not fingerprint analyzer {self.uid}: {e}")
+            return None
+
     def destroy(self) -> NoReturn:
         """
         Call after the analysis is done.
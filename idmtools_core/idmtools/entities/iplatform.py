@@ -13,7 +13,7 @@ from dataclasses import fields, field
 from functools import partial
 from os import PathLike
 import pandas as pd
-from pathlib import PureWindowsPath, PurePath
+from pathlib import Path, PureWindowsPath, PurePath
 from itertools import groupby
 from logging import getLogger, DEBUG
 from typing import Dict, List, NoReturn, Type, TypeVar, Any, Union, Tuple, Set, Iterator, Callable, Optional
@@ -646,6 +646,38 @@ class IPlatform(IItem, CacheEnabled, metaclass=ABCMeta):
         idm_item = self.get_item(item_id, item_type, raw=True)
         return self.get_files(idm_item, files, output)
 
+    def get_files_checksums(self, item: IEntity, files: Union[Set[str], List[str]]) -> Optional[Dict[str, str]]:
+        """
+        Get a checksum of files of a platform entity without retrieving their content.
+
+        Platforms able to identify file versions cheaply (for example, from file size and modification time) override
+        this so cached analysis results can be reused without downloading the files.
+
+        Args:
+            item: Item to get file checksums for
+            files: List of file names
+
+        Returns:
+            Dict with file name as key and checksum as value, or None if the platform cannot provide checksums
+        """
+        return None
+
+    def get_local_files(self, item: IEntity, files: Union[Set[str], List[str]]) -> Optional[Dict[str, Path]]:
+        """
+        Get the paths of files of a platform entity that can be read directly from the local filesystem.
+
+        Platforms storing outputs on a local or shared filesystem override this so analyzers can read the files
+        without copying them in memory.
+
+        Args:
+            item: Item to get files for
+            files: List of file names
+
+        Returns:
+            Dict with file name as key and path as value, or None if the files are not available locally
+        """
+        return None
+
     def are_requirements_met(self, requirements: Union[PlatformRequirements, Set[PlatformRequirements]]) -> bool:
         """
         Does the platform support the list of requirements.
@@ -709,9 +741,26 @@ class IPlatform(IItem, CacheEnabled, metaclass=ABCMeta):
             self.refresh_status(item)
             if callback(item):
                 return
-            time.sleep(refresh_interval)
+            self.wait_for_status_change(item, refresh_interval)
         raise TimeoutError(f"Timeout of {timeout} seconds exceeded")
 
+    def wait_for_status_change(self, item: Union[Experiment, IWorkflowItem, Suite], timeout: float):
+        """
+        Wait between two refreshes of the status of an item while waiting on it.
+
+        Platforms notified when items change can return as soon as the status of the item changes. By default, this
+        waits for the whole timeout.
+
+        Args:
+            item: Item waited on
+            timeout: Maximum time to wait, in seconds
+
+        Returns:
+            None
+        """
+        import time
+        time.sleep(timeout)
+
     def wait_till_done(self, item: IRunnableEntity, timeout: int = 60 * 60 * 24,
                        refresh_interval: int = 5, progress: bool = True):
         """
@@ -0,0 +1,323 @@
+"""
+CreationJournal definition. The journal records the progress of an experiment creation so it can be resumed.
+
+Copyright 2025, Gates Foundation. All rights reserved.
+"""
+import glob
+import hashlib
+import json
+import os
+import pickle
+import time
+import uuid
+from functools import partial
+from logging import getLogger, DEBUG
+from pathlib import Path
+from threading import Lock
+from typing import Any, Dict, Iterable, Optional, Tuple, TYPE_CHECKING
+from idmtools.builders.sweep_space import SweepDimension, SweepSpace, SweepSpaceView
+from idmtools.entities.templated_simulation import TemplatedSimulations
+from idmtools.utils.hashing import hash_obj
+
+if TYPE_CHECKING:  # pragma: no cover
+    from idmtools.entities.experiment import Experiment
+    from idmtools.entities.iplatform import IPlatform
+
+logger = getLogger(__name__)
+user_logger = getLogger('user')
+
+DEFAULT_JOURNAL_DIRECTORY = os.path.join(str(Path.home()), '.idmtools', 'journals')
+#: Journals not written for this many days are removed, their runs are considered abandoned
+DEFAULT_JOURNAL_EXPIRY_DAYS = 7
+
+
+def _describe_function(function: Any) -> Any:
+    """
+    Describe a sweep function by its name, so the description is the same in every process.
+
+    Args:
+        function: Sweep function
+
+    Returns:
+        Description of the function
+    """
+    if isinstance(function, partial):
+        return _describe_function(function.func), function.args, function.keywords
+    return getattr(function, '__module__', None), getattr(function, '__qualname__', repr(function))
+
+
+def _describe_sweep_space(space: SweepSpace) -> Any:
+    """
+    Describe a sweep space by its functions and values.
+
+    Args:
+        space: Sweep space
+
+    Returns:
+        Description of the space
+    """
+    if isinstance(space, SweepDimension):
+        return _describe_function(space.function), space.parameters, space.values
+    if isinstance(space, SweepSpaceView):
+        return _describe_sweep_space(space.space), space.indices
+    return type(space).__name__, [_describe_sweep_space(s) for s in space.spaces]
+
+
+def get_template_fingerprint(template: TemplatedSimulations) -> Optional[str]:
+    """
+    Get the fingerprint of a template: its base task, base tags and the sweep values of its builder.
+
+    The fingerprint is computed once and kept on the template, since creating simulations updates the base task (its
+    common assets for example).
+
+    Args:
+        template: Template of the simulations
+
+    Returns:
+        Fingerprint, or None if the template cannot be hashed
+    """
+    fingerprint = getattr(template, '_journal_fingerprint', None)
+    if fingerprint is None:
+        try:
+            fingerprint = hash_obj([template.base_task, template.base_simulation.tags,
+                                    [_describe_sweep_space(builder.sweep_space) for builder in template.builders]])
+        except (pickle.PicklingError, AttributeError, TypeError) as e:
+            logger.debug(f"Cannot compute the fingerprint of the template: {e}")
+            return None
+        template._journal_fingerprint = fingerprint
+    return fingerprint
+
+
+def remove_expired_journals(directory: str, expiry_days: float = DEFAULT_JOURNAL_EXPIRY_DAYS) -> int:
+    """
+    Remove the journals of runs that stopped long ago and were never resumed.
+
+    Args:
+        directory: Directory of the journals
+        expiry_days: Age, in days since their last write, after which journals are removed
+
+    Returns:
+        Number of journals removed
+    """
+    expired = time.time() - expiry_days * 24 * 3600
+    removed = 0
+    for path in glob.glob(os.path.join(glob.escape(directory), '*.jsonl')):
+        try:
+            if os.path.getmtime(path) < expired:
+                os.remove(path)
+                removed += 1
+        except OSError:
+            # Removed by another run in the meantime
+            pass
+    if removed and logger.isEnabledFor(DEBUG):
+        logger.debug(f"Removed {removed} expired creation journals from {directory}")
+    return removed
+
+
+class CreationJournal:
+    """
+    Append-only journal of the simulations of an experiment created on a platform.
+
+    The first line of the file records the experiment (and suite) ids, the fingerprint of the template and the id of
+    the run. Each following line records a batch of simulations once it is created, as pairs of sweep index and
+    platform id, see :meth:`~idmtools.entities.templated_simulation.TemplatedSimulations.indexed_simulations`. Lines
+    are flushed as they are written, so the journal survives a crash of the creating process.
+
+    Each run writes its own file, so runs of the same experiment at the same time do not overwrite or remove the
+    journal of each other. A resumed run continues the journal of the run it resumes.
+    """
+
+    def __init__(self, directory: str, key: str, fingerprint: Optional[str] = None):
+        """
+        Constructor.
+
+        Args:
+            directory: Directory of the journals
+            key: Key of the experiment, shared by the journals of all its runs
+            fingerprint: Fingerprint of the template of the experiment
+        """
+        self.directory = str(directory)
+        self.key = key
+        self.fingerprint = fingerprint
+        self.run_id = uuid.uuid4().hex
+        self.path = os.path.join(self.directory, f'{key}.{self.run_id}.jsonl')
+        self.experiment_id: Optional[str] = None
+        self.suite_id: Optional[str] = None
+        #: Platform id of each simulation created, by sweep index
+        self.created: Dict[int, str] = dict()
+        self._lock = Lock()
+
+    @classmethod
+    def get_directory(cls, directory: Optional[str] = None) -> str:
+        """
+        Get the directory of the journals.
+
+        Args:
+            directory: Directory given to the run, if any
+
+        Returns:
+            The directory given, the journal_directory option or ~/.idmtools/journals
+        """
+        if directory:
+            return str(directory)
+        from idmtools.config import IdmConfigParser
+        return IdmConfigParser.get_option(None, "journal_directory", fallback='') or DEFAULT_JOURNAL_DIRECTORY
+
+    @classmethod
+    def for_experiment(cls, experiment: 'Experiment', platform: 'IPlatform',
+                       directory: Optional[str] = None) -> Optional['CreationJournal']:
+        """
+        Get the journal of an experiment.
+
+        The journal of an experiment is found from its name, platform, number of simulations and the fingerprint of its
+        template, so the journal of an earlier run of the same script is found again, and not the one of another sweep.
+        Only experiments built from a TemplatedSimulations with at most one builder have a journal, since the order of
+        several builders is not stable between runs.
+
+        Args:
+            experiment: Experiment
+            platform: Platform the experiment is created on
+            directory: Directory of the journals. Defaults to the journal_directory option or ~/.idmtools/journals
+
+        Returns:
+            Journal or None if the creation of the experiment cannot be journaled
+        """
+        template = experiment.simulations.items
+        if not isinstance(template, TemplatedSimulations) or len(template.builders) > 1:
+            return None
+        fingerprint = get_template_fingerprint(template)
+        if fingerprint is None:
+            return None
+        directory = cls.get_directory(directory)
+        task_class = template.base_task.__class__
+        key = json.dumps([experiment.name, platform.__class__.__name__, len(template),
+                          f'{task_class.__module__}.{task_class.__name__}', fingerprint])
+        os.makedirs(directory, exist_ok=True)
+        return cls(directory, hashlib.md5(key.encode("utf-8")).hexdigest(), fingerprint=fingerprint)
+
+    @property
+    def resumable(self) -> bool:
+        """
+        Whether the journal records an experiment already created.
+
+        Returns:
+            True if the creation can be resumed
+        """
+        return self.experiment_id is not None
+
+    def __len__(self) -> int:
+        """
+        Number of simulations created.
+
+        Returns:
+            Number of simulations created
+        """
+        return len(self.created)
+
+    def load(self) -> 'CreationJournal':
+        """
+        Load the latest journal of the experiment, if any, and continue it.
+
+        A line partially written when the creating process stopped is ignored, the simulations it recorded are
+        created again. Journals of another template are not resumed.
+
+        Returns:
+            The journal
+        """
+        self.experiment_id, self.suite_id, self.created = None, None, dict()
+        if os.path.exists(self.path):
+            self._read(self.path)
+            return self
+        paths = glob.glob(os.path.join(glob.escape(self.directory), f'{self.key}.*.jsonl'))
+        for path in sorted(paths, key=os.path.getmtime, reverse=True):
+            header = self._read(path)
+            if header.get('fingerprint') != self.fingerprint:
+                user_logger.warning(f"The creation journal {path} was written for another template, it is not resumed")
+                self.experiment_id, self.suite_id, self.created = None, None, dict()
+                continue
+            if header.get('experiment_id') is not None:
+                self.path, self.run_id = path, header.get('run_id')
+                break
+        return self
+
+    def _read(self, path: str) -> Dict:
+        """
+        Read a journal file.
+
+        Args:
+            path: Path of the journal file
+
+        Returns:
+            Header of the journal
+        """
+        header = dict()
+        with open(path, 'r') as journal_file:
+            for line in journal_file:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    logger.debug(f"Ignoring incomplete line of creation journal {path}")
+                    break
+                if 'experiment_id' in entry:
+                    header = entry
+                    self.experiment_id, self.suite_id = entry['experiment_id'], entry.get('suite_id')
+                else:
+                    self.created.update((int(index), item_id) for index, item_id in entry['created'])
+        return header
+
+    def _write(self, entry: Dict, mode: str = 'a'):
+        """
+        Write an entry to the journal and flush it. The caller holds the lock of the journal.
+
+        Args:
+            entry: Entry to write
+            mode: File open mode
+
+        Returns:
+            None
+        """
+        with open(self.path, mode) as journal_file:
+            journal_file.write(json.dumps(entry) + '\n')
+
+    def start(self, experiment: 'Experiment'):
+        """
+        Start the journal of this run for an experiment just created.
+
+        Args:
+            experiment: Experiment created
+
+        Returns:
+            None
+        """
+        with self._lock:
+            self.experiment_id, self.created = str(experiment.uid), dict()
+            self.suite_id = str(experiment.parent_id) if experiment.parent_id else None
+            self._write(dict(experiment_id=self.experiment_id, suite_id=self.suite_id, fingerprint=self.fingerprint,
+                             run_id=self.run_id), mode='w')
+
+    def record(self, created: Iterable[Tuple[int, str]]):
+        """
+        Record a batch of simulations created.
+
+        Args:
+            created: Sweep index and platform id of each simulation
+
+        Returns:
+            None
+        """
+        created = [(int(index), str(item_id)) for index, item_id in created]
+        if logger.isEnabledFor(DEBUG):
+            logger.debug(f"Recording {len(created)} simulations created in {self.path}")
+        with self._lock:
+            self._write(dict(created=created))
+            self.created.update(created)
+
+    def remove(self):
+        """
+        Remove the journal of this run once the experiment is completely created.
+
+        Returns:
+            None
+        """
+        if os.path.exists(self.path):
+            os.remove(self.path)
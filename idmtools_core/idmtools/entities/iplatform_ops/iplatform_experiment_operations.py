@@ -9,15 +9,19 @@ from concurrent.futures.thread import ThreadPoolExecutor
 from dataclasses import dataclass
 from logging import getLogger, DEBUG
 from types import GeneratorType
-from typing import Type, Any, NoReturn, Tuple, List, Dict, Iterator, Union, TYPE_CHECKING
+from typing import Type, Any, NoReturn, Tuple, List, Dict, Iterator, Union, Optional, TYPE_CHECKING
 
 from idmtools.assets import Asset
+from idmtools.core import EntityContainer
 from idmtools.core.enums import EntityStatus, ItemType
 from idmtools.entities.experiment import Experiment
+from idmtools.entities.iplatform_ops.creation_journal import CreationJournal, DEFAULT_JOURNAL_EXPIRY_DAYS, \
+    remove_expired_journals
 from idmtools.entities.iplatform_ops.utils import batch_create_items
 from idmtools.registry.functions import FunctionPluginManager
 
 logger = getLogger(__name__)
+user_logger = getLogger('user')
 if TYPE_CHECKING:  # pragma: no cover
     from idmtools.entities.iplatform import IPlatform
 
@@ -80,7 +84,8 @@ class IPlatformExperimentOperations(ABC):
             logger.debug("Calling experiment post_creation")
         experiment.post_creation(self.platform)
 
-    def create(self, experiment: Experiment, do_pre: bool = True, do_post: bool = True, **kwargs) -> Union[Experiment]:
+    def create(self, experiment: Experiment, do_pre: bool = True, do_post: bool = True,
+               journal: Optional[CreationJournal] = None, **kwargs) -> Union[Experiment]:
         """
         Creates an experiment from an IDMTools simulation object.
 
@@ -90,6 +95,9 @@ class IPlatformExperimentOperations(ABC):
             experiment: Experiment to create
             do_pre: Perform Pre creation events for item
             do_post: Perform Post creation events for item
+            journal: Optional creation journal. When the journal records an experiment already created, that experiment
+                is loaded from the platform instead of creating a new one. Otherwise the journal is started once the
+                experiment is created.
             **kwargs: Optional arguments mainly for extensibility
 
         Returns:
@@ -102,15 +110,25 @@ class IPlatformExperimentOperations(ABC):
             if logger.isEnabledFor(DEBUG):
                 logger.debug("Finished platform_modify_experiment")
             return experiment
+        resume = journal is not None and journal.resumable
+        if resume:
+            self.resume_from_journal(experiment, journal)
         if do_pre:
             self.pre_create(experiment, **kwargs)
             if logger.isEnabledFor(DEBUG):
                 logger.debug("Finished pre_create")
-        if logger.isEnabledFor(DEBUG):
-            logger.debug("Calling platform_create")
-        experiment._platform_object = self.platform_create(experiment, **kwargs)
-        if logger.isEnabledFor(DEBUG):
-            logger.debug("Finished platform_create")
+        if resume:
+            user_logger.info(f"Resuming the creation of experiment {experiment.uid}: {len(journal)} simulations were "
+                             f"already created")
+            experiment._platform_object = self.get(experiment.uid, **kwargs)
+        else:
+            if logger.isEnabledFor(DEBUG):
+                logger.debug("Calling platform_create")
+            experiment._platform_object = self.platform_create(experiment, **kwargs)
+            if logger.isEnabledFor(DEBUG):
+                logger.debug("Finished platform_create")
+            if journal is not None:
+                journal.start(experiment)
         experiment.platform = self.platform
         if do_post:
             self.post_create(experiment, **kwargs)
@@ -191,14 +209,72 @@ class IPlatformExperimentOperations(ABC):
         """
         return experiment
 
-    def pre_run_item(self, experiment: Experiment, **kwargs):
+    def open_creation_journal(self, experiment: Experiment, resume: bool = False, journal_directory: str = None,
+                              **kwargs) -> Optional[CreationJournal]:
+        """
+        Open the creation journal of an experiment built from a template.
+
+        Journaling is opt-in: the creation is journaled when it is resumed, or when a journal directory is given to the
+        run or set with the journal_directory option. Journals not written for journal_expiry_days days (7 by default)
+        are removed.
+
+        Args:
+            experiment: Experiment to create
+            resume: Resume the creation recorded by the journal of an earlier run, if any
+            journal_directory: Optional directory of the journals
+            **kwargs: Optional arguments mainly for extensibility
+
+        Returns:
+            Journal or None if the creation of the experiment is not journaled
+        """
+        from idmtools.config import IdmConfigParser
+        journal_directory = journal_directory or IdmConfigParser.get_option(None, "journal_directory", fallback='')
+        if not resume and not journal_directory:
+            return None
+        journal = CreationJournal.for_experiment(experiment, self.platform, directory=journal_directory or None)
+        if journal is None:
+            if resume:
+                user_logger.warning("Only experiments built from a template with at most one builder can be resumed. "
+                                    "Creating the experiment from scratch.")
+            return None
+        expiry_days = IdmConfigParser.get_option(None, "journal_expiry_days", fallback=DEFAULT_JOURNAL_EXPIRY_DAYS)
+        remove_expired_journals(journal.directory, float(expiry_days))
+        if resume and not journal.load().resumable:
+            user_logger.info(f"No creation to resume for experiment {experiment.name}. Creating it from scratch.")
+        return journal
+
+    def resume_from_journal(self, experiment: Experiment, journal: CreationJournal):
+        """
+        Give an experiment the ids of the experiment and suite created by the run its journal records.
+
+        Args:
+            experiment: Experiment to create
+            journal: Creation journal recording an experiment already created
+
+        Returns:
+            None
+        """
+        experiment.uid = journal.experiment_id
+        if experiment.parent is not None:
+            if journal.suite_id:
+                experiment.parent.uid = journal.suite_id
+            experiment.parent.add_experiment(experiment)
+        experiment.clear_directory_cache()
+
+    def pre_run_item(self, experiment: Experiment, journal: Optional[CreationJournal] = None, **kwargs):
         """
         Trigger right before commissioning experiment on platform.
 
         This ensures that the item is created. It also ensures that the children(simulations) have also been created.
 
+        The creation of experiments built from a template is recorded in a journal when the run is given resume=True
+        or a journal_directory, see :class:`~idmtools.entities.iplatform_ops.creation_journal.CreationJournal`. If it
+        stops before all the simulations are created, running the experiment again with resume=True only creates the
+        missing simulations.
+
         Args:
             experiment: Experiment to commission
+            journal: Creation journal opened by :meth:`run_item`, if the creation is journaled
 
         Returns:
             None
@@ -213,7 +289,7 @@ class IPlatformExperimentOperations(ABC):
         if experiment.status is None:
             if logger.isEnabledFor(DEBUG):
                 logger.debug("Calling create")
-            self.create(experiment, **kwargs)
+            self.create(experiment, journal=journal, **kwargs)
         else:
             if logger.isEnabledFor(DEBUG):
                 logger.debug("Calling platform_modify_experiment")
@@ -222,7 +298,19 @@ class IPlatformExperimentOperations(ABC):
         # check sims
         if logger.isEnabledFor(DEBUG):
             logger.debug("Ensuring simulations exist")
-        if isinstance(experiment.simulations, (GeneratorType, Iterator)):
+        if journal is not None:
+            if logger.isEnabledFor(DEBUG):
+                logger.debug("Calling _create_items_of_type for sims with creation journal")
+            previous = set(journal.created.values())
+            simulations = self.platform._create_items_of_type(experiment.simulations, ItemType.SIMULATION,
+                                                              journal=journal, **kwargs)
+            if previous:
+                # Load the simulations created by the earlier run
+                children = self.platform.get_children(experiment.uid, ItemType.EXPERIMENT, force=True, item=experiment)
+                simulations = [s for s in children if str(s.id) in previous] + list(simulations)
+            experiment.simulations = EntityContainer(simulations)
+            journal.remove()
+        elif isinstance(experiment.simulations, (GeneratorType, Iterator)):
             if logger.isEnabledFor(DEBUG):
                 logger.debug("Calling _create_items_of_type for sims")
             experiment.simulations = self.platform._create_items_of_type(experiment.simulations, ItemType.SIMULATION,
@@ -263,9 +351,16 @@ class IPlatformExperimentOperations(ABC):
         Returns:
             None
         """
+        journal = None
+        if experiment.status is None:
+            journal = self.open_creation_journal(experiment, **kwargs)
+            if journal is not None and journal.resumable:
+                # The ids are known before the platform creates the parent of the experiment
+                self.resume_from_journal(experiment, journal)
+        kwargs.pop('resume', None)
         if logger.isEnabledFor(DEBUG):
             logger.debug("Calling pre_run_item")
-        self.pre_run_item(experiment, **kwargs)
+        self.pre_run_item(experiment, journal=journal, **kwargs)
         if experiment.status not in [EntityStatus.FAILED, EntityStatus.SUCCEEDED]:
             if logger.isEnabledFor(DEBUG):
                 logger.debug("Calling platform_run_item")
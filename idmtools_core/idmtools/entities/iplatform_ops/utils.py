@@ -5,17 +5,23 @@ Here we have mostly utilities to handle batch operations which tend to overlap a
 
 Copyright 2021, Bill & Melinda Gates Foundation. All rights reserved.
 """
-from concurrent.futures import as_completed, Future
+from collections import deque
+from concurrent.futures import as_completed, Future, wait
 from concurrent.futures.process import ProcessPoolExecutor
 from concurrent.futures.thread import ThreadPoolExecutor
 from functools import partial
+from itertools import islice
 from logging import getLogger, DEBUG
 from os import cpu_count
-from typing import List, Union, Generator, Iterable, Callable, Any
+from time import perf_counter
+from typing import List, Union, Generator, Iterable, Callable, Any, Optional, Tuple, TYPE_CHECKING
 from more_itertools import chunked
 from idmtools.core import EntityContainer
 from idmtools.entities.templated_simulation import TemplatedSimulations
 
+if TYPE_CHECKING:  # pragma: no cover
+    from idmtools.entities.iplatform_ops.creation_journal import CreationJournal
+
 logger = getLogger(__name__)
 user_logger = getLogger('user')
 # Global executor
@@ -63,43 +69,146 @@ def item_batch_worker_thread(create_func: Callable, items: Union[List], **kwargs
     return ret
 
 
-def batch_create_items(items: Union[Iterable, Generator], batch_worker_thread_func: Callable[[List], List] = None,
-                       create_func: Callable[..., Any] = None, display_progress: bool = True,
-                       progress_description: str = "Commissioning items", unit: str = None, **kwargs):
+def journaled_item_batch_worker_thread(create_func: Callable, journal: 'CreationJournal', items: List[Tuple[int, Any]],
+                                       **kwargs) -> List:
     """
-    Batch create items. You must specify either batch_worker_thread_func or create_func.
+    Batch worker thread function recording the items created in a creation journal.
+
+    The items created are recorded once the batch is done, or when an item fails to be created.
 
     Args:
-        items: Items to create
-        batch_worker_thread_func: Optional Function to execute. Should take a list and return a list
-        create_func: Optional Create function
-        display_progress: Enable progress bar
-        progress_description: Description to show in progress bar
-        unit: Unit for progress bar
-        **kwargs:
+        create_func: Create function for item
+        journal: Creation journal
+        items: Sweep index and item of each item to create
 
     Returns:
-        Batches crated results
+        List of items created
     """
-    global EXECUTOR
-    from idmtools.config import IdmConfigParser
-    from idmtools.utils.collections import ExperimentParentIterator
+    if logger.isEnabledFor(DEBUG):
+        logger.debug(f'Create {len(items)}')
 
-    max_workers = kwargs.get('max_workers', None)
+    ret = []
+    created = []
+    try:
+        for index, item in items:
+            ret.append(create_func(item, **kwargs))
+            created.append((index, item.id))
+    finally:
+        if created:
+            journal.record(created)
+    return ret
 
-    # Consider values from the block that Platform uses
-    _batch_size = int(IdmConfigParser.get_option(None, "batch_size", fallback=16))
 
-    batch_size = kwargs.get('batch_size', None)
-    if batch_size is not None:
-        _batch_size = batch_size
+class AdaptiveBatchSize:
+    """
+    Batch size adapted from the observed latency of the batches.
 
-    if display_progress and not IdmConfigParser.is_progress_bar_disabled():
-        from tqdm import tqdm
-        extra_args = dict(unit=unit) if unit else dict()
-        prog = tqdm(desc="Initializing objects for creation", **extra_args)
-    else:
-        prog = None
+    The size aims for batches taking target_seconds to create: it follows a moving average of the time per item,
+    grows or shrinks by a factor two at most per batch and stays within [min_size, max_size]. A growth that lowers the
+    throughput (items created per second) is reverted, since bigger batches then only delay the results.
+    """
+
+    def __init__(self, initial: int = 16, min_size: int = 1, max_size: int = 256, target_seconds: float = 1.0,
+                 smoothing: float = 0.5):
+        """
+        Constructor.
+
+        Args:
+            initial: Initial batch size
+            min_size: Minimum batch size
+            max_size: Maximum batch size
+            target_seconds: Time a batch should take to be created
+            smoothing: Weight of the last batch in the moving average of the time per item, between 0 and 1
+        """
+        if min_size < 1 or max_size < min_size:
+            raise ValueError(f"Invalid batch size bounds [{min_size}, {max_size}]")
+        if target_seconds <= 0:
+            raise ValueError(f"The batch target time must be positive, got {target_seconds}")
+        self.min_size = int(min_size)
+        self.max_size = int(max_size)
+        self.target_seconds = float(target_seconds)
+        self.smoothing = float(smoothing)
+        self.size = self._clamp(int(initial))
+        self._seconds_per_item: Optional[float] = None
+        # Size and throughput before the last growth, to revert it if the throughput dropped
+        self._previous: Optional[Tuple[int, float]] = None
+
+    def _clamp(self, size: int) -> int:
+        """
+        Clamp a size to the bounds.
+
+        Args:
+            size: Size
+
+        Returns:
+            Size within the bounds
+        """
+        return max(self.min_size, min(self.max_size, size))
+
+    def update(self, items: int, seconds: float) -> int:
+        """
+        Update the batch size from a batch created.
+
+        Args:
+            items: Number of items of the batch
+            seconds: Time taken to create the batch
+
+        Returns:
+            New batch size
+        """
+        if items <= 0 or self.min_size == self.max_size:
+            return self.size
+        seconds = max(seconds, 1e-6)
+        throughput = items / seconds
+        if self._previous is not None:
+            previous_size, previous_throughput = self._previous
+            self._previous = None
+            if throughput < 0.9 * previous_throughput:
+                self.size = previous_size
+                return self.size
+        latency = seconds / items
+        if self._seconds_per_item is None:
+            self._seconds_per_item = latency
+        else:
+            self._seconds_per_item = self.smoothing * latency + (1 - self.smoothing) * self._seconds_per_item
+        wanted = int(self.target_seconds / self._seconds_per_item)
+        size = self._clamp(max(self.size // 2, min(self.size * 2, wanted)))
+        if size > self.size:
+            self._previous = (self.size, throughput)
+        if logger.isEnabledFor(DEBUG) and size != self.size:
+            logger.debug(f"Batch size changed from {self.size} to {size}")
+        self.size = size
+        return self.size
+
+
+def _timed_batch_worker(batch_worker_thread_func: Callable[[List], List], items: List) -> Tuple[float, List]:
+    """
+    Run a batch worker and time it.
+
+    Args:
+        batch_worker_thread_func: Batch worker
+        items: Items of the batch
+
+    Returns:
+        Time taken in seconds and items created
+    """
+    start = perf_counter()
+    result = batch_worker_thread_func(items)
+    return perf_counter() - start, result
+
+
+def _get_executor(max_workers: Optional[int] = None) -> Union[ThreadPoolExecutor, ProcessPoolExecutor]:
+    """
+    Get the global executor used to create items, creating it on first use.
+
+    Args:
+        max_workers: Number of workers. Defaults to the workers_per_cpu or max_workers options
+
+    Returns:
+        Executor
+    """
+    global EXECUTOR
+    from idmtools.config import IdmConfigParser
 
     if EXECUTOR is None:
         _workers_per_cpu = IdmConfigParser.get_option(None, "workers_per_cpu", fallback=None)
@@ -119,21 +228,137 @@ def batch_create_items(items: Union[Iterable, Generator], batch_worker_thread_fu
             EXECUTOR = ProcessPoolExecutor(max_workers=_max_workers)
         else:
             EXECUTOR = ThreadPoolExecutor(max_workers=_max_workers)
+    return EXECUTOR
+
+
+def _get_batch_sizer(**kwargs) -> AdaptiveBatchSize:
+    """
+    Get the batch size of a creation from its options.
+
+    A batch_size passed to the creation fixes the batch size. Otherwise the batch size starts from the batch_size
+    option and adapts within the min_batch_size and max_batch_size options. A max_batch_size passed to the creation is
+    a hard bound, for platforms limiting the size of their batches.
+
+    Args:
+        **kwargs: Options of the creation
+
+    Returns:
+        Batch size
+    """
+    from idmtools.config import IdmConfigParser
 
+    def option(name, fallback, convert=int):
+        value = kwargs.get(name, None)
+        if value is None:
+            value = IdmConfigParser.get_option(None, name, fallback=fallback)
+        return convert(value)
+
+    if kwargs.get('batch_size', None) is not None:
+        batch_size = int(kwargs['batch_size'])
+        return AdaptiveBatchSize(batch_size, min_size=batch_size, max_size=batch_size)
+    # Consider values from the block that Platform uses
+    batch_size = option('batch_size', 16)
+    if kwargs.get('max_batch_size', None) is not None:
+        max_size = int(kwargs['max_batch_size'])
+    else:
+        max_size = max(batch_size, option('max_batch_size', 256))
+    return AdaptiveBatchSize(batch_size, min_size=min(option('min_batch_size', 1), max_size), max_size=max_size,
+                             target_seconds=option('batch_target_seconds', 1.0, float))
+
+
+def batch_create_items(items: Union[Iterable, Generator], batch_worker_thread_func: Callable[[List], List] = None,
+                       create_func: Callable[..., Any] = None, display_progress: bool = True,
+                       progress_description: str = "Commissioning items", unit: str = None,
+                       journal: Optional['CreationJournal'] = None, **kwargs) -> List:
+    """
+    Batch create items. You must specify either batch_worker_thread_func or create_func.
+
+    See :func:`iter_batch_create_items` for the options.
+
+    Args:
+        items: Items to create
+        batch_worker_thread_func: Optional Function to execute. Should take a list and return a list
+        create_func: Optional Create function
+        display_progress: Enable progress bar
+        progress_description: Description to show in progress bar
+        unit: Unit for progress bar
+        journal: Optional creation journal of the experiment of the simulations. Simulations of the template already
+            recorded in the journal are skipped, and each batch is recorded once it is created.
+        **kwargs:
+
+    Returns:
+        Batches crated results
+    """
+    return list(iter_batch_create_items(items, batch_worker_thread_func=batch_worker_thread_func,
+                                        create_func=create_func, display_progress=display_progress,
+                                        progress_description=progress_description, unit=unit, journal=journal,
+                                        **kwargs))
+
+
+def iter_batch_create_items(items: Union[Iterable, Generator], batch_worker_thread_func: Callable[[List], List] = None,
+                            create_func: Callable[..., Any] = None, display_progress: bool = True,
+                            progress_description: str = "Commissioning items", unit: str = None,
+                            journal: Optional['CreationJournal'] = None, **kwargs) -> Generator[Any, None, None]:
+    """
+    Batch create items, yielding the items created in order as their batches are done.
+
+    Items are only pulled from items when a batch is submitted, and at most max_pending_batches batches are submitted
+    at once, so a generator of items is never fully built in memory. The size of the batches adapts to their
+    latency, see :class:`AdaptiveBatchSize`. Closing the iterator cancels the batches not started yet.
+
+    Args:
+        items: Items to create
+        batch_worker_thread_func: Optional Function to execute. Should take a list and return a list
+        create_func: Optional Create function
+        display_progress: Enable progress bar
+        progress_description: Description to show in progress bar
+        unit: Unit for progress bar
+        journal: Optional creation journal of the experiment of the simulations. Simulations of the template already
+            recorded in the journal are skipped, and each batch is recorded once it is created.
+        **kwargs: Options passed to create_func. The batch_size, min_batch_size, max_batch_size, batch_target_seconds,
+            max_pending_batches and max_workers options default to the options of the same name.
+
+    Returns:
+        Generator of the items created
+
+    Raises:
+        ValueError - If neither create_func nor batch_worker_thread_func is provided
+    """
+    from idmtools.config import IdmConfigParser
+    from idmtools.utils.collections import ExperimentParentIterator
+
+    executor = _get_executor(kwargs.get('max_workers', None))
+    sizer = _get_batch_sizer(**kwargs)
+    max_pending = kwargs.get('max_pending_batches', None)
+    if max_pending is None:
+        max_pending = IdmConfigParser.get_option(None, "max_pending_batches",
+                                                 fallback=2 * getattr(executor, '_max_workers', 16))
+    max_pending = max(1, int(max_pending))
+
+    indexed = journal is not None and isinstance(items, ExperimentParentIterator) and \
+        isinstance(items.items, TemplatedSimulations)
+    # Items created by the default worker are recorded by the worker itself, so a failed batch still records the items
+    # created before the failure. Other batches are recorded when they are done.
+    record_in_worker = False
     if batch_worker_thread_func is None:
 
         if create_func is None:
             raise ValueError("You must provide either an item create callback or a item batch worker thread callback to"
                              " perform batches")
-        batch_worker_thread_func = partial(item_batch_worker_thread, create_func, **kwargs)
+        if indexed and isinstance(executor, ThreadPoolExecutor):
+            record_in_worker = True
+            batch_worker_thread_func = partial(journaled_item_batch_worker_thread, create_func, journal, **kwargs)
+        else:
+            batch_worker_thread_func = partial(item_batch_worker_thread, create_func, **kwargs)
     if logger.isEnabledFor(DEBUG):
-        logger.debug(f'Batching creation by {_batch_size}')
+        logger.debug(f'Batching creation by {sizer.size} in [{sizer.min_size}, {sizer.max_size}], '
+                     f'{max_pending} batches at most pending')
 
-    futures = []
-
-    total = 0
     parent = None
-    if isinstance(items, ExperimentParentIterator) and isinstance(items.items, TemplatedSimulations):
+    if indexed:
+        parent = items.parent
+        i = items.items.indexed_simulations(skip=journal.created)
+    elif isinstance(items, ExperimentParentIterator) and isinstance(items.items, TemplatedSimulations):
         parent = items.parent
         i = items.items.simulations().generator
     elif isinstance(items, ExperimentParentIterator) and isinstance(items.items, EntityContainer):
@@ -141,29 +366,77 @@ def batch_create_items(items: Union[Iterable, Generator], batch_worker_thread_fu
         i = items.items
     else:
         i = items
-    if display_progress and not IdmConfigParser.is_progress_bar_disabled() and hasattr(items, '__len__'):
-        prog.total = len(items)
-    for chunk in chunked(i, _batch_size):
-        total += len(chunk)
-        if parent:
-            for c in chunk:
-                c.parent = parent
-        if logger.isEnabledFor(DEBUG):
-            logger.debug(f"Submitting chunk: {len(chunk)}")
-        if display_progress and not IdmConfigParser.is_progress_bar_disabled():
-            prog.update(len(chunk))
-        futures.append(EXECUTOR.submit(batch_worker_thread_func, chunk))
+    i = iter(i)
 
-    results = []
     if display_progress and not IdmConfigParser.is_progress_bar_disabled():
-        prog.set_description(progress_description)
-        prog.reset(total)
-        results = show_progress_of_batch(prog, futures)
+        from tqdm import tqdm
+        extra_args = dict(unit=unit) if unit else dict()
+        if hasattr(items, '__len__'):
+            extra_args['total'] = len(items) - (len(journal.created) if indexed else 0)
+        prog = tqdm(desc=progress_description, **extra_args)
     else:
-        for future in futures:
-            results.extend(future.result())
+        prog = None
 
-    return results
+    pending = deque()
+
+    def collect():
+        seconds, result = pending.popleft().result()
+        sizer.update(len(result), seconds)
+        if prog is not None:
+            prog.update(len(result))
+        return result
+
+    try:
+        while True:
+            chunk = list(islice(i, sizer.size))
+            if not chunk:
+                break
+            if indexed:
+                indices, chunk = [index for index, _ in chunk], [item for _, item in chunk]
+            if parent:
+                for c in chunk:
+                    c.parent = parent
+            if logger.isEnabledFor(DEBUG):
+                logger.debug(f"Submitting chunk: {len(chunk)}")
+            if record_in_worker:
+                future = executor.submit(_timed_batch_worker, batch_worker_thread_func, list(zip(indices, chunk)))
+            else:
+                future = executor.submit(_timed_batch_worker, batch_worker_thread_func, chunk)
+                if indexed:
+                    future.add_done_callback(partial(_record_batch, journal, indices))
+            pending.append(future)
+            # Backpressure: wait for the oldest batch before pulling more items once enough batches are pending
+            while len(pending) >= max_pending:
+                yield from collect()
+        while pending:
+            yield from collect()
+    except BaseException:
+        if indexed:
+            # Let the pending batches finish so they are recorded before the error is raised
+            wait(pending)
+        raise
+    finally:
+        for future in pending:
+            future.cancel()
+        if prog is not None:
+            prog.close()
+
+
+def _record_batch(journal: 'CreationJournal', indices: List[int], future: Future):
+    """
+    Record a batch of simulations in the creation journal once it is created.
+
+    Args:
+        journal: Creation journal
+        indices: Sweep index of each simulation of the batch
+        future: Future of the batch
+
+    Returns:
+        None
+    """
+    if not future.cancelled() and future.exception() is None:
+        _, result = future.result()
+        journal.record((index, item.id) for index, item in zip(indices, result))
 
 
 def show_progress_of_batch(progress_bar: 'tqdm', futures: List[Future]) -> List:  # noqa: F821
@@ -6,20 +6,74 @@ This is meant to be combined with builders.
 Copyright 2021, Bill & Melinda Gates Foundation. All rights reserved.
 """
 import copy
+import pickle
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
 from dataclasses import dataclass, field, fields, InitVar
 from functools import partial
 from itertools import chain
-from typing import Set, Generator, Dict, Any, List, TYPE_CHECKING, Union
-from more_itertools import grouper
+from logging import getLogger
+from os import cpu_count
+from typing import Set, Generator, Dict, Any, List, TYPE_CHECKING, Union, Optional, Callable, Iterable, Tuple, \
+    Container
+from more_itertools import chunked, grouper
+from idmtools.assets import AssetCollection
 from idmtools.entities.itask import ITask
 from idmtools.entities.simulation import Simulation
 from idmtools.utils.collections import ResetGenerator
 from idmtools.utils.hashing import ignore_fields_in_dataclass_on_pickle
 from idmtools.builders import SimulationBuilder, ArmSimulationBuilder
+from idmtools.builders.sweep_space import SweepSpace, ChainSweepSpace
 
 if TYPE_CHECKING:  # pragma: no cover
     from idmtools.entities.experiment import Experiment
 
+logger = getLogger(__name__)
+user_logger = getLogger('user')
+
+# Base simulation and parent of the simulations of the worker processes of the parallel simulation generator
+_worker_base_simulation: Optional[Simulation] = None
+_worker_parent: Optional['Experiment'] = None
+
+
+def copy_base_simulation(base_simulation: Simulation) -> Simulation:
+    """
+    Copy a base simulation to build a new simulation from it.
+
+    Args:
+        base_simulation: Base simulation
+
+    Returns:
+        New simulation
+    """
+    sim = base_simulation.task.copy_simulation(base_simulation)
+    # Set UID=none to ensure it is regenerated
+    sim._uid = None
+    sim.assets = copy.deepcopy(base_simulation.assets)
+    return sim
+
+
+def apply_sweep_functions(simulation: Simulation, simulation_functions: Iterable[Callable]) -> Simulation:
+    """
+    Apply the sweep functions of a sweep point to a simulation and tag it with the tags they return.
+
+    Args:
+        simulation: Simulation
+        simulation_functions: Sweep functions of the sweep point
+
+    Returns:
+        The simulation
+    """
+    tags = {}
+
+    for func in simulation_functions:
+        new_tags = func(simulation=simulation)
+        if new_tags:
+            tags.update(new_tags)
+
+    simulation.tags.update(tags)
+    return simulation
+
 
 def simulation_generator(builders, new_sim_func, additional_sims=None, batch_size=10):
     """
@@ -39,18 +93,171 @@ def simulation_generator(builders, new_sim_func, additional_sims=None, batch_siz
     # Then the builders
     for groups in grouper(chain(*builders), batch_size):
         for simulation_functions in filter(None, groups):
-            simulation = new_sim_func()
-            tags = {}
+            yield apply_sweep_functions(new_sim_func(), simulation_functions)
 
-            for func in simulation_functions:
-                new_tags = func(simulation=simulation)
-                if new_tags:
-                    tags.update(new_tags)
+    yield from additional_sims
 
-            simulation.tags.update(tags)
+
+def _init_generation_worker(base_simulation: Simulation, base_assets: AssetCollection,
+                            parent: Optional['Experiment'] = None):
+    """
+    Initialize a worker process of the parallel simulation generator.
+
+    Args:
+        base_simulation: Base simulation
+        base_assets: Assets of the base simulation. Simulations do not pickle their assets
+        parent: Parent experiment of the simulations
+
+    Returns:
+        None
+    """
+    global _worker_base_simulation, _worker_parent
+    base_simulation.assets = base_assets
+    _worker_base_simulation = base_simulation
+    _worker_parent = parent
+
+
+def _build_simulations(sweep_points: List[Tuple[Callable]]) -> List[Tuple[Simulation, AssetCollection]]:
+    """
+    Build the simulations of a batch of sweep points in a worker process.
+
+    Args:
+        sweep_points: Sweep functions of each sweep point
+
+    Returns:
+        Simulations built with their assets
+    """
+    results = []
+    for simulation_functions in sweep_points:
+        simulation = copy_base_simulation(_worker_base_simulation)
+        # Like TemplatedSimulations.new_simulation, sweep functions see the parent of the simulation
+        simulation.parent = _worker_parent
+        simulation = apply_sweep_functions(simulation, simulation_functions)
+        # The parent is set again by the generator, do not send it back with every simulation
+        simulation._parent = None
+        results.append((simulation, simulation.assets))
+    return results
+
+
+def _build_serially(sweep_points: Iterable[Tuple[Callable]], base_simulation: Simulation,
+                    parent: Optional['Experiment']) -> Generator[Simulation, None, None]:
+    """
+    Build the simulations of sweep points in the calling process.
+
+    Args:
+        sweep_points: Sweep functions of each sweep point
+        base_simulation: Base simulation to copy
+        parent: Parent experiment of the simulations
+
+    Returns:
+        Generator for simulations
+    """
+    for simulation_functions in sweep_points:
+        simulation = copy_base_simulation(base_simulation)
+        simulation.parent = parent
+        yield apply_sweep_functions(simulation, simulation_functions)
+
+
+def _cannot_pickle(obj: Any) -> Optional[Exception]:
+    """
+    Check an object can be sent to a worker process.
+
+    Args:
+        obj: Object to send
+
+    Returns:
+        The error pickling the object, None if it can be pickled
+    """
+    try:
+        pickle.dumps(obj)
+    except Exception as e:
+        return e
+    return None
+
+
+def parallel_simulation_generator(builders, base_simulation: Simulation, parent: 'Experiment' = None,
+                                  additional_sims: List[Simulation] = None, batch_size: int = 10,
+                                  max_workers: Optional[int] = None) -> Generator[Simulation, None, None]:
+    """
+    Generates simulations from the templated simulations, applying sweep functions in a process pool.
+
+    Batches of sweep points are sent to the workers and the simulations are yielded in order as soon as their batch is
+    built, so the simulations can be created on a platform while the next ones are generated. The base simulation, the
+    parent and the sweep functions must be picklable; otherwise the simulations are generated sequentially.
+
+    Args:
+        builders: List of builders to build
+        base_simulation: Base simulation to copy
+        parent: Parent experiment of the simulations
+        additional_sims: Additional simulations
+        batch_size: Number of sweep points sent to a worker at once
+        max_workers: Number of worker processes. Defaults to the number of CPUs
+
+    Returns:
+        Generator for simulations
+    """
+    batches = chunked(chain(*builders), batch_size)
+    first = next(batches, None)
+    if first is not None:
+        # The pool is only started once the worker state is known to be picklable
+        error = _cannot_pickle((base_simulation, base_simulation.assets, parent)) or _cannot_pickle(first)
+        if error is not None:
+            user_logger.warning(f"Simulations cannot be generated in worker processes ({error}). Generating "
+                                f"simulations sequentially.")
+            yield from _build_serially(chain(first, chain.from_iterable(batches)), base_simulation, parent)
+        else:
+            yield from _generate_in_pool(chain([first], batches), base_simulation, parent, max_workers)
+
+    yield from additional_sims or []
+
+
+def _generate_in_pool(batches: Iterable[List], base_simulation: Simulation, parent: Optional['Experiment'],
+                      max_workers: Optional[int]) -> Generator[Simulation, None, None]:
+    """
+    Build batches of sweep points in a process pool and yield the simulations in order.
+
+    Batches with sweep functions that cannot be pickled are built in the calling process.
+
+    Args:
+        batches: Batches of sweep points
+        base_simulation: Base simulation to copy
+        parent: Parent experiment of the simulations
+        max_workers: Number of worker processes
+
+    Returns:
+        Generator for simulations
+    """
+    max_workers = max_workers or cpu_count() or 1
+    pool = ProcessPoolExecutor(max_workers=max_workers, initializer=_init_generation_worker,
+                               initargs=(base_simulation, base_simulation.assets, parent))
+    # Keep every worker busy without building the whole sweep ahead of the consumer
+    max_in_flight = 2 * max_workers
+    pending = deque()
+
+    def finish(future: Future):
+        for simulation, assets in future.result():
+            simulation.assets = assets
+            simulation.parent = parent
             yield simulation
 
-    yield from additional_sims
+    try:
+        for batch in batches:
+            error = _cannot_pickle(batch)
+            if error is not None:
+                logger.debug(f"Generating a batch of simulations sequentially: {error}")
+                while pending:
+                    yield from finish(pending.popleft())
+                yield from _build_serially(batch, base_simulation, parent)
+                continue
+            pending.append(pool.submit(_build_simulations, batch))
+            if len(pending) >= max_in_flight:
+                yield from finish(pending.popleft())
+        while pending:
+            yield from finish(pending.popleft())
+    finally:
+        for future in pending:
+            future.cancel()
+        pool.shutdown(wait=True)
 
 
 @dataclass(repr=False)
@@ -77,6 +284,8 @@ class TemplatedSimulations:
     parent: 'Experiment' = field(default=None)
     tags: InitVar[Dict] = None
     __extra_simulations: List[Simulation] = field(default_factory=list)
+    #: Number of processes applying sweep functions. By default, simulations are generated in the calling thread
+    generation_workers: Optional[int] = field(default=None, compare=False)
 
     def __post_init__(self, tags):
         """
@@ -180,9 +389,51 @@ class TemplatedSimulations:
         Returns:
             Simulation iterator
         """
-        p = partial(simulation_generator, self.builders, self.new_simulation, self.__extra_simulations)
+        if self.generation_workers:
+            p = partial(parallel_simulation_generator, self.builders, self.base_simulation, self.parent,
+                        self.__extra_simulations, max_workers=self.generation_workers)
+        else:
+            p = partial(simulation_generator, self.builders, self.new_simulation, self.__extra_simulations)
         return ResetGenerator(p)
 
+    @property
+    def sweep_space(self) -> SweepSpace:
+        """
+        Sweep points of all the builders, see :class:`~idmtools.builders.sweep_space.SweepSpace`.
+
+        Simulations built from the template are numbered by the index of their sweep point in this space. Extra
+        simulations come after the sweep points.
+
+        Returns:
+            Sweep space
+        """
+        return ChainSweepSpace([builder.sweep_space for builder in self.builders])
+
+    def indexed_simulations(self, skip: Container[int] = ()) -> Generator[Tuple[int, Simulation], None, None]:
+        """
+        Build the simulations with their index, skipping some of them.
+
+        Skipped simulations are not built at all, so this is cheap to use to resume the creation of a large experiment.
+
+        Args:
+            skip: Indices of the simulations not to build
+
+        Returns:
+            Generator of index and simulation pairs
+        """
+        space = self.sweep_space
+        indices = [i for i in range(len(space)) if i not in skip]
+        points = (space[i] for i in indices)
+        if self.generation_workers:
+            simulations = parallel_simulation_generator([points], self.base_simulation, self.parent,
+                                                        max_workers=self.generation_workers)
+        else:
+            simulations = simulation_generator([points], self.new_simulation)
+        yield from zip(indices, simulations)
+        for index, simulation in enumerate(self.__extra_simulations, start=len(space)):
+            if index not in skip:
+                yield index, simulation
+
     def extra_simulations(self) -> List[Simulation]:
         """
         Returns the extra simulations defined on template.
@@ -223,16 +474,13 @@ class TemplatedSimulations:
         """
         Return a new simulation object.
 
-        The simulation will be copied from the base simulation of the experiment.
+        The simulation will be copied from the base simulation of the experiment by the task of the base simulation,
+        see :meth:`~idmtools.entities.itask.ITask.copy_simulation`.
 
         Returns:
             The created simulation.
         """
-        # TODO: the experiment should be frozen when the first simulation is created
-        sim = copy.deepcopy(self.base_simulation)
-        # Set UID=none to ensure it is regenerated
-        sim._uid = None
-        sim.assets = copy.deepcopy(self.base_simulation.assets)
+        sim = copy_base_simulation(self.base_simulation)
         sim.parent = self.parent
         return sim
 
@@ -0,0 +1,197 @@
+"""
+CopyOnWriteDict provides a dict view sharing a read-only base dict.
+
+Copyright 2025, Gates Foundation. All rights reserved.
+"""
+import copy
+from collections.abc import Mapping, MutableMapping
+from typing import Any, Dict, Iterator, Optional, Set
+
+_MUTABLE_TYPES = (dict, list, set, bytearray)
+
+
+class CopyOnWriteDict(MutableMapping):
+    """
+    Mapping over a shared base dict that is never modified.
+
+    Changes are kept in an overlay. Reading a mutable value (dict, list, ...) of the base copies it into the overlay
+    first, so only the keys that are touched are ever copied. Copies of a CopyOnWriteDict share the base dict, which
+    makes cloning large configurations cheap.
+    """
+
+    def __init__(self, base: Optional[Mapping] = None):
+        """
+        Constructor.
+
+        Args:
+            base: Base dict. It is shared and must not be modified afterwards
+        """
+        self._base = {} if base is None else base
+        self._overlay: Dict[Any, Any] = {}
+        self._deleted: Set[Any] = set()
+        # Base shared with copies, built from the base and the overlay. Reset when the overlay may have changed.
+        self._folded: Optional[Mapping] = self._base
+
+    def __getitem__(self, key):
+        """
+        Get a value. Mutable values of the base are copied to the overlay before being returned.
+
+        Args:
+            key: Key
+
+        Returns:
+            Value
+        """
+        if key in self._overlay:
+            value = self._overlay[key]
+        elif key in self._deleted:
+            raise KeyError(key)
+        else:
+            value = self._base[key]
+            if not isinstance(value, _MUTABLE_TYPES):
+                return value
+            value = self._overlay[key] = copy.deepcopy(value)
+        if isinstance(value, _MUTABLE_TYPES):
+            # The caller may change the value in place
+            self._folded = None
+        return value
+
+    def __setitem__(self, key, value):
+        """
+        Set a value in the overlay.
+
+        Args:
+            key: Key
+            value: Value
+
+        Returns:
+            None
+        """
+        self._overlay[key] = value
+        self._deleted.discard(key)
+        self._folded = None
+
+    def __delitem__(self, key):
+        """
+        Delete a key.
+
+        Args:
+            key: Key
+
+        Returns:
+            None
+        """
+        if key not in self:
+            raise KeyError(key)
+        self._overlay.pop(key, None)
+        if key in self._base:
+            self._deleted.add(key)
+        self._folded = None
+
+    def __contains__(self, key) -> bool:
+        """
+        Check a key exists without copying its value.
+
+        Args:
+            key: Key
+
+        Returns:
+            True if the key exists
+        """
+        return key in self._overlay or (key in self._base and key not in self._deleted)
+
+    def __iter__(self) -> Iterator:
+        """
+        Iterate over the keys, keys of the base first.
+
+        Returns:
+            Keys iterator
+        """
+        for key in self._base:
+            if key not in self._deleted:
+                yield key
+        for key in self._overlay:
+            if key not in self._base:
+                yield key
+
+    def __len__(self) -> int:
+        """
+        Number of keys.
+
+        Returns:
+            Number of keys
+        """
+        return len(self._base) - len(self._deleted) + sum(1 for key in self._overlay if key not in self._base)
+
+    def __eq__(self, other) -> bool:
+        """
+        Compare with another mapping without copying values.
+
+        Args:
+            other: Other mapping
+
+        Returns:
+            True if both mappings have the same items
+        """
+        if isinstance(other, CopyOnWriteDict):
+            other = other.to_dict()
+        if not isinstance(other, Mapping):
+            return NotImplemented
+        return self.to_dict() == other
+
+    def __repr__(self) -> str:
+        """
+        Representation of the items.
+
+        Returns:
+            Items as a dict representation
+        """
+        return repr(self.to_dict())
+
+    def to_dict(self) -> Dict:
+        """
+        Build a dict of the items, for instance to serialize them. Values are not copied and must not be modified.
+
+        Returns:
+            Dict of the items
+        """
+        result = {key: value for key, value in self._base.items() if key not in self._deleted}
+        result.update(self._overlay)
+        return result
+
+    def copy(self) -> 'CopyOnWriteDict':
+        """
+        Copy the dict. The copy shares the base with this dict and later changes of either are not seen by the other.
+
+        Returns:
+            Copy of the dict
+        """
+        if self._folded is None:
+            # Values touched so far may still be changed in place, so the copy gets its own
+            folded = {key: value for key, value in self._base.items() if key not in self._deleted}
+            folded.update(copy.deepcopy(self._overlay))
+            self._folded = folded
+        return CopyOnWriteDict(self._folded)
+
+    def __copy__(self) -> 'CopyOnWriteDict':
+        """
+        Copy the dict. See :meth:`copy`.
+
+        Returns:
+            Copy of the dict
+        """
+        return self.copy()
+
+    def __deepcopy__(self, memo) -> 'CopyOnWriteDict':
+        """
+        Deep copy the dict. The base is shared since it is never modified. See :meth:`copy`.
+
+        Args:
+            memo: Deepcopy memo
+
+        Returns:
+            Copy of the dict
+        """
+        result = self.copy()
+        memo[id(self)] = result
+        return result
@@ -225,22 +225,3 @@ class ResetGenerator(typing.Iterator):
             self.generator, self.__next_gen = tee(self.__next_gen)
             raise StopIteration
         return result
-
-
-def duplicate_list_of_generators(lst: List[Generator]):
-    """
-    Copy a list of iterators using tee.
-
-    Args:
-        lst: List of generators
-
-    Returns:
-        Tuple with duplicate of iterators
-    """
-    new_sw = []
-    old_sw = []
-    for sw in lst:
-        o, n = tee(sw)
-        new_sw.append(n)
-        old_sw.append(o)
-    return old_sw, new_sw
@@ -3,54 +3,341 @@ File parser utility. Used to automatically load data.
 
 Copyright 2021, Bill & Melinda Gates Foundation. All rights reserved.
 """
+import fnmatch
 import json
 import os
+import re
+import warnings
 from logging import getLogger
-from typing import Dict
+from typing import Any, Callable, Dict, Optional, Union
 
+import numpy as np
 import pandas as pd
 
-from io import StringIO, BytesIO
+from io import BufferedIOBase, StringIO, BytesIO, SEEK_CUR, SEEK_END, SEEK_SET
 
 logger = getLogger(__name__)
 
+# Parser signature: parser(filename, content) where content is a binary file object over the file content, a BytesIO
+# or a BufferReader for memory maps
+TParser = Callable[[str, BytesIO], Any]
+
+# Numeric "Data" arrays of DTK channel reports, decoded straight into NumPy arrays
+_CHANNEL_DATA = re.compile(rb'"Data"\s*:\s*\[([-+.,0-9eEINafinty\s]*)\]')
+# Key of the placeholder of a decoded channel array in the rest of the report
+_CHANNEL_DATA_KEY = '__channel_data__'
+
+try:
+    import orjson as _fast_json
+except ImportError:  # pragma: no cover
+    try:
+        import ujson as _fast_json
+    except ImportError:
+        _fast_json = None
+
+
+class BufferReader(BufferedIOBase):
+    """
+    Read-only binary file object over a buffer, like a memory map, that does not copy it.
+
+    It reads like a BytesIO: *read* and *getvalue* return copies of what they read while *getbuffer* gives a view of
+    the buffer itself.
+    """
+
+    def __init__(self, buffer):
+        """
+        Constructor.
+
+        Args:
+            buffer: Object supporting the buffer protocol, like a memory map or bytes
+        """
+        super().__init__()
+        self._buffer = buffer
+        self._base = memoryview(buffer)
+        self._view = self._base if self._base.format == 'B' and self._base.ndim == 1 else self._base.cast('B')
+        self._position = 0
+
+    def readable(self) -> bool:
+        """
+        The buffer can be read.
+
+        Returns:
+            True
+        """
+        return True
+
+    def seekable(self) -> bool:
+        """
+        The buffer supports random access.
+
+        Returns:
+            True
+        """
+        return True
+
+    def read(self, size: Optional[int] = -1) -> bytes:
+        """
+        Read bytes from the current position.
+
+        Args:
+            size: Number of bytes to read. Defaults to the rest of the buffer
+
+        Returns:
+            Bytes read
+        """
+        self._check_closed()
+        end = len(self._view) if size is None or size < 0 else min(self._position + size, len(self._view))
+        data = self._view[self._position:end].tobytes()
+        self._position = max(self._position, end)
+        return data
+
+    read1 = read
+
+    def readinto(self, b) -> int:
+        """
+        Read bytes into a writable buffer.
+
+        Args:
+            b: Buffer to fill
+
+        Returns:
+            Number of bytes read
+        """
+        self._check_closed()
+        target = memoryview(b).cast('B')
+        count = max(0, min(len(target), len(self._view) - self._position))
+        target[:count] = self._view[self._position:self._position + count]
+        self._position += count
+        return count
+
+    def readline(self, size: Optional[int] = -1) -> bytes:
+        """
+        Read up to the end of the line.
+
+        Args:
+            size: Maximum number of bytes to read
+
+        Returns:
+            Line read, with its line feed
+        """
+        self._check_closed()
+        end = len(self._view) if size is None or size < 0 else min(self._position + size, len(self._view))
+        if hasattr(self._buffer, 'find'):
+            # Memory maps and bytes search without copying
+            newline = self._buffer.find(b'\n', self._position, end)
+        else:
+            newline = self._view[self._position:end].tobytes().find(b'\n')
+            newline = newline if newline < 0 else newline + self._position
+        return self.read((end if newline < 0 else newline + 1) - self._position)
+
+    def seek(self, offset: int, whence: int = SEEK_SET) -> int:
+        """
+        Move to a position.
+
+        Args:
+            offset: Offset to move by
+            whence: Position the offset is from
+
+        Returns:
+            New position
+        """
+        self._check_closed()
+        start = {SEEK_SET: 0, SEEK_CUR: self._position, SEEK_END: len(self._view)}[whence]
+        if start + offset < 0:
+            raise ValueError(f"negative seek position {start + offset}")
+        self._position = start + offset
+        return self._position
+
+    def tell(self) -> int:
+        """
+        Current position.
+
+        Returns:
+            Position
+        """
+        self._check_closed()
+        return self._position
+
+    def getbuffer(self) -> memoryview:
+        """
+        View of the whole buffer, without copy.
+
+        Returns:
+            Read-only view of the buffer
+        """
+        self._check_closed()
+        return self._view
+
+    def getvalue(self) -> bytes:
+        """
+        Copy of the whole buffer.
+
+        Returns:
+            Content of the buffer
+        """
+        self._check_closed()
+        return self._view.tobytes()
+
+    def close(self) -> None:
+        """
+        Release the buffer.
+
+        Returns:
+            None
+        """
+        if not self.closed:
+            self._view.release()
+            self._base.release()
+            self._buffer = None
+        super().close()
+
+    def _check_closed(self) -> None:
+        """
+        Fail on closed readers.
+
+        Returns:
+            None
+
+        Raises:
+            ValueError - If the reader is closed
+        """
+        if self.closed:
+            raise ValueError("I/O operation on closed file.")
+
+
+def content_buffer(content: Union[BytesIO, BufferReader]) -> Union[bytes, memoryview]:
+    """
+    Get the whole content of a parser input without copying it.
+
+    Args:
+        content: Content given to a parser
+
+    Returns:
+        The bytes of a BytesIO created from bytes or a view of the buffer of a BufferReader
+    """
+    if isinstance(content, BufferReader):
+        return content.getbuffer()
+    # BytesIO shares the bytes it is created from until it is written
+    return content.getvalue()
+
 
 class FileParser:
     """
     FileParser to load contents in analysis.
+
+    Parsers are looked up in a registry. Keys are either a file extension (``json``) or a filename pattern
+    (``*SpatialReport*.bin``). Patterns are tried first, most recently registered first, then extensions.
+    Files without a parser are returned raw.
     """
+    _extension_parsers: Dict[str, TParser] = {}
+    _pattern_parsers: Dict[str, TParser] = {}
 
     @classmethod
-    def parse(cls, filename, content=None):
+    def register_parser(cls, key: str, parser: TParser) -> None:
         """
-        Parse filename and load the content.
+        Register a parser for an extension or a filename pattern. Replaces the parser previously registered for the key.
 
         Args:
-            filename: Filename to load
-            content: Content to load
+            key: File extension without dot or filename pattern (fnmatch syntax, matched on full name and base name)
+            parser: Parser called with the filename and a binary file object over the content, see :meth:`parse`
 
         Returns:
-            Content loaded
+            None
+        """
+        if cls._is_pattern(key):
+            cls._pattern_parsers.pop(key, None)
+            cls._pattern_parsers[key] = parser
+        else:
+            cls._extension_parsers[key.lstrip('.').lower()] = parser
+
+    @classmethod
+    def unregister_parser(cls, key: str) -> None:
+        """
+        Remove a parser from the registry.
+
+        Args:
+            key: Key the parser was registered with
+
+        Returns:
+            None
         """
+        cls._pattern_parsers.pop(key, None)
+        cls._extension_parsers.pop(key.lstrip('.').lower(), None)
+
+    @staticmethod
+    def _is_pattern(key: str) -> bool:
+        """
+        Is a registry key a filename pattern rather than an extension.
+
+        Args:
+            key: Registry key
+
+        Returns:
+            True for patterns
+        """
+        return any(c in key for c in '*?[')
+
+    @classmethod
+    def _find_parser(cls, parsers: Dict[str, TParser], filename: str) -> Optional[TParser]:
+        """
+        Find the parser of a file in a parser mapping.
+
+        Args:
+            parsers: Parsers by extension or pattern
+            filename: Filename to parse
+
+        Returns:
+            Parser of the file or None
+        """
+        basename = os.path.basename(filename)
+        for key in reversed(list(parsers)):
+            if cls._is_pattern(key) and (fnmatch.fnmatch(filename, key) or fnmatch.fnmatch(basename, key)):
+                return parsers[key]
         file_extension = os.path.splitext(filename)[1][1:].lower()
-        content = BytesIO(content)
+        for key, parser in parsers.items():
+            if not cls._is_pattern(key) and key.lstrip('.').lower() == file_extension:
+                return parser
+        return None
 
-        if file_extension == 'json':
-            return cls.load_json_file(filename, content)
+    @classmethod
+    def get_parser(cls, filename: str, parsers: Optional[Dict[str, TParser]] = None) -> TParser:
+        """
+        Find the parser of a file.
 
-        if file_extension == 'csv':
-            return cls.load_csv_file(filename, content)
+        Args:
+            filename: Filename to parse
+            parsers: Parsers taking precedence over the registry, with the same keys as :meth:`register_parser`
 
-        if file_extension == 'xlsx':
-            return cls.load_xlsx_file(filename, content)
+        Returns:
+            Parser of the file
+        """
+        parser = None
+        if parsers:
+            parser = cls._find_parser(parsers, filename)
+        if parser is None:
+            parser = cls._find_parser(cls._pattern_parsers, filename)
+        if parser is None:
+            parser = cls._extension_parsers.get(os.path.splitext(filename)[1][1:].lower(), cls.load_raw_file)
+        return parser
 
-        if file_extension == 'txt':
-            return cls.load_txt_file(filename, content)
+    @classmethod
+    def parse(cls, filename, content=None, parser: Optional[TParser] = None):
+        """
+        Parse filename and load the content.
 
-        if file_extension == 'bin' and 'SpatialReport' in filename:
-            return cls.load_bin_file(filename, content)
+        Args:
+            filename: Filename to load
+            content: Content to load, bytes or a buffer like a memory map, which is not copied
+            parser: Parser to use. Defaults to the parser registered for the filename
 
-        return cls.load_raw_file(filename, content)
+        Returns:
+            Content loaded
+        """
+        if parser is None:
+            parser = cls.get_parser(filename)
+        # Bytes are shared by a BytesIO, other buffers like memory maps are read in place
+        content = BytesIO(content) if content is None or isinstance(content, bytes) else BufferReader(content)
+        return parser(filename, content)
 
     @classmethod
     def load_json_file(cls, filename, content) -> Dict:
@@ -64,8 +351,60 @@ class FileParser:
         Returns:
             JSOn as dict
         """
+        if _fast_json is not None:
+            try:
+                return _fast_json.loads(content_buffer(content))
+            except (TypeError, ValueError):
+                # NaN and Infinity are only supported by the standard library, like buffers other than bytes for some
+                # backends
+                content.seek(0)
         return json.load(content)
 
+    @classmethod
+    def load_dtk_channels_file(cls, filename, content) -> Dict:
+        """
+        Load a DTK channel report (like InsetChart.json) with the data of each channel as a NumPy array.
+
+        The numbers of each channel *Data* are decoded straight into an array, without building a list of floats
+        first, and only the rest of the report is decoded as JSON. Arrays use less memory than lists and let
+        analyzers use vectorized operations. Not registered by default; register it for the reports an analysis
+        reads, for example *FileParser.register_parser('*InsetChart.json', FileParser.load_dtk_channels_file)*.
+
+        Args:
+            filename: Filename to load
+            content: Content
+
+        Returns:
+            Report as dict where each channel *Data* is a NumPy array
+        """
+        arrays = []
+
+        def decode_data(match) -> bytes:
+            numbers = match.group(1)
+            arrays.append(np.fromstring(numbers, sep=',') if numbers.strip() else np.empty(0))
+            return b'"Data": {"%s": %d}' % (_CHANNEL_DATA_KEY.encode(), len(arrays) - 1)
+
+        def restore_data(obj: Dict) -> Any:
+            return arrays[obj[_CHANNEL_DATA_KEY]] if len(obj) == 1 and _CHANNEL_DATA_KEY in obj else obj
+
+        try:
+            with warnings.catch_warnings():
+                # NumPy warns instead of failing on text it cannot read to the end
+                warnings.simplefilter('error', DeprecationWarning)
+                report = _CHANNEL_DATA.sub(decode_data, content_buffer(content))
+        except (ValueError, DeprecationWarning):
+            logger.debug(f"Channels of {filename} are not plain numbers, decoding the whole report")
+            report = None
+        if report is not None:
+            return json.loads(report, object_hook=restore_data)
+
+        content.seek(0)
+        report = cls.load_json_file(filename, content)
+        for channel in report.get('Channels', {}).values():
+            if isinstance(channel, dict) and 'Data' in channel:
+                channel['Data'] = np.asarray(channel['Data'], dtype=np.float64)
+        return report
+
     @classmethod
     def load_raw_file(self, filename, content):
         """
@@ -92,12 +431,34 @@ class FileParser:
         Returns:
             Loaded csv file
         """
-        if not isinstance(content, StringIO) and not isinstance(content, BytesIO):
+        if not isinstance(content, (StringIO, BytesIO, BufferReader)):
             content = StringIO(content)
 
         csv_read = pd.read_csv(content, skipinitialspace=True)
         return csv_read
 
+    @classmethod
+    def load_csv_file_pyarrow(cls, filename, content) -> pd.DataFrame:
+        """
+        Load csv file with the multithreaded pyarrow reader. Falls back to :meth:`load_csv_file` without pyarrow.
+
+        Not registered by default since pyarrow does not strip spaces after delimiters; register it with
+        *FileParser.register_parser('csv', FileParser.load_csv_file_pyarrow)*.
+
+        Args:
+            filename: Filename to load
+            content: Content is loading
+
+        Returns:
+            Loaded csv file
+        """
+        try:
+            from pyarrow import csv as pa_csv
+        except ImportError:
+            logger.debug("pyarrow is not installed, reading csv with pandas")
+            return cls.load_csv_file(filename, content)
+        return pa_csv.read_csv(content).to_pandas()
+
     @classmethod
     def load_xlsx_file(cls, filename, content) -> Dict[str, pd.ExcelFile]:
         """
@@ -125,7 +486,7 @@ class FileParser:
         Returns:
             Content
         """
-        return str(content.getvalue().decode())
+        return str(content_buffer(content), 'utf-8')
 
     @classmethod
     def load_bin_file(cls, filename, content):
@@ -149,3 +510,10 @@ class FileParser:
         except ImportError as ex:
             logger.exception(ex)
             logger.error("Could not import item. Most likely dtk.tools is not installed")
+
+
+FileParser.register_parser('json', FileParser.load_json_file)
+FileParser.register_parser('csv', FileParser.load_csv_file)
+FileParser.register_parser('xlsx', FileParser.load_xlsx_file)
+FileParser.register_parser('txt', FileParser.load_txt_file)
+FileParser.register_parser('*SpatialReport*.bin', FileParser.load_bin_file)
@@ -15,6 +15,7 @@ from idmtools.entities import CommandLine
 from idmtools.entities.experiment import Experiment
 from idmtools.entities.itask import ITask
 from idmtools.entities.simulation import Simulation
+from idmtools.frozen.copy_on_write_dict import CopyOnWriteDict
 from idmtools.utils.entities import as_dict
 from datetime import datetime
 
@@ -56,7 +57,9 @@ class IDMJSONEncoder(JSONEncoder):
         elif isinstance(o, Asset):
             return as_dict(o, exclude=['content'])
         elif isinstance(o, AssetCollection):
-            return o.assets
+            return list(o.assets)
+        elif isinstance(o, CopyOnWriteDict):
+            return o.to_dict()
         elif isinstance(o, (dict, int, list, str)):
             return o
         elif isinstance(o, datetime):
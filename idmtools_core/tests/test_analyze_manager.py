@@ -1,11 +1,20 @@
 import copy
+import csv
+import os
+import json
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
 
 import allure
 import unittest
 from typing import Any
+from unittest import mock
 import pytest
 from idmtools.analysis.analyze_manager import AnalyzeManager
 from idmtools.analysis.download_analyzer import DownloadAnalyzer as SampleAnalyzer
+from idmtools.analysis.map_worker_entry import _get_mapped_data_for_item
 from idmtools.core.enums import EntityStatus, ItemType
 from idmtools.core.interfaces.iitem import IItem
 from idmtools.core.platform_factory import Platform
@@ -15,6 +24,85 @@ from idmtools.entities.simulation import Simulation
 from idmtools_test.utils.test_task import TestTask
 
 
+class CountAnalyzer(IAnalyzer):
+    def __init__(self):
+        super().__init__(parse=False)
+        self.batch_sizes = []
+
+    def map(self, data: 'Any', item: 'IItem') -> 'Any':
+        return 1
+
+    def reduce(self, all_data: dict) -> 'Any':
+        self.batch_sizes.append(len(all_data))
+        return sum(all_data.values())
+
+    def combine(self, accumulated: 'Any', partial: 'Any') -> 'Any':
+        return accumulated + partial
+
+
+class ConcatAnalyzer(IAnalyzer):
+    def __init__(self):
+        super().__init__(parse=False)
+
+    def map(self, data: 'Any', item: 'IItem') -> 'Any':
+        return item.uid
+
+    def reduce(self, all_data: dict) -> 'Any':
+        return list(all_data.values())
+
+    def combine(self, accumulated: 'Any', partial: 'Any') -> 'Any':
+        return accumulated + partial
+
+
+class CollectAnalyzer(IAnalyzer):
+    def __init__(self):
+        super().__init__(parse=False)
+
+    def map(self, data: 'Any', item: 'IItem') -> 'Any':
+        return item.uid
+
+    def reduce(self, all_data: dict) -> 'Any':
+        return sorted(all_data.values())
+
+
+class SlowReduceAnalyzer(CollectAnalyzer):
+    def reduce(self, all_data: dict) -> 'Any':
+        time.sleep(0.5)
+        return super().reduce(all_data)
+
+
+class InsetChartAnalyzer(IAnalyzer):
+    def __init__(self, uid, share=False):
+        super().__init__(uid=uid, filenames=['output/InsetChart.json'])
+        self.share_parsed_data = share
+
+    def map(self, data: 'Any', item: 'IItem') -> 'Any':
+        channels = data['output/InsetChart.json']['Channels']
+        if not self.share_parsed_data:
+            channels.clear()
+        return channels
+
+    def reduce(self, all_data: dict) -> 'Any':
+        pass
+
+
+class FileAccessAnalyzer(IAnalyzer):
+    def __init__(self, uid, file_access, parse=False):
+        super().__init__(uid=uid, parse=parse, filenames=['output/result.json'])
+        self.file_access = file_access
+
+    def map(self, data: 'Any', item: 'IItem') -> 'Any':
+        content = data['output/result.json']
+        if isinstance(content, Path):
+            return type(content).__name__, content.read_bytes()
+        if isinstance(content, dict):
+            return type(content).__name__, content
+        return type(content).__name__, bytes(content[:])
+
+    def reduce(self, all_data: dict) -> 'Any':
+        pass
+
+
 @pytest.mark.analysis
 @pytest.mark.smoke
 @pytest.mark.serial
@@ -198,3 +286,203 @@ class TestAnalyzeManager(unittest.TestCase):
             actual = [analyzer.working_dir for analyzer in am.analyzers]
             self.assertEqual(actual, expected[force_wd])
 
+
+    def _create_succeeded_experiment(self, n_sims: int) -> Experiment:
+        test_exp = Experiment()
+        base_sim = Simulation(task=TestTask())
+        for i in range(n_sims):
+            test_exp.simulations.append(copy.deepcopy(base_sim))
+        test_exp.run()
+        self.platform._simulations.set_simulation_status(test_exp.uid, EntityStatus.SUCCEEDED)
+        return test_exp
+
+    def test_streaming_map_reduce(self):
+        test_exp = self._create_succeeded_experiment(10)
+        sim_ids = sorted(str(sim.uid) for sim in self.platform.get_children(test_exp.uid, ItemType.EXPERIMENT, force=True))
+        self.assertFalse(self.TestAnalyzer().can_combine)
+        self.assertTrue(CountAnalyzer().can_combine)
+        for streaming in [False, True]:
+            analyzers = [CountAnalyzer(), CollectAnalyzer()]
+            am = AnalyzeManager(self.platform, ids=[(test_exp.uid, ItemType.EXPERIMENT)], analyzers=analyzers,
+                                executor_type='thread', max_workers=2, streaming=streaming, max_in_flight=3)
+            self.assertTrue(am.analyze())
+            self.assertEqual(analyzers[0].results, 10)
+            self.assertEqual(analyzers[1].results, sim_ids)
+            if streaming:
+                # partial reduces never hold more than max_in_flight items
+                self.assertEqual(sum(analyzers[0].batch_sizes), 10)
+                self.assertLessEqual(max(analyzers[0].batch_sizes), 3)
+                self.assertGreater(len(analyzers[0].batch_sizes), 1)
+
+    def test_max_in_flight_validation(self):
+        with self.assertRaises(ValueError):
+            AnalyzeManager(self.platform, streaming=True, max_in_flight=0)
+
+    def test_chunked_map(self):
+        test_exp = self._create_succeeded_experiment(10)
+        sim_ids = sorted(str(sim.uid) for sim in self.platform.get_children(test_exp.uid, ItemType.EXPERIMENT, force=True))
+        for chunk_size, streaming in [(4, False), ('auto', False), (4, True), ('auto', True)]:
+            analyzers = [CountAnalyzer(), CollectAnalyzer()]
+            am = AnalyzeManager(self.platform, ids=[(test_exp.uid, ItemType.EXPERIMENT)], analyzers=analyzers,
+                                executor_type='thread', max_workers=2, chunk_size=chunk_size, streaming=streaming,
+                                max_in_flight=3)
+            self.assertTrue(am.analyze())
+            self.assertEqual(analyzers[0].results, 10)
+            self.assertEqual(analyzers[1].results, sim_ids)
+
+    def test_map_result_cache(self):
+        test_exp = self._create_succeeded_experiment(10)
+        sim_ids = sorted(str(sim.uid) for sim in self.platform.get_children(test_exp.uid, ItemType.EXPERIMENT, force=True))
+        with tempfile.TemporaryDirectory() as cache_dir:
+            def run(analyzer):
+                am = AnalyzeManager(self.platform, ids=[(test_exp.uid, ItemType.EXPERIMENT)], analyzers=[analyzer],
+                                    executor_type='thread', max_workers=2, map_cache=cache_dir)
+                self.assertTrue(am.analyze())
+                self.assertEqual(analyzer.results, sim_ids)
+                return am
+
+            am = run(CollectAnalyzer())
+            self.assertEqual((am.cache_stats['hits'], am.cache_stats['misses']), (0, 10))
+            am = run(CollectAnalyzer())
+            self.assertEqual((am.cache_stats['hits'], am.cache_stats['misses']), (10, 0))
+            # a change in the analyzer configuration invalidates its results
+            analyzer = CollectAnalyzer()
+            analyzer.option = 1
+            am = run(analyzer)
+            self.assertEqual((am.cache_stats['hits'], am.cache_stats['misses']), (0, 10))
+
+            self.assertEqual(am.evict_map_cache(max_age=3600), 0)
+            self.assertEqual(am.evict_map_cache(max_age=0), 20)
+            am = run(CollectAnalyzer())
+            self.assertEqual((am.cache_stats['hits'], am.cache_stats['misses']), (0, 10))
+            am.map_cache.cleanup_cache()
+
+    def test_parse_once_shared_data(self):
+        content = json.dumps({'Channels': {'Infected': {'Data': [0.1, 0.2]}}}).encode()
+        platform = mock.MagicMock()
+        platform.get_files.return_value = {'output/InsetChart.json': bytearray(content)}
+        item = Simulation()
+        analyzers = [InsetChartAnalyzer('copy_1'), InsetChartAnalyzer('shared_1', True),
+                     InsetChartAnalyzer('shared_2', True), InsetChartAnalyzer('copy_2')]
+        with mock.patch('idmtools.analysis.map_worker_entry.FileParser.parse', side_effect=lambda filename, content, **kwargs: json.loads(bytes(content))) as parse:
+            data = _get_mapped_data_for_item(item, analyzers, platform)
+        self.assertEqual(parse.call_count, 1)
+        platform.get_files.assert_called_once()
+        # shared analyzers see the same object, untouched by the analyzers that modify their copy
+        self.assertIs(data['shared_1'], data['shared_2'])
+        self.assertIn('Infected', data['shared_1'])
+        self.assertIsNot(data['copy_1'], data['shared_1'])
+        self.assertIsNot(data['copy_2'], data['shared_1'])
+
+        # without shared readers, the last reader takes the parsed object
+        analyzers = [InsetChartAnalyzer('copy_1'), InsetChartAnalyzer('copy_2')]
+        with mock.patch('idmtools.analysis.map_worker_entry.FileParser.parse', side_effect=lambda filename, content, **kwargs: json.loads(bytes(content))) as parse:
+            data = _get_mapped_data_for_item(item, analyzers, platform)
+        self.assertEqual(parse.call_count, 1)
+        self.assertIsNot(data['copy_1'], data['copy_2'])
+
+    def test_local_file_access(self):
+        content = b'{"a": 1}'
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            local_file = Path(tmp_dir, 'result.json')
+            local_file.write_bytes(content)
+            platform = mock.MagicMock()
+            platform.get_files.return_value = {'output/result.json': bytearray(content)}
+            platform.get_local_files.return_value = {'output/result.json': local_file}
+            analyzers = [FileAccessAnalyzer('mmap', 'mmap'), FileAccessAnalyzer('path', 'path'),
+                         FileAccessAnalyzer('parsed_mmap', 'mmap', parse=True)]
+            data = _get_mapped_data_for_item(Simulation(), analyzers, platform)
+            # every analyzer reads the local file, nothing is copied through get_files
+            platform.get_files.assert_not_called()
+            self.assertEqual(data['mmap'], ('mmap', content))
+            self.assertEqual(data['path'][1], content)
+            self.assertEqual(data['parsed_mmap'], ('dict', {'a': 1}))
+
+            analyzers.append(FileAccessAnalyzer('bytes', 'bytes'))
+            data = _get_mapped_data_for_item(Simulation(), analyzers, platform)
+            platform.get_files.assert_called_once()
+            self.assertEqual(data['bytes'], ('bytearray', content))
+
+            # platforms without local files fall back to bytes
+            platform.get_local_files.return_value = None
+            data = _get_mapped_data_for_item(Simulation(), analyzers[:1], platform)
+            self.assertEqual(data['mmap'], ('bytearray', content))
+
+            # memory maps are closed once the item is mapped, and copied when map returns them
+            platform.get_local_files.return_value = {'output/result.json': local_file}
+            maps = []
+            kept, raw = FileAccessAnalyzer('kept', 'mmap'), FileAccessAnalyzer('raw', 'mmap')
+            kept.map = lambda data, item: maps.append(data['output/result.json'])
+            raw.map = lambda data, item: data['output/result.json']
+            data = _get_mapped_data_for_item(Simulation(), [kept, raw], platform)
+            self.assertTrue(maps[0].closed)
+            self.assertEqual(data['raw'], content)
+            with self.assertRaises(ValueError):
+                _get_mapped_data_for_item(Simulation(), [FileAccessAnalyzer('memory', 'memory')], platform)
+
+    def test_tree_reduce(self):
+        test_exp = self._create_succeeded_experiment(10)
+        sim_ids = sorted(str(sim.uid) for sim in self.platform.get_children(test_exp.uid, ItemType.EXPERIMENT, force=True))
+        analyzers = [CountAnalyzer(), ConcatAnalyzer(), CollectAnalyzer()]
+        am = AnalyzeManager(self.platform, ids=[(test_exp.uid, ItemType.EXPERIMENT)], analyzers=analyzers,
+                            executor_type='thread', max_workers=2, tree_reduce=True, reduce_shard_size=3)
+        self.assertTrue(am.analyze())
+        self.assertEqual(analyzers[0].results, 10)
+        self.assertEqual(sorted(analyzers[0].batch_sizes), [1, 3, 3, 3])
+        self.assertEqual(sorted(analyzers[1].results), sim_ids)
+        self.assertEqual(analyzers[2].results, sim_ids)
+
+        # partial results are combined in item order
+        data = {f'item_{i}': f'item_{i}' for i in range(10)}
+        self.assertEqual(am._run_and_wait_for_analyzer_reduces(ThreadPoolExecutor(4), [ConcatAnalyzer()], {'ConcatAnalyzer': data}),
+                         {'ConcatAnalyzer': list(data)})
+        with self.assertRaises(ValueError):
+            AnalyzeManager(self.platform, tree_reduce=True, reduce_shard_size=0)
+
+    def test_profile(self):
+        test_exp = self._create_succeeded_experiment(4)
+        sim_ids = {str(sim.uid) for sim in self.platform.get_children(test_exp.uid, ItemType.EXPERIMENT, force=True)}
+        with tempfile.TemporaryDirectory() as profile_dir:
+            for streaming in [False, True]:
+                analyzers = [CountAnalyzer(), CollectAnalyzer()]
+                am = AnalyzeManager(self.platform, ids=[(test_exp.uid, ItemType.EXPERIMENT)], analyzers=analyzers,
+                                    executor_type='thread', max_workers=2, profile=profile_dir, streaming=streaming)
+                self.assertTrue(am.analyze())
+                totals = am.profile.totals()
+                for stage in ['fetch', 'parse', 'map', 'queue', 'ipc', 'reduce']:
+                    self.assertIn(stage, totals)
+                self.assertGreater(totals['ipc'][1], 0)
+                self.assertSetEqual(set(am.profile.totals('item')), sim_ids)
+                self.assertSetEqual(set(am.profile.totals('analyzer')), {'CountAnalyzer', 'CollectAnalyzer'})
+                self.assertEqual(len(am.profile.slowest('item', 2)), 2)
+                self.assertIn('Slowest analyzers', am.profile.summary())
+
+                with open(os.path.join(profile_dir, 'analysis_profile.json')) as f:
+                    content = json.load(f)
+                self.assertEqual(len(content['records']), len(am.profile.records))
+                self.assertEqual(len(content['slowest_items']), 4)
+                with open(os.path.join(profile_dir, 'analysis_profile.csv')) as f:
+                    rows = list(csv.DictReader(f))
+                self.assertEqual(len(rows), len(am.profile.records))
+                self.assertEqual(rows[0].keys(), {'item', 'analyzer', 'stage', 'seconds', 'bytes'})
+
+    def test_profile_reduce_time(self):
+        # with a single worker, the fast analyzer waits for the slow one but is only charged for its own reduce
+        am = AnalyzeManager(self.platform, executor_type='thread', profile=True)
+        data = {'item_1': 'item_1'}
+        results = am._run_and_wait_for_analyzer_reduces(ThreadPoolExecutor(1), [SlowReduceAnalyzer(), CollectAnalyzer()],
+                                                        {'SlowReduceAnalyzer': data, 'CollectAnalyzer': data})
+        self.assertEqual(results, {'SlowReduceAnalyzer': ['item_1'], 'CollectAnalyzer': ['item_1']})
+        totals = am.profile.totals('analyzer', ['reduce'])
+        self.assertGreaterEqual(totals['SlowReduceAnalyzer'][0], 0.5)
+        self.assertLess(totals['CollectAnalyzer'][0], 0.25)
+
+    def test_chunk_size_validation(self):
+        for chunk_size in [0, 'fast', 1.5]:
+            with self.assertRaises(ValueError):
+                AnalyzeManager(self.platform, chunk_size=chunk_size)
+        am = AnalyzeManager(self.platform, chunk_size='auto')
+        self.assertEqual(am._next_chunk_size(None), 1)
+        self.assertEqual(am._next_chunk_size(10), 1)
+        self.assertEqual(am._next_chunk_size(0.01), 50)
+        self.assertEqual(am._next_chunk_size(0), AnalyzeManager.MAX_CHUNK_SIZE)
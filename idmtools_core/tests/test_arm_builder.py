@@ -305,3 +305,35 @@ class TestArmBuilder(ITestWithPersistence):
         for simulation, value in zip(simulations, expected_values):
             expected_dict = {"a": value[0], "b": value[1]}
             self.assertEqual(simulation.task.parameters, expected_dict)
+
+    def test_sweep_space_random_access(self):
+        arm = SweepArm(type=ArmType.cross)
+        arm.add_sweep_definition(setA, range(4))
+        arm.add_sweep_definition(setB, [1, 2, 3])
+        self.builder.add_arm(arm)
+        arm = SweepArm(type=ArmType.pair)
+        arm.add_sweep_definition(setC, [1, 2])
+        arm.add_sweep_definition(setD, ["x", "y"])
+        self.builder.add_arm(arm)
+        self.builder.add_arm(SweepArm())
+        arm = SweepArm()
+        arm.add_sweep_definition(setE, 7)
+        self.builder.add_arm(arm)
+
+        space = self.builder.sweep_space
+        keywords = [tuple(f.keywords for f in point) for point in self.builder]
+        self.assertEqual(len(space), self.builder.count)
+        self.assertEqual(len(keywords), 4 * 3 + 2 + 1)
+        self.assertEqual([tuple(f.keywords for f in space[i]) for i in range(len(space))], keywords)
+        self.assertEqual(tuple(f.keywords for f in space[12]), ({'param': 'c', 'value': 1}, {'param': 'd', 'value': 'x'}))
+        self.assertEqual([tuple(f.keywords for f in p) for i in range(4) for p in space.shard(i, 4)], keywords)
+        self.assertEqual([tuple(f.keywords for f in p) for p in self.builder[11:]], keywords[11:])
+
+    def test_set_functions_deprecated(self):
+        arm = SweepArm(type=ArmType.cross)
+        with self.assertWarns(DeprecationWarning):
+            arm.functions = [(partial(setA, value=a), partial(setB, value=b)) for a, b in [(1, 2), (3, 4), (5, 6)]]
+        self.assertEqual(arm.count, 3)
+        self.builder.add_arm(arm)
+        simulations = list(self.get_templated_sim_builder())
+        self.assertEqual([s.task.parameters for s in simulations], [{"a": 1, "b": 2}, {"a": 3, "b": 4}, {"a": 5, "b": 6}])
@@ -9,9 +9,12 @@ from functools import partial
 import pytest
 from tqdm import tqdm
 from idmtools.assets import Asset, AssetCollection
+from idmtools.assets.asset_collection import IndexedAssets
+from idmtools.assets.checksum_cache import ChecksumCache
 from idmtools.assets.errors import DuplicatedAssetError
 from idmtools.core import FilterMode
 from idmtools.utils.file import content_generator, file_content_to_generator
+from idmtools.utils.hashing import calculate_md5
 from idmtools.utils.filters.asset_filters import asset_in_directory, file_name_is
 from idmtools_test import COMMON_INPUT_PATH
 from idmtools_test.utils.decorators import run_in_temp_dir
@@ -331,6 +334,116 @@ class TestAssets(unittest.TestCase):
             assets2.add_asset(Asset(content=f"{i}", filename=f"{i}"))
         assets1.add_assets(assets2)
 
+    def test_indexed_lookups(self):
+        ac = AssetCollection([Asset(content=f"{i}", filename=f"{i}.txt", relative_path=f"d{i % 3}") for i in range(30)])
+        self.assertTrue(ac.has_asset(filename="7.txt", relative_path="d1"))
+        self.assertFalse(ac.has_asset(filename="7.txt", relative_path="d2"))
+        self.assertEqual(ac.find_index_of_asset(Asset(filename="7.txt", relative_path="d1", content="")), 7)
+        self.assertEqual(ac.get_one(filename="7.txt", relative_path="d1").content, "7")
+        self.assertIsNone(ac.get_one(filename="7.txt", relative_path="d1", content="8"))
+        self.assertEqual(ac.get_one(filename="8.txt").content, "8")
+
+        self.assertEqual(ac.pop(filename="7.txt", relative_path="d1").content, "7")
+        ac.remove(filename="8.txt", relative_path="d2")
+        ac.remove(index=0)
+        self.assertEqual(len(ac), 27)
+        self.assertFalse(ac.has_asset(filename="7.txt", relative_path="d1"))
+        self.assertFalse(ac.has_asset(filename="0.txt", relative_path="d0"))
+        with self.assertRaises(DuplicatedAssetError):
+            ac.add_asset(Asset(filename="9.txt", relative_path="d0", content="new"))
+        ac.add_asset(Asset(filename="9.txt", relative_path="d0", content="new"), fail_on_duplicate=False)
+        self.assertEqual(ac.assets[-1].content, "new")
+        self.assertEqual(len(ac), 27)
+
+    def test_indexed_assets_follow_list_changes(self):
+        ac = AssetCollection([Asset(filename="a.txt", content="a"), Asset(filename="b.txt", content="b")])
+        # Renamed assets are re-keyed when iterated over or on request
+        for asset in ac:
+            asset.filename = "c.txt" if asset.filename == "a.txt" else asset.filename
+        self.assertTrue(ac.has_asset(filename="c.txt"))
+        self.assertFalse(ac.has_asset(filename="a.txt"))
+        ac.assets[0].filename = "a.txt"
+        ac.assets.reindex()
+        self.assertTrue(ac.has_asset(filename="a.txt"))
+
+        ac.assets[1] = Asset(filename="d.txt", content="d")
+        ac.assets.append(Asset(filename="e.txt", content="e"))
+        self.assertFalse(ac.has_asset(filename="b.txt"))
+        self.assertTrue(ac.has_asset(filename="d.txt"))
+        self.assertTrue(ac.has_asset(filename="e.txt"))
+        self.assertEqual([a.filename for a in ac.assets], ["a.txt", "d.txt", "e.txt"])
+
+        # Assigned lists and copies are indexed too
+        ac.assets = [Asset(filename="f.txt", content="f")]
+        self.assertTrue(ac.has_asset(filename="f.txt"))
+        ac2 = AssetCollection(ac)
+        self.assertIsNot(ac2.assets[0], ac.assets[0])
+        self.assertEqual(ac2.assets, ac.assets)
+        self.assertTrue(ac2.has_asset(filename="f.txt"))
+        ac2.assets.clear()
+        self.assertFalse(ac2.has_asset(filename="f.txt"))
+
+    def test_indexed_positions(self):
+        assets = [Asset(content=f"{i}", filename=f"{i}.txt") for i in range(10)]
+        ac = AssetCollection(assets)
+        ac.remove(filename="2.txt")
+        ac.assets.insert(0, Asset(filename="first.txt", content="f"))
+        for position, asset in enumerate(ac.assets):
+            self.assertEqual(ac.find_index_of_asset(asset), position)
+            self.assertIs(ac.assets[position], asset)
+        # Lookups, removes and pops by path do not walk the assets
+        with patch.object(IndexedAssets, '__iter__', side_effect=AssertionError("no scan expected")), \
+                patch.object(IndexedAssets, '_key_at', side_effect=AssertionError("no scan expected")):
+            self.assertTrue(ac.has_asset(filename="8.txt"))
+            self.assertEqual(ac.get_one(filename="5.txt", relative_path="").content, "5")
+            self.assertEqual(ac.pop(filename="9.txt", relative_path="").content, "9")
+            ac.remove(filename="8.txt", relative_path="")
+            ac.add_or_replace_asset(Asset(filename="3.txt", content="new"))
+            self.assertEqual(ac.pop().filename, "7.txt")
+        self.assertEqual(ac.find_index_of_asset(Asset(filename="3.txt", content="")), 3)
+
+        # A renamed asset is found again once it is looked up under its old path
+        assets[0].filename = "renamed.txt"
+        self.assertIsNone(ac.get_one(filename="0.txt", relative_path=""))
+        self.assertEqual(ac.find_index_of_asset(Asset(filename="renamed.txt", content="")), 1)
+
+    def test_find_index_deep_compare(self):
+        ac = AssetCollection([Asset(filename="a.txt", content="a"), Asset(filename="b.txt", content="b")])
+        self.assertEqual(ac.find_index_of_asset(Asset(filename="b.txt", content="b"), deep_compare=True), 1)
+        self.assertIsNone(ac.find_index_of_asset(Asset(filename="b.txt", content="other"), deep_compare=True))
+
+    @run_in_temp_dir
+    def test_calculate_checksums(self):
+        os.makedirs("files")
+        for i in range(10):
+            with open(os.path.join("files", f"{i}.txt"), "w") as fout:
+                fout.write(str(i) * 1000)
+        expected = [Asset(absolute_path=os.path.abspath(os.path.join("files", f"{i}.txt"))).calculate_checksum()
+                    for i in range(10)]
+
+        ac = AssetCollection.from_directory("files")
+        ac.add_asset(Asset(filename="content.txt", content="content"))
+        checksums = ac.calculate_checksums(max_workers=4, cache="cache")
+        self.assertEqual(len(checksums), 11)
+        self.assertEqual(sorted(checksums[:10]), sorted(expected))
+        self.assertEqual(checksums[10], Asset(filename="content.txt", content="content").calculate_checksum())
+
+        # Unchanged files are not hashed again by a new collection
+        with open(os.path.join("files", "0.txt"), "w") as fout:
+            fout.write("changed")
+        with patch("idmtools.assets.checksum_cache.calculate_md5", wraps=calculate_md5) as md5:
+            ac = AssetCollection.from_directory("files")
+            checksums = ac.calculate_checksums(cache="cache")
+            self.assertEqual(md5.call_count, 1)
+        self.assertEqual(ac.get_one(filename="0.txt").checksum, calculate_md5(os.path.join("files", "0.txt")))
+
+        # The persistent cache is opt-in
+        with patch.object(ChecksumCache, "default_cache_directory", os.path.abspath("default_cache")):
+            AssetCollection.from_directory("files").calculate_checksums()
+            self.assertFalse(os.path.exists("default_cache"))
+            AssetCollection.from_directory("files").calculate_checksums(cache=True)
+            self.assertTrue(os.path.exists("default_cache"))
+
     @run_in_temp_dir
     def test_ignore_git(self):
         # make test data
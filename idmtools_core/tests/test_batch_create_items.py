@@ -0,0 +1,78 @@
+import allure
+import threading
+import time
+import unittest
+import pytest
+from idmtools.entities.iplatform_ops.utils import AdaptiveBatchSize, _get_batch_sizer, batch_create_items, \
+    iter_batch_create_items
+
+
+@pytest.mark.smoke
+@allure.story("Entities")
+@allure.suite("idmtools_core")
+class TestBatchCreateItems(unittest.TestCase):
+
+    def test_adaptive_batch_size(self):
+        sizer = AdaptiveBatchSize(16, min_size=2, max_size=64, target_seconds=1.0)
+        # fast items grow the batches, by a factor two at most per batch
+        self.assertEqual(sizer.update(16, 0.01), 32)
+        self.assertEqual(sizer.update(32, 0.02), 64)
+        self.assertEqual(sizer.update(64, 0.04), 64)
+        # slow items shrink them down to the minimum
+        for _ in range(10):
+            sizer.update(sizer.size, sizer.size * 2.0)
+        self.assertEqual(sizer.size, 2)
+
+        # a growth lowering the throughput is reverted
+        sizer = AdaptiveBatchSize(8, max_size=64, target_seconds=1.0)
+        self.assertEqual(sizer.update(8, 0.5), 16)
+        self.assertEqual(sizer.update(16, 2.0), 8)
+
+        # fixed size
+        sizer = AdaptiveBatchSize(5, min_size=5, max_size=5)
+        self.assertEqual(sizer.update(5, 0.001), 5)
+        with self.assertRaises(ValueError):
+            AdaptiveBatchSize(5, min_size=10, max_size=2)
+
+    def test_max_batch_size_bounds_the_batches(self):
+        # a max_batch_size passed to the creation caps the batch size, even below the batch_size option
+        sizer = _get_batch_sizer(batch_size=None, max_batch_size=4, min_batch_size=8)
+        self.assertEqual((sizer.size, sizer.min_size, sizer.max_size), (4, 4, 4))
+        sizer = _get_batch_sizer(max_batch_size=100, min_batch_size=1, batch_target_seconds=1.0)
+        for _ in range(10):
+            sizer.update(sizer.size, 0.001)
+        self.assertEqual(sizer.size, 100)
+
+    def test_results_are_streamed_in_order(self):
+        created = batch_create_items(range(100), create_func=lambda item, **kwargs: item * 2, display_progress=False,
+                                     min_batch_size=1, max_batch_size=8, batch_target_seconds=0.001)
+        self.assertEqual(created, [item * 2 for item in range(100)])
+
+        results = iter_batch_create_items(range(10), create_func=lambda item, **kwargs: item, display_progress=False,
+                                          batch_size=3)
+        self.assertEqual(next(results), 0)
+        self.assertEqual(list(results), list(range(1, 10)))
+
+    def test_pending_batches_are_bounded(self):
+        pulled = []
+        release = threading.Event()
+
+        def items():
+            for item in range(1000):
+                pulled.append(item)
+                yield item
+
+        def create(item, **kwargs):
+            release.wait(5)
+            return item
+
+        results = iter_batch_create_items(items(), create_func=create, display_progress=False, batch_size=4,
+                                          max_pending_batches=3)
+        consumer = threading.Thread(target=next, args=(results,))
+        consumer.start()
+        time.sleep(0.2)
+        # creation is blocked, only the batches pending were pulled from the generator
+        self.assertEqual(len(pulled), 12)
+        release.set()
+        consumer.join()
+        self.assertEqual(list(results), list(range(1, 1000)))
@@ -0,0 +1,66 @@
+import allure
+import copy
+import json
+import pickle
+import unittest
+import pytest
+from idmtools.frozen.copy_on_write_dict import CopyOnWriteDict
+from idmtools.utils.json import IDMJSONEncoder
+
+
+@pytest.mark.smoke
+@allure.story("Frozen")
+@allure.suite("idmtools_core")
+class TestCopyOnWriteDict(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.base = dict(a=1, b=dict(c=[1, 2]), d="text")
+
+    def test_changes_do_not_touch_base(self):
+        d = CopyOnWriteDict(self.base)
+        d['a'] = 2
+        d['b']['c'].append(3)
+        d['e'] = 5
+        del d['d']
+        self.assertEqual(self.base, dict(a=1, b=dict(c=[1, 2]), d="text"))
+        self.assertEqual(d, dict(a=2, b=dict(c=[1, 2, 3]), e=5))
+        self.assertEqual(list(d), ['a', 'b', 'e'])
+        self.assertEqual(len(d), 3)
+        self.assertNotIn('d', d)
+        with self.assertRaises(KeyError):
+            del d['d']
+
+    def test_only_touched_values_are_copied(self):
+        d = CopyOnWriteDict(self.base)
+        self.assertIn('b', d)
+        self.assertEqual(d['a'], 1)
+        self.assertEqual(d._overlay, {})
+        d['b']
+        self.assertEqual(list(d._overlay), ['b'])
+        self.assertIsNot(d._overlay['b'], self.base['b'])
+
+    def test_copies_share_base(self):
+        d = CopyOnWriteDict(self.base)
+        clones = [copy.deepcopy(d) for _ in range(3)]
+        self.assertTrue(all(c._base is self.base for c in clones))
+        clones[0]['b']['c'].append(3)
+
+        # A changed dict folds its changes into a new base shared by its copies
+        d['a'] = 2
+        c1, c2 = d.copy(), d.copy()
+        self.assertIs(c1._base, c2._base)
+        self.assertEqual(c1, dict(a=2, b=dict(c=[1, 2]), d="text"))
+
+        # Values handed out may be changed in place later, they are not shared with copies
+        d['b']['c'].append(4)
+        c3 = d.copy()
+        d['b']['c'].append(5)
+        self.assertEqual(c3['b']['c'], [1, 2, 4])
+        self.assertEqual(c1['b']['c'], [1, 2])
+
+    def test_serialize(self):
+        d = CopyOnWriteDict(self.base)
+        d['e'] = 5
+        self.assertEqual(json.loads(json.dumps(d, cls=IDMJSONEncoder)), dict(a=1, b=dict(c=[1, 2]), d="text", e=5))
+        self.assertEqual(pickle.loads(pickle.dumps(d)), d)
+        self.assertEqual(repr(d), repr(d.to_dict()))
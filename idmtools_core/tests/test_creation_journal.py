@@ -0,0 +1,145 @@
+import allure
+import os
+import tempfile
+import time
+import unittest
+from functools import partial
+import pytest
+from idmtools.builders import SimulationBuilder
+from idmtools.core.platform_factory import Platform
+from idmtools.entities.experiment import Experiment
+from idmtools.entities.iplatform_ops.creation_journal import CreationJournal, remove_expired_journals
+from idmtools.entities.iplatform_ops.utils import batch_create_items
+from idmtools.entities.templated_simulation import TemplatedSimulations
+from idmtools_test.utils.test_task import TestTask
+
+
+def set_a(simulation, value):
+    simulation.task.set_parameter('a', value)
+    return dict(a=value)
+
+
+def create(simulation, fail_on=None, **kwargs):
+    if simulation.tags['a'] == fail_on:
+        raise RuntimeError(f"Failed to create simulation {fail_on}")
+    simulation.uid = f"sim-{simulation.tags['a']}"
+    return simulation
+
+
+@pytest.mark.smoke
+@allure.story("Entities")
+@allure.suite("idmtools_core")
+class TestCreationJournal(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        builder = SimulationBuilder()
+        builder.add_sweep_definition(set_a, range(10))
+        template = TemplatedSimulations(base_task=TestTask())
+        template.add_builder(builder)
+        self.experiment = Experiment.from_template(template, name="journaled")
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def test_journal_round_trip(self):
+        journal = CreationJournal.for_experiment(self.experiment, None, directory=self.directory.name)
+        self.assertFalse(journal.load().resumable)
+        journal.start(self.experiment)
+        journal.record([(0, 'a'), (1, 'b')])
+        journal.record([(3, 'c')])
+        # a line partially written by a crash is ignored
+        with open(journal.path, 'a') as journal_file:
+            journal_file.write('{"created": [[2, ')
+
+        loaded = CreationJournal.for_experiment(self.experiment, None, directory=self.directory.name).load()
+        self.assertTrue(loaded.resumable)
+        self.assertEqual(loaded.path, journal.path)
+        self.assertEqual(loaded.experiment_id, self.experiment.uid)
+        self.assertEqual(loaded.created, {0: 'a', 1: 'b', 3: 'c'})
+        loaded.remove()
+        self.assertFalse(os.path.exists(journal.path))
+
+        # Other experiments have their own journal, templates with several builders have none
+        other = Experiment.from_template(TemplatedSimulations(base_task=TestTask()), name="other")
+        self.assertNotEqual(CreationJournal.for_experiment(other, None, directory=self.directory.name).key,
+                            journal.key)
+        self.experiment.simulations.items.add_builder(SimulationBuilder())
+        self.assertIsNone(CreationJournal.for_experiment(self.experiment, None, directory=self.directory.name))
+
+    def test_journal_of_other_runs(self):
+        journal = CreationJournal.for_experiment(self.experiment, None, directory=self.directory.name)
+        journal.start(self.experiment)
+        journal.record([(0, 'a')])
+
+        # the same name with other sweep values has its own journal
+        builder = SimulationBuilder()
+        builder.add_sweep_definition(set_a, range(100, 110))
+        template = TemplatedSimulations(base_task=TestTask())
+        template.add_builder(builder)
+        other = Experiment.from_template(template, name="journaled")
+        self.assertFalse(CreationJournal.for_experiment(other, None, directory=self.directory.name).load().resumable)
+
+        # a run started at the same time keeps its own file, and does not remove the journal of the other run
+        concurrent = CreationJournal.for_experiment(self.experiment, None, directory=self.directory.name)
+        self.assertNotEqual(concurrent.path, journal.path)
+        concurrent.start(Experiment.from_template(self.experiment.simulations.items, name="journaled"))
+        concurrent.remove()
+        self.assertTrue(os.path.exists(journal.path))
+        self.assertEqual(CreationJournal.for_experiment(self.experiment, None, directory=self.directory.name).load()
+                         .created, {0: 'a'})
+
+        # a journal written for another template is not resumed
+        with open(journal.path, 'r') as journal_file:
+            lines = journal_file.readlines()
+        lines[0] = lines[0].replace(journal.fingerprint, 'other')
+        with open(journal.path, 'w') as journal_file:
+            journal_file.writelines(lines)
+        self.assertFalse(CreationJournal.for_experiment(self.experiment, None, directory=self.directory.name).load()
+                         .resumable)
+
+    def test_indexed_simulations(self):
+        template = self.experiment.simulations.items
+        template.add_simulation(TestTask().to_simulation())
+        indexed = list(template.indexed_simulations(skip={0, 4, 10}))
+        self.assertEqual([index for index, _ in indexed], [1, 2, 3, 5, 6, 7, 8, 9])
+        self.assertEqual([simulation.tags['a'] for _, simulation in indexed], [1, 2, 3, 5, 6, 7, 8, 9])
+        self.assertEqual(len(list(template.indexed_simulations())), 11)
+
+    def test_resume_batch_create(self):
+        journal = CreationJournal.for_experiment(self.experiment, None, directory=self.directory.name)
+        journal.start(self.experiment)
+        with self.assertRaises(RuntimeError):
+            batch_create_items(self.experiment.simulations, create_func=partial(create, fail_on=5),
+                               display_progress=False, batch_size=3, journal=journal)
+        # only the simulation that failed is missing, including from its batch
+        journal = CreationJournal.for_experiment(self.experiment, None, directory=self.directory.name).load()
+        self.assertEqual(journal.created, {i: f"sim-{i}" for i in range(10) if i != 5})
+
+        created = batch_create_items(self.experiment.simulations, create_func=create, display_progress=False,
+                                     batch_size=3, journal=journal)
+        self.assertEqual([simulation.id for simulation in created], ["sim-5"])
+        self.assertEqual(journal.load().created, {i: f"sim-{i}" for i in range(10)})
+
+    def test_remove_expired_journals(self):
+        journal = CreationJournal.for_experiment(self.experiment, None, directory=self.directory.name)
+        journal.start(self.experiment)
+        builder = SimulationBuilder()
+        builder.add_sweep_definition(set_a, range(3))
+        template = TemplatedSimulations(base_task=TestTask())
+        template.add_builder(builder)
+        old = CreationJournal.for_experiment(Experiment.from_template(template, name="old"), None,
+                                             directory=self.directory.name)
+        old.start(self.experiment)
+        stale = time.time() - 8 * 24 * 3600
+        os.utime(old.path, (stale, stale))
+
+        self.assertEqual(remove_expired_journals(self.directory.name, 7), 1)
+        self.assertFalse(os.path.exists(old.path))
+        self.assertTrue(os.path.exists(journal.path))
+
+    def test_journal_is_opt_in(self):
+        operations = Platform('Test')._experiments
+        self.assertIsNone(operations.open_creation_journal(self.experiment))
+        journal = operations.open_creation_journal(self.experiment, journal_directory=self.directory.name)
+        self.assertEqual(os.path.dirname(journal.path), self.directory.name)
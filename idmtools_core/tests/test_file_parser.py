@@ -0,0 +1,91 @@
+import allure
+import json
+import mmap
+import tempfile
+from unittest import TestCase, mock
+import numpy as np
+import pandas as pd
+import pytest
+from idmtools.utils import file_parser
+from idmtools.utils.file_parser import BufferReader, FileParser
+
+
+def _upper_parser(filename, content):
+    return content.getvalue().decode().upper()
+
+
+@pytest.mark.smoke
+@allure.story("Analyzers")
+@allure.suite("idmtools_core")
+class TestFileParser(TestCase):
+    def tearDown(self) -> None:
+        FileParser.unregister_parser('*Report.txt')
+
+    def test_default_parsers(self):
+        self.assertEqual(FileParser.parse('output/InsetChart.json', b'{"a": [1, 2]}'), {'a': [1, 2]})
+        self.assertEqual(FileParser.parse('out.TXT', b'hello'), 'hello')
+        df = FileParser.parse('data.csv', b'a, b\n1, 2\n')
+        self.assertIsInstance(df, pd.DataFrame)
+        self.assertListEqual(list(df.columns), ['a', 'b'])
+        self.assertEqual(FileParser.parse('data.unknown', b'raw').getvalue(), b'raw')
+
+    def test_json_fallback(self):
+        # NaN is not supported by the fast json backends
+        data = FileParser.parse('config.json', json.dumps({'a': float('nan')}).encode())
+        self.assertTrue(np.isnan(data['a']))
+        with mock.patch.object(file_parser, '_fast_json', None):
+            self.assertEqual(FileParser.parse('config.json', b'{"a": 1}'), {'a': 1})
+
+    def test_register_pattern(self):
+        FileParser.register_parser('*Report.txt', _upper_parser)
+        self.assertEqual(FileParser.parse('output/ReportEvents.txt', b'abc'), 'abc')
+        self.assertEqual(FileParser.parse('output/MalariaReport.txt', b'abc'), 'ABC')
+        FileParser.unregister_parser('*Report.txt')
+        self.assertEqual(FileParser.parse('output/MalariaReport.txt', b'abc'), 'abc')
+
+    def test_parser_overrides(self):
+        self.assertIs(FileParser.get_parser('out.txt', {'txt': _upper_parser}), _upper_parser)
+        self.assertEqual(FileParser.get_parser('out.txt', {'*.csv': _upper_parser}), FileParser.load_txt_file)
+        self.assertEqual(FileParser.get_parser('SpatialReport_Population.bin'), FileParser.load_bin_file)
+        self.assertEqual(FileParser.get_parser('Population.bin'), FileParser.load_raw_file)
+
+    def test_dtk_channels(self):
+        content = json.dumps({'Header': {'Timesteps': 3},
+                              'Channels': {'Infected': {'Units': '', 'Data': [0.0, 0.5, 1.0]}}}).encode()
+        report = FileParser.parse('output/InsetChart.json', content, parser=FileParser.load_dtk_channels_file)
+        self.assertEqual(report['Header']['Timesteps'], 3)
+        self.assertIsInstance(report['Channels']['Infected']['Data'], np.ndarray)
+        np.testing.assert_array_equal(report['Channels']['Infected']['Data'], [0.0, 0.5, 1.0])
+
+        # Numbers json writes as NaN or Infinity and empty channels are decoded too, other data is left to json
+        content = json.dumps({'Channels': {'Infected': {'Data': [float('nan'), float('inf'), -1e-3]},
+                                           'Empty': {'Data': []}, 'Names': {'Data': ['a', 'b']}}}).encode()
+        report = FileParser.parse('output/InsetChart.json', content, parser=FileParser.load_dtk_channels_file)
+        np.testing.assert_array_equal(report['Channels']['Infected']['Data'], [np.nan, np.inf, -1e-3])
+        self.assertEqual(report['Channels']['Empty']['Data'].shape, (0,))
+        self.assertEqual(report['Channels']['Names']['Data'], ['a', 'b'])
+
+    def test_csv_pyarrow(self):
+        df = FileParser.parse('data.csv', b'a,b\n1,2\n3,4\n', parser=FileParser.load_csv_file_pyarrow)
+        self.assertListEqual(list(df.columns), ['a', 'b'])
+        self.assertListEqual(df['b'].tolist(), [2, 4])
+
+    def test_memory_map_content(self):
+        with tempfile.TemporaryFile() as f:
+            f.write(b'a,b\n1,2\n3,4\n')
+            f.flush()
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as content:
+                self.assertListEqual(FileParser.parse('data.csv', content)['b'].tolist(), [2, 4])
+                self.assertEqual(FileParser.parse('data.txt', content), 'a,b\n1,2\n3,4\n')
+                reader = FileParser.parse('data.unknown', content)
+                self.assertIsInstance(reader, BufferReader)
+                self.assertEqual(list(reader), [b'a,b\n', b'1,2\n', b'3,4\n'])
+                reader.seek(-4, 2)
+                buffer = bytearray(10)
+                self.assertEqual(reader.readinto(buffer), 4)
+                self.assertEqual(bytes(buffer[:4]), b'3,4\n')
+                # The reader views the map without copying it
+                self.assertIs(reader.getbuffer().obj, content)
+                reader.close()
+                del reader
+        self.assertEqual(FileParser.parse('config.json', memoryview(b'{"a": 1}')), {'a': 1})
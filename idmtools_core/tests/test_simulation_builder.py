@@ -828,3 +828,26 @@ class TestSimulationBuilder(ITestWithPersistence):
             assert simulation.task.parameters['arg2'].equals(pd.DataFrame(data)['arg2'])
 
 
+
+    def test_sweep_space_random_access(self):
+        self.builder.add_sweep_definition(setA, range(5))
+        self.builder.add_sweep_definition(update_parameter_callback, a=[1, 2], b=["x", "y", "z"], c=[True])
+        self.builder.add_sweep_definition(setB, {1, 2})
+        space = self.builder.sweep_space
+        keywords = [tuple(f.keywords for f in point) for point in self.builder]
+        self.assertEqual(len(space), len(keywords))
+        self.assertEqual(len(space), 5 * 6 * 2)
+        self.assertEqual([tuple(f.keywords for f in space[i]) for i in range(len(space))], keywords)
+        self.assertEqual(tuple(f.keywords for f in self.builder[-1]), keywords[-1])
+        with self.assertRaises(IndexError):
+            space[len(space)]
+
+        # slices and shards are views that can be sliced again
+        self.assertEqual([tuple(f.keywords for f in p) for p in space[7:]], keywords[7:])
+        self.assertEqual([tuple(f.keywords for f in p) for p in space[::-3][1:4]], keywords[::-3][1:4])
+        shards = [space.shard(i, 7) for i in range(7)]
+        self.assertEqual(sum(map(len, shards)), len(space))
+        self.assertTrue(all(len(s) in (8, 9) for s in shards))
+        self.assertEqual([tuple(f.keywords for f in p) for s in shards for p in s], keywords)
+        with self.assertRaises(ValueError):
+            space.shard(7, 7)
@@ -4,8 +4,11 @@ from unittest import TestCase
 
 import pytest
 
+from idmtools.assets import Asset
 from idmtools.builders import SimulationBuilder
+from idmtools.core.platform_factory import Platform
 from idmtools.entities.command_task import CommandTask
+from idmtools.entities.experiment import Experiment
 from idmtools.entities.simulation import Simulation
 from idmtools.entities.templated_simulation import TemplatedSimulations
 
@@ -15,6 +18,15 @@ def print_sweep(simulation: Simulation, value) -> Dict:
     return dict()
 
 
+def tag_parent(simulation: Simulation, value) -> Dict:
+    return dict(value='callable' if callable(value) else value, parent=simulation.parent.name)
+
+
+def set_value(simulation: Simulation, value) -> Dict:
+    simulation.assets.add_asset(Asset(filename="value.txt", content=str(value)))
+    return dict(value=value)
+
+
 @pytest.mark.tasks
 @pytest.mark.smoke
 @allure.story("Sweeps")
@@ -36,3 +48,60 @@ class TestTemplatedSimulation(TestCase):
 
         sims = [s for s in ts]
         self.assertEqual(len(sims), total)
+
+    def test_parallel_generator(self):
+        results = []
+        for generation_workers in [None, 2]:
+            ts = TemplatedSimulations(base_task=CommandTask(command='ls'), generation_workers=generation_workers)
+            ts.base_simulation.assets.add_asset(Asset(filename="base.txt", content="base"))
+            builder = SimulationBuilder()
+            builder.add_sweep_definition(set_value, range(25))
+            ts.add_builder(builder)
+            sims = list(ts)
+            results.append([(s.tags['value'], sorted(a.filename for a in s.assets), s.assets.get_one(filename="value.txt").content) for s in sims])
+        self.assertEqual(results[0], results[1])
+        self.assertEqual([r[0] for r in results[1]], list(range(25)))
+
+    def test_parallel_generator_unpicklable_functions(self):
+        ts = TemplatedSimulations(base_task=CommandTask(command='ls'), generation_workers=2)
+        builder = SimulationBuilder()
+        builder.add_sweep_definition(lambda simulation, value: dict(value=value), range(5))
+        ts.add_builder(builder)
+        with self.assertLogs('user', level='WARNING'):
+            sims = list(ts)
+        self.assertEqual([s.tags['value'] for s in sims], list(range(5)))
+
+    def test_parallel_generator_unpicklable_base_task(self):
+        ts = TemplatedSimulations(base_task=CommandTask(command='ls'), generation_workers=2)
+        ts.base_task.hook = lambda: None
+        builder = SimulationBuilder()
+        builder.add_sweep_definition(tag_parent, range(5))
+        ts.add_builder(builder)
+        ts.parent = Experiment.from_template(ts, name="parent")
+        with self.assertLogs('user', level='WARNING'):
+            sims = list(ts)
+        self.assertEqual([s.tags['value'] for s in sims], list(range(5)))
+
+    def test_parallel_generator_parent(self):
+        ts = TemplatedSimulations(base_task=CommandTask(command='ls'), generation_workers=2)
+        builder = SimulationBuilder()
+        # A sweep point that cannot be pickled is generated in the calling process, in order
+        values = list(range(25))
+        values[12] = lambda: None
+        builder.add_sweep_definition(tag_parent, values)
+        ts.add_builder(builder)
+        experiment = ts.parent = Experiment.from_template(ts, name="parent")
+        sims = list(ts)
+        self.assertEqual([s.tags['value'] for s in sims], [v if v != 12 else 'callable' for v in range(25)])
+        self.assertTrue(all(s.tags['parent'] == "parent" and s.parent is experiment for s in sims))
+
+    def test_parallel_generator_creation(self):
+        platform = Platform('Test')
+        ts = TemplatedSimulations(base_task=CommandTask(command='ls'), generation_workers=2)
+        builder = SimulationBuilder()
+        builder.add_sweep_definition(set_value, range(30))
+        ts.add_builder(builder)
+        experiment = Experiment.from_template(ts)
+        experiment.run(platform=platform)
+        sims = platform.get_children(experiment.uid, experiment.item_type, force=True)
+        self.assertEqual(sorted(s.tags['value'] for s in sims), list(range(30)))
@@ -2,6 +2,7 @@
 
 Copyright 2021, Bill & Melinda Gates Foundation. All rights reserved.
 """
+import copy
 import json
 from dataclasses import dataclass, field, fields
 from functools import partial
@@ -10,6 +11,7 @@ from typing import Union, Dict, Any, List, Optional, Type, TYPE_CHECKING
 from idmtools.assets import Asset, AssetCollection
 from idmtools.entities.itask import ITask
 from idmtools.entities.simulation import Simulation
+from idmtools.frozen.copy_on_write_dict import CopyOnWriteDict
 from idmtools.registry.task_specification import TaskSpecification
 if TYPE_CHECKING:  # pragma: no cover
     from idmtools.entities.iplatform import IPlatform
@@ -79,7 +81,8 @@ class JSONConfiguredTask(ITask):
             None
         """
         if self.config_file_name is not None:
-            params = {self.envelope: self.parameters} if self.envelope else self.parameters
+            params = self.parameters.to_dict() if isinstance(self.parameters, CopyOnWriteDict) else self.parameters
+            params = {self.envelope: params} if self.envelope else params
             if logger.isEnabledFor(DEBUG):
                 logger.debug('Adding JSON Configured File %s', self.config_file_name)
                 logger.debug(f'Generating {self.config_file_name} as an asset from JSONConfiguredTask')
@@ -132,6 +135,23 @@ class JSONConfiguredTask(ITask):
         self.parameters.update(values)
         return values
 
+    def copy_simulation(self, base_simulation: 'Simulation') -> 'Simulation':
+        """
+        Copy a simulation for batching.
+
+        The parameters are turned into a :class:`~idmtools.frozen.copy_on_write_dict.CopyOnWriteDict` the first time,
+        so every copy shares them and only copies the parameters it changes.
+
+        Args:
+            base_simulation: Simulation to copy
+
+        Returns:
+            New simulation
+        """
+        if isinstance(self.parameters, dict):
+            self.parameters = CopyOnWriteDict(copy.deepcopy(self.parameters))
+        return super().copy_simulation(base_simulation)
+
     def reload_from_simulation(self, simulation: 'Simulation', config_file_name: Optional[str] = None,
                                envelope: Optional[str] = None, **kwargs):  # noqa: F821
         """
@@ -6,7 +6,9 @@ import pytest
 from idmtools.core.platform_factory import Platform
 from idmtools.core.task_factory import TaskFactory
 from idmtools.entities import CommandLine
+from idmtools.builders import SimulationBuilder
 from idmtools.entities.experiment import Experiment
+from idmtools.entities.templated_simulation import TemplatedSimulations
 from idmtools_models.json_configured_task import JSONConfiguredTask
 
 
@@ -81,6 +83,30 @@ class TestJSONConfiguredTask(TestCase):
         self.assertEqual(str(task.command), 'cat config.json')
         self.assertDictEqual(json.loads(task.transient_assets.assets[0].content), dict(test=values))
 
+    def test_templated_simulations_share_parameters(self):
+        task = self.get_cat_command_task(dict(parameters=dict(a=1, b=dict(c=1), d=list(range(100)))))
+        ts = TemplatedSimulations(base_task=task)
+        builder = SimulationBuilder()
+
+        def set_c(simulation, value):
+            simulation.task.parameters['b']['c'] = value
+            return dict(c=value)
+
+        builder.add_sweep_definition(JSONConfiguredTask.set_parameter_partial('a'), range(3))
+        builder.add_sweep_definition(set_c, [10, 20])
+        ts.add_builder(builder)
+
+        simulations = list(ts)
+        self.assertEqual(len(simulations), 6)
+        for simulation in simulations:
+            parameters = simulation.task.parameters
+            self.assertIs(parameters._base, task.parameters._base)
+            self.assertEqual(sorted(parameters._overlay), ['a', 'b'])
+            simulation.task.gather_transient_assets()
+            config = json.loads(simulation.task.transient_assets.get_one(filename='config.json').content)
+            self.assertEqual(config, dict(a=simulation.tags['a'], b=dict(c=simulation.tags['c']), d=list(range(100))))
+        self.assertEqual(task.parameters, dict(a=1, b=dict(c=1), d=list(range(100))))
+
     @pytest.mark.timeout(60)
     @pytest.mark.serial
     def test_reload_from_simulation_task(self):
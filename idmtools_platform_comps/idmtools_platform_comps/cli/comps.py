@@ -129,13 +129,16 @@ try:
     @click.option('--extract-after-download/--no-extract-after-download', default=True,
                   help="Extract zip after download")
     @click.option('--zip-name', default="output.zip", help="Name of zipfile")
+    @click.option('--parts', default=1, help="Number of zipfiles to split the files into. Parts are downloaded "
+                                             "concurrently")
+    @click.option('--compress-workers', default=1, help="Number of processes compressing files in the workitem")
     @click.pass_context
     def download(  # noqa D103
             ctx: click.Context, pattern, exclude_pattern, experiment, simulation, work_item, asset_collection, dry_run,
             wait,
             include_assets, verbose, json, simulation_prefix_format_str, work_item_prefix_format_str, name, output_path,
             delete_after_download,
-            extract_after_download, zip_name
+            extract_after_download, zip_name, parts, compress_workers
     ):
         from idmtools_platform_comps.utils.download.download import DownloadWorkItem
 
@@ -159,7 +162,9 @@ try:
             output_path=output_path,
             delete_after_download=delete_after_download,
             extract_after_download=extract_after_download,
-            zip_name=zip_name
+            zip_name=zip_name,
+            parts=parts,
+            compress_workers=compress_workers
         )
 
         if name:
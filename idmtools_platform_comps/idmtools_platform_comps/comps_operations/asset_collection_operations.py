@@ -67,6 +67,9 @@ class CompsPlatformAssetCollectionOperations(IPlatformAssetCollectionOperations)
         ac = COMPSAssetCollection()
         ac_files = set()
         ac_map = dict()
+        # Hash the files in parallel, reusing the checksums of files unchanged since a previous upload when the
+        # platform has a checksum cache
+        asset_collection.calculate_checksums(cache=self.platform.checksum_cache)
         for asset in asset_collection:
             # using checksum is not accurate and not all systems will support de-duplication
             if asset.checksum is None:
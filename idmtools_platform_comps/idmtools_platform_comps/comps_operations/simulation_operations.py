@@ -252,7 +252,8 @@ class CompsPlatformSimulationOperations(IPlatformSimulationOperations):
         return Configuration(**comps_configuration)
 
     def batch_create(self, simulations: List[Simulation], num_cores: int = None, priority: str = None,
-                     asset_collection_id: str = None, **kwargs) -> List[COMPSSimulation]:
+                     asset_collection_id: str = None, journal: 'CreationJournal' = None,  # noqa: F821
+                     **kwargs) -> List[COMPSSimulation]:
         """
         Perform batch creation of Simulations.
 
@@ -261,6 +262,8 @@ class CompsPlatformSimulationOperations(IPlatformSimulationOperations):
             num_cores: Optional MPI Cores to allocate per simulation
             priority: Optional Priority
             asset_collection_id: Asset collection id for sim(overide experiment)
+            journal: Optional creation journal of the experiment, see
+                :class:`~idmtools.entities.iplatform_ops.creation_journal.CreationJournal`
             **kwargs: Future expansion
 
         Returns:
@@ -276,11 +279,15 @@ class CompsPlatformSimulationOperations(IPlatformSimulationOperations):
             simulations,
             batch_worker_thread_func=thread_func,
             progress_description="Creating Simulations on Comps",
-            unit="simulation"
+            unit="simulation",
+            journal=journal,
+            # COMPS bounds its batches to the batch_size of the platform
+            max_batch_size=self.platform.batch_size
         )
         # Always commission again
         try:
-            results[0].parent.get_platform_object().commission()
+            if results:
+                results[0].parent.get_platform_object().commission()
         except RuntimeError as ex:  # occasionally we hit this because double commissioning. Its ok to ignore though because that means we have already commissioned this experiment
             if logger.isEnabledFor(DEBUG):
                 logger.debug(f"COMMISSION Response: {ex.args}")
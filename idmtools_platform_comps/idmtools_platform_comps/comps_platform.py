@@ -92,6 +92,9 @@ class COMPSPlatform(IPlatform, CacheEnabled):
     exclusive: bool = field(default=False,
                             metadata=dict(help="Enable exclusive mode? (one simulation per node on the cluster)"))
     docker_image: str = field(default=None, metadata={"help": "Docker image to use for simulations"})
+    checksum_cache: str = field(default=None, metadata={
+        "help": "Directory of a persistent cache of the checksums of uploaded files. Files unchanged since a previous "
+                "upload are not hashed again. Disabled by default"})
 
     _platform_supports: List[PlatformRequirements] = field(default_factory=lambda: copy.deepcopy(supported_types),
                                                            repr=False, init=False)
@@ -5,11 +5,13 @@ Copyright 2021, Bill & Melinda Gates Foundation. All rights reserved.
 import os
 import sys
 import warnings
-import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
 from dataclasses import dataclass, field
 from enum import Enum
 from logging import getLogger, DEBUG
 from pathlib import PurePath
+from typing import List
 from uuid import UUID
 from COMPS.Data import WorkItem
 from tqdm import tqdm
@@ -19,10 +21,14 @@ from idmtools.assets.file_list import FileList
 from idmtools.core import EntityStatus
 from idmtools.entities.iplatform import IPlatform
 from idmtools_platform_comps.utils.file_filter_workitem import FileFilterWorkItem
+from idmtools_platform_comps.utils.download.zip_stream import ZipNotStreamable, ZipStreamExtractor, extract_zip_parallel
+from idmtools_platform_comps.utils.ssmt_utils.common import get_archive_names
 from idmtools_platform_comps.utils.general import get_file_as_generator
 
 logger = getLogger(__name__)
 user_logger = getLogger('user')
+# Size of the chunks downloaded when extracting while downloading
+STREAM_CHUNK_SIZE = 1024 * 1024
 
 
 class CompressType(Enum):
@@ -52,6 +58,16 @@ class DownloadWorkItem(FileFilterWorkItem):
     delete_after_download: bool = field(default=True)
     zip_name: str = field(default='output.zip')
     compress_type: CompressType = field(default=None)
+    #: Number of archives the files are split into. Parts are downloaded and extracted concurrently
+    parts: int = field(default=1)
+    #: Number of processes compressing files on SSMT
+    compress_workers: int = field(default=1)
+    #: Maximum number of parts downloaded at once
+    download_workers: int = field(default=4)
+    #: Extract the files while the archives are downloaded. The archives are only written to disk when they are kept
+    stream_extract: bool = field(default=False)
+    #: Number of threads extracting each archive
+    extract_workers: int = field(default=4)
 
     def __post_init__(self, item_name: str, asset_collection_id: UUID, asset_files: FileList, user_files: FileList,
                       command: str):
@@ -96,8 +112,21 @@ class DownloadWorkItem(FileFilterWorkItem):
             command += f" --zip-name {self.zip_name}"
         if self.compress_type != "lzma":
             command += f" --compress-type {self.compress_type.value}"
+        if self.parts > 1:
+            command += f" --parts {self.parts}"
+        if self.compress_workers > 1:
+            command += f" --workers {self.compress_workers}"
         return command
 
+    def _archive_names(self) -> List[str]:
+        """
+        Get the names of the archives created by the work item.
+
+        Returns:
+            Names of the archives
+        """
+        return get_archive_names(self.zip_name, self.parts)
+
     def wait(self, wait_on_done_progress: bool = True, timeout: int = None, refresh_interval=None,
              platform: 'IPlatform' = None) -> None:
         """
@@ -123,24 +152,95 @@ class DownloadWorkItem(FileFilterWorkItem):
             # Download our zip
             po: WorkItem = self.get_platform_object(platform=self.platform)
             if self._uid:
-                oi = po.retrieve_output_file_info([self.zip_name])
-                zip_name = PurePath(self.output_path).joinpath(self.zip_name)
-                with tqdm(total=oi[0].length, unit='B', unit_scale=True, unit_divisor=1024,
+                names = self._archive_names()
+                oi = po.retrieve_output_file_info(names)
+                zip_names = [PurePath(self.output_path).joinpath(name) for name in names]
+                with tqdm(total=sum(o.length for o in oi), unit='B', unit_scale=True, unit_divisor=1024,
                           desc="Downloading Files") as pbar:
-                    self.__download_file(oi, pbar, zip_name)
-                    if self.extract_after_download:
-                        self.__extract_output(zip_name)
+                    if len(oi) == 1:
+                        self.__download_and_extract(oi[0], pbar, zip_names[0])
+                    else:
+                        with ThreadPoolExecutor(max_workers=max(1, min(self.download_workers, len(oi)))) as pool:
+                            futures = [pool.submit(self.__download_and_extract, info, pbar, zip_name)
+                                       for info, zip_name in zip(oi, zip_names)]
+                            for future in futures:
+                                future.result()
 
                 if self.delete_after_download:
                     if self.extract_after_download:
-                        if IdmConfigParser.is_output_enabled():
-                            user_logger.debug(f"Removing {zip_name}")
-                        os.remove(zip_name)
+                        for zip_name in zip_names:
+                            # Archives extracted while downloading are not written to disk
+                            if os.path.exists(zip_name):
+                                if IdmConfigParser.is_output_enabled():
+                                    user_logger.debug(f"Removing {zip_name}")
+                                os.remove(zip_name)
                     if IdmConfigParser.is_output_enabled():
                         user_logger.debug(f'Deleting workitem {self.uid}')
                     po.delete()
                     self.uid = None
 
+    def __download_and_extract(self, oi, pbar, zip_name):
+        """
+        Download an archive and extract it if extract_after_download is set.
+
+        With stream_extract, files are extracted while the archive is downloaded. Otherwise, or when the archive cannot
+        be extracted as it is received, the archive is downloaded and then extracted.
+
+        Args:
+            oi: Output file info of the archive
+            pbar: Progress bar
+            zip_name: Zip file to save to
+
+        Returns:
+            None
+        """
+        if self.extract_after_download and self.stream_extract:
+            try:
+                self.__stream_extract(oi, pbar, zip_name)
+                return
+            except ZipNotStreamable as ex:
+                logger.warning(f"{ex}. Downloading {PurePath(zip_name).name} again before extracting it")
+        self.__download_file(oi, pbar, zip_name)
+        if self.extract_after_download:
+            self.__extract_output(zip_name)
+
+    def __stream_extract(self, oi, pbar, zip_name):
+        """
+        Extract an archive while it is downloaded. The archive is also saved when delete_after_download is not set.
+
+        When the archive cannot be extracted as it is received, the progress of its download is taken back before the
+        error is raised. The extractor has already removed the files it extracted.
+
+        Args:
+            oi: Output file info of the archive
+            pbar: Progress bar
+            zip_name: Zip file to save to
+
+        Returns:
+            None
+        """
+        if logger.isEnabledFor(DEBUG):
+            logger.debug(f"Extracting {zip_name} while downloading it")
+        os.makedirs(PurePath(zip_name).parent, exist_ok=True)
+        received = 0
+
+        def chunks():
+            nonlocal received
+            with (open(zip_name, 'wb') if not self.delete_after_download else nullcontext()) as zo:
+                for chunk in get_file_as_generator(oi, chunk_size=STREAM_CHUNK_SIZE):
+                    pbar.update(len(chunk))
+                    received += len(chunk)
+                    if zo is not None:
+                        zo.write(chunk)
+                    yield chunk
+
+        try:
+            ZipStreamExtractor(self.output_path, workers=self.extract_workers).extract(chunks())
+        except ZipNotStreamable:
+            # The archive is downloaded again. The bar is shared with the other parts, so only this part is taken back
+            pbar.update(-received)
+            raise
+
     def __extract_output(self, zip_name):
         """
         Extra output from our zip file.
@@ -153,15 +253,14 @@ class DownloadWorkItem(FileFilterWorkItem):
         """
         if logger.isEnabledFor(DEBUG):
             logger.debug(f"Extracting {zip_name}")
-        with zipfile.ZipFile(zip_name, 'r') as zin:
-            zin.extractall(self.output_path)
+        extract_zip_parallel(str(zip_name), self.output_path, workers=self.extract_workers)
 
     def __download_file(self, oi, pbar, zip_name):
         """
         Download our file tracking progress as we go.
 
         Args:
-            oi: Stream to download
+            oi: Output file info to download
             pbar: Prograss Bar
             zip_name: Zip file to save to
 
@@ -173,6 +272,6 @@ class DownloadWorkItem(FileFilterWorkItem):
         parent_dir = PurePath(zip_name).parent
         os.makedirs(parent_dir, exist_ok=True)
         with open(zip_name, 'wb') as zo:
-            for chunk in get_file_as_generator(oi[0]):
+            for chunk in get_file_as_generator(oi):
                 pbar.update(len(chunk))
                 zo.write(chunk)
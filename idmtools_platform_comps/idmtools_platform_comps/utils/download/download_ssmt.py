@@ -5,10 +5,17 @@ This script is meant to be ran remotely on SSMT, not locally.
 Copyright 2021, Bill & Melinda Gates Foundation. All rights reserved.
 """
 # flake8: noqa F405 F403
+import bz2
+import lzma
+import struct
 import sys
 import zipfile
+import zlib
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from logging import getLogger
 import os
+from typing import Any, Callable, List, Tuple
 from COMPS.Data import WorkItem
 
 # we have to support two ways to load the utils. The first is load from Assets
@@ -27,34 +34,471 @@ logger = getLogger(__name__)
 user_logger = getLogger('user')
 
 
+#: Files bigger than this are compressed by the thread writing their archive instead of in memory by the process pool
+MAX_POOLED_MEMBER_SIZE = 64 * 1024 * 1024
+COMPRESS_TYPES = dict(lzma=zipfile.ZIP_LZMA, deflate=zipfile.ZIP_DEFLATED, bz=zipfile.ZIP_BZIP2, bz2=zipfile.ZIP_BZIP2)
+# Source path, name in the archive and size of a file to archive
+ArchiveMember = Tuple[str, str, int]
+
+# Records of the zip format, as zipfile writes them
+STRUCT_FILE_HEADER = struct.Struct('<4s2B4HL2L2H')
+STRUCT_CENTRAL_DIR = struct.Struct('<4s4B4HL2L5H2L')
+STRUCT_END_ARCHIVE = struct.Struct('<4s4H2LH')
+STRUCT_END_ARCHIVE64 = struct.Struct('<4sQ2H2L4Q')
+STRUCT_END_ARCHIVE64_LOCATOR = struct.Struct('<4sLQL')
+# Sizes and offsets over this need zip64 records
+ZIP64_LIMIT = (1 << 31) - 1
+ZIP_FILECOUNT_LIMIT = (1 << 16) - 1
+ZIP_MAX = 0xFFFFFFFF
+ZIP64_VERSION = 45
+VERSION_NEEDED = {zipfile.ZIP_DEFLATED: 20, zipfile.ZIP_BZIP2: 46, zipfile.ZIP_LZMA: 63}
+# The LZMA1 filter zip readers expect, with the properties written before the data
+LZMA_FILTER = dict(id=lzma.FILTER_LZMA1, dict_size=1 << 23, lc=3, lp=0, pb=2)
+LZMA_HEADER = struct.pack('<BBHBL', 9, 4, 5, (LZMA_FILTER['pb'] * 5 + LZMA_FILTER['lp']) * 9 + LZMA_FILTER['lc'], LZMA_FILTER['dict_size'])
+BLOCK_SIZE = 1024 * 1024
+
+
 def get_argument_parser():
     p = get_common_parser("Download")
     p.add_argument("--zip-name", default="output.zip")
+    p.add_argument("--parts", default=1, type=int, help="Number of archives to split the files into")
+    p.add_argument("--workers", default=1, type=int, help="Number of processes compressing files")
     return p
 
 
+def split_members(members: List[ArchiveMember], parts: int) -> List[List[ArchiveMember]]:
+    """
+    Split the files into archives of about the same size. Each archive lists its files by name.
+
+    Args:
+        members: Files to archive
+        parts: Number of archives
+
+    Returns:
+        Files of each archive
+    """
+    splits = [[] for _ in range(max(parts, 1))]
+    sizes = [0] * len(splits)
+    for member in sorted(members, key=lambda m: m[2], reverse=True):
+        smallest = sizes.index(min(sizes))
+        splits[smallest].append(member)
+        sizes[smallest] += member[2]
+    return [sorted(split, key=lambda m: m[1]) for split in splits]
+
+
+class LZMAZipCompressor:
+    """
+    Compresses a zip member with LZMA. Zip members start with the properties of the LZMA1 filter.
+    """
+
+    def __init__(self):
+        """
+        Constructor.
+        """
+        self._compressor = lzma.LZMACompressor(lzma.FORMAT_RAW, filters=[LZMA_FILTER])
+        self._header = LZMA_HEADER
+
+    def _with_header(self, data: bytes) -> bytes:
+        """
+        Prefix the first data returned with the properties.
+
+        Args:
+            data: Compressed data
+
+        Returns:
+            Data to write
+        """
+        header, self._header = self._header, b''
+        return header + data
+
+    def compress(self, data: bytes) -> bytes:
+        """
+        Compress data.
+
+        Args:
+            data: Data to compress
+
+        Returns:
+            Compressed data
+        """
+        return self._with_header(self._compressor.compress(data))
+
+    def flush(self) -> bytes:
+        """
+        Finish the compression.
+
+        Returns:
+            Rest of the compressed data
+        """
+        return self._with_header(self._compressor.flush())
+
+
+def get_compressor(compress_type: int):
+    """
+    Get a compressor for zip members.
+
+    Args:
+        compress_type: Zip compression type
+
+    Returns:
+        Compressor with compress and flush methods
+
+    Raises:
+        NotImplementedError - If the compression type is not supported
+    """
+    if compress_type == zipfile.ZIP_DEFLATED:
+        return zlib.compressobj(zlib.Z_DEFAULT_COMPRESSION, zlib.DEFLATED, -15)
+    if compress_type == zipfile.ZIP_BZIP2:
+        return bz2.BZ2Compressor()
+    if compress_type == zipfile.ZIP_LZMA:
+        return LZMAZipCompressor()
+    raise NotImplementedError(f"Compression type {compress_type} is not supported")
+
+
+def get_member_info(source: str, arcname: str, compress_type: int) -> zipfile.ZipInfo:
+    """
+    Get the info of a member for a file.
+
+    Args:
+        source: File to archive
+        arcname: Name in the archive
+        compress_type: Zip compression type
+
+    Returns:
+        Info of the member, without checksum and sizes
+    """
+    zinfo = zipfile.ZipInfo.from_file(source, arcname)
+    zinfo.compress_type = compress_type
+    if compress_type == zipfile.ZIP_LZMA:
+        # The LZMA stream has an end marker
+        zinfo.flag_bits |= 0x02
+    return zinfo
+
+
+def compress_file(source: str, compress_type: int, write: Callable[[bytes], Any]) -> Tuple[int, int, int]:
+    """
+    Compress a file.
+
+    Args:
+        source: File to compress
+        compress_type: Zip compression type
+        write: Called with each block of compressed data
+
+    Returns:
+        CRC, size and compressed size of the file
+    """
+    compressor = get_compressor(compress_type)
+    crc, file_size, compress_size = 0, 0, 0
+    with open(source, 'rb') as src:
+        for block in iter(lambda: src.read(BLOCK_SIZE), b''):
+            crc = zlib.crc32(block, crc)
+            file_size += len(block)
+            data = compressor.compress(block)
+            compress_size += len(data)
+            write(data)
+    data = compressor.flush()
+    write(data)
+    return crc, file_size, compress_size + len(data)
+
+
+def compress_member(source: str, arcname: str, compress_type: int) -> Tuple[zipfile.ZipInfo, bytes]:
+    """
+    Compress a file to a zip member. This runs in the process pool.
+
+    Args:
+        source: File to compress
+        arcname: Name in the archive
+        compress_type: Zip compression type
+
+    Returns:
+        Info of the member, with its checksum and sizes, and its compressed data
+    """
+    zinfo = get_member_info(source, arcname, compress_type)
+    data = []
+    zinfo.CRC, zinfo.file_size, zinfo.compress_size = compress_file(source, compress_type, data.append)
+    return zinfo, b''.join(data)
+
+
+class ArchiveWriter:
+    """
+    Writes zip archives whose members can be compressed by other processes.
+
+    zipfile has no public way to write compressed data, so the local headers, the central directory and the end
+    records are written here, the way zipfile writes them.
+    """
+
+    def __init__(self, zip_name: str):
+        """
+        Constructor.
+
+        Args:
+            zip_name: Archive to write
+        """
+        self.fp = open(zip_name, 'wb')
+        self.members: List[zipfile.ZipInfo] = []
+
+    def __enter__(self):
+        """
+        Enter the archive.
+
+        Returns:
+            The writer
+        """
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """
+        Close the archive. The central directory is only written when no error occurred.
+
+        Args:
+            exc_type: Type of the error
+            exc_val: Error
+            exc_tb: Traceback
+
+        Returns:
+            None
+        """
+        if exc_type is None:
+            self.close()
+        else:
+            self.fp.close()
+
+    @staticmethod
+    def _encode_name(zinfo: zipfile.ZipInfo) -> Tuple[bytes, int]:
+        """
+        Encode the name of a member.
+
+        Args:
+            zinfo: Info of the member
+
+        Returns:
+            Name and flags of the member
+        """
+        try:
+            return zinfo.filename.encode('ascii'), zinfo.flag_bits
+        except UnicodeEncodeError:
+            return zinfo.filename.encode('utf-8'), zinfo.flag_bits | 0x800
+
+    @staticmethod
+    def _dos_date_time(zinfo: zipfile.ZipInfo) -> Tuple[int, int]:
+        """
+        Get the MS-DOS time and date of a member.
+
+        Args:
+            zinfo: Info of the member
+
+        Returns:
+            Time and date
+        """
+        dt = zinfo.date_time
+        return dt[3] << 11 | dt[4] << 5 | (dt[5] // 2), (dt[0] - 1980) << 9 | dt[1] << 5 | dt[2]
+
+    def _local_header(self, zinfo: zipfile.ZipInfo, zip64: bool) -> bytes:
+        """
+        Build the local header of a member.
+
+        Args:
+            zinfo: Info of the member
+            zip64: Whether the sizes go in a zip64 extra field
+
+        Returns:
+            Header
+        """
+        name, flags = self._encode_name(zinfo)
+        version = VERSION_NEEDED[zinfo.compress_type]
+        file_size, compress_size, extra = zinfo.file_size, zinfo.compress_size, b''
+        if zip64:
+            extra = struct.pack('<HHQQ', 1, 16, file_size, compress_size)
+            file_size = compress_size = ZIP_MAX
+            version = max(version, ZIP64_VERSION)
+        dostime, dosdate = self._dos_date_time(zinfo)
+        return STRUCT_FILE_HEADER.pack(b'PK\003\004', version, 0, flags, zinfo.compress_type, dostime, dosdate,
+                                       zinfo.CRC, compress_size, file_size, len(name), len(extra)) + name + extra
+
+    def write_compressed(self, zinfo: zipfile.ZipInfo, data: bytes):
+        """
+        Write a member compressed by compress_member.
+
+        Args:
+            zinfo: Info of the member
+            data: Compressed data
+
+        Returns:
+            None
+        """
+        zinfo.header_offset = self.fp.tell()
+        self.fp.write(self._local_header(zinfo, max(zinfo.file_size, zinfo.compress_size) > ZIP64_LIMIT))
+        self.fp.write(data)
+        self.members.append(zinfo)
+
+    def write(self, source: str, arcname: str, compress_type: int):
+        """
+        Compress a file to the archive. The header is written again once the checksum and sizes are known.
+
+        Args:
+            source: File to archive
+            arcname: Name in the archive
+            compress_type: Zip compression type
+
+        Returns:
+            None
+
+        Raises:
+            RuntimeError - If the file grew over the zip64 limit while it was compressed
+        """
+        zinfo = get_member_info(source, arcname, compress_type)
+        # Same margin as zipfile for the compressed data being bigger than the file
+        zip64 = zinfo.file_size * 1.05 > ZIP64_LIMIT
+        zinfo.header_offset = self.fp.tell()
+        zinfo.CRC = zinfo.compress_size = 0
+        self.fp.write(self._local_header(zinfo, zip64))
+        zinfo.CRC, zinfo.file_size, zinfo.compress_size = compress_file(source, compress_type, self.fp.write)
+        if not zip64 and max(zinfo.file_size, zinfo.compress_size) > ZIP64_LIMIT:
+            raise RuntimeError(f"{source} grew over {ZIP64_LIMIT} bytes while it was compressed")
+        end = self.fp.tell()
+        self.fp.seek(zinfo.header_offset)
+        self.fp.write(self._local_header(zinfo, zip64))
+        self.fp.seek(end)
+        self.members.append(zinfo)
+
+    def _central_dir_entry(self, zinfo: zipfile.ZipInfo) -> bytes:
+        """
+        Build the central directory entry of a member.
+
+        Args:
+            zinfo: Info of the member
+
+        Returns:
+            Entry
+        """
+        name, flags = self._encode_name(zinfo)
+        version = VERSION_NEEDED[zinfo.compress_type]
+        file_size, compress_size, header_offset = zinfo.file_size, zinfo.compress_size, zinfo.header_offset
+        extra = []
+        if file_size > ZIP64_LIMIT or compress_size > ZIP64_LIMIT:
+            extra += [file_size, compress_size]
+            file_size = compress_size = ZIP_MAX
+        if header_offset > ZIP64_LIMIT:
+            extra.append(header_offset)
+            header_offset = ZIP_MAX
+        extra = struct.pack(f'<HH{len(extra)}Q', 1, 8 * len(extra), *extra) if extra else b''
+        if extra:
+            version = max(version, ZIP64_VERSION)
+        dostime, dosdate = self._dos_date_time(zinfo)
+        create_system = 0 if sys.platform == 'win32' else 3
+        return STRUCT_CENTRAL_DIR.pack(b'PK\001\002', version, create_system, version, 0, flags, zinfo.compress_type,
+                                       dostime, dosdate, zinfo.CRC, compress_size, file_size, len(name), len(extra), 0,
+                                       0, zinfo.internal_attr, zinfo.external_attr, header_offset) + name + extra
+
+    def close(self):
+        """
+        Write the central directory and the end records, then close the archive.
+
+        Returns:
+            None
+        """
+        try:
+            start = self.fp.tell()
+            for zinfo in self.members:
+                self.fp.write(self._central_dir_entry(zinfo))
+            end = self.fp.tell()
+            count, size = len(self.members), end - start
+            if count > ZIP_FILECOUNT_LIMIT or start > ZIP64_LIMIT or size > ZIP64_LIMIT:
+                self.fp.write(STRUCT_END_ARCHIVE64.pack(b'PK\x06\x06', STRUCT_END_ARCHIVE64.size - 12, ZIP64_VERSION,
+                                                        ZIP64_VERSION, 0, 0, count, count, size, start))
+                self.fp.write(STRUCT_END_ARCHIVE64_LOCATOR.pack(b'PK\x06\x07', 0, end, 1))
+                count, size, start = min(count, ZIP_FILECOUNT_LIMIT), min(size, ZIP_MAX), min(start, ZIP_MAX)
+            self.fp.write(STRUCT_END_ARCHIVE.pack(b'PK\005\006', 0, 0, count, count, size, start, 0))
+        finally:
+            self.fp.close()
+
+
+def write_archive(zip_name: str, members: List[ArchiveMember], compress_type: int, pool: ProcessPoolExecutor = None, max_pending: int = 1, progress: tqdm = None):
+    """
+    Write an archive.
+
+    When a pool is given, files are compressed by the pool, at most max_pending at once, and written in order.
+
+    Args:
+        zip_name: Archive to write
+        members: Files to archive
+        compress_type: Zip compression type
+        pool: Optional process pool compressing the files
+        max_pending: Maximum number of files compressed at once for this archive
+        progress: Progress bar
+
+    Returns:
+        None
+    """
+    pending = deque()
+    with ArchiveWriter(zip_name) as zo:
+
+        def write_next():
+            source, arcname, future = pending.popleft()
+            if future is None:
+                zo.write(source, arcname, compress_type)
+            else:
+                zo.write_compressed(*future.result())
+            if progress is not None:
+                progress.update()
+
+        for source, arcname, size in members:
+            logger.info(f"Adding {source.encode('ascii', 'ignore').decode('utf-8')} to {arcname}")
+            if pool is not None and size <= MAX_POOLED_MEMBER_SIZE:
+                pending.append((source, arcname, pool.submit(compress_member, source, arcname, compress_type)))
+            else:
+                pending.append((source, arcname, None))
+            while len(pending) > max_pending:
+                write_next()
+        while pending:
+            write_next()
+
+
 def create_archive_from_files(args: Namespace, files, files_from_ac, compress_type: str = "lzma"):
-    if compress_type == "lzma":
-        compress_type = zipfile.ZIP_LZMA
-    elif compress_type == "deflate":
-        compress_type = zipfile.ZIP_DEFLATED
-    elif compress_type == "bz":
-        compress_type = zipfile.ZIP_BZIP2
-    with zipfile.ZipFile(args.zip_name, mode="w", compression=compress_type) as zo:
-        for f in tqdm(sorted(files, key=lambda x: x[1]), total=len(files), mininterval=5, maxinterval=15):
-            logger.info(f"Adding {f[0].encode('ascii', 'ignore').decode('utf-8')} to {f[1].encode('ascii', 'ignore').decode('utf-8')}")
-            zo.write(f[0], f[1].encode('ascii', 'ignore').decode('utf-8'))
-        for f in tqdm(files_from_ac, total=len(files_from_ac), mininterval=5, maxinterval=15):
-            fn = PurePath(f.relative_path).joinpath(f.file_name) if f.relative_path else f.file_name
-            if logger.isEnabledFor(DEBUG):
-                logger.debug(f"Adding {f[0]} to {fn}")
-            zo.write(f.uri, fn)
+    """
+    Create the archives of the files.
+
+    With more than one worker, files are compressed concurrently by a process pool. With more than one part, the files
+    are split into parts archives of about the same size, written concurrently, that can be downloaded concurrently.
+
+    Args:
+        args: Arguments of the script
+        files: Files gathered from Experiments, Simulations and WorkItems
+        files_from_ac: Files from Asset Collections
+        compress_type: Compression type. lzma, deflate or bz
+
+    Returns:
+        None
+    """
+    compress_type = COMPRESS_TYPES[compress_type]
+    workers = getattr(args, 'workers', 1) or 1
+    parts = getattr(args, 'parts', 1) or 1
+    members = [(f[0], f[1].encode('ascii', 'ignore').decode('utf-8'), f[3]) for f in files]
+    for f in files_from_ac:
+        fn = PurePath(f.relative_path).joinpath(f.file_name) if f.relative_path else f.file_name
+        members.append((f.uri, str(fn), getattr(f, '_length', None) or 0))
+    names = get_archive_names(args.zip_name, parts)
+    splits = split_members(members, len(names))
+
+    pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    try:
+        with tqdm(total=len(members), mininterval=5, maxinterval=15) as progress:
+            if len(names) == 1:
+                write_archive(names[0], splits[0], compress_type, pool, 2 * workers, progress)
+            else:
+                with ThreadPoolExecutor(max_workers=len(names)) as writers:
+                    futures = [writers.submit(write_archive, name, split, compress_type, pool, max(2, 2 * workers // len(names)), progress) for name, split in zip(names, splits)]
+                    for future in futures:
+                        future.result()
+    finally:
+        if pool is not None:
+            pool.shutdown()
 
 
 if __name__ == "__main__":  # pragma: no cover
     # build our argument parser and then parse the command line
     parser = get_argument_parser()
-    parser.add_argument("--compress-type", choices=["lzma", "deflate", "bz2"], default="lzma")
+    parser.add_argument("--compress-type", choices=list(COMPRESS_TYPES), default="lzma")
     args = parser.parse_args()
 
     # Set our JOB config global with config provided
@@ -78,4 +522,4 @@ if __name__ == "__main__":  # pragma: no cover
     if args.dry_run:
         print_results(files_from_ac, files)
     else:
-        create_archive_from_files(args, files, files_from_ac)
+        create_archive_from_files(args, files, files_from_ac, args.compress_type)
@@ -0,0 +1,500 @@
+"""idmtools zip extraction utilities for the download work item.
+
+Archives can be extracted while they are downloaded, from their local file headers, or in parallel once they are on
+disk.
+
+Copyright 2025, Gates Foundation. All rights reserved.
+"""
+import bz2
+import lzma
+import os
+import struct
+import zipfile
+import zlib
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from logging import getLogger, DEBUG
+from pathlib import PurePosixPath
+from typing import Deque, Iterable, Iterator, List, Optional, Tuple
+
+logger = getLogger(__name__)
+
+LOCAL_FILE_HEADER_SIGNATURE = b'PK\x03\x04'
+DATA_DESCRIPTOR_SIGNATURE = b'PK\x07\x08'
+# Flags of the local file header
+FLAG_DATA_DESCRIPTOR = 0x08
+FLAG_UTF8_FILENAME = 0x800
+ZIP64_EXTRA_ID = 0x0001
+BLOCK_SIZE = 1024 * 1024
+
+
+class ZipNotStreamable(zipfile.BadZipFile):
+    """Error for archives that cannot be extracted before they are completely received."""
+    pass
+
+
+def get_member_path(output_path: str, name: str) -> Optional[str]:
+    """
+    Get the destination of a member. Absolute paths and parent directories are dropped, like ZipFile.extract does.
+
+    Args:
+        output_path: Directory to extract to
+        name: Name of the member in the archive
+
+    Returns:
+        Destination path, or None if nothing is left of the name
+    """
+    parts = [p for p in PurePosixPath(name.replace('\\', '/')).parts if p not in ('/', '', '.', '..')]
+    if parts:
+        parts[0] = os.path.splitdrive(parts[0])[1] or parts[0]
+    if not parts:
+        return None
+    return os.path.join(output_path, *parts)
+
+
+class _ChunkReader:
+    """
+    Reads exact byte counts from an iterable of chunks of any size.
+    """
+
+    def __init__(self, chunks: Iterable[bytes]):
+        """
+        Constructor.
+
+        Args:
+            chunks: Chunks of the stream
+        """
+        self._chunks = iter(chunks)
+        self._buffer = bytearray()
+
+    def fill(self, size: int) -> bool:
+        """
+        Buffer at least size bytes, if the stream has that many left.
+
+        Args:
+            size: Number of bytes wanted
+
+        Returns:
+            True if size bytes are buffered
+        """
+        while len(self._buffer) < size:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                return False
+            self._buffer += chunk
+        return True
+
+    def read(self, size: int) -> bytes:
+        """
+        Read exactly size bytes.
+
+        Args:
+            size: Number of bytes
+
+        Returns:
+            Bytes read
+
+        Raises:
+            BadZipFile - If the stream ends before
+        """
+        if not self.fill(size):
+            raise zipfile.BadZipFile(f"Archive truncated, {size} bytes expected and {len(self._buffer)} left")
+        data = bytes(self._buffer[:size])
+        del self._buffer[:size]
+        return data
+
+    def read_blocks(self, size: int) -> Iterator[bytes]:
+        """
+        Read exactly size bytes, in blocks as they are received.
+
+        Args:
+            size: Number of bytes
+
+        Returns:
+            Generator of the blocks
+        """
+        while size > 0:
+            if not self._buffer:
+                self.fill(1)
+            block = self.read(min(size, len(self._buffer), BLOCK_SIZE) or size)
+            size -= len(block)
+            yield block
+
+    def read_any(self) -> bytes:
+        """
+        Read whatever is buffered, or the next chunk.
+
+        Returns:
+            Bytes read. Empty at the end of the stream
+        """
+        if not self._buffer:
+            self.fill(1)
+        data = bytes(self._buffer)
+        self._buffer.clear()
+        return data
+
+    def push_back(self, data: bytes):
+        """
+        Return bytes read too far to the stream.
+
+        Args:
+            data: Bytes to return
+
+        Returns:
+            None
+        """
+        self._buffer[:0] = data
+
+    def drain(self):
+        """
+        Read the rest of the stream.
+
+        Returns:
+            None
+        """
+        self._buffer.clear()
+        for _ in self._chunks:
+            pass
+
+
+class LZMAZipDecompressor:
+    """
+    Decompresses an LZMA zip member. Zip members start with the properties of the LZMA1 filter.
+    """
+
+    def __init__(self):
+        """
+        Constructor.
+        """
+        self._decompressor = None
+        self._header = b''
+
+    def decompress(self, data: bytes) -> bytes:
+        """
+        Decompress data.
+
+        Args:
+            data: Compressed data
+
+        Returns:
+            Decompressed data
+        """
+        if self._decompressor is None:
+            self._header += data
+            if len(self._header) < 4:
+                return b''
+            properties_size = struct.unpack('<H', self._header[2:4])[0]
+            if len(self._header) < 4 + properties_size:
+                return b''
+            properties, data = self._header[4:4 + properties_size], self._header[4 + properties_size:]
+            # The properties byte packs lc, lp and pb, followed by the dictionary size
+            lc, lp, pb = properties[0] % 9, properties[0] // 9 % 5, properties[0] // 45
+            dict_size = struct.unpack('<L', properties[1:5])[0]
+            self._decompressor = lzma.LZMADecompressor(lzma.FORMAT_RAW, filters=[
+                dict(id=lzma.FILTER_LZMA1, lc=lc, lp=lp, pb=pb, dict_size=dict_size)])
+            self._header = b''
+        return self._decompressor.decompress(data)
+
+    @property
+    def eof(self) -> bool:
+        """
+        Whether the end of the stream was reached.
+
+        Returns:
+            True at the end of the stream
+        """
+        return self._decompressor is not None and self._decompressor.eof
+
+    @property
+    def unused_data(self) -> bytes:
+        """
+        Data received after the end of the stream.
+
+        Returns:
+            Data after the stream
+        """
+        return self._decompressor.unused_data if self._decompressor is not None else b''
+
+
+def get_decompressor(compress_type: int):
+    """
+    Get a decompressor for zip members.
+
+    Args:
+        compress_type: Zip compression type
+
+    Returns:
+        Decompressor with decompress, eof and unused_data, or None for stored members
+
+    Raises:
+        NotImplementedError - If the compression type is not supported
+    """
+    if compress_type == zipfile.ZIP_STORED:
+        return None
+    if compress_type == zipfile.ZIP_DEFLATED:
+        return zlib.decompressobj(-15)
+    if compress_type == zipfile.ZIP_BZIP2:
+        return bz2.BZ2Decompressor()
+    if compress_type == zipfile.ZIP_LZMA:
+        return LZMAZipDecompressor()
+    raise NotImplementedError(f"Compression type {compress_type} is not supported")
+
+
+def _write_member(path: str, blocks: Iterable[bytes], compress_type: int, crc: Optional[int], name: str):
+    """
+    Decompress a member to its destination and check its CRC.
+
+    Args:
+        path: Destination
+        blocks: Compressed data
+        compress_type: Zip compression type
+        crc: Expected CRC, or None when it is only known after the data
+        name: Name of the member
+
+    Returns:
+        CRC of the data written
+
+    Raises:
+        BadZipFile - If the CRC does not match
+    """
+    decompressor = get_decompressor(compress_type)
+    actual = 0
+    with open(path, 'wb') as out:
+        for block in blocks:
+            data = decompressor.decompress(block) if decompressor else block
+            actual = zlib.crc32(data, actual)
+            out.write(data)
+        if hasattr(decompressor, 'flush'):
+            data = decompressor.flush()
+            actual = zlib.crc32(data, actual)
+            out.write(data)
+    if crc is not None and actual != crc:
+        raise zipfile.BadZipFile(f"Bad CRC-32 for file {name}")
+    return actual
+
+
+class ZipStreamExtractor:
+    """
+    Extracts an archive while it is received.
+
+    Members are read from their local file headers, so they land on disk as soon as they are received, without the
+    archive itself being written to disk. Members of known size are decompressed by a pool of threads while the next
+    ones are received. The central directory at the end of the archive is not needed.
+    """
+
+    def __init__(self, output_path: str, workers: int = 4, max_pending_bytes: int = 256 * 1024 * 1024):
+        """
+        Constructor.
+
+        Args:
+            output_path: Directory to extract to
+            workers: Number of threads decompressing members
+            max_pending_bytes: Maximum compressed bytes received and waiting for a thread. Bigger members are
+                decompressed as they are received
+        """
+        self.output_path = output_path
+        self.workers = workers
+        self.max_pending_bytes = max_pending_bytes
+
+    def extract(self, chunks: Iterable[bytes]) -> List[str]:
+        """
+        Extract an archive from its chunks.
+
+        Args:
+            chunks: Chunks of the archive
+
+        Returns:
+            Names of the members extracted
+
+        Raises:
+            ZipNotStreamable - If a stored member has no size in its header. The members already extracted are removed
+            BadZipFile - If the archive is invalid
+        """
+        reader = _ChunkReader(chunks)
+        names = []
+        paths = []
+        pending: Deque[Tuple[Future, int]] = deque()
+        pending_bytes = 0
+        pool = ThreadPoolExecutor(max_workers=self.workers) if self.workers > 1 else None
+        try:
+            while True:
+                signature = reader.read(4) if reader.fill(4) else b''
+                if signature != LOCAL_FILE_HEADER_SIGNATURE:
+                    # The central directory (or the end of the stream) follows the last member
+                    break
+                name, path, flags, compress_type, crc, compress_size, zip64 = self._read_header(reader, signature)
+                names.append(name)
+                if path is None:
+                    reader.read(compress_size)
+                    continue
+                if name.endswith('/'):
+                    os.makedirs(path, exist_ok=True)
+                    reader.read(compress_size)
+                    continue
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                paths.append(path)
+                if flags & FLAG_DATA_DESCRIPTOR:
+                    self._extract_with_descriptor(reader, path, compress_type, name, zip64)
+                elif pool is not None and compress_size <= self.max_pending_bytes:
+                    while pending and pending_bytes + compress_size > self.max_pending_bytes:
+                        future, size = pending.popleft()
+                        future.result()
+                        pending_bytes -= size
+                    data = reader.read(compress_size)
+                    pending.append((pool.submit(_write_member, path, [data], compress_type, crc, name), compress_size))
+                    pending_bytes += compress_size
+                else:
+                    _write_member(path, reader.read_blocks(compress_size), compress_type, crc, name)
+            reader.drain()
+            for future, _ in pending:
+                future.result()
+        except ZipNotStreamable:
+            # Wait on the threads before removing what they wrote
+            if pool is not None:
+                pool.shutdown()
+            self._remove_extracted(paths)
+            raise
+        finally:
+            if pool is not None:
+                pool.shutdown()
+        if logger.isEnabledFor(DEBUG):
+            logger.debug(f"Extracted {len(names)} members to {self.output_path}")
+        return names
+
+    def _remove_extracted(self, paths: List[str]):
+        """
+        Remove extracted files, and the directories they leave empty.
+
+        Args:
+            paths: Files extracted
+
+        Returns:
+            None
+        """
+        output_path = os.path.normpath(self.output_path)
+        for path in paths:
+            if os.path.exists(path):
+                os.remove(path)
+            directory = os.path.dirname(path)
+            while os.path.normpath(directory) != output_path and os.path.isdir(directory) and not os.listdir(directory):
+                os.rmdir(directory)
+                directory = os.path.dirname(directory)
+
+    def _read_header(self, reader: _ChunkReader, signature: bytes):
+        """
+        Read a local file header.
+
+        Args:
+            reader: Stream positioned after the signature
+            signature: Signature read
+
+        Returns:
+            Name, destination, flags, compression type, CRC, compressed size and whether the member is zip64
+        """
+        header = struct.unpack(zipfile.structFileHeader, signature + reader.read(zipfile.sizeFileHeader - 4))
+        flags, compress_type, crc, compress_size, file_size = header[3], header[4], header[7], header[8], header[9]
+        raw_name = reader.read(header[10])
+        extra = reader.read(header[11])
+        name = raw_name.decode('utf-8' if flags & FLAG_UTF8_FILENAME else 'cp437')
+        zip64 = False
+        position = 0
+        while position + 4 <= len(extra):
+            extra_id, extra_size = struct.unpack('<HH', extra[position:position + 4])
+            if extra_id == ZIP64_EXTRA_ID:
+                zip64 = True
+                values = extra[position + 4:position + 4 + extra_size]
+                # The zip64 extra field has the sizes set to 0xFFFFFFFF in the header, in this order
+                if file_size == 0xFFFFFFFF and len(values) >= 8:
+                    file_size, values = struct.unpack('<Q', values[:8])[0], values[8:]
+                if compress_size == 0xFFFFFFFF and len(values) >= 8:
+                    compress_size = struct.unpack('<Q', values[:8])[0]
+            position += 4 + extra_size
+        if flags & FLAG_DATA_DESCRIPTOR:
+            crc = None
+            if compress_type == zipfile.ZIP_STORED:
+                raise ZipNotStreamable(f"The size of {name} is only known after its data, it cannot be extracted "
+                                       f"while it is received")
+        return name, get_member_path(self.output_path, name), flags, compress_type, crc, compress_size, zip64
+
+    @staticmethod
+    def _extract_with_descriptor(reader: _ChunkReader, path: str, compress_type: int, name: str, zip64: bool):
+        """
+        Extract a member whose sizes and CRC follow its data. The end of the data is found by the decompressor.
+
+        Args:
+            reader: Stream positioned at the data of the member
+            path: Destination
+            compress_type: Zip compression type
+            name: Name of the member
+            zip64: Whether the sizes in the descriptor are 8 bytes
+
+        Returns:
+            None
+        """
+        decompressor = get_decompressor(compress_type)
+        actual = 0
+        with open(path, 'wb') as out:
+            while not decompressor.eof:
+                block = reader.read_any()
+                if not block:
+                    raise zipfile.BadZipFile(f"Archive truncated in {name}")
+                data = decompressor.decompress(block)
+                actual = zlib.crc32(data, actual)
+                out.write(data)
+        reader.push_back(decompressor.unused_data)
+        descriptor = reader.read(4)
+        if descriptor == DATA_DESCRIPTOR_SIGNATURE:
+            descriptor = reader.read(4)
+        reader.read(16 if zip64 else 8)
+        if struct.unpack('<L', descriptor)[0] != actual:
+            raise zipfile.BadZipFile(f"Bad CRC-32 for file {name}")
+
+
+def _extract_members(zip_name: str, members: List[zipfile.ZipInfo], output_path: str):
+    """
+    Extract some members of an archive. Each thread opens the archive itself.
+
+    Args:
+        zip_name: Archive
+        members: Members to extract
+        output_path: Directory to extract to
+
+    Returns:
+        None
+    """
+    with zipfile.ZipFile(zip_name, 'r') as zin:
+        for member in members:
+            zin.extract(member, output_path)
+
+
+def extract_zip_parallel(zip_name: str, output_path: str, workers: int = 4):
+    """
+    Extract an archive on disk with several threads, using its central directory to split the members.
+
+    Args:
+        zip_name: Archive
+        output_path: Directory to extract to
+        workers: Number of threads
+
+    Returns:
+        None
+    """
+    with zipfile.ZipFile(zip_name, 'r') as zin:
+        members = zin.infolist()
+    # Create the directories first so the threads do not race on them
+    for directory in {os.path.dirname(get_member_path(output_path, m.filename) or '') for m in members}:
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+    workers = max(1, min(workers, len(members)))
+    splits = [[] for _ in range(workers)]
+    sizes = [0] * workers
+    for member in sorted(members, key=lambda m: m.compress_size, reverse=True):
+        smallest = sizes.index(min(sizes))
+        splits[smallest].append(member)
+        sizes[smallest] += member.compress_size
+    if workers == 1:
+        _extract_members(zip_name, members, output_path)
+        return
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for future in [pool.submit(_extract_members, zip_name, split, output_path) for split in splits]:
+            future.result()
@@ -7,6 +7,7 @@ import os
 import traceback
 from argparse import Namespace
 from logging import getLogger, DEBUG
+from typing import List
 from COMPS import Client
 from idmtools.core.exceptions import idmtools_error_handler
 
@@ -44,6 +45,23 @@ def login_to_env():
     return client
 
 
+def get_archive_names(zip_name: str, parts: int = 1) -> List[str]:
+    """
+    Get the names of the archives the files of a download are split into.
+
+    Args:
+        zip_name: Name of the archive
+        parts: Number of archives
+
+    Returns:
+        Names of the archives. Just zip_name when there is a single part
+    """
+    if parts <= 1:
+        return [zip_name]
+    stem, ext = os.path.splitext(zip_name)
+    return [f"{stem}.{i + 1}{ext}" for i in range(parts)]
+
+
 def get_error_handler_dump_config_and_error(job_config):
     """
     Define our exception handler for ssmt.
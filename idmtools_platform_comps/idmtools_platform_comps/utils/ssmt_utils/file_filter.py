@@ -6,13 +6,15 @@ import argparse
 import glob
 import json
 import os
+import re
 import uuid
 from collections import defaultdict
 from concurrent.futures._base import as_completed, Future
 from concurrent.futures.thread import ThreadPoolExecutor
+from functools import lru_cache
 from logging import DEBUG, getLogger
 from pathlib import PurePath
-from typing import List, Tuple, Set, Callable
+from typing import List, Tuple, Set, Callable, Generator
 import humanfriendly
 from COMPS.Data import WorkItem, Experiment, Simulation, AssetCollectionFile, AssetCollection, QueryCriteria, CommissionableEntity
 from COMPS.Data.Simulation import SimulationState
@@ -61,10 +63,183 @@ def get_common_parser(app_description):
     return parser
 
 
-def gather_files(directory: str, file_patterns: List[str], exclude_patterns: List[str] = None, assets: bool = False, prefix: str = None, filename_format_func: FilenameFormatFunction = None) -> SetOfAssets:
+def _translate_glob_component(pattern: str) -> str:
+    """
+    Translate a glob pattern of a single path component to a regular expression. Wildcards do not match separators.
+
+    Args:
+        pattern: Pattern of a path component
+
+    Returns:
+        Regular expression
+    """
+    i, n, regex = 0, len(pattern), []
+    while i < n:
+        c = pattern[i]
+        i += 1
+        if c == '*':
+            regex.append('[^/]*')
+        elif c == '?':
+            regex.append('[^/]')
+        elif c == '[':
+            j = i
+            if j < n and pattern[j] in '!^':
+                j += 1
+            if j < n and pattern[j] == ']':
+                j += 1
+            while j < n and pattern[j] != ']':
+                j += 1
+            if j >= n:
+                regex.append('\\[')
+            else:
+                chars = pattern[i:j].replace('\\', '\\\\')
+                i = j + 1
+                if chars[0] in '!^':
+                    chars = '^/' + chars[1:]
+                regex.append(f'[{chars}]')
+        else:
+            regex.append(re.escape(c))
+    return ''.join(regex)
+
+
+class CompiledFilePattern:
+    """
+    Glob file pattern compiled to match paths relative to a directory, as glob.iglob(recursive=True) would find them.
+
+    A ** component matches any number of directories. Wildcards do not match names starting with a dot unless the
+    pattern does, like glob.
+    """
+
+    def __init__(self, pattern: str):
+        """
+        Constructor.
+
+        Args:
+            pattern: Glob pattern, relative to the directory searched
+        """
+        self.pattern = pattern
+        parts = [p for p in pattern.replace(os.sep, '/').split('/') if p]
+        self.recursive = '**' in parts
+        self.depth = len(parts)
+        # Leading components without wildcards. Only directories under them are searched
+        self.prefix = []
+        for part in parts:
+            if glob.has_magic(part):
+                break
+            self.prefix.append(os.path.normcase(part))
+        regex = []
+        for position, part in enumerate(parts):
+            last = position == len(parts) - 1
+            if part == '**':
+                regex.append(r'[^/.][^/]*(?:/[^/.][^/]*)*' if last else r'(?:[^/.][^/]*/)*')
+            else:
+                component = _translate_glob_component(part)
+                if glob.has_magic(part) and not part.startswith('.'):
+                    component = r'(?!\.)' + component
+                regex.append(component if last else component + '/')
+        flags = re.IGNORECASE if os.path.normcase('A') == 'a' else 0
+        self.regex = re.compile(''.join(regex) + r'\Z', flags)
+
+    def match(self, relative_path: str) -> bool:
+        """
+        Does a file match the pattern.
+
+        Args:
+            relative_path: Path of the file relative to the directory searched, with / separators
+
+        Returns:
+            True if the file matches
+        """
+        return self.regex.match(relative_path) is not None
+
+    def may_match_under(self, parts: List[str]) -> bool:
+        """
+        Can files under a directory match the pattern.
+
+        Args:
+            parts: Components of the path of the directory relative to the directory searched, normalized by os.path.normcase
+
+        Returns:
+            True if the directory should be searched
+        """
+        if not self.recursive and len(parts) >= self.depth:
+            return False
+        return all(a == b for a, b in zip(parts, self.prefix))
+
+
+@lru_cache(maxsize=None)
+def _compile_exclude_pattern(pattern: str) -> re.Pattern:
+    """
+    Compile an exclude pattern to match paths the way PurePath.match does, from the right and without case.
+
+    Args:
+        pattern: Exclude pattern
+
+    Returns:
+        Regular expression matching paths with / separators
+    """
+    pattern = pattern.lower()
+    parts = PurePath(pattern).parts
+    if not parts:
+        raise ValueError("empty pattern")
+    anchored = PurePath(pattern).anchor
+    if anchored:
+        parts = parts[1:]
+    regex = '/'.join(_translate_glob_component(part) for part in parts)
+    prefix = re.escape(anchored.replace(os.sep, '/')) if anchored else '(?:.*/)?'
+    return re.compile(prefix + regex + r'\Z', re.DOTALL)
+
+
+def _walk_files(directory: str, patterns: List[CompiledFilePattern], assets: bool) -> Generator[Tuple[str, str, os.DirEntry], None, None]:
+    """
+    Walk a directory once, yielding the files matching any of the patterns.
+
+    Directories that cannot contain matches are not searched. Links to files and directories are followed, like glob.
+
+    Args:
+        directory: Directory to search
+        patterns: Patterns to match
+        assets: Should the Assets directory be searched
+
+    Returns:
+        Generator of the path, path relative to the directory with / separators, and scandir entry of each file
+    """
+    stack = [(directory, [])]
+    while stack:
+        path, parts = stack.pop()
+        relative_directory = '/'.join(parts)
+        try:
+            with os.scandir(path) as entries:
+                entries = list(entries)
+        except OSError as ex:
+            if logger.isEnabledFor(DEBUG):
+                logger.debug(f'Cannot scan {path}: {ex}')
+            continue
+        for entry in entries:
+            relative_path = f'{relative_directory}/{entry.name}' if parts else entry.name
+            # Files under Assets are only gathered on demand. Skip them before any other work
+            if not assets and not parts and entry.name.startswith("Assets"):
+                continue
+            try:
+                if entry.is_dir():
+                    sub_parts = parts + [os.path.normcase(entry.name)]
+                    if any(p.may_match_under(sub_parts) for p in patterns):
+                        stack.append((entry.path, sub_parts))
+                elif entry.is_file() and any(p.match(relative_path) for p in patterns):
+                    yield entry.path, relative_path, entry
+            except OSError as ex:
+                if logger.isEnabledFor(DEBUG):
+                    logger.debug(f'Cannot stat {entry.path}: {ex}')
+
+
+def gather_files(directory: str, file_patterns: List[str], exclude_patterns: List[str] = None, assets: bool = False, prefix: str = None, filename_format_func: FilenameFormatFunction = None,
+                 hash_workers: int = 4) -> SetOfAssets:
     """
     Gather file_list.
 
+    The directory is walked once for all the patterns, and files are filtered by the include and exclude patterns before their checksums are
+    calculated, in a thread pool.
+
     Args:
         directory: Directory to gather from
         file_patterns: List of file patterns
@@ -72,48 +247,61 @@ def gather_files(directory: str, file_patterns: List[str], exclude_patterns: Lis
         assets: Should assets be included
         prefix: Prefix for file_list
         filename_format_func: Function that can format the filename
+        hash_workers: Number of threads calculating the checksums of the files
 
     Returns:
         Return files that match patterns.
     """
     from idmtools.utils.hashing import calculate_md5
-    file_list = set()
-    # Loop through our patterns
+    exclude_patterns = exclude_patterns or []
+    compiled, glob_patterns = [], []
     for pattern in file_patterns:
-        # User glob to search each directory using the pattern. We also do full recursion here
-
+        # Patterns reaching outside the directory are left to glob
+        if os.path.isabs(pattern) or '..' in pattern.replace(os.sep, '/').split('/'):
+            glob_patterns.append(pattern)
+        else:
+            compiled.append(CompiledFilePattern(pattern))
+
+    # Source filename, short name and stat of each file matched
+    matches = dict()
+    if compiled:
+        if logger.isEnabledFor(DEBUG):
+            logger.debug(f'Looking for files with patterns {[p.pattern for p in compiled]} in {directory}')
+        for file, relative_path, entry in _walk_files(directory, compiled, assets):
+            matches[file] = (relative_path.replace('/', os.path.sep), entry.stat())
+    for pattern in glob_patterns:
         sd = os.path.join(directory, pattern)
         if logger.isEnabledFor(DEBUG):
             logger.debug(f'Looking for files with pattern {sd}')
         for file in glob.iglob(sd, recursive=True):
             # Ensure it is a file and not a directory
-            if logger.isEnabledFor(DEBUG):
-                logger.debug(f'{file.encode("ascii", "ignore").decode("utf-8")} matching pattern. Is Dir: {os.path.isdir(file)}. Is Link: {os.path.islink(file)}')
-            if os.path.isfile(file):
-                if logger.isEnabledFor(DEBUG):
-                    logger.debug(f'Found file {file.encode("ascii", "ignore").decode("utf-8")}')
+            if file not in matches and os.path.isfile(file):
                 # Create our shortname. This will remove the base directory from the file. Eg
                 # If are scanning C:\ABC\, the file C:\ABC\DEF\123.txt will be DEF\123.txt
                 short_name = file.replace(directory + os.path.sep, "")
-                # Setup destination name which is just joining prefix if it exists
-                dest_name = os.path.join(prefix if prefix else '', short_name)
-                filesize = os.stat(file).st_size
-                if filename_format_func:
-                    dest_name = filename_format_func(dest_name)
-                # Process assets separately than regular files
-                if short_name.startswith("Assets"):
-                    if assets:
-                        file_list.add((file, dest_name, uuid.UUID(calculate_md5(file)), filesize))
-                else:
-                    file_list.add((file, dest_name, uuid.UUID(calculate_md5(file)), filesize))
-
-    # Now strip file that match exclude patterns. We do this after since the regular expressions here are a bit more expensive, so a we are at the
-    # minimum possible files we must scan as this point. We did possible calculate extra md5s here
+                if assets or not short_name.startswith("Assets"):
+                    matches[file] = (short_name, os.stat(file))
+
     if logger.isEnabledFor(DEBUG):
-        logger.debug(f"File count before excluding: {len(file_list)} in {directory}")
-    result = set([f for f in file_list if not is_file_excluded(f[0], exclude_patterns)])
+        logger.debug(f"File count before excluding: {len(matches)} in {directory}")
+    files = [(file, short_name, stat) for file, (short_name, stat) in matches.items() if not is_file_excluded(file, exclude_patterns)]
     if logger.isEnabledFor(DEBUG):
-        logger.debug(f"File count after excluding: {len(file_list)} in {directory}")
+        logger.debug(f"File count after excluding: {len(files)} in {directory}")
+
+    # Checksums are only calculated for the files kept
+    if hash_workers > 1 and len(files) > 1:
+        with ThreadPoolExecutor(max_workers=min(hash_workers, len(files))) as pool:
+            checksums = list(pool.map(calculate_md5, [f[0] for f in files]))
+    else:
+        checksums = [calculate_md5(f[0]) for f in files]
+
+    result = set()
+    for (file, short_name, stat), checksum in zip(files, checksums):
+        # Setup destination name which is just joining prefix if it exists
+        dest_name = os.path.join(prefix if prefix else '', short_name)
+        if filename_format_func:
+            dest_name = filename_format_func(dest_name)
+        result.add((file, dest_name, uuid.UUID(checksum), stat.st_size))
     return result
 
 
@@ -121,6 +309,8 @@ def is_file_excluded(filename: str, exclude_patterns: List[str]) -> bool:
     """
     Is file excluded by excluded patterns.
 
+    Patterns match the end of the path, without case, like PurePath.match. They are compiled once and cached.
+
     Args:
         filename: File to filter
         exclude_patterns: List of file patterns to exclude
@@ -128,10 +318,10 @@ def is_file_excluded(filename: str, exclude_patterns: List[str]) -> bool:
     Returns:
         True is file is excluded
     """
-    for pattern in exclude_patterns:
-        if PurePath(filename.lower()).match(pattern.lower()):
-            return True
-    return False
+    if not exclude_patterns:
+        return False
+    filename = filename.replace(os.sep, '/').lower()
+    return any(_compile_exclude_pattern(pattern).match(filename) for pattern in exclude_patterns)
 
 
 def gather_files_from_related(work_item: WorkItem, file_patterns: List[str], exclude_patterns: List[str], assets: bool, simulation_prefix_format_str: str, work_item_prefix_format_str: str, entity_filter_func: EntityFilterFunc,
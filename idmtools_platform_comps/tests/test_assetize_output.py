@@ -1,5 +1,8 @@
 import os
+import tempfile
+import uuid
 from pathlib import PurePath
+from unittest import mock
 from unittest import skipIf
 
 import allure
@@ -13,7 +16,8 @@ from idmtools.entities.simulation import Simulation
 from idmtools_models.python.json_python_task import JSONConfiguredPythonTask
 from idmtools_platform_comps.utils.assetize_output.assetize_output import AssetizeOutput
 from idmtools_platform_comps.utils.file_filter_workitem import AtLeastOneItemToWatch, CrossEnvironmentFilterNotSupport
-from idmtools_platform_comps.utils.ssmt_utils.file_filter import is_file_excluded
+from idmtools.utils.hashing import calculate_md5
+from idmtools_platform_comps.utils.ssmt_utils.file_filter import gather_files, is_file_excluded
 from idmtools_test import COMMON_INPUT_PATH
 from idmtools_test.test_precreate_hooks import TEST_WITH_NEW_CODE
 from idmtools_test.utils.comps import load_library_dynamically, run_package_dists
@@ -63,6 +67,24 @@ class TestAssetizeOutput(unittest.TestCase):
         self.assertIn('ABc/123/stdout.err', filtered_list)
         self.assertIn('ABc/123/StdErr.err', filtered_list)
 
+    @pytest.mark.smoke
+    def test_gather_files(self):
+        with tempfile.TemporaryDirectory() as directory:
+            for name in ['StdOut.txt', 'output/a.csv', 'output/b.csv', 'output/sub/c.csv', 'output/.hidden.csv', 'Assets/d.csv', 'idmtools.log']:
+                os.makedirs(os.path.join(directory, os.path.dirname(name)), exist_ok=True)
+                with open(os.path.join(directory, name), 'w') as out:
+                    out.write(name)
+            with mock.patch('idmtools.utils.hashing.calculate_md5', wraps=calculate_md5) as md5:
+                files = gather_files(directory, ['**/*.csv', 'output/*', '*.txt'], exclude_patterns=['**/b.csv'], prefix='sim')
+            self.assertEqual(sorted(f[1] for f in files), [os.path.join('sim', 'StdOut.txt'), os.path.join('sim', 'output', 'a.csv'), os.path.join('sim', 'output', 'sub', 'c.csv')])
+            # only the files kept are hashed, once
+            self.assertEqual(md5.call_count, 3)
+            for file, _, checksum, size in files:
+                self.assertEqual(checksum, uuid.UUID(calculate_md5(file)))
+                self.assertEqual(size, os.path.getsize(file))
+            files = gather_files(directory, ['**'], assets=True)
+            self.assertEqual(len(files), 6)
+
     @pytest.mark.smoke
     def test_experiment_precreate_fails_if_no_watched_items(self):
         ao = AssetizeOutput()
@@ -1,13 +1,20 @@
+import io
 import os
 import shutil
 import tempfile
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
 from glob import glob
 from pathlib import PurePath
+from unittest import mock
 import allure
 import pytest
 import unittest
+from tqdm import tqdm
 from idmtools.core.platform_factory import Platform
+from idmtools_platform_comps.utils.download import download_ssmt
 from idmtools_platform_comps.utils.download.download import DownloadWorkItem, CompressType
+from idmtools_platform_comps.utils.download.zip_stream import ZipNotStreamable, ZipStreamExtractor
 from idmtools_test import COMMON_INPUT_PATH
 from idmtools_test.test_precreate_hooks import TEST_WITH_NEW_CODE
 from idmtools_test.utils.comps import run_package_dists
@@ -15,6 +22,28 @@ from idmtools_test.utils.decorators import linux_only, windows_only
 from idmtools_test.utils.utils import get_case_name
 
 
+class UnseekableBytesIO(io.BytesIO):
+    """Stream zipfile cannot seek in, so it writes data descriptors after the members."""
+
+    def seek(self, *args):
+        raise io.UnsupportedOperation("seek")
+
+
+def local_file_as_generator(file, chunk_size=128, resume_byte_pos=None):
+    """Stand-in for get_file_as_generator reading a local archive."""
+    with open(file, 'rb') as archive:
+        yield from iter(lambda: archive.read(chunk_size), b'')
+
+
+def write_archive(path, files, compression, seekable=True):
+    out = io.BytesIO() if seekable else UnseekableBytesIO()
+    with zipfile.ZipFile(out, 'w', compression=compression) as zo:
+        for name, content in files.items():
+            zo.writestr(name, content)
+    with open(path, 'wb') as archive:
+        archive.write(out.getvalue())
+
+
 @pytest.mark.comps
 @allure.feature("DownloadFilter")
 class TestDownloadWorkItem(unittest.TestCase):
@@ -46,6 +75,134 @@ class TestDownloadWorkItem(unittest.TestCase):
         di = DownloadWorkItem(extract_after_download=False)
         self.assertEqual(di.compress_type, CompressType.deflate)
 
+    def test_parts_and_workers_arguments(self):
+        di = DownloadWorkItem(parts=3, compress_workers=4)
+        command = di._extra_command_args("")
+        self.assertIn("--parts 3", command)
+        self.assertIn("--workers 4", command)
+        self.assertEqual(di._archive_names(), ["output.1.zip", "output.2.zip", "output.3.zip"])
+        self.assertEqual(DownloadWorkItem()._archive_names(), ["output.zip"])
+
+    @mock.patch('idmtools_platform_comps.utils.download.download_ssmt.MAX_POOLED_MEMBER_SIZE', new=20000)
+    def test_write_split_archives(self):
+        files = {f'sim{i}/output/out{i}.csv': (f'{i},' * (i * 1000)).encode() + os.urandom(100) for i in range(12)}
+        with tempfile.TemporaryDirectory() as directory, ProcessPoolExecutor(max_workers=2) as pool:
+            members = []
+            for name, content in files.items():
+                source = os.path.join(directory, 'sources', name)
+                os.makedirs(os.path.dirname(source), exist_ok=True)
+                with open(source, 'wb') as f:
+                    f.write(content)
+                members.append((source, name, len(content)))
+            # the biggest files are over MAX_POOLED_MEMBER_SIZE and compressed by the writing thread
+            self.assertTrue(any(size > download_ssmt.MAX_POOLED_MEMBER_SIZE for _, _, size in members))
+            for compress_type in ['deflate', 'lzma', 'bz2']:
+                names = [os.path.join(directory, name) for name in download_ssmt.get_archive_names(f'{compress_type}.zip', 3)]
+                splits = download_ssmt.split_members(members, len(names))
+                self.assertEqual(sorted(m[1] for split in splits for m in split), sorted(files))
+                for name, split in zip(names, splits):
+                    download_ssmt.write_archive(name, split, download_ssmt.COMPRESS_TYPES[compress_type], pool, 2)
+                extracted = {}
+                for name in names:
+                    with zipfile.ZipFile(name) as zi:
+                        self.assertIsNone(zi.testzip())
+                        for info in zi.infolist():
+                            self.assertEqual(info.compress_type, download_ssmt.COMPRESS_TYPES[compress_type])
+                            extracted[info.filename] = zi.read(info)
+                self.assertEqual(extracted, files)
+
+    def test_archive_writer_matches_zipfile(self):
+        with tempfile.TemporaryDirectory() as directory:
+            source = os.path.join(directory, 'out.csv')
+            with open(source, 'wb') as f:
+                f.write(b'1,2,3\n' * 10000)
+            for compress_type in ['deflate', 'lzma', 'bz2']:
+                ours, theirs = os.path.join(directory, 'ours.zip'), os.path.join(directory, 'theirs.zip')
+                compression = download_ssmt.COMPRESS_TYPES[compress_type]
+                with download_ssmt.ArchiveWriter(ours) as zo:
+                    zo.write(source, 'streamed.csv', compression)
+                    zo.write_compressed(*download_ssmt.compress_member(source, 'pooled.csv', compression))
+                with zipfile.ZipFile(theirs, 'w', compression=compression) as zo:
+                    zo.write(source, 'streamed.csv')
+                    zo.write(source, 'pooled.csv')
+                with open(ours, 'rb') as a, open(theirs, 'rb') as b:
+                    self.assertEqual(a.read(), b.read())
+
+    @mock.patch('idmtools_platform_comps.utils.download.download_ssmt.ZIP_FILECOUNT_LIMIT', new=3)
+    @mock.patch('idmtools_platform_comps.utils.download.download_ssmt.ZIP64_LIMIT', new=3000)
+    def test_write_zip64_archive(self):
+        files = {f'sim{i}/out{i}.csv': os.urandom(i * 1000) for i in range(6)}
+        with tempfile.TemporaryDirectory() as directory:
+            members = []
+            for name, content in files.items():
+                source = os.path.join(directory, name.replace('/', '_'))
+                with open(source, 'wb') as f:
+                    f.write(content)
+                members.append((source, name, len(content)))
+            archive = os.path.join(directory, 'output.zip')
+            download_ssmt.write_archive(archive, members, zipfile.ZIP_DEFLATED)
+            with zipfile.ZipFile(archive) as zi:
+                self.assertIsNone(zi.testzip())
+                self.assertEqual({info.filename: zi.read(info) for info in zi.infolist()}, files)
+                self.assertTrue(any(info.header_offset > 3000 for info in zi.infolist()))
+
+    def test_stream_extract(self):
+        files = {f'sim{i}/output/out{i}.csv': (f'{i},' * (i * 5000)).encode() + os.urandom(100) for i in range(20)}
+        with tempfile.TemporaryDirectory() as directory:
+            for compression in [zipfile.ZIP_DEFLATED, zipfile.ZIP_LZMA, zipfile.ZIP_BZIP2, zipfile.ZIP_STORED]:
+                for seekable in [True, False]:
+                    archive = os.path.join(directory, f'{compression}_{seekable}.zip')
+                    write_archive(archive, files, compression, seekable)
+                    output = os.path.join(directory, f'{compression}_{seekable}')
+                    extractor = ZipStreamExtractor(output, max_pending_bytes=50000)
+                    if compression == zipfile.ZIP_STORED and not seekable:
+                        with self.assertRaises(ZipNotStreamable):
+                            extractor.extract(local_file_as_generator(archive))
+                        continue
+                    self.assertEqual(extractor.extract(local_file_as_generator(archive, 1000)), list(files))
+                    for name, content in files.items():
+                        with open(os.path.join(output, name), 'rb') as extracted:
+                            self.assertEqual(extracted.read(), content)
+
+    def test_stream_extract_not_streamable_removes_members(self):
+        out = UnseekableBytesIO()
+        with zipfile.ZipFile(out, 'w') as zo:
+            zo.writestr('sim0/output/out.csv', b'0,' * 1000, compress_type=zipfile.ZIP_DEFLATED)
+            zo.writestr('sim1/output/out.csv', b'1,' * 1000, compress_type=zipfile.ZIP_DEFLATED)
+            zo.writestr('sim2/output/out.csv', b'2,' * 1000, compress_type=zipfile.ZIP_STORED)
+        with tempfile.TemporaryDirectory() as directory:
+            archive = os.path.join(directory, 'output.zip')
+            with open(archive, 'wb') as f:
+                f.write(out.getvalue())
+            output = os.path.join(directory, 'output')
+            os.makedirs(output)
+            with self.assertRaises(ZipNotStreamable):
+                ZipStreamExtractor(output).extract(local_file_as_generator(archive))
+            self.assertEqual(os.listdir(output), [])
+
+    @mock.patch('idmtools_platform_comps.utils.download.download.get_file_as_generator', new=local_file_as_generator)
+    def test_download_extracts_while_downloading(self):
+        files = {f'sim{i}/out.txt': f'output {i}'.encode() * 1000 for i in range(10)}
+        with tempfile.TemporaryDirectory() as directory:
+            archive = os.path.join(directory, 'remote.zip')
+            for keep, seekable in [(False, True), (True, True), (False, False)]:
+                output = os.path.join(directory, f'{keep}_{seekable}')
+                zip_name = os.path.join(output, 'output.zip')
+                # stored members without sizes cannot be streamed, the archive is downloaded then extracted
+                write_archive(archive, files, zipfile.ZIP_DEFLATED if seekable else zipfile.ZIP_STORED, seekable)
+                di = DownloadWorkItem(output_path=output, delete_after_download=not keep, stream_extract=True)
+                with tqdm(total=os.path.getsize(archive), file=io.StringIO()) as pbar:
+                    di._DownloadWorkItem__download_and_extract(archive, pbar, zip_name)
+                    # the progress of an archive downloaded again is only counted once
+                    self.assertEqual(pbar.n, os.path.getsize(archive))
+                for name, content in files.items():
+                    with open(os.path.join(output, name), 'rb') as extracted:
+                        self.assertEqual(extracted.read(), content)
+                self.assertEqual(os.path.exists(zip_name), keep or not seekable)
+
+    def test_stream_extract_is_opt_in(self):
+        self.assertFalse(DownloadWorkItem().stream_extract)
+
     def test_comps_download(self):
         try:
             dirpath = tempfile.mkdtemp()
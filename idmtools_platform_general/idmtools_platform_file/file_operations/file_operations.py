@@ -9,7 +9,8 @@ import shutil
 from dataclasses import dataclass
 from logging import getLogger
 from pathlib import Path
-from typing import Union
+from concurrent.futures import ThreadPoolExecutor
+from typing import Union, Dict, Iterable
 from idmtools.core import ItemType, EntityStatus
 from idmtools.entities import Suite
 from idmtools.entities.experiment import Experiment
@@ -92,6 +93,9 @@ class FileOperations(IOperations):
         Returns:
             item file directory
         """
+        item_dir = self.platform._metas.lookup_directory(str(item_id), item_type)
+        if item_dir is not None:
+            return item_dir
         metas = self.platform._metas.filter(item_type=item_type, property_filter={'id': str(item_id)})
         if len(metas) > 0:
             return Path(metas[0]['dir'])
@@ -244,6 +248,25 @@ class FileOperations(IOperations):
         except:
             logger.debug(f"Failed to change file mode for executable: {exe}")
 
+    @staticmethod
+    def get_job_status(sim_dir: Union[Path, str]) -> EntityStatus:
+        """
+        Read simulation status from job_status.txt in the simulation directory.
+        Args:
+            sim_dir: simulation directory
+        Returns:
+            EntityStatus
+        """
+        try:
+            with open(os.path.join(sim_dir, 'job_status.txt')) as f:
+                status = f.read().strip()
+        except FileNotFoundError:
+            return FILE_MAPS['None']
+
+        if status in ['100', '0', '-1']:
+            return FILE_MAPS[status]
+        return FILE_MAPS['100']  # To be safe
+
     def get_simulation_status(self, sim_id: str, **kwargs) -> EntityStatus:
         """
         Retrieve simulation status.
@@ -254,19 +277,47 @@ class FileOperations(IOperations):
             EntityStatus
         """
         sim_dir = self.get_directory_by_id(sim_id, ItemType.SIMULATION)
+        return self.get_job_status(sim_dir)
 
-        # Check process status
-        job_status_path = sim_dir.joinpath('job_status.txt')
-        if job_status_path.exists():
-            status = open(job_status_path).read().strip()
-            if status in ['100', '0', '-1']:
-                status = FILE_MAPS[status]
-            else:
-                status = FILE_MAPS['100']  # To be safe
-        else:
-            status = FILE_MAPS['None']
+    def get_simulation_statuses(self, experiment: Experiment, sim_ids: Iterable[str] = None,
+                                max_workers: int = None, **kwargs) -> Dict[str, EntityStatus]:
+        """
+        Retrieve status of all simulations of an experiment with a single pass over the experiment directory.
+        Args:
+            experiment: idmtools Experiment
+            sim_ids: simulation ids to look for. If None, every simulation directory is reported
+            max_workers: number of threads used to read job_status.txt files. None or 1 reads sequentially
+            kwargs: keyword arguments used to expand functionality
+        Returns:
+            Dict of simulation id as key and EntityStatus as value
+        """
+        exp_dir = self.get_directory(experiment)
+        wanted = None if sim_ids is None else set(sim_ids)
 
-        return status
+        sim_dirs = {}
+        try:
+            with os.scandir(exp_dir) as it:
+                for entry in it:
+                    if entry.name == 'Assets' or not entry.is_dir():
+                        continue
+                    # Simulation directory is either '<id>' or '<name>_<id>'
+                    sim_id = entry.name
+                    if wanted is None:
+                        sim_id = sim_id.rsplit('_', 1)[-1]
+                    elif sim_id not in wanted:
+                        sim_id = sim_id.rsplit('_', 1)[-1]
+                        if sim_id not in wanted:
+                            continue
+                    sim_dirs[sim_id] = entry.path
+        except FileNotFoundError:
+            logger.debug(f"Experiment directory not found: {exp_dir}")
+            return {}
+
+        if max_workers is not None and max_workers > 1 and len(sim_dirs) > 1:
+            with ThreadPoolExecutor(max_workers=max_workers) as pool:
+                statuses = pool.map(self.get_job_status, sim_dirs.values())
+                return dict(zip(sim_dirs.keys(), statuses))
+        return {sim_id: self.get_job_status(sim_dir) for sim_id, sim_dir in sim_dirs.items()}
 
     def create_file(self, file_path: str, content: str) -> None:
         """
@@ -6,7 +6,7 @@ Copyright 2025, Gates Foundation. All rights reserved.
 import os
 from pathlib import Path
 from logging import getLogger
-from typing import Union, List
+from typing import Union, List, Dict, Iterable, Optional, Set
 from dataclasses import dataclass, field
 
 from idmtools import IdmConfigParser
@@ -48,6 +48,8 @@ class FilePlatform(IPlatform):
     # extra packages to install
     extra_packages: list = field(default_factory=list, metadata=dict(help="Extra packages to install"))
     maxlen: int = field(default=30, metadata=dict(help="Maximum length of suite/experiment name"))
+    status_workers: int = field(default=None,
+                                metadata=dict(help="Number of threads used to read simulation status files"))
 
     _suites: FilePlatformSuiteOperations = field(**op_defaults, repr=False, init=False)
     _experiments: FilePlatformExperimentOperations = field(**op_defaults, repr=False, init=False)
@@ -277,6 +279,42 @@ class FilePlatform(IPlatform):
         """
         return self._op_client.get_simulation_status(sim_id, **kwargs)
 
+    def get_simulation_statuses(self, experiment: Experiment, sim_ids: Iterable[str] = None,
+                                **kwargs) -> Dict[str, EntityStatus]:
+        """
+        Retrieve status of all simulations of an experiment with one pass over the experiment directory.
+        Args:
+            experiment: idmtools Experiment
+            sim_ids: simulation ids to look for. If None, every simulation directory is reported
+            kwargs: keyword arguments used to expand functionality
+        Returns:
+            Dict of simulation id as key and EntityStatus as value
+        """
+        kwargs.setdefault('max_workers', self.status_workers)
+        return self._op_client.get_simulation_statuses(experiment, sim_ids=sim_ids, **kwargs)
+
+    def get_local_files(self, item: Union[Simulation, FileSimulation], files: Union[Set[str], List[str]]) -> Optional[Dict[str, Path]]:
+        """
+        Get paths of simulation files so analyzers can read them without copies.
+        Args:
+            item: Simulation
+            files: file names
+        Returns:
+            Dict of file name and path, None if not available
+        """
+        return self._assets.get_assets_paths(item, files)
+
+    def get_files_checksums(self, item: Union[Simulation, FileSimulation], files: Union[Set[str], List[str]]) -> Optional[Dict[str, str]]:
+        """
+        Get a checksum of simulation files from their size and modification time, without reading them.
+        Args:
+            item: Simulation
+            files: file names
+        Returns:
+            Dict of file name and checksum, None if not available
+        """
+        return self._assets.get_assets_checksums(item, files)
+
     def entity_display_name(self, item: Union[Suite, Experiment, Simulation]) -> str:
         """
         Get display name for entity.
@@ -3,6 +3,7 @@ Here we implement the FilePlatform asset collection operations.
 
 Copyright 2021, Bill & Melinda Gates Foundation. All rights reserved.
 """
+import os
 import shutil
 from uuid import UUID
 from pathlib import Path
@@ -101,6 +102,47 @@ class FilePlatformAssetCollectionOperations(IPlatformAssetCollectionOperations):
             raise NotImplementedError(
                 f"get_assets() for items of type {type(simulation)} is not supported on FilePlatform.")
 
+    def get_assets_paths(self, simulation: Union[Simulation, FileSimulation], files: List[str]) -> Optional[Dict[str, Path]]:
+        """
+        Get paths of simulation files.
+        Args:
+            simulation: Simulation or FileSimulation
+            files: files to get paths for
+        Returns:
+            Dict of file name and path
+        """
+        if not isinstance(simulation, (Simulation, FileSimulation)):
+            return None
+        sim_dir = self.platform.get_directory_by_id(simulation.id, ItemType.SIMULATION)
+        ret = {}
+        for file in files:
+            asset_file = sim_dir / file
+            if not asset_file.exists():
+                raise RuntimeError(f"Couldn't find asset for path '{file}'.")
+            ret[file] = asset_file.absolute()
+        return ret
+
+    def get_assets_checksums(self, simulation: Union[Simulation, FileSimulation], files: List[str]) -> Optional[Dict[str, str]]:
+        """
+        Get a checksum of simulation files from their size and modification time, without reading them.
+        Args:
+            simulation: Simulation or FileSimulation
+            files: files to get checksum for
+        Returns:
+            Dict of file name and checksum, None if a file does not exist
+        """
+        if not isinstance(simulation, (Simulation, FileSimulation)):
+            return None
+        sim_dir = self.platform.get_directory_by_id(simulation.id, ItemType.SIMULATION)
+        ret = {}
+        for file in files:
+            try:
+                st = os.stat(sim_dir / file)
+            except OSError:
+                return None
+            ret[file] = f"{st.st_size}-{st.st_mtime_ns}"
+        return ret
+
     def list_assets(self, item: Union[Experiment, Simulation], exclude: List[str] = None, **kwargs) -> List[Asset]:
         """
         List assets for Experiment/Simulation.
@@ -85,7 +85,7 @@ class FilePlatformExperimentOperations(IPlatformExperimentOperations):
         sim_meta_list = self.platform._metas.get_children(experiment)
         for meta in sim_meta_list:
             file_sim = FileSimulation(meta)
-            file_sim.status = self.platform.get_simulation_status(file_sim.id)
+            file_sim.status = self.platform._op_client.get_job_status(self.platform.get_directory(file_sim))
             if raw:
                 sim_list.append(file_sim)
             else:
@@ -221,9 +221,12 @@ class FilePlatformExperimentOperations(IPlatformExperimentOperations):
         Returns:
             Dict of simulation id as key and working dir as value
         """
-        # Refresh status for each simulation
-        for sim in experiment.simulations:
-            sim.status = self.platform.get_simulation_status(sim.id, **kwargs)
+        # Refresh status for all simulations with one pass over the experiment directory
+        sims = list(experiment.simulations)
+        statuses = self.platform.get_simulation_statuses(experiment, sim_ids=[sim.id for sim in sims], **kwargs)
+        for sim in sims:
+            status = statuses.get(sim.id)
+            sim.status = status if status is not None else self.platform.get_simulation_status(sim.id, **kwargs)
 
     def create_sim_directory_map(self, experiment_id: str) -> Dict:
         """
@@ -296,13 +299,13 @@ class FilePlatformExperimentOperations(IPlatformExperimentOperations):
             ret[sim.id] = self.platform._simulations.get_assets(sim, files, **kwargs)
         return ret
 
-    def run_item(self, experiment: Experiment, **kwargs):
+    def pre_run_item(self, experiment: Experiment, **kwargs):
         """
-        Called during commissioning of an item. This should create the remote resource.
+        Create the suite of the experiment before the experiment itself.
 
         Args:
             experiment:Experiment
-            **kwargs: Keyword arguments to pass to pre_run_item, platform_run_item, post_run_item
+            **kwargs: Keyword arguments to pass to pre_run_item
 
         Returns:
             None
@@ -311,4 +314,4 @@ class FilePlatformExperimentOperations(IPlatformExperimentOperations):
         if experiment.parent:
             experiment.parent.add_experiment(experiment)
             self.platform._suites.platform_create(experiment.parent)
-        super().run_item(experiment, **kwargs)
+        super().pre_run_item(experiment, **kwargs)
@@ -6,7 +6,8 @@ Copyright 2021, Bill & Melinda Gates Foundation. All rights reserved.
 import os
 import json
 from pathlib import Path
-from typing import TYPE_CHECKING, Dict, List, Type, Union
+from logging import getLogger
+from typing import TYPE_CHECKING, Dict, List, Type, Union, Optional
 from dataclasses import dataclass, field
 from idmtools.core import ItemType
 from idmtools.core.interfaces import imetadata_operations
@@ -14,11 +15,14 @@ from idmtools.entities import Suite
 from idmtools.entities.experiment import Experiment
 from idmtools.entities.simulation import Simulation
 from idmtools.utils.json import IDMJSONEncoder
+from idmtools_platform_file.platform_operations.metadata_index import MetadataIndex
 from idmtools_platform_file.platform_operations.utils import FileSuite, FileExperiment
 
 if TYPE_CHECKING:
     from idmtools_platform_file.file_platform import FilePlatform
 
+logger = getLogger(__name__)
+
 
 @dataclass
 class JSONMetadataOperations(imetadata_operations.IMetadataOperations):
@@ -28,6 +32,19 @@ class JSONMetadataOperations(imetadata_operations.IMetadataOperations):
     platform: 'FilePlatform'  # noqa: F821
     platform_type: Type = field(default=None)
     metadata_filename: str = field(default='metadata.json')
+    use_index: bool = field(default=True)
+    _index: MetadataIndex = field(default=None, init=False, repr=False, compare=False)
+
+    @property
+    def index(self) -> MetadataIndex:
+        """
+        Get the id -> directory index of the platform job directory.
+        Returns:
+            MetadataIndex
+        """
+        if self._index is None or Path(self._index.job_directory) != Path(self.platform.job_directory):
+            self._index = MetadataIndex(job_directory=self.platform.job_directory)
+        return self._index
 
     @staticmethod
     def _read_from_file(filepath: Union[Path, str]) -> Dict:
@@ -136,6 +153,7 @@ class JSONMetadataOperations(imetadata_operations.IMetadataOperations):
 
         tags_path = dest.parent / "tags.json"
         self._write_to_file(tags_path, extracted, indent=2)
+        self._index_item(item, dest.parent)
         return meta
 
     def load(self, item: Union[Suite, Experiment, Simulation]) -> Dict:
@@ -185,6 +203,7 @@ class JSONMetadataOperations(imetadata_operations.IMetadataOperations):
             meta.update(metadata)
         meta_file = self.get_metadata_filepath(item)
         self._write_to_file(meta_file, meta)
+        self._index_item(item, meta_file.parent)
 
     def clear(self, item: Union[Suite, Experiment, Simulation]) -> None:
         """
@@ -223,6 +242,56 @@ class JSONMetadataOperations(imetadata_operations.IMetadataOperations):
                 item_list.append(meta)
         return item_list
 
+    def _index_item(self, item: Union[Suite, Experiment, Simulation], item_dir: Union[Path, str]) -> None:
+        """
+        Utility: record item's directory in the metadata index.
+        Args:
+            item: idmtools entity (Suite, Experiment and Simulation)
+            item_dir: item's directory
+        Returns:
+            None
+        """
+        if self.use_index:
+            self.index.add(item.id, item.item_type, item_dir, parent_id=item.parent_id)
+
+    def lookup_directory(self, item_id: str, item_type: ItemType) -> Optional[Path]:
+        """
+        Find item's directory with the metadata index.
+        Args:
+            item_id: item id
+            item_type: the type of item (simulation, experiment, suite)
+        Returns:
+            item's directory or None if item is not indexed or index entry is stale
+        """
+        if not self.use_index:
+            return None
+        item_dir = self.index.lookup(item_id, item_type)
+        if item_dir is None:
+            return None
+        if not item_dir.joinpath(self.metadata_filename).exists():
+            self.index.discard(item_id, item_type)
+            return None
+        return item_dir
+
+    def rebuild_index(self) -> int:
+        """
+        Rebuild the metadata index by scanning the whole job directory.
+        Returns:
+            number of items indexed
+        """
+        use_index = self.use_index
+        self.use_index = False
+        try:
+            entries = []
+            for item_type in (ItemType.SUITE, ItemType.EXPERIMENT, ItemType.SIMULATION):
+                for meta in self.get_all(item_type):
+                    if 'id' in meta and 'dir' in meta:
+                        entries.append(dict(id=meta['id'], item_type=item_type, dir=meta['dir'],
+                                            parent_id=meta.get('parent_id')))
+        finally:
+            self.use_index = use_index
+        return self.index.rebuild(entries)
+
     def get_all(self, item_type: ItemType, item_id: str = '') -> List[Dict]:
         """
         Obtain all the metadata for a given item type.
@@ -235,6 +304,17 @@ class JSONMetadataOperations(imetadata_operations.IMetadataOperations):
         root = Path(self.platform.job_directory)
         item_list = []
 
+        if item_id:
+            item_dir = self.lookup_directory(item_id, item_type)
+            if item_dir is not None:
+                meta_file = item_dir.joinpath(self.metadata_filename)
+                try:
+                    return [self.load_from_file(meta_file)]
+                except Exception as e:
+                    # Fall back to searching the job directory
+                    print(f"Warning: Failed to load metadata from {meta_file}: {e}")
+                    self.index.discard(item_id, item_type)
+
         if item_type is ItemType.SIMULATION:
             # Match sim under experiment, under optional suite
             patterns = [
@@ -254,13 +334,20 @@ class JSONMetadataOperations(imetadata_operations.IMetadataOperations):
             raise RuntimeError(f"Unknown item type: {item_type}")
 
         # Search each pattern
+        found = []
         for pattern in patterns:
             for meta_file in root.glob(pattern):
                 try:
                     meta = self.load_from_file(meta_file)
                     item_list.append(meta)
+                    found.append((meta, meta_file.parent))
                 except Exception as e:
                     print(f"Warning: Failed to load metadata from {meta_file}: {e}")
+        # Index all the items found with a single write
+        if self.use_index:
+            self.index.add_many(dict(id=meta['id'], item_type=meta['item_type'], dir=item_dir,
+                                     parent_id=meta.get('parent_id'))
+                                for meta, item_dir in found if 'id' in meta and 'item_type' in meta)
 
         return item_list
 
@@ -0,0 +1,203 @@
+"""
+Here we implement the persistent metadata index used by File Platform.
+
+The index is an append-only JSON lines file stored in the platform job directory. Each line maps an item id and
+item type to the item's directory (relative to the job directory) so metadata lookups by id do not require
+globbing the whole job directory.
+
+Copyright 2025, Gates Foundation. All rights reserved.
+"""
+import os
+import json
+import threading
+from pathlib import Path
+from logging import getLogger
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Optional, Tuple, Union
+from idmtools.core import ItemType
+
+logger = getLogger(__name__)
+
+INDEX_FILENAME = '.metadata_index.jsonl'
+
+
+@dataclass
+class MetadataIndex:
+    """
+    Append-only id -> directory index kept in the platform job directory.
+    """
+    job_directory: Union[Path, str]
+    index_filename: str = field(default=INDEX_FILENAME)
+    _entries: Dict[Tuple[str, str], Dict] = field(default_factory=dict, init=False, repr=False)
+    _offset: int = field(default=0, init=False, repr=False)
+    _lock: threading.RLock = field(default_factory=threading.RLock, init=False, repr=False, compare=False)
+
+    @property
+    def index_path(self) -> Path:
+        """
+        Get the index file path.
+        Returns:
+            index file path
+        """
+        return Path(self.job_directory, self.index_filename)
+
+    @staticmethod
+    def _key(item_id: str, item_type: Union[ItemType, str]) -> Tuple[str, str]:
+        """
+        Utility: build the lookup key for an item.
+        Args:
+            item_id: item id
+            item_type: item type
+        Returns:
+            tuple of item type and item id
+        """
+        return str(item_type), str(item_id)
+
+    def _make_entry(self, item_id: str, item_type: Union[ItemType, str], item_dir: Union[Path, str],
+                    parent_id: str = None) -> Dict:
+        """
+        Utility: build an index entry. Directory is stored relative to the job directory when possible.
+        Args:
+            item_id: item id
+            item_type: item type
+            item_dir: item directory
+            parent_id: parent item id
+        Returns:
+            index entry
+        """
+        try:
+            rel_dir = os.path.relpath(os.path.abspath(item_dir), os.path.abspath(self.job_directory))
+        except ValueError:
+            # Different drives on Windows
+            rel_dir = os.path.abspath(item_dir)
+        return dict(id=str(item_id), item_type=str(item_type), dir=Path(rel_dir).as_posix(),
+                    parent_id=None if parent_id is None else str(parent_id))
+
+    def refresh(self) -> None:
+        """
+        Read index lines appended since the last refresh, including lines written by other processes.
+        Returns:
+            None
+        """
+        with self._lock:
+            try:
+                size = self.index_path.stat().st_size
+            except FileNotFoundError:
+                self._entries.clear()
+                self._offset = 0
+                return
+            if size < self._offset:
+                # The index was rebuilt, start over
+                self._entries.clear()
+                self._offset = 0
+            if size == self._offset:
+                return
+            with self.index_path.open(mode='rb') as f:
+                f.seek(self._offset)
+                data = f.read(size - self._offset)
+            # Ignore a trailing partial line which is still being written
+            end = data.rfind(b'\n') + 1
+            for line in data[:end].splitlines():
+                try:
+                    entry = json.loads(line)
+                    self._entries[self._key(entry['id'], entry['item_type'])] = entry
+                except (ValueError, KeyError):
+                    logger.debug(f"Skip invalid line in metadata index: {line}")
+            self._offset += end
+
+    def add(self, item_id: str, item_type: Union[ItemType, str], item_dir: Union[Path, str],
+            parent_id: str = None) -> None:
+        """
+        Record an item in the index. Nothing is written if the item is already indexed with the same values.
+        Args:
+            item_id: item id
+            item_type: item type
+            item_dir: item directory
+            parent_id: parent item id
+        Returns:
+            None
+        """
+        self.add_many([dict(id=item_id, item_type=item_type, dir=item_dir, parent_id=parent_id)])
+
+    def add_many(self, entries: Iterable[Dict]) -> int:
+        """
+        Record items in the index with a single write, skipping items already indexed with the same values.
+        Args:
+            entries: iterable of dict with keys id, item_type, dir and parent_id
+        Returns:
+            number of entries written
+        """
+        new_entries = {}
+        for e in entries:
+            entry = self._make_entry(e['id'], e['item_type'], e['dir'], e.get('parent_id'))
+            new_entries[self._key(entry['id'], entry['item_type'])] = entry
+        with self._lock:
+            # Lines appended by other processes or instances count as indexed
+            self.refresh()
+            new_entries = {key: entry for key, entry in new_entries.items() if self._entries.get(key) != entry}
+            if not new_entries:
+                return 0
+            data = ''.join(json.dumps(entry) + '\n' for entry in new_entries.values())
+            try:
+                self.index_path.parent.mkdir(parents=True, exist_ok=True)
+                # A single write on a file opened in append mode keeps lines whole across processes
+                with self.index_path.open(mode='a') as f:
+                    f.write(data)
+            except OSError as e:
+                logger.debug(f"Failed to update metadata index {self.index_path}: {e}")
+                return 0
+            self._entries.update(new_entries)
+        return len(new_entries)
+
+    def discard(self, item_id: str, item_type: Union[ItemType, str]) -> None:
+        """
+        Forget a stale in-memory entry. The entry is fixed on disk by the next add or rebuild.
+        Args:
+            item_id: item id
+            item_type: item type
+        Returns:
+            None
+        """
+        with self._lock:
+            self._entries.pop(self._key(item_id, item_type), None)
+
+    def lookup(self, item_id: str, item_type: Union[ItemType, str]) -> Optional[Path]:
+        """
+        Find an item's directory.
+        Args:
+            item_id: item id
+            item_type: item type
+        Returns:
+            item directory or None if item is not indexed
+        """
+        key = self._key(item_id, item_type)
+        entry = self._entries.get(key)
+        if entry is None:
+            self.refresh()
+            entry = self._entries.get(key)
+        if entry is None:
+            return None
+        return Path(self.job_directory, entry['dir'])
+
+    def rebuild(self, entries: Iterable[Dict]) -> int:
+        """
+        Replace the index with the given entries.
+        Args:
+            entries: iterable of dict with keys id, item_type, dir and parent_id
+        Returns:
+            number of entries written
+        """
+        new_entries = {}
+        for e in entries:
+            entry = self._make_entry(e['id'], e['item_type'], e['dir'], e.get('parent_id'))
+            new_entries[self._key(entry['id'], entry['item_type'])] = entry
+        with self._lock:
+            self.index_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.index_path.with_name(f"{self.index_filename}.{os.getpid()}.tmp")
+            with tmp_path.open(mode='w') as f:
+                for entry in new_entries.values():
+                    f.write(json.dumps(entry) + '\n')
+            os.replace(tmp_path, self.index_path)
+            self._entries = new_entries
+            self._offset = self.index_path.stat().st_size
+        return len(new_entries)
@@ -0,0 +1,329 @@
+"""
+Here we implement the local executor of the ProcessPlatform.
+
+Copyright 2025, Gates Foundation. All rights reserved.
+"""
+import heapq
+import itertools
+import os
+import subprocess
+import threading
+from dataclasses import dataclass, field
+from logging import getLogger, DEBUG
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from idmtools.core import EntityStatus
+
+logger = getLogger(__name__)
+user_logger = getLogger('user')
+
+JOB_STATUS_FILE = 'job_status.txt'
+# Values of job_status.txt, see idmtools_platform_file.platform_operations.utils.FILE_MAPS
+JOB_STATUS_VALUES = {EntityStatus.RUNNING: '100', EntityStatus.SUCCEEDED: '0', EntityStatus.FAILED: '-1'}
+# Number of simulations after one that does not fit the resources left that are considered to start before it
+BACKFILL_LOOKAHEAD = 16
+# Number of simulations that start before one that does not fit, after which it waits for the resources it needs
+BACKFILL_LIMIT = 16
+
+
+def write_job_status(directory: str, status: EntityStatus) -> None:
+    """
+    Write job_status.txt atomically, so readers never see a partially written file.
+    Args:
+        directory: simulation directory
+        status: EntityStatus
+    Returns:
+        None
+    """
+    tmp_path = os.path.join(directory, f'.{JOB_STATUS_FILE}.tmp')
+    with open(tmp_path, 'w') as f:
+        f.write(JOB_STATUS_VALUES[status])
+    os.replace(tmp_path, os.path.join(directory, JOB_STATUS_FILE))
+
+
+def get_total_memory() -> Optional[int]:
+    """
+    Get the physical memory of the machine.
+    Returns:
+        Memory in MB, or None if unknown
+    """
+    try:
+        return os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_PHYS_PAGES') // (1024 * 1024)
+    except (AttributeError, ValueError, OSError):
+        return None
+
+
+@dataclass
+class LocalJob:
+    """
+    A simulation run by the LocalExecutor.
+    """
+    sim_id: str
+    directory: str
+    #: Cores reserved while the simulation runs
+    cores: int = 1
+    #: Memory reserved while the simulation runs, in MB
+    memory: Optional[int] = None
+    #: Simulations of higher priority start first
+    priority: int = 0
+    #: Number of times the simulation is run before it is failed
+    retries: int = 1
+    attempts: int = field(default=0, init=False)
+    status: EntityStatus = field(default=EntityStatus.CREATED, init=False)
+    returncode: Optional[int] = field(default=None, init=False)
+
+
+class LocalExecutor:
+    """
+    Run the _run.sh script of simulations as local processes, within a budget of cores and memory.
+
+    Simulations start by priority, then in the order they were submitted. A simulation that does not fit the
+    resources left lets a bounded number of the next ones start before it, then gets the resources released. Failed simulations are run again until their retries are
+    exhausted. Every status change wakes the threads waiting in :meth:`wait_for`, so callers do not poll files.
+    """
+
+    def __init__(self, max_cores: Optional[int] = None, max_memory: Optional[int] = None,
+                 max_jobs: Optional[int] = None):
+        """
+        Constructor.
+        Args:
+            max_cores: cores shared by all simulations. Defaults to the cores of the machine
+            max_memory: memory shared by all simulations, in MB. Defaults to the memory of the machine
+            max_jobs: maximum number of simulations running at once. Defaults to no limit
+        """
+        self.max_cores = max_cores or os.cpu_count() or 1
+        self.max_memory = max_memory if max_memory is not None else get_total_memory()
+        self.max_jobs = max_jobs
+        self.jobs: Dict[str, LocalJob] = dict()
+        self._pending: List[Tuple[int, int, LocalJob]] = []
+        self._order = itertools.count()
+        self._running: Dict[str, subprocess.Popen] = dict()
+        self._used_cores = 0
+        self._used_memory = 0
+        self._changed = threading.Condition()
+        self._dispatching = False
+        # First pending simulation that does not fit, and number of simulations started before it
+        self._blocked: Optional[LocalJob] = None
+        self._bypassed = 0
+
+    def submit(self, jobs: Iterable[LocalJob]) -> None:
+        """
+        Queue simulations to run.
+        Args:
+            jobs: simulations to run
+        Returns:
+            None
+        """
+        with self._changed:
+            for job in jobs:
+                if job.cores > self.max_cores:
+                    user_logger.warning(f"Simulation {job.sim_id} requests {job.cores} cores, more than the "
+                                        f"{self.max_cores} available. It will run alone.")
+                    job.cores = self.max_cores
+                if job.memory is not None and self.max_memory is not None and job.memory > self.max_memory:
+                    user_logger.warning(f"Simulation {job.sim_id} requests {job.memory}MB of memory, more than the "
+                                        f"{self.max_memory}MB available. It will run alone.")
+                    job.memory = self.max_memory
+                job.status, job.attempts, job.returncode = EntityStatus.CREATED, 0, None
+                self.jobs[job.sim_id] = job
+                heapq.heappush(self._pending, (-job.priority, next(self._order), job))
+            if not self._dispatching:
+                # Not a daemon: simulations keep running until they are done, like the batch script does
+                self._dispatching = True
+                threading.Thread(target=self._dispatch, name='LocalExecutor').start()
+            self._changed.notify_all()
+
+    def get_status(self, sim_id: str) -> Optional[EntityStatus]:
+        """
+        Get the status of a simulation.
+        Args:
+            sim_id: simulation id
+        Returns:
+            EntityStatus, or None if the simulation was not submitted to this executor
+        """
+        job = self.jobs.get(sim_id)
+        return None if job is None else job.status
+
+    def wait_for(self, predicate: Callable[[], bool], timeout: Optional[float] = None) -> bool:
+        """
+        Wait until a predicate is true. The predicate is checked each time the status of a simulation changes.
+        Args:
+            predicate: condition to wait for
+            timeout: maximum time to wait, in seconds
+        Returns:
+            Value of the predicate
+        """
+        with self._changed:
+            return self._changed.wait_for(predicate, timeout)
+
+    def wait(self, sim_ids: Optional[Iterable[str]] = None, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until simulations are done.
+        Args:
+            sim_ids: simulations to wait for. Defaults to all simulations submitted
+            timeout: maximum time to wait, in seconds
+        Returns:
+            True if the simulations are done
+        """
+        jobs = list(self.jobs.values()) if sim_ids is None else [self.jobs[sim_id] for sim_id in sim_ids]
+        return self.wait_for(
+            lambda: all(job.status in (EntityStatus.SUCCEEDED, EntityStatus.FAILED) for job in jobs), timeout)
+
+    def cancel(self) -> None:
+        """
+        Drop the simulations not started yet and terminate the running ones.
+        Returns:
+            None
+        """
+        with self._changed:
+            for _, _, job in self._pending:
+                self._set_status(job, EntityStatus.FAILED)
+            self._pending.clear()
+            for sim_id, process in self._running.items():
+                self._set_status(self.jobs[sim_id], EntityStatus.FAILED)
+                if process is not None:
+                    process.terminate()
+            self._changed.notify_all()
+
+    def _fits(self, job: LocalJob) -> bool:
+        """
+        Check if a simulation fits the resources left. The caller holds the lock.
+        Args:
+            job: simulation
+        Returns:
+            True if the simulation can start
+        """
+        if self.max_jobs is not None and len(self._running) >= self.max_jobs:
+            return False
+        if self._used_cores + job.cores > self.max_cores:
+            return False
+        return job.memory is None or self.max_memory is None or self._used_memory + job.memory <= self.max_memory
+
+    def _dispatch(self) -> None:
+        """
+        Start simulations as resources are released, until all of them are done.
+        Returns:
+            None
+        """
+        with self._changed:
+            while self._pending or self._running:
+                self._start_pending()
+                self._changed.wait()
+            self._dispatching = False
+
+    def _start_pending(self) -> None:
+        """
+        Start the pending simulations that fit the resources left, in order. The caller holds the lock.
+        Returns:
+            None
+        """
+        while self._pending:
+            if self.max_jobs is not None and len(self._running) >= self.max_jobs:
+                return
+            job = self._pending[0][2]
+            if self._fits(job):
+                heapq.heappop(self._pending)
+                self._start(job)
+                continue
+            if self._blocked is not job:
+                self._blocked, self._bypassed = job, 0
+            if self._bypassed < BACKFILL_LIMIT:
+                self._backfill()
+            return
+
+    def _backfill(self) -> None:
+        """
+        Start the simulations following the first pending one, which does not fit, that fit the resources left.
+        Only the next BACKFILL_LOOKAHEAD simulations are considered. The caller holds the lock.
+        Returns:
+            None
+        """
+        head = heapq.heappop(self._pending)
+        candidates = [heapq.heappop(self._pending) for _ in range(min(BACKFILL_LOOKAHEAD, len(self._pending)))]
+        for entry in candidates:
+            if self._bypassed < BACKFILL_LIMIT and self._fits(entry[2]):
+                self._start(entry[2])
+                self._bypassed += 1
+            else:
+                heapq.heappush(self._pending, entry)
+        heapq.heappush(self._pending, head)
+
+    def _start(self, job: LocalJob) -> None:
+        """
+        Start a simulation. The caller holds the lock.
+        Args:
+            job: simulation
+        Returns:
+            None
+        """
+        self._used_cores += job.cores
+        self._used_memory += job.memory or 0
+        job.attempts += 1
+        self._set_status(job, EntityStatus.RUNNING)
+        # The process is recorded once it is started by the thread of the simulation
+        self._running[job.sim_id] = None
+        threading.Thread(target=self._run, args=(job,), name=f'LocalExecutor-{job.sim_id}').start()
+
+    def _run(self, job: LocalJob) -> None:
+        """
+        Run a simulation and release its resources when it is done.
+        Args:
+            job: simulation
+        Returns:
+            None
+        """
+        returncode = -1
+        try:
+            script = os.path.join(job.directory, '_run.sh')
+            with open(script, 'rb') as f:
+                content = f.read()
+            if b'\r' in content:
+                with open(script, 'wb') as f:
+                    f.write(content.replace(b'\r', b''))
+            with open(os.path.join(job.directory, 'stdout.txt'), 'w') as out, \
+                    open(os.path.join(job.directory, 'stderr.txt'), 'w') as err:
+                process = subprocess.Popen(['bash', '_run.sh'], cwd=job.directory, stdout=out, stderr=err)
+                with self._changed:
+                    self._running[job.sim_id] = process
+                    if job.status != EntityStatus.RUNNING:
+                        # Cancelled while starting
+                        process.terminate()
+                returncode = process.wait()
+        except OSError as e:
+            logger.error(f"Failed to run simulation {job.sim_id}: {e}")
+        with self._changed:
+            del self._running[job.sim_id]
+            self._used_cores -= job.cores
+            self._used_memory -= job.memory or 0
+            job.returncode = returncode
+            # Simulations cancelled while running are already failed
+            if job.status != EntityStatus.RUNNING:
+                pass
+            elif returncode == 0:
+                self._set_status(job, EntityStatus.SUCCEEDED)
+            elif job.attempts < job.retries:
+                logger.debug(f"Simulation {job.sim_id} failed with code {returncode}, retrying")
+                job.status = EntityStatus.CREATED
+                heapq.heappush(self._pending, (-job.priority, next(self._order), job))
+            else:
+                self._set_status(job, EntityStatus.FAILED)
+            self._changed.notify_all()
+
+    def _set_status(self, job: LocalJob, status: EntityStatus) -> None:
+        """
+        Update the status of a simulation and its job_status.txt, and wake the waiting threads.
+
+        The caller holds the lock.
+        Args:
+            job: simulation
+            status: new status
+        Returns:
+            None
+        """
+        job.status = status
+        self._changed.notify_all()
+        if logger.isEnabledFor(DEBUG):
+            logger.debug(f"Simulation {job.sim_id} is {status.value}")
+        try:
+            write_job_status(job.directory, status)
+        except OSError as e:
+            logger.debug(f"Failed to write the status of simulation {job.sim_id}: {e}")
@@ -5,11 +5,15 @@ Copyright 2021, Bill & Melinda Gates Foundation. All rights reserved.
 """
 import platform
 import subprocess
-from typing import Union, Any
-from dataclasses import dataclass
+from typing import Union, Any, Dict, Iterable, List, Optional
+from dataclasses import dataclass, field
+from idmtools.core import EntityStatus
+from idmtools.entities import Suite
 from idmtools.entities.experiment import Experiment
+from idmtools.entities.iworkflow_item import IWorkflowItem
 from idmtools.entities.simulation import Simulation
-from idmtools_platform_file.file_platform import FilePlatform
+from idmtools_platform_file.file_platform import FilePlatform, op_defaults
+from idmtools_platform_process.local_executor import LocalExecutor, LocalJob
 from idmtools_platform_process.platform_operations.experiment_operations import ProcessPlatformExperimentOperations
 from logging import getLogger
 
@@ -21,11 +25,50 @@ class ProcessPlatform(FilePlatform):
     """
     Process Platform definition.
     """
+    local_executor: bool = field(default=False, metadata=dict(
+        help="Run simulations with the Python local executor instead of batch.sh"))
+    # Resources of the local executor. Simulations can override num_cores, mem and priority with tags of those names
+    max_cores: Optional[int] = field(default=None, metadata=dict(
+        help="Cores shared by the simulations of the local executor. Defaults to the cores of the machine"))
+    max_memory: Optional[int] = field(default=None, metadata=dict(
+        help="Memory (MB) shared by the simulations of the local executor. Defaults to the memory of the machine"))
+    num_cores: Optional[int] = field(default=None, metadata=dict(
+        help="Cores used by each simulation of the local executor. Defaults to ntasks"))
+    mem: Optional[int] = field(default=None, metadata=dict(
+        help="Memory (MB) used by each simulation of the local executor"))
+
+    _executor: LocalExecutor = field(**op_defaults, repr=False, init=False)
 
     def __post_init__(self):
         super().__post_init__()
         self._experiments = ProcessPlatformExperimentOperations(platform=self)
 
+    @property
+    def executor(self) -> LocalExecutor:
+        """
+        Get the local executor, created on first use.
+        Returns:
+            LocalExecutor
+        """
+        if self._executor is None:
+            self._executor = LocalExecutor(max_cores=self.max_cores, max_memory=self.max_memory,
+                                           max_jobs=1 if self.run_sequence else self.max_job)
+        return self._executor
+
+    def create_batch_file(self, item: Union[Experiment, Simulation], **kwargs) -> None:
+        """
+        Create batch file.
+        Args:
+            item: the item to build batch file for
+            kwargs: keyword arguments used to expand functionality.
+        Returns:
+            None
+        """
+        if self.local_executor and isinstance(item, Simulation):
+            # The local executor retries simulations itself
+            kwargs['retries'] = 1
+        super().create_batch_file(item, **kwargs)
+
     def submit_job(self, item: Union[Experiment, Simulation], **kwargs) -> Any:
         """
         Submit a Process job.
@@ -40,6 +83,13 @@ class ProcessPlatform(FilePlatform):
                 "\n/!\\ WARNING: The current ProcessPlatform only support running Experiment/Simulation on Linux!")
             exit(-1)
 
+        if isinstance(item, Experiment) and self.local_executor:
+            if self.modules or self.extra_packages:
+                user_logger.warning("Modules and extra packages are only set up by batch.sh, the local executor is "
+                                    "not used.")
+            else:
+                self.executor.submit(self.get_local_jobs(item, retries=kwargs.get('retries')))
+                return None
         if isinstance(item, Experiment):
             working_directory = self.get_directory(item)
             result = subprocess.run(['bash', 'batch.sh'], stdout=subprocess.PIPE, cwd=str(working_directory))
@@ -50,3 +100,67 @@ class ProcessPlatform(FilePlatform):
         else:
             raise NotImplementedError(
                 f"Submit job is not implemented for {item.__class__.__name__} on ProcessPlatform.")
+
+    def get_local_jobs(self, experiment: Experiment, retries: Optional[int] = None) -> List[LocalJob]:
+        """
+        Get the jobs of the simulations of an experiment for the local executor.
+        Args:
+            experiment: idmtools Experiment
+            retries: number of times a simulation is run before it is failed. Defaults to the platform retries
+        Returns:
+            List of LocalJob
+        """
+        jobs = []
+        for sim in experiment.simulations:
+            tags = sim.tags or {}
+            memory = tags.get('mem', self.mem)
+            jobs.append(LocalJob(sim.id, str(self.get_directory(sim)),
+                                 cores=int(tags.get('num_cores', self.num_cores or self.ntasks or 1)),
+                                 memory=None if memory is None else int(memory),
+                                 priority=int(tags.get('priority', 0)),
+                                 retries=retries or self.retries))
+        return jobs
+
+    def get_simulation_statuses(self, experiment: Experiment, sim_ids: Iterable[str] = None,
+                                **kwargs) -> Dict[str, EntityStatus]:
+        """
+        Retrieve status of all simulations of an experiment, from the local executor for the simulations it runs.
+        Args:
+            experiment: idmtools Experiment
+            sim_ids: simulation ids to look for. If None, every simulation directory is reported
+            kwargs: keyword arguments used to expand functionality
+        Returns:
+            Dict of simulation id as key and EntityStatus as value
+        """
+        if self._executor is None:
+            return super().get_simulation_statuses(experiment, sim_ids=sim_ids, **kwargs)
+        if sim_ids is None:
+            statuses = super().get_simulation_statuses(experiment, **kwargs)
+            statuses.update((sim_id, self._executor.get_status(sim_id)) for sim_id in statuses
+                            if self._executor.get_status(sim_id) is not None)
+            return statuses
+        statuses = {sim_id: self._executor.get_status(sim_id) for sim_id in sim_ids}
+        missing = [sim_id for sim_id, status in statuses.items() if status is None]
+        if missing:
+            statuses.update(super().get_simulation_statuses(experiment, sim_ids=missing, **kwargs))
+        return {sim_id: status for sim_id, status in statuses.items() if status is not None}
+
+    def wait_for_status_change(self, item: Union[Experiment, IWorkflowItem, Suite], timeout: float):
+        """
+        Wait until a simulation of the item run by the local executor changes status, or the timeout.
+        Args:
+            item: Item waited on
+            timeout: Maximum time to wait, in seconds
+        Returns:
+            None
+        """
+        if isinstance(item, Experiment):
+            sims = list(item.simulations)
+        elif isinstance(item, Suite):
+            sims = [sim for experiment in item.experiments for sim in experiment.simulations]
+        else:
+            sims = []
+        sims = [sim for sim in sims if self._executor is not None and self._executor.get_status(sim.id) is not None]
+        if not sims:
+            return super().wait_for_status_change(item, timeout)
+        self._executor.wait_for(lambda: any(self._executor.get_status(sim.id) != sim.status for sim in sims), timeout)
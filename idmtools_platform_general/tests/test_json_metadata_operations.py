@@ -3,6 +3,7 @@ from pathlib import Path
 import shutil
 import tempfile
 import unittest
+from unittest import mock
 
 from idmtools.core import ItemType
 from idmtools.core.platform_factory import Platform
@@ -396,3 +397,60 @@ class JSONMetadataOperationsTest(unittest.TestCase):
         filtered_meta_list = self.op.filter(item_type=ItemType.SIMULATION)
         # make sure match 3 simulations
         self.assertEqual(len(filtered_meta_list), 3)
+
+    def test_index_updated_by_dump(self):
+        suites, experiments, simulations = self._initialize_data(self)
+        self.assertTrue(self.op.index.index_path.exists())
+        for item in suites + experiments + simulations:
+            self.assertEqual(self.op.lookup_directory(item.id, item.item_type),
+                             Path(self.platform.get_directory(item)).absolute())
+
+    def test_filter_by_id_uses_index(self):
+        _, _, simulations = self._initialize_data(self)
+        sim = simulations[1]
+        with mock.patch.object(Path, 'glob', side_effect=AssertionError("index should be used")):
+            metas = self.op.filter(item_type=ItemType.SIMULATION, property_filter={'id': sim.id})
+            sim_dir = self.platform.get_directory_by_id(sim.id, ItemType.SIMULATION)
+        self.assertEqual(len(metas), 1)
+        self.assertEqual(metas[0]['id'], sim.id)
+        self.assertEqual(sim_dir, Path(self.platform.get_directory(sim)).absolute())
+
+    def test_rebuild_index(self):
+        suites, experiments, simulations = self._initialize_data(self)
+        self.op.index.index_path.unlink()
+        op = JSONMetadataOperations(self.platform)
+        self.assertIsNone(op.lookup_directory(simulations[0].id, ItemType.SIMULATION))
+        self.assertEqual(op.rebuild_index(), 6)
+        self.assertEqual(op.lookup_directory(simulations[0].id, ItemType.SIMULATION),
+                         Path(self.platform.get_directory(simulations[0])).absolute())
+        # another instance sees the rebuilt index
+        self.assertEqual(len(JSONMetadataOperations(self.platform).filter(
+            item_type=ItemType.EXPERIMENT, property_filter={'id': experiments[0].id})), 1)
+
+    def test_index_stale_entry_falls_back_to_search(self):
+        _, _, simulations = self._initialize_data(self)
+        sim = simulations[0]
+        sim_dir = Path(self.platform.get_directory(sim))
+        shutil.rmtree(sim_dir)
+        self.assertIsNone(self.op.lookup_directory(sim.id, ItemType.SIMULATION))
+        self.assertEqual(self.op.filter(item_type=ItemType.SIMULATION, property_filter={'id': sim.id}), [])
+
+    def test_index_not_duplicated_across_instances(self):
+        suites, experiments, simulations = self._initialize_data(self)
+        index_path = self.op.index.index_path
+        lines = index_path.read_text().splitlines()
+        self.assertEqual(len(lines), 6)
+        # other instances scanning or dumping the same items do not append them again
+        for _ in range(3):
+            op = JSONMetadataOperations(self.platform)
+            self.assertEqual(len(op.get_all(ItemType.SIMULATION)), 3)
+            op.dump(simulations[0])
+        self.assertEqual(index_path.read_text().splitlines(), lines)
+
+        # a scan indexes the items it finds with a single write
+        index_path.unlink()
+        op = JSONMetadataOperations(self.platform)
+        with mock.patch.object(op.index, 'add_many', wraps=op.index.add_many) as add_many:
+            self.assertEqual(len(op.get_all(ItemType.SIMULATION)), 3)
+        add_many.assert_called_once()
+        self.assertEqual(len(index_path.read_text().splitlines()), 3)
@@ -0,0 +1,117 @@
+import os
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+import pytest
+from idmtools.core import EntityStatus
+from idmtools_platform_process import local_executor
+from idmtools_platform_process.local_executor import LocalExecutor, LocalJob
+from idmtools_test.utils.decorators import linux_only
+
+# Records the start and end of the simulation, and fails until the attempt given in the fail file
+RUN_SCRIPT = """#!/bin/bash
+echo "$(basename $(pwd)) start" >> ../events.txt
+sleep {sleep}
+echo "$(basename $(pwd)) end" >> ../events.txt
+attempt=$(( $(cat attempts.txt 2>/dev/null || echo 0) + 1 ))
+echo $attempt > attempts.txt
+[ "$attempt" -ge {succeed_at} ]
+"""
+
+
+@pytest.mark.smoke
+@linux_only
+class TestLocalExecutor(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def create_job(self, name, sleep=0.2, succeed_at=1, **kwargs):
+        sim_dir = os.path.join(self.directory.name, name)
+        os.makedirs(sim_dir)
+        with open(os.path.join(sim_dir, '_run.sh'), 'w') as f:
+            f.write(RUN_SCRIPT.format(sleep=sleep, succeed_at=succeed_at))
+        return LocalJob(name, sim_dir, **kwargs)
+
+    def get_events(self):
+        with open(os.path.join(self.directory.name, 'events.txt')) as f:
+            return [line.split() for line in f.read().splitlines()]
+
+    def test_core_budget_and_priority(self):
+        executor = LocalExecutor(max_cores=4, max_memory=1000)
+        jobs = [self.create_job('big', cores=3), self.create_job('small1'), self.create_job('small2'),
+                self.create_job('urgent', cores=2, priority=10), self.create_job('heavy', memory=800),
+                self.create_job('heavy2', memory=800)]
+        executor.submit(jobs)
+        self.assertTrue(executor.wait(timeout=30))
+        self.assertTrue(all(job.status == EntityStatus.SUCCEEDED for job in jobs))
+        for job in jobs:
+            with open(os.path.join(job.directory, 'job_status.txt')) as f:
+                self.assertEqual(f.read(), '0')
+
+        # cores and memory in use never exceed the budget
+        resources = {job.sim_id: (job.cores, job.memory or 0) for job in jobs}
+        running = set()
+        for name, event in self.get_events():
+            if event == 'start':
+                running.add(name)
+                self.assertLessEqual(sum(resources[n][0] for n in running), 4)
+                self.assertLessEqual(sum(resources[n][1] for n in running), 1000)
+            else:
+                running.discard(name)
+        # the simulation of highest priority starts first, the big one waits for its cores
+        events = self.get_events()
+        self.assertLess(events.index(['urgent', 'end']), events.index(['big', 'start']))
+        self.assertEqual(executor._used_cores, 0)
+
+    def test_backfill_is_bounded(self):
+        executor = LocalExecutor(max_cores=2)
+        jobs = [self.create_job('small0'), self.create_job('big', cores=2)]
+        jobs += [self.create_job(f'small{i}') for i in range(1, 6)]
+        with mock.patch.object(local_executor, 'BACKFILL_LIMIT', 2):
+            executor.submit(jobs)
+            self.assertTrue(executor.wait(timeout=30))
+        self.assertTrue(all(job.status == EntityStatus.SUCCEEDED for job in jobs))
+        # two small simulations start before the big one, the others wait for it
+        starts = [name for name, event in self.get_events() if event == 'start']
+        self.assertEqual(starts[3], 'big')
+        self.assertSetEqual(set(starts[:3]), {'small0', 'small1', 'small2'})
+
+    def test_retries_and_events(self):
+        executor = LocalExecutor(max_cores=2)
+        flaky = self.create_job('flaky', sleep=0, succeed_at=2, retries=3)
+        failing = self.create_job('failing', sleep=0, succeed_at=5, retries=2)
+        executor.submit([flaky, failing])
+        self.assertTrue(executor.wait(timeout=30))
+        self.assertEqual((flaky.status, flaky.attempts), (EntityStatus.SUCCEEDED, 2))
+        self.assertEqual((failing.status, failing.attempts), (EntityStatus.FAILED, 2))
+        with open(os.path.join(failing.directory, 'job_status.txt')) as f:
+            self.assertEqual(f.read(), '-1')
+
+        # waiters are woken by the status change, not by polling
+        slow = self.create_job('slow', sleep=0.5)
+        executor.submit([slow])
+        changed = []
+        waiter = threading.Thread(target=lambda: changed.append(
+            executor.wait_for(lambda: slow.status == EntityStatus.SUCCEEDED, timeout=30)))
+        start = time.time()
+        waiter.start()
+        waiter.join()
+        self.assertEqual(changed, [True])
+        self.assertLess(time.time() - start, 10)
+
+    def test_cancel(self):
+        executor = LocalExecutor(max_cores=1)
+        jobs = [self.create_job(f'sim{i}', sleep=5) for i in range(3)]
+        executor.submit(jobs)
+        executor.wait_for(lambda: jobs[0].status == EntityStatus.RUNNING, timeout=10)
+        executor.cancel()
+        self.assertTrue(executor.wait(timeout=10))
+        self.assertTrue(all(job.status == EntityStatus.FAILED for job in jobs))
+        self.assertEqual(jobs[0].attempts, 1)
+        self.assertEqual(jobs[1].attempts, 0)
@@ -2,20 +2,25 @@ import json
 import os
 import sys
 import pathlib
+import shutil
+import tempfile
 import unittest
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
 import pandas as pd
 import pytest
 from functools import partial
 from typing import Any, Dict
 from pathlib import Path
+from unittest.mock import patch
 if sys.platform == "win32":
     from win32con import FALSE
 from idmtools.builders import SimulationBuilder
-from idmtools.core import ItemType
+from idmtools.core import ItemType, EntityStatus
 from idmtools.core.platform_factory import Platform
 from idmtools.entities import Suite
 from idmtools.entities.experiment import Experiment
+from idmtools.entities.iplatform_ops.creation_journal import CreationJournal
 from idmtools.entities.simulation import Simulation
 from idmtools.entities.templated_simulation import TemplatedSimulations
 from idmtools_models.python.json_python_task import JSONConfiguredPythonTask
@@ -218,6 +223,71 @@ class TestFilePlatform(unittest.TestCase):
         # cleanup
         os.remove(f"{experiment.id}.csv")
 
+    def test_get_simulation_statuses(self):
+        experiment = self.experiment
+        sims = experiment.simulations
+        status_file = Path(self.platform.get_directory(sims[0]), 'job_status.txt')
+        status_file.write_text('0')
+        try:
+            for max_workers in (None, 4):
+                statuses = self.platform.get_simulation_statuses(experiment, max_workers=max_workers)
+                self.assertEqual(len(statuses), 9)
+                self.assertEqual(statuses[sims[0].id], EntityStatus.SUCCEEDED)
+                for sim in sims:
+                    self.assertEqual(statuses[sim.id], self.platform.get_simulation_status(sim.id))
+            statuses = self.platform.get_simulation_statuses(experiment, sim_ids=[sims[1].id])
+            self.assertDictEqual(statuses, {sims[1].id: EntityStatus.CREATED})
+            self.platform.refresh_status(experiment)
+            self.assertEqual(sims[0].status, EntityStatus.SUCCEEDED)
+            self.assertEqual(sims[1].status, EntityStatus.CREATED)
+        finally:
+            status_file.unlink()
+
+    def test_refresh_status_with_status_workers(self):
+        experiment = self.experiment
+        sims = list(experiment.simulations)
+        expected = {sim.id: EntityStatus.CREATED for sim in sims}
+        status_files = []
+        for sim, value, status in [(sims[0], '0', EntityStatus.SUCCEEDED), (sims[1], '-1', EntityStatus.FAILED),
+                                   (sims[2], '100', EntityStatus.RUNNING)]:
+            status_file = Path(self.platform.get_directory(sim), 'job_status.txt')
+            status_file.write_text(value)
+            status_files.append(status_file)
+            expected[sim.id] = status
+        try:
+            # simulations without job_status.txt are created, ids of other experiments are ignored
+            statuses = self.platform._op_client.get_simulation_statuses(
+                experiment, sim_ids=[sims[1].id, sims[3].id, 'unknown'], max_workers=4)
+            self.assertDictEqual(statuses, {sims[1].id: EntityStatus.FAILED, sims[3].id: EntityStatus.CREATED})
+            self.assertDictEqual(self.platform._op_client.get_simulation_statuses(experiment), expected)
+
+            # refresh_status reads the status files with status_workers threads
+            self.platform.status_workers = 4
+            with patch('idmtools_platform_file.file_operations.file_operations.ThreadPoolExecutor',
+                       wraps=ThreadPoolExecutor) as pool:
+                self.platform.refresh_status(experiment)
+            pool.assert_called_once_with(max_workers=4)
+            self.assertDictEqual({sim.id: sim.status for sim in sims}, expected)
+        finally:
+            self.platform.status_workers = None
+            for status_file in status_files:
+                status_file.unlink()
+
+    def test_get_files_checksums(self):
+        sim = self.experiment.simulations[0]
+        checksums = self.platform.get_files_checksums(sim, ['config.json'])
+        st = os.stat(Path(self.platform.get_directory(sim), 'config.json'))
+        self.assertDictEqual(checksums, {'config.json': f"{st.st_size}-{st.st_mtime_ns}"})
+        self.assertIsNone(self.platform.get_files_checksums(sim, ['missing.txt']))
+
+    def test_get_local_files(self):
+        sim = self.experiment.simulations[0]
+        paths = self.platform.get_local_files(sim, ['config.json'])
+        self.assertEqual(paths['config.json'], Path(self.platform.get_directory(sim), 'config.json').absolute())
+        self.assertEqual(paths['config.json'].read_bytes(), bytes(self.platform.get_files(sim, ['config.json'])['config.json']))
+        with self.assertRaises(RuntimeError):
+            self.platform.get_local_files(sim, ['missing.txt'])
+
     def test_platform_delete_experiment(self):
         experiment = self.create_experiment(a=3, b=3)
         suite_dir = self.platform.get_directory(experiment.parent)
@@ -283,4 +353,40 @@ class TestFilePlatform(unittest.TestCase):
         simulation_assets = [asset.filename for asset in experiment.simulations[0].assets]
         self.assertEqual(set(file_simulation_assets), set(simulation_assets))
 
+    def test_resume_experiment_creation(self):
+        journal_directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, journal_directory, ignore_errors=True)
+
+        def build_experiment():
+            task = JSONConfiguredPythonTask(script_path=os.path.join(COMMON_INPUT_PATH, "python", "model3.py"),
+                                            envelope="parameters", parameters=dict(c=0))
+            builder = SimulationBuilder()
+            builder.add_sweep_definition(partial(JSONConfiguredPythonTask.set_parameter_sweep_callback, param="a"),
+                                         range(6))
+            experiment = Experiment.from_builder(builder, task, name="test_resume")
+            Suite(name='Idm Suite').add_experiment(experiment)
+            return experiment
+
+        def flaky_create(simulation, **kwargs):
+            if simulation.tags['a'] == 3:
+                raise RuntimeError("Disk full")
+            return create(simulation, **kwargs)
+
+        experiment = build_experiment()
+        create = self.platform._simulations.platform_create
+        with patch.object(self.platform._simulations, 'platform_create', side_effect=flaky_create):
+            with self.assertRaises(RuntimeError):
+                experiment.run(platform=self.platform, batch_size=2, journal_directory=journal_directory)
+        journal = CreationJournal.for_experiment(experiment, self.platform, journal_directory).load()
+        self.assertEqual(sorted(journal.created), [0, 1, 2, 4, 5])
 
+        resumed = build_experiment()
+        resumed.run(platform=self.platform, resume=True, batch_size=2, journal_directory=journal_directory)
+        self.assertEqual(resumed.id, experiment.id)
+        self.assertEqual(resumed.parent_id, experiment.parent_id)
+        self.assertFalse(os.path.exists(journal.path))
+        self.assertEqual(sorted(s.tags['a'] for s in resumed.simulations), list(range(6)))
+        children = self.platform.get_children(resumed.id, ItemType.EXPERIMENT, force=True)
+        self.assertEqual(sorted(s.tags['a'] for s in children), list(range(6)))
+        file_experiment = self.platform.get_item(resumed.id, item_type=ItemType.EXPERIMENT, force=True, raw=True)
+        self.assertEqual(len(file_experiment.simulations), 6)
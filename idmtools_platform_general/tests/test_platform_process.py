@@ -233,3 +233,20 @@ class TestProcessPlatform(ITestWithPersistence):
         with self.assertRaises(RuntimeError) as context:
             self.platform.get_item(experiment.parent_id, item_type=ItemType.SUITE, force=True)
         self.assertTrue(f"Not found Suite with id '{experiment.parent_id}'" in str(context.exception.args[0]))
+
+    def test_local_executor(self):
+        platform = Platform('PROCESS', job_directory=self.job_directory, local_executor=True, run_sequence=False,
+                            max_cores=2, retries=2)
+        experiment = self.create_experiment(platform=platform, a=3, b=2)
+        self.assertTrue(experiment.succeeded)
+        # the batch script is not run, simulations are run and followed by the executor
+        experiment_dir = platform.get_directory(experiment)
+        self.assertFalse(os.path.exists(experiment_dir.joinpath("stdout.txt")))
+        for simulation in experiment.simulations:
+            simulation_dir = platform.get_directory(simulation)
+            self.assertEqual(simulation_dir.joinpath("job_status.txt").read_text(), "0")
+            self.assertTrue(simulation_dir.joinpath("output", "result.txt").exists())
+            self.assertEqual(platform.executor.jobs[simulation.id].attempts, 1)
+            # the executor retries simulations, _run.sh runs them once
+            self.assertIn('until [ "$n" -ge 1 ]', simulation_dir.joinpath("_run.sh").read_text())
+        self.assertEqual(platform.executor.max_cores, 2)
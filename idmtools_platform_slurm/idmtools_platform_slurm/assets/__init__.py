@@ -33,7 +33,10 @@ def generate_batch(platform: 'SlurmPlatform', experiment: Experiment,
     Returns:
         None
     """
-    template_vars = dict(njobs=experiment.simulation_count)
+    # Each array task runs sims_per_task simulations
+    sims_per_task = platform.get_sims_per_task()
+    njobs = -(-experiment.simulation_count // sims_per_task)
+    template_vars = dict(njobs=njobs, sims_per_task=sims_per_task)
 
     # Set max_running_jobs
     if max_running_jobs is not None:
@@ -53,14 +56,13 @@ def generate_batch(platform: 'SlurmPlatform', experiment: Experiment,
 
     if platform._max_array_size is not None:
         if platform.array_batch_size is not None:
-            template_vars['array_batch_size'] = min(platform._max_array_size, platform.array_batch_size,
-                                                    experiment.simulation_count)
+            template_vars['array_batch_size'] = min(platform._max_array_size, platform.array_batch_size, njobs)
         else:
-            template_vars['array_batch_size'] = min(platform._max_array_size, experiment.simulation_count)
+            template_vars['array_batch_size'] = min(platform._max_array_size, njobs)
     elif platform.array_batch_size is not None:
-        template_vars['array_batch_size'] = min(platform.array_batch_size, experiment.simulation_count)
+        template_vars['array_batch_size'] = min(platform.array_batch_size, njobs)
     else:
-        template_vars['array_batch_size'] = experiment.simulation_count
+        template_vars['array_batch_size'] = njobs
 
     # Consider dependency
     if dependency is None:
@@ -109,6 +111,10 @@ def generate_script(platform: 'SlurmPlatform', experiment: Experiment, max_runni
     if max_running_jobs is None and platform.max_running_jobs is None:
         template_vars['max_running_jobs'] = 1
 
+    # Simulations packed in each array task, and how many of them run at the same time
+    template_vars['sims_per_task'] = platform.get_sims_per_task()
+    template_vars['pool_size'] = platform.get_pack_pool_size()
+
     # Add any overides. We need some validation here later
     # TODO add validation for valid config options
     template_vars.update(kwargs)
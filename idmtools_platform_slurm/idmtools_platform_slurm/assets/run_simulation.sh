@@ -1,23 +1,84 @@
 #!/usr/bin/env bash
 # Get the parameters passed from sbatch.sh
 mpi_type="$2"
+# Number of simulations run by this array task, and how many of them run at the same time
+SIMS_PER_TASK=${3:-1}
+POOL_SIZE=${4:-1}
 
-SIMULATION_INDEX=$((${SLURM_ARRAY_TASK_ID} + $1))
-JOB_DIRECTORY=$(find . -type d -maxdepth 1 -mindepth 1  | grep -v Assets | head -$SIMULATION_INDEX | tail -1)
-cd $JOB_DIRECTORY
-current_dir=$(pwd)
-echo "The script is running from: $current_dir"
+TASK_INDEX=$((${SLURM_ARRAY_TASK_ID} + $1))
+MANIFEST=simulation_index.txt
+if [ -f "$MANIFEST" ]; then
+    # All lines of the manifest have the same width, so the line of a simulation is read without scanning the file
+    WIDTH=$(head -1 "$MANIFEST" | wc -c)
+fi
+
+get_job_directory()
+{
+    if [ -f "$MANIFEST" ]; then
+        dd if="$MANIFEST" bs=$WIDTH skip=$(($1 - 1)) count=1 2>/dev/null | sed 's/ *$//'
+    else
+        find . -type d -maxdepth 1 -mindepth 1  | grep -v Assets | head -$1 | tail -1
+    fi
+}
+
+run_simulation()
+{
+    cd $1
+    current_dir=$(pwd)
+    echo "The script is running from: $current_dir"
+
+    # Run the simulation based on whether MPI is required
+    if [ "$mpi_type" = "no-mpi" ] && [ "$SIMS_PER_TASK" -gt 1 ]; then
+        # Packed simulations run inside the allocation of the task, without the startup of a job step each
+        echo "Run without MPI in packed task"
+        bash _run.sh 1> stdout.txt 2> stderr.txt
+    elif [ "$mpi_type" = "no-mpi" ]; then
+        echo "Run without MPI"
+        srun _run.sh 1> stdout.txt 2> stderr.txt
+    elif [ "$mpi_type" = "mpirun" ]; then
+        echo "Run mpirun"
+        mpirun "$current_dir"/_run.sh 1> stdout.txt 2> stderr.txt
+    elif [ "$mpi_type" = "pmi2" ] || [ "$mpi_type" = "pmix" ]; then # pmi2 or pmix
+        echo "Run MPI with $mpi_type"
+        srun --mpi=$mpi_type _run.sh 1> stdout.txt 2> stderr.txt
+    else
+        echo "Invalid MPI type: $mpi_type"
+        exit 1
+    fi
+}
 
-# Run the simulation based on whether MPI is required
-if [ "$mpi_type" = "no-mpi" ]; then
-    echo "Run without MPI"
-    srun _run.sh 1> stdout.txt 2> stderr.txt
-elif [ "$mpi_type" = "mpirun" ]; then
-    echo "Run mpirun"
-    mpirun "$current_dir"/_run.sh 1> stdout.txt 2> stderr.txt
-elif [ "$mpi_type" = "pmi2" ] || [ "$mpi_type" = "pmix" ]; then # pmi2 or pmix
-    echo "Run MPI with $mpi_type"
-    srun --mpi=$mpi_type _run.sh 1> stdout.txt 2> stderr.txt
-else
-    echo "Invalid MPI type: $mpi_type"
+if [ "$SIMS_PER_TASK" -le 1 ]; then
+    run_simulation "$(get_job_directory $TASK_INDEX)"
+    exit $?
 fi
+
+# Packed task: run the simulations FIRST to LAST of the manifest
+TOTAL=$(( $(wc -c < "$MANIFEST") / WIDTH ))
+FIRST=$(( (TASK_INDEX - 1) * SIMS_PER_TASK + 1 ))
+LAST=$(( TASK_INDEX * SIMS_PER_TASK ))
+if [ $LAST -gt $TOTAL ]; then
+    LAST=$TOTAL
+fi
+echo "Running simulations $FIRST to $LAST, $POOL_SIZE at a time"
+for (( i=FIRST; i<=LAST; i++ ))
+do
+    if [ "$POOL_SIZE" -gt 1 ]; then
+        while [ "$(jobs -rp | wc -l)" -ge "$POOL_SIZE" ]; do
+            wait -n
+        done
+        (run_simulation "$(get_job_directory $i)") &
+    else
+        (run_simulation "$(get_job_directory $i)")
+    fi
+done
+wait
+
+# The task succeeds only if all its simulations succeeded
+RESULT=0
+for (( i=FIRST; i<=LAST; i++ ))
+do
+    if [ "$(cat "$(get_job_directory $i)/job_status.txt" 2>/dev/null)" != "0" ]; then
+        RESULT=1
+    fi
+done
+exit $RESULT
@@ -25,6 +25,7 @@ if TYPE_CHECKING:
 class SlurmPlatformExperimentOperations(FilePlatformExperimentOperations):
     platform: 'SlurmPlatform'  # noqa: F821
     RUN_SIMULATION_SCRIPT_PATH = Path(__file__).parent.parent.joinpath('assets/run_simulation.sh')
+    SIMULATION_MANIFEST = 'simulation_index.txt'
 
     def platform_run_item(self, experiment: Experiment, dry_run: bool = False, **kwargs):
         """
@@ -38,10 +39,34 @@ class SlurmPlatformExperimentOperations(FilePlatformExperimentOperations):
         """
         # Ensure parent
         super().platform_run_item(experiment, **kwargs)
+        self.write_simulation_manifest(experiment)
         # Commission
         if not dry_run:
             self.platform.submit_job(experiment, **kwargs)
 
+    def write_simulation_manifest(self, experiment: Experiment) -> Path:
+        """
+        Write the directory of each simulation, in the order of the array task indices, to simulation_index.txt.
+
+        Lines are padded to the same width so run_simulation.sh reads the line of its task directly instead of listing
+        the experiment directory.
+        Args:
+            experiment: idmtools Experiment
+        Returns:
+            Path of the manifest
+        """
+        exp_dir = self.platform.get_directory(experiment)
+        names = [os.path.relpath(self.platform.get_directory(sim), exp_dir).replace('\\', '/').encode('utf-8')
+                 for sim in experiment.simulations]
+        width = max((len(name) for name in names), default=0)
+        manifest = exp_dir.joinpath(self.SIMULATION_MANIFEST)
+        # Write to a temporary file first so array tasks never read a partial manifest
+        tmp_manifest = manifest.with_name(f'.{manifest.name}.tmp')
+        with open(tmp_manifest, 'wb') as out:
+            out.writelines(name.ljust(width) + b'\n' for name in names)
+        os.replace(tmp_manifest, manifest)
+        return manifest
+
     def refresh_status(self, experiment: Experiment, **kwargs):
         """
         Refresh status of experiment.
@@ -57,9 +82,7 @@ class SlurmPlatformExperimentOperations(FilePlatformExperimentOperations):
             logger.debug(f'job_id is not available for experiment: {experiment.id}')
             return
 
-        # Refresh status for each simulation
-        for sim in experiment.simulations:
-            sim.status = self.platform.get_simulation_status(sim.id, **kwargs)
+        super().refresh_status(experiment, **kwargs)
 
     def platform_cancel(self, experiment_id: str, force: bool = True) -> None:
         """
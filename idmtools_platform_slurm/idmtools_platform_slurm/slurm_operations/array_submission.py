@@ -0,0 +1,205 @@
+"""
+Here we implement the submission of the array jobs of an experiment.
+
+Copyright 2025, Gates Foundation. All rights reserved.
+"""
+import os
+import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from logging import getLogger, DEBUG
+from pathlib import Path
+from typing import List, Optional, Tuple, Union
+
+logger = getLogger(__name__)
+user_logger = getLogger('user')
+
+JOB_ID_FILE = 'job_id.txt'
+
+
+def write_job_ids(exp_dir: Union[str, os.PathLike], job_ids: List[str]) -> None:
+    """
+    Write job_id.txt atomically, so readers never see a partially written file.
+    Args:
+        exp_dir: experiment directory
+        job_ids: array job ids, in the order of their slices
+    Returns:
+        None
+    """
+    tmp_path = os.path.join(exp_dir, f'.{JOB_ID_FILE}.tmp')
+    with open(tmp_path, 'w') as f:
+        f.writelines(f'{job_id}\n' for job_id in job_ids)
+    os.replace(tmp_path, os.path.join(exp_dir, JOB_ID_FILE))
+
+
+def get_array_slices(total_tasks: int, batch_size: int) -> List[Tuple[int, int]]:
+    """
+    Split the array tasks of an experiment into array jobs.
+    Args:
+        total_tasks: number of array tasks
+        batch_size: maximum number of tasks of an array job
+    Returns:
+        List of the tasks before each array job and its number of tasks
+    """
+    return [(start, min(batch_size, total_tasks - start)) for start in range(0, total_tasks, batch_size)]
+
+
+def submit_array_job(exp_dir: Union[str, os.PathLike], start: int, size: int, max_running_jobs: int) -> str:
+    """
+    Submit the array job of a slice of the tasks of an experiment.
+    Args:
+        exp_dir: experiment directory
+        start: number of tasks before the slice
+        size: number of tasks of the slice
+        max_running_jobs: maximum number of tasks of the array job running at once
+    Returns:
+        Array job id
+
+    Raises:
+        RuntimeError - If sbatch fails or cannot be run
+    """
+    try:
+        result = subprocess.run(['sbatch', '--parsable', f'--array=1-{size}%{max_running_jobs}', 'sbatch.sh',
+                                 str(start)], stdout=subprocess.PIPE, stderr=subprocess.PIPE, cwd=str(exp_dir),
+                                universal_newlines=True)
+    except OSError as e:
+        raise RuntimeError(f"Failed to submit array tasks {start + 1}-{start + size}: {e}") from e
+    job_id = result.stdout.strip().split(';')[0]
+    if result.returncode != 0 or not job_id:
+        raise RuntimeError(f"Failed to submit array tasks {start + 1}-{start + size}: {result.stderr.strip()}")
+    return job_id
+
+
+def count_queued_tasks(job_ids: List[str]) -> int:
+    """
+    Count the tasks of array jobs pending or running.
+    Args:
+        job_ids: array job ids
+    Returns:
+        Number of tasks in the queue
+    """
+    try:
+        result = subprocess.run(['squeue', '-h', '-r', '-j', ','.join(job_ids), '-o', '%i'], stdout=subprocess.PIPE,
+                                stderr=subprocess.PIPE, universal_newlines=True)
+    except OSError:
+        logger.debug("squeue is not available")
+        return 0
+    if result.returncode != 0:
+        # squeue fails when none of the jobs is known anymore
+        logger.debug(f"squeue failed: {result.stderr.strip()}")
+        return 0
+    return len(result.stdout.split())
+
+
+class ArraySubmitter:
+    """
+    Submit the array jobs of an experiment from Python.
+
+    Array jobs are independent of each other, so a failing task does not hold the ones of the next array jobs. Without
+    a limit on the queued tasks, all array jobs are submitted at once with parallel sbatch calls. With a limit, array
+    jobs are submitted while the tasks in the queue stay within the limit, and the others by a background thread as
+    tasks leave the queue. job_id.txt is rewritten atomically after each submission.
+
+    The background thread is not a daemon: the Python process does not exit before the last array job is submitted,
+    and the array jobs not submitted yet are lost if the process is killed.
+    """
+
+    def __init__(self, exp_dir: Union[str, os.PathLike], total_tasks: int, batch_size: int, max_running_jobs: int,
+                 max_queued_tasks: Optional[int] = None, refresh_interval: float = 5, workers: int = 8):
+        """
+        Constructor.
+        Args:
+            exp_dir: experiment directory
+            total_tasks: number of array tasks of the experiment
+            batch_size: maximum number of tasks of an array job
+            max_running_jobs: maximum number of tasks of each array job running at once
+            max_queued_tasks: maximum number of tasks pending or running. None submits all array jobs at once. With a
+                limit, the process keeps running until the last array job is submitted
+            refresh_interval: seconds between two checks of the queue when tasks are throttled
+            workers: number of sbatch calls made at once
+        """
+        self.exp_dir = Path(exp_dir)
+        self.slices = get_array_slices(total_tasks, batch_size)
+        self.max_running_jobs = max_running_jobs
+        self.max_queued_tasks = max_queued_tasks
+        self.refresh_interval = refresh_interval
+        self.workers = workers
+        self.job_ids: List[str] = []
+        self.thread: Optional[threading.Thread] = None
+
+    def submit(self) -> List[str]:
+        """
+        Submit the array jobs, or the first of them when the queued tasks are limited.
+        Returns:
+            Ids of the array jobs submitted
+
+        Raises:
+            RuntimeError - If sbatch fails. The array jobs already submitted are cancelled
+        """
+        if self.max_queued_tasks is None:
+            self._submit_slices(self.slices)
+        else:
+            self._submit_next(queued=0)
+            if len(self.job_ids) < len(self.slices):
+                # Not a daemon: the remaining array jobs are submitted even if the script is done
+                self.thread = threading.Thread(target=self._throttle, name=f'ArraySubmitter-{self.exp_dir.name}')
+                self.thread.start()
+        return list(self.job_ids)
+
+    def _submit_slices(self, slices: List[Tuple[int, int]]) -> None:
+        """
+        Submit array jobs with parallel sbatch calls and record them.
+        Args:
+            slices: tasks before each array job and its number of tasks
+        Returns:
+            None
+        """
+        with ThreadPoolExecutor(max_workers=max(1, min(self.workers, len(slices)))) as pool:
+            futures = [pool.submit(submit_array_job, self.exp_dir, start, size, self.max_running_jobs)
+                       for start, size in slices]
+        job_ids, errors = [], []
+        for future in futures:
+            try:
+                job_ids.append(future.result())
+            except RuntimeError as e:
+                errors.append(e)
+        if errors:
+            if job_ids:
+                subprocess.run(['scancel', *job_ids], stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+            raise errors[0]
+        # Job ids are recorded in the order of their slices, the status of tasks relies on it
+        self.job_ids.extend(job_ids)
+        write_job_ids(self.exp_dir, self.job_ids)
+        if logger.isEnabledFor(DEBUG):
+            logger.debug(f"Submitted array jobs {job_ids} in {self.exp_dir}")
+
+    def _submit_next(self, queued: int) -> None:
+        """
+        Submit the next array jobs that fit within the limit of queued tasks, or the next one if the queue is empty.
+        Args:
+            queued: number of tasks in the queue
+        Returns:
+            None
+        """
+        slices = []
+        for start, size in self.slices[len(self.job_ids):]:
+            if queued > 0 and queued + size > self.max_queued_tasks:
+                break
+            slices.append((start, size))
+            queued += size
+        if slices:
+            self._submit_slices(slices)
+
+    def _throttle(self) -> None:
+        """
+        Submit the remaining array jobs as tasks leave the queue.
+        Returns:
+            None
+        """
+        try:
+            while len(self.job_ids) < len(self.slices):
+                time.sleep(self.refresh_interval)
+                self._submit_next(count_queued_tasks(self.job_ids))
+        except RuntimeError as e:
+            user_logger.error(f"Stopped submitting the array jobs of {self.exp_dir}: {e}")
@@ -0,0 +1,170 @@
+"""
+Here we implement the status of Slurm array jobs read from the scheduler.
+
+Copyright 2025, Gates Foundation. All rights reserved.
+"""
+import re
+import subprocess
+import time
+from logging import getLogger, DEBUG
+from threading import Lock
+from typing import Dict, Iterable, List, Optional, Tuple
+from idmtools.core import EntityStatus
+
+logger = getLogger(__name__)
+
+# Slurm job states, see https://slurm.schedmd.com/squeue.html#SECTION_JOB-STATE-CODES
+SLURM_STATE_MAPS = {
+    'PENDING': EntityStatus.CREATED,
+    'REQUEUED': EntityStatus.CREATED,
+    'REQUEUE_FED': EntityStatus.CREATED,
+    'REQUEUE_HOLD': EntityStatus.CREATED,
+    'RUNNING': EntityStatus.RUNNING,
+    'CONFIGURING': EntityStatus.RUNNING,
+    'COMPLETING': EntityStatus.RUNNING,
+    'RESIZING': EntityStatus.RUNNING,
+    'SUSPENDED': EntityStatus.RUNNING,
+    'STOPPED': EntityStatus.RUNNING,
+    'SIGNALING': EntityStatus.RUNNING,
+    'STAGE_OUT': EntityStatus.RUNNING,
+    'COMPLETED': EntityStatus.SUCCEEDED,
+    'FAILED': EntityStatus.FAILED,
+    'CANCELLED': EntityStatus.FAILED,
+    'TIMEOUT': EntityStatus.FAILED,
+    'NODE_FAIL': EntityStatus.FAILED,
+    'OUT_OF_MEMORY': EntityStatus.FAILED,
+    'BOOT_FAIL': EntityStatus.FAILED,
+    'DEADLINE': EntityStatus.FAILED,
+    'PREEMPTED': EntityStatus.FAILED,
+    'SPECIAL_EXIT': EntityStatus.FAILED,
+    'REVOKED': EntityStatus.FAILED
+}
+
+# Array task (123_4) or range of pending array tasks (123_[4-10%2])
+ARRAY_TASK_PATTERN = re.compile(r'^(\d+)_(?:(\d+)|\[([0-9,\-]+)(?:%\d+)?\])$')
+
+
+def parse_array_tasks(job_id: str) -> Tuple[Optional[str], List[int]]:
+    """
+    Parse the job id of array tasks reported by sacct or squeue.
+    Args:
+        job_id: job id, like 123_4 or 123_[4-10%2] for tasks still pending
+    Returns:
+        Array job id and task ids, or None and no task for jobs that are not array tasks
+    """
+    match = ARRAY_TASK_PATTERN.match(job_id.strip())
+    if match is None:
+        return None, []
+    array_job_id, task_id, task_ranges = match.groups()
+    if task_id is not None:
+        return array_job_id, [int(task_id)]
+    task_ids = []
+    for task_range in task_ranges.split(','):
+        first, _, last = task_range.partition('-')
+        task_ids.extend(range(int(first), int(last or first) + 1))
+    return array_job_id, task_ids
+
+
+def parse_job_states(output: str) -> Dict[Tuple[str, int], EntityStatus]:
+    """
+    Parse job id and state lines, separated by '|', into the status of each array task.
+    Args:
+        output: output of sacct or squeue
+    Returns:
+        Dict of (array job id, task id) as key and EntityStatus as value
+    """
+    statuses = {}
+    for line in output.splitlines():
+        job_id, _, state = line.partition('|')
+        array_job_id, task_ids = parse_array_tasks(job_id)
+        # The state of cancelled jobs reads like 'CANCELLED by 1234'
+        state = state.strip().split(' ')[0].rstrip('+')
+        if array_job_id is None or state not in SLURM_STATE_MAPS:
+            continue
+        for task_id in task_ids:
+            statuses[(array_job_id, task_id)] = SLURM_STATE_MAPS[state]
+    return statuses
+
+
+class SlurmJobStatusPoller:
+    """
+    Read the status of all tasks of array jobs with one scheduler call, and cache it for a polling interval.
+
+    sacct is asked first since it reports finished tasks too. When accounting is not available, squeue reports the
+    tasks still pending or running.
+    """
+
+    def __init__(self, cache_seconds: float = 5):
+        """
+        Constructor.
+        Args:
+            cache_seconds: how long the status of jobs is reused before the scheduler is asked again
+        """
+        self.cache_seconds = cache_seconds
+        self._cache: Dict[Tuple[str, ...], Tuple[float, Dict[Tuple[str, int], EntityStatus]]] = dict()
+        self._lock = Lock()
+
+    def get_task_statuses(self, job_ids: Iterable[str]) -> Dict[Tuple[str, int], EntityStatus]:
+        """
+        Get the status of the tasks of array jobs.
+        Args:
+            job_ids: array job ids
+        Returns:
+            Dict of (array job id, task id) as key and EntityStatus as value. Tasks the scheduler does not report
+            are missing
+        """
+        key = tuple(sorted(set(str(job_id) for job_id in job_ids)))
+        if not key:
+            return {}
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None and time.monotonic() - cached[0] < self.cache_seconds:
+                return cached[1]
+            statuses = self._query(key)
+            self._cache[key] = (time.monotonic(), statuses)
+            return statuses
+
+    def clear(self):
+        """
+        Forget the status of all jobs.
+        Returns:
+            None
+        """
+        with self._lock:
+            self._cache.clear()
+
+    @staticmethod
+    def _run(command: List[str]) -> Optional[str]:
+        """
+        Run a scheduler command.
+        Args:
+            command: command and arguments
+        Returns:
+            Output of the command, or None if it failed
+        """
+        try:
+            result = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True)
+        except OSError:
+            logger.debug(f"{command[0]} is not available")
+            return None
+        if result.returncode != 0:
+            logger.debug(f"{command[0]} failed: {result.stderr.strip()}")
+            return None
+        return result.stdout
+
+    def _query(self, job_ids: Tuple[str, ...]) -> Dict[Tuple[str, int], EntityStatus]:
+        """
+        Ask the scheduler for the status of array jobs.
+        Args:
+            job_ids: array job ids
+        Returns:
+            Dict of (array job id, task id) as key and EntityStatus as value
+        """
+        joined = ','.join(job_ids)
+        output = self._run(['sacct', '-n', '-P', '-X', '-j', joined, '-o', 'JobID,State'])
+        if output is None:
+            output = self._run(['squeue', '-h', '-r', '-j', joined, '-o', '%i|%T'])
+        statuses = parse_job_states(output or '')
+        if logger.isEnabledFor(DEBUG):
+            logger.debug(f"Scheduler reported {len(statuses)} array tasks of jobs {joined}")
+        return statuses
@@ -3,15 +3,20 @@ Here we implement the Slurm Operations.
 
 Copyright 2025, Gates Foundation. All rights reserved.
 """
+import os
+import re
 import subprocess
 from dataclasses import dataclass, field
 from logging import getLogger
-from typing import Union, List, Any, Type
+from typing import Union, List, Any, Type, Dict, Iterable
 
+from idmtools.core import EntityStatus
 from idmtools.entities.experiment import Experiment
 from idmtools.entities.simulation import Simulation
 from idmtools_platform_file.file_operations.file_operations import FileOperations
 from idmtools_platform_slurm.assets import generate_batch, generate_script, generate_simulation_script
+from idmtools_platform_slurm.slurm_operations.array_submission import ArraySubmitter
+from idmtools_platform_slurm.slurm_operations.job_status import SlurmJobStatusPoller
 
 
 logger = getLogger(__name__)
@@ -22,6 +27,14 @@ class SlurmOperations(FileOperations):
 
     platform: 'SlurmPlatform'  # noqa: F821
     platform_type: Type = field(default=None)
+    status_poller: SlurmJobStatusPoller = field(default=None, repr=False, compare=False)
+
+    def __post_init__(self):
+        if self.status_poller is None:
+            cache_seconds = self.platform.status_cache_seconds
+            if cache_seconds is None:
+                cache_seconds = self.platform.refresh_interval
+            self.status_poller = SlurmJobStatusPoller(cache_seconds=cache_seconds)
 
     def create_batch_file(self, item: Union[Experiment, Simulation], max_running_jobs: int = None, retries: int = None,
                           array_batch_size: int = None, dependency: bool = True, **kwargs) -> None:
@@ -41,6 +54,29 @@ class SlurmOperations(FileOperations):
         else:
             raise NotImplementedError(f"{item.__class__.__name__} is not supported for batch creation.")
 
+    def submit_experiment(self, experiment: Experiment, max_queued_tasks: int = None) -> Union[ArraySubmitter, None]:
+        """
+        Submit the array jobs of an experiment, following the plan of its batch.sh.
+
+        The array jobs are independent, they do not wait on each other. Experiments whose batch.sh does not set the
+        tasks to submit (custom templates) are submitted by running their batch.sh.
+        Args:
+            experiment: idmtools Experiment
+            max_queued_tasks: maximum number of tasks pending or running. None submits all array jobs at once
+        Returns:
+            The ArraySubmitter, or None if batch.sh was run
+        """
+        exp_dir = self.get_directory(experiment)
+        batch_variables = self.get_batch_variables(exp_dir)
+        if 'total_tasks' not in batch_variables or 'batch_size' not in batch_variables:
+            subprocess.run(['bash', 'batch.sh'], stdout=subprocess.PIPE, cwd=str(exp_dir))
+            return None
+        submitter = ArraySubmitter(exp_dir, batch_variables['total_tasks'], batch_variables['batch_size'],
+                                   batch_variables.get('max_jobs', 1), max_queued_tasks=max_queued_tasks,
+                                   refresh_interval=self.platform.refresh_interval)
+        submitter.submit()
+        return submitter
+
     @staticmethod
     def cancel_job(job_ids: Union[str, List[str]]) -> Any:
         """
@@ -56,3 +92,94 @@ class SlurmOperations(FileOperations):
         result = subprocess.run(['scancel', *job_ids], stdout=subprocess.PIPE)
         stdout = "Success" if result.returncode == 0 else 'Error'
         return stdout
+
+    def get_simulation_statuses(self, experiment: Experiment, sim_ids: Iterable[str] = None,
+                                **kwargs) -> Dict[str, EntityStatus]:
+        """
+        Retrieve status of all simulations of an experiment, from the scheduler when it reports them.
+
+        Simulations the scheduler does not report are read from their job_status.txt files.
+        Args:
+            experiment: idmtools Experiment
+            sim_ids: simulation ids to look for. If None, every simulation directory is reported
+            kwargs: keyword arguments used to expand functionality
+        Returns:
+            Dict of simulation id as key and EntityStatus as value
+        """
+        statuses = {}
+        if self.platform.status_source == 'scheduler':
+            statuses = self.get_scheduler_statuses(experiment, sim_ids=sim_ids)
+        if sim_ids is None:
+            file_statuses = super().get_simulation_statuses(experiment, **kwargs)
+        else:
+            missing = [sim_id for sim_id in sim_ids if sim_id not in statuses]
+            if not missing:
+                return statuses
+            file_statuses = super().get_simulation_statuses(experiment, sim_ids=missing, **kwargs)
+        file_statuses.update(statuses)
+        return file_statuses
+
+    def get_scheduler_statuses(self, experiment: Experiment, sim_ids: Iterable[str] = None) -> Dict[str, EntityStatus]:
+        """
+        Retrieve status of simulations of an experiment with one sacct (or squeue) call for all its array jobs.
+
+        Array tasks are matched to simulations with the job ids in job_id.txt, the batch size and simulations per task
+        in batch.sh and the simulation manifest of the experiment. A packed task reports the state of all its
+        simulations only while it is pending or once it completed, the simulations of running or failed packed tasks
+        are read from their files.
+        Args:
+            experiment: idmtools Experiment
+            sim_ids: simulation ids to look for. If None, every simulation reported is returned
+        Returns:
+            Dict of simulation id as key and EntityStatus as value, for the simulations the scheduler reports
+        """
+        exp_dir = self.get_directory(experiment)
+        try:
+            with open(exp_dir.joinpath('job_id.txt')) as f:
+                job_ids = f.read().split()
+            with open(exp_dir.joinpath(self.platform._experiments.SIMULATION_MANIFEST), 'rb') as f:
+                names = [line.decode('utf-8').rstrip() for line in f.read().splitlines()]
+        except FileNotFoundError:
+            logger.debug(f"Experiment {experiment.id} has no Slurm jobs or simulation manifest")
+            return {}
+        batch_variables = self.get_batch_variables(exp_dir)
+        sims_per_task = batch_variables.get('sims_per_task', 1)
+        batch_size = batch_variables.get('batch_size')
+        if batch_size is None:
+            if len(job_ids) > 1:
+                return {}
+            batch_size = len(names)
+
+        wanted = None if sim_ids is None else set(sim_ids)
+        offsets = {job_id: i * batch_size for i, job_id in enumerate(job_ids)}
+        statuses = {}
+        for (job_id, task_id), status in self.status_poller.get_task_statuses(job_ids).items():
+            if job_id not in offsets:
+                continue
+            if sims_per_task > 1 and status not in (EntityStatus.CREATED, EntityStatus.SUCCEEDED):
+                continue
+            first = (offsets[job_id] + task_id - 1) * sims_per_task
+            for name in names[max(0, first):first + sims_per_task]:
+                # Simulation directory is either '<id>' or '<name>_<id>'
+                sim_id = name
+                if wanted is None or sim_id not in wanted:
+                    sim_id = sim_id.rsplit('_', 1)[-1]
+                    if wanted is not None and sim_id not in wanted:
+                        continue
+                statuses[sim_id] = status
+        return statuses
+
+    @staticmethod
+    def get_batch_variables(exp_dir: Union[str, os.PathLike]) -> Dict[str, int]:
+        """
+        Get the integer variables set in the batch.sh of an experiment, like batch_size and sims_per_task.
+        Args:
+            exp_dir: experiment directory
+        Returns:
+            Dict of variable name as key and value
+        """
+        try:
+            with open(os.path.join(exp_dir, 'batch.sh')) as f:
+                return {name: int(value) for name, value in re.findall(r'^(\w+)=(\d+)$', f.read(), re.MULTILINE)}
+        except FileNotFoundError:
+            return {}
@@ -3,7 +3,6 @@ Here we implement the SlurmPlatform object.
 
 Copyright 2025, Gates Foundation. All rights reserved.
 """
-import subprocess
 from typing import Optional, Any, Dict, List, Union, Literal
 from dataclasses import dataclass, field, fields
 from logging import getLogger
@@ -102,6 +101,40 @@ class SlurmPlatform(FilePlatform):
     mpi_type: Optional[Literal['pmi2', 'pmix', 'mpirun']] = field(default="pmi2", metadata=dict(sbatch=True,
                                                                                                 help="MPI types ('pmi2', 'pmix' for slurm MPI, 'mpirun' for independently MPI)"))
 
+    # number of simulations run by each array task. Packing short simulations saves the scheduling and job step
+    # startup of each of them. When None, it is derived from sim_runtime, or each simulation is its own task
+    sims_per_task: Optional[int] = field(default=None, metadata=dict(sbatch=False,
+                                                                     help="Number of simulations run by each task"))
+
+    # estimated runtime of a simulation in seconds, used to pack enough simulations to run a task for task_runtime
+    sim_runtime: Optional[float] = field(default=None, metadata=dict(sbatch=False,
+                                                                     help="Estimated simulation runtime (seconds)"))
+
+    # target runtime of a packed array task in seconds, keep it below the time limit of the jobs
+    task_runtime: float = field(default=1800, metadata=dict(sbatch=False,
+                                                            help="Target runtime of packed tasks (seconds)"))
+
+    # run the simulations packed in a task in parallel, cpus_per_task at a time, instead of one after the other
+    pack_parallel: bool = field(default=False, metadata=dict(sbatch=False,
+                                                             help="Run packed simulations in parallel"))
+
+    # maximum number of array tasks pending or running. Further array jobs are submitted as tasks leave the queue, by a
+    # thread that keeps the Python process alive until the last one is submitted. Those not submitted yet are lost if
+    # the process is killed
+    max_queued_tasks: Optional[int] = field(default=None, metadata=dict(sbatch=False,
+                                                                        help="Maximum number of tasks queued"))
+
+    # where simulation status is read from: 'scheduler' asks sacct/squeue for all array tasks at once and reads
+    # job_status.txt only for simulations the scheduler does not report, 'file' always reads job_status.txt
+    status_source: Literal['scheduler', 'file'] = field(default='scheduler', repr=False, compare=False,
+                                                        metadata=dict(sbatch=False,
+                                                                      help="Status source ('scheduler' or 'file')"))
+
+    # how long the scheduler status is reused before sacct is called again. Defaults to refresh_interval
+    status_cache_seconds: Optional[float] = field(default=None, repr=False, compare=False,
+                                                  metadata=dict(sbatch=False,
+                                                                help="Seconds the scheduler status is cached"))
+
     # endregion
 
     _suites: SlurmPlatformSuiteOperations = field(**op_defaults, repr=False, init=False)
@@ -123,6 +156,9 @@ class SlurmPlatform(FilePlatform):
         if self.mpi_type.lower() not in {'pmi2', 'pmix', 'mpirun'}:
             raise ValueError(f"Invalid mpi_type '{self.mpi_type}'. Allowed values are 'pmi2', 'pmix', or 'mpirun'.")
 
+        if self.status_source not in {'scheduler', 'file'}:
+            raise ValueError(f"Invalid status_source '{self.status_source}'. Allowed values are 'scheduler' or 'file'.")
+
         # check if run script as a slurm job
         r = run_script_on_slurm(self, run_on_slurm=self.run_on_slurm)
         if r:
@@ -168,6 +204,29 @@ class SlurmPlatform(FilePlatform):
         """
         self._op_client.create_batch_file(item, **kwargs)
 
+    def get_pack_pool_size(self) -> int:
+        """
+        Get the number of simulations of a packed task running at the same time.
+        Returns:
+            cpus_per_task when pack_parallel is set, 1 otherwise
+        """
+        return max(1, self.cpus_per_task or 1) if self.pack_parallel else 1
+
+    def get_sims_per_task(self) -> int:
+        """
+        Get the number of simulations run by each array task.
+
+        sims_per_task is used when set. Otherwise, with a runtime estimate in sim_runtime, each task gets the
+        simulations its pool runs in task_runtime.
+        Returns:
+            Number of simulations per array task
+        """
+        if self.sims_per_task is not None:
+            return max(1, int(self.sims_per_task))
+        if self.sim_runtime:
+            return max(1, int(self.task_runtime // self.sim_runtime)) * self.get_pack_pool_size()
+        return 1
+
     def get_job_id(self, item_id: str, item_type: ItemType) -> List:
         """
         Retrieve the job id for item that had been run.
@@ -199,8 +258,8 @@ class SlurmPlatform(FilePlatform):
             None
         """
         if isinstance(item, Experiment):
-            working_directory = self.get_directory(item)
-            subprocess.run(['bash', 'batch.sh'], stdout=subprocess.PIPE, cwd=str(working_directory))
+            self._op_client.submit_experiment(item, max_queued_tasks=kwargs.get('max_queued_tasks',
+                                                                                self.max_queued_tasks))
         elif isinstance(item, Simulation):
             pass
         else:
@@ -42,6 +42,7 @@ def verify_result(self, suite):
                               pathlib.Path(experiment_path_prefix + "run_simulation.sh"),
                               pathlib.Path(experiment_path_prefix + "sbatch.sh"),
                               pathlib.Path(experiment_path_prefix + "batch.sh"),
+                              pathlib.Path(experiment_path_prefix + "simulation_index.txt"),
                               pathlib.Path(experiment_path_prefix + "tags.json")])
         self.assertSetEqual(set(experiment_files), expected_files)
         # Verify all sub directories under experiment
@@ -54,12 +55,13 @@ def verify_result_experiment(self, experiment):
     experiment_dir = self.platform.get_directory(experiment)
     experiment_sub_dirs, experiment_files = get_dirs_and_files(self, experiment_dir)
     # Verify all files under experiment
-    self.assertTrue(len(experiment_files) == 5)
+    self.assertTrue(len(experiment_files) == 6)
     experiment_path_prefix = str(experiment_dir) + "/"
     expected_files = set([pathlib.Path(experiment_path_prefix + "metadata.json"),
                           pathlib.Path(experiment_path_prefix + "run_simulation.sh"),
                           pathlib.Path(experiment_path_prefix + "sbatch.sh"),
                           pathlib.Path(experiment_path_prefix + "batch.sh"),
+                          pathlib.Path(experiment_path_prefix + "simulation_index.txt"),
                           pathlib.Path(experiment_path_prefix + "tags.json")
                           ])
     self.assertSetEqual(set(experiment_files), expected_files)
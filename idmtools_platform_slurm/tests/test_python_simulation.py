@@ -72,7 +72,8 @@ class TestPythonSimulation(ITestWithPersistence):
         for (dirpath, dirnames, filenames) in os.walk(experiment_dir):
             files.extend(filenames)
             break
-        self.assertSetEqual(set(files), set(["metadata.json", "run_simulation.sh", "sbatch.sh", "batch.sh", "tags.json"]))
+        self.assertSetEqual(set(files), set(["metadata.json", "run_simulation.sh", "sbatch.sh", "batch.sh", "tags.json",
+                                                  "simulation_index.txt"]))
 
         # verify all files under simulations
         self.assertEqual(experiment.simulation_count, 9)
@@ -102,13 +103,17 @@ class TestPythonSimulation(ITestWithPersistence):
         self.assertIn("#SBATCH --open-mode=append", contents)
         self.assertIn("bash run_simulation.sh", contents)
 
+        # verify batch.sh chains array jobs without waiting for their success, a failed simulation fails its task
+        with open(os.path.join(experiment_dir, 'batch.sh'), 'r') as fpr:
+            contents = fpr.read()
+        self.assertIn("--dependency=afterany:$job_id", contents)
+        self.assertNotIn("afterok", contents)
+
         # verify run_simulation.sh script content in experiment level
         with open(os.path.join(experiment_dir, 'run_simulation.sh'), 'r') as fpr:
             contents = fpr.read()
-        self.assertIn(
-            "JOB_DIRECTORY=$(find . -type d -maxdepth 1 -mindepth 1  | grep -v Assets | head -$SIMULATION_INDEX | tail -1)",
-            contents)
-        self.assertIn("JOB_DIRECTORY", contents)
+        self.assertIn("find . -type d -maxdepth 1 -mindepth 1  | grep -v Assets | head -$1 | tail -1", contents)
+        self.assertIn('run_simulation "$(get_job_directory $TASK_INDEX)"', contents)
         self.assertIn("srun _run.sh 1> stdout.txt 2> stderr.txt", contents)
 
         # verify _run.sh script content under simulation level
@@ -1,4 +1,5 @@
 import os
+import subprocess
 import tempfile
 from functools import partial
 from pathlib import Path
@@ -12,6 +13,7 @@ from idmtools.entities.experiment import Experiment
 from idmtools.entities.simulation import Simulation
 from idmtools_models.python.json_python_task import JSONConfiguredPythonTask
 from idmtools_platform_file.platform_operations.utils import FileExperiment, FileSimulation, add_dummy_suite
+from idmtools_platform_slurm.slurm_operations.job_status import parse_array_tasks
 from idmtools_test import COMMON_INPUT_PATH
 from idmtools_test.utils.decorators import linux_only
 from idmtools_test.utils.itest_with_persistence import ITestWithPersistence
@@ -246,3 +248,166 @@ class TestSlurmPlatform(ITestWithPersistence):
         assets = my_exp.assets
         self.assertEqual(2, len(assets))
         self.assertEqual(set([asset.filename for asset in assets]), set(['model1.py', 'test.txt']))
+
+    def test_simulation_manifest(self):
+        exp_dir = self.platform.get_directory(self.exp)
+        with open(exp_dir.joinpath('simulation_index.txt'), 'rb') as manifest:
+            lines = manifest.read().split(b'\n')[:-1]
+        self.assertEqual(len(set(len(line) for line in lines)), 1)
+        self.assertEqual([line.decode().rstrip() for line in lines],
+                         [os.path.relpath(self.platform.get_directory(sim), exp_dir) for sim in self.exp.simulations])
+
+        # Each array task finds its simulation directory from the manifest
+        with tempfile.TemporaryDirectory() as bin_dir:
+            srun = Path(bin_dir, 'srun')
+            srun.write_text('#!/bin/bash\npwd > task_dir.txt\n')
+            srun.chmod(0o755)
+            env = dict(os.environ, PATH=f'{bin_dir}{os.pathsep}{os.environ["PATH"]}')
+            for task_id, sim in enumerate(self.exp.simulations, start=1):
+                subprocess.run(['bash', 'run_simulation.sh', '0', 'no-mpi'], cwd=exp_dir,
+                               env=dict(env, SLURM_ARRAY_TASK_ID=str(task_id)), check=True, stdout=subprocess.PIPE)
+                sim_dir = self.platform.get_directory(sim)
+                self.assertEqual(sim_dir.joinpath('task_dir.txt').read_text().strip(), str(sim_dir.resolve()))
+
+    def test_scheduler_status(self):
+        self.assertEqual(parse_array_tasks('123_4'), ('123', [4]))
+        self.assertEqual(parse_array_tasks('123_[1-3,7%2]'), ('123', [1, 2, 3, 7]))
+        self.assertEqual(parse_array_tasks('123.batch'), (None, []))
+
+        exp_dir = self.platform.get_directory(self.exp)
+        exp_dir.joinpath('job_id.txt').write_text('111\n222\n')
+        exp_dir.joinpath('batch.sh').write_text('batch_size=1\n')
+        sim_ids = [sim.id for sim in self.exp.simulations]
+        with tempfile.TemporaryDirectory() as bin_dir:
+            # sacct reports the first simulation only, the second one is read from its job_status.txt
+            sacct = Path(bin_dir, 'sacct')
+            sacct.write_text('#!/bin/bash\n'
+                             f'echo "$@" >> {bin_dir}/calls.txt\n'
+                             'echo "111_1|CANCELLED by 1000"\n'
+                             'echo "333_[1-4%2]|PENDING"\n')
+            sacct.chmod(0o755)
+            self.platform.get_directory(self.exp.simulations[1]).joinpath('job_status.txt').write_text('0')
+            path = os.environ['PATH']
+            os.environ['PATH'] = f'{bin_dir}{os.pathsep}{path}'
+            try:
+                statuses = self.platform.get_simulation_statuses(self.exp, sim_ids=sim_ids)
+                self.assertEqual(statuses, {sim_ids[0]: EntityStatus.FAILED, sim_ids[1]: EntityStatus.SUCCEEDED})
+                # the status of the array jobs is cached for the polling interval
+                self.platform.refresh_status(self.exp)
+                self.assertEqual([sim.status for sim in self.exp.simulations],
+                                 [EntityStatus.FAILED, EntityStatus.SUCCEEDED])
+                calls = Path(bin_dir, 'calls.txt').read_text().splitlines()
+                self.assertEqual(len(calls), 1)
+                self.assertIn('-j 111,222', calls[0])
+
+                # squeue reports the tasks still running when accounting is not available
+                sacct.write_text('#!/bin/bash\nexit 1\n')
+                squeue = Path(bin_dir, 'squeue')
+                squeue.write_text('#!/bin/bash\necho "111_1|RUNNING"\necho "222_1|PENDING"\n')
+                squeue.chmod(0o755)
+                self.platform._op_client.status_poller.clear()
+                statuses = self.platform.get_simulation_statuses(self.exp, sim_ids=sim_ids)
+                self.assertEqual(statuses, {sim_ids[0]: EntityStatus.RUNNING, sim_ids[1]: EntityStatus.CREATED})
+            finally:
+                os.environ['PATH'] = path
+
+    def test_job_packing(self):
+        platform = Platform('SLURM_LOCAL', job_directory=self.job_directory, sim_runtime=10, task_runtime=100,
+                            pack_parallel=True, cpus_per_task=4)
+        self.assertEqual(platform.get_sims_per_task(), 40)
+        platform = Platform('SLURM_LOCAL', job_directory=self.job_directory, sims_per_task=2, pack_parallel=True,
+                            cpus_per_task=2)
+        _, exp = self.create_experiment(platform)
+        exp_dir = platform.get_directory(exp)
+        # both simulations are run by a single array task, two at a time
+        batch = exp_dir.joinpath('batch.sh').read_text()
+        self.assertIn('total_tasks=1\n', batch)
+        self.assertIn('sims_per_task=2\n', batch)
+        self.assertIn('pool_size=2\n', exp_dir.joinpath('sbatch.sh').read_text())
+
+        def run_task():
+            return subprocess.run(['bash', 'run_simulation.sh', '0', 'no-mpi', '2', '2'], cwd=exp_dir,
+                                  env=dict(os.environ, SLURM_ARRAY_TASK_ID='1'), stdout=subprocess.PIPE).returncode
+
+        sim_dirs = [platform.get_directory(sim) for sim in exp.simulations]
+        for sim_dir in sim_dirs:
+            sim_dir.joinpath('_run.sh').write_text('#!/bin/bash\npwd > task_dir.txt\necho "0" > job_status.txt\n')
+        self.assertEqual(run_task(), 0)
+        for sim_dir in sim_dirs:
+            self.assertEqual(sim_dir.joinpath('task_dir.txt').read_text().strip(), str(sim_dir.resolve()))
+        # the task fails when one of its simulations fails
+        sim_dirs[1].joinpath('_run.sh').write_text('#!/bin/bash\necho "-1" > job_status.txt\nexit 1\n')
+        self.assertEqual(run_task(), 1)
+
+        # the state of a packed task applies to all its simulations once it completed
+        exp_dir.joinpath('job_id.txt').write_text('111\n')
+        sim_ids = [sim.id for sim in exp.simulations]
+        with tempfile.TemporaryDirectory() as bin_dir:
+            sacct = Path(bin_dir, 'sacct')
+            sacct.write_text('#!/bin/bash\necho "111_1|COMPLETED"\n')
+            sacct.chmod(0o755)
+            path = os.environ['PATH']
+            os.environ['PATH'] = f'{bin_dir}{os.pathsep}{path}'
+            try:
+                self.assertEqual(platform._op_client.get_scheduler_statuses(exp, sim_ids=sim_ids),
+                                 {sim_id: EntityStatus.SUCCEEDED for sim_id in sim_ids})
+                # running packed tasks leave the status of their simulations to their files
+                sacct.write_text('#!/bin/bash\necho "111_1|RUNNING"\n')
+                platform._op_client.status_poller.clear()
+                self.assertEqual(platform._op_client.get_scheduler_statuses(exp, sim_ids=sim_ids), {})
+                self.assertEqual(platform.get_simulation_statuses(exp, sim_ids=sim_ids),
+                                 {sim_ids[0]: EntityStatus.SUCCEEDED, sim_ids[1]: EntityStatus.FAILED})
+            finally:
+                os.environ['PATH'] = path
+
+    def test_array_submission(self):
+        platform = Platform('SLURM_LOCAL', job_directory=self.job_directory, array_batch_size=1, max_running_jobs=3,
+                            refresh_interval=0.1)
+        _, exp = self.create_experiment(platform)
+        exp_dir = platform.get_directory(exp)
+        with tempfile.TemporaryDirectory() as bin_dir:
+            # sbatch answers job ids that follow the start of the slices, so the order of job_id.txt can be checked
+            sbatch = Path(bin_dir, 'sbatch')
+            sbatch.write_text('#!/bin/bash\n'
+                              f'echo "$@" >> {bin_dir}/calls.txt\n'
+                              'echo "$((1000 + ${@: -1}));cluster"\n')
+            sbatch.chmod(0o755)
+            scancel = Path(bin_dir, 'scancel')
+            scancel.write_text(f'#!/bin/bash\necho "$@" >> {bin_dir}/cancelled.txt\n')
+            scancel.chmod(0o755)
+            path = os.environ['PATH']
+            os.environ['PATH'] = f'{bin_dir}{os.pathsep}{path}'
+            try:
+                # both slices are submitted at once, without dependency
+                platform.submit_job(exp)
+                self.assertEqual(exp_dir.joinpath('job_id.txt').read_text(), '1000\n1001\n')
+                calls = sorted(Path(bin_dir, 'calls.txt').read_text().splitlines())
+                self.assertEqual(calls, ['--parsable --array=1-1%3 sbatch.sh 0', '--parsable --array=1-1%3 sbatch.sh 1'])
+
+                # with a limit on the queued tasks, the second slice waits for the queue to empty
+                Path(bin_dir, 'calls.txt').unlink()
+                squeue = Path(bin_dir, 'squeue')
+                squeue.write_text(f'#!/bin/bash\nif [ -f {bin_dir}/done.txt ]; then exit 0; fi\necho "1000_1"\n')
+                squeue.chmod(0o755)
+                submitter = platform._op_client.submit_experiment(exp, max_queued_tasks=1)
+                self.assertEqual(submitter.job_ids, ['1000'])
+                self.assertEqual(exp_dir.joinpath('job_id.txt').read_text(), '1000\n')
+                Path(bin_dir, 'done.txt').touch()
+                submitter.thread.join(timeout=30)
+                self.assertEqual(exp_dir.joinpath('job_id.txt').read_text(), '1000\n1001\n')
+                self.assertEqual(len(Path(bin_dir, 'calls.txt').read_text().splitlines()), 2)
+
+                # a failed sbatch cancels the slices already submitted
+                sbatch.write_text('#!/bin/bash\n'
+                                  'if [ "${@: -1}" = "1" ]; then echo "error" >&2; exit 1; fi\n'
+                                  'echo "$((1000 + ${@: -1}))"\n')
+                with self.assertRaises(RuntimeError):
+                    platform.submit_job(exp)
+                self.assertEqual(Path(bin_dir, 'cancelled.txt').read_text().strip(), '1000')
+
+                # an sbatch that cannot be run fails the same way
+                sbatch.chmod(0o644)
+                with self.assertRaises(RuntimeError):
+                    platform.submit_job(exp)
+            finally:
+                os.environ['PATH'] = path